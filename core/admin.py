@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (HCP, ResearchUpdate, EMRData, Engagement, UserProfile, HCRRecommendation, 
                     PatientCohort, TreatmentOutcome, CohortRecommendation, ActionableInsight,
                     AnonymizedPatient, EMRDataPoint, PatientOutcome, PatientCluster, 
-                    ClusterMembership, ClusterInsight, DrugRecommendation)
+                    ClusterMembership, ClusterInsight, DrugRecommendation, ScheduledJob, JobRun,
+                    TreatmentOutcomeStat, HCPMerge)
 
 @admin.register(HCP)
 class HCPAdmin(admin.ModelAdmin):
@@ -44,7 +45,12 @@ class HCRRecommendationAdmin(admin.ModelAdmin):
 class PatientCohortAdmin(admin.ModelAdmin):
     list_display = ['name', 'condition', 'specialty', 'patient_count', 'created_date']
     list_filter = ['specialty', 'condition', 'created_date']
-    search_fields = ['name', 'condition', 'specialty']
+    search_fields = ['name', 'condition', 'specialty', 'definition']
+
+    def save_model(self, request, obj, form, change):
+        from .cohorts import refresh_cohort_counts
+        super().save_model(request, obj, form, change)
+        refresh_cohort_counts([obj])
 
 @admin.register(TreatmentOutcome)
 class TreatmentOutcomeAdmin(admin.ModelAdmin):
@@ -106,3 +112,25 @@ class DrugRecommendationAdmin(admin.ModelAdmin):
     list_display = ['hcp', 'drug_name', 'indication', 'success_rate', 'evidence_level', 'priority', 'created_date', 'is_reviewed']
     list_filter = ['priority', 'evidence_level', 'created_date', 'is_reviewed', 'hcp__specialty']
     search_fields = ['hcp__name', 'drug_name', 'indication']
+
+@admin.register(TreatmentOutcomeStat)
+class TreatmentOutcomeStatAdmin(admin.ModelAdmin):
+    list_display = ['treatment', 'diagnosis', 'age_group', 'hcp', 'total', 'success_rate', 'ci_low', 'ci_high', 'updated_at']
+    list_filter = ['age_group', 'hcp__specialty']
+    search_fields = ['treatment', 'diagnosis', 'hcp__name']
+
+@admin.register(HCPMerge)
+class HCPMergeAdmin(admin.ModelAdmin):
+    list_display = ['name', 'merged_hcp_id', 'survivor', 'score', 'patients_moved', 'merged_at']
+    search_fields = ['name', 'contact_info', 'survivor__name']
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_run_at', 'last_run_at', 'lease_owner', 'lease_expires_at']
+    search_fields = ['name']
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ['job', 'status', 'started_at', 'duration_seconds', 'owner']
+    list_filter = ['status', 'job__name', 'started_at']
+    search_fields = ['job__name', 'output']
@@ -1,51 +1,40 @@
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.http import JsonResponse, StreamingHttpResponse
+from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.shortcuts import get_object_or_404
-import json
 
-from .models import PatientCluster, DrugRecommendation, ClusterInsight
-from .views import generate_cluster_based_recommendations, cohort_cluster_network
+from .models import PatientCluster, PatientCohort
+from .cluster_graph import cluster_graph, graph_filters, iter_graph_json
 
+@login_required
 @require_http_methods(["GET"])
 def cluster_network_data(request):
-    """API endpoint to get cluster network data"""
+    """API endpoint to get cluster network data (accepts the same filters as the network page)"""
+    if request.identity.role != 'HCR':
+        return JsonResponse({'error': 'Permission denied'}, status=403)
     try:
-        # Get the same data as the cohort_cluster_network view
-        from .views import cohort_cluster_network
-        from django.test import RequestFactory
-        
-        # Create a mock request
-        factory = RequestFactory()
-        mock_request = factory.get('/api/cluster-network-data/')
-        mock_request.user = request.user
-        
-        # Get the context from the view
-        context = cohort_cluster_network(mock_request)
-        
-        # Extract nodes and links from context
-        nodes = json.loads(context['nodes']) if 'nodes' in context else []
-        links = json.loads(context['links']) if 'links' in context else []
-        
-        return JsonResponse({
-            'nodes': nodes,
-            'links': links,
-            'status': 'success'
-        })
+        graph = cluster_graph(graph_filters(request.GET))
     except Exception as e:
         return JsonResponse({
             'error': str(e),
             'status': 'error'
         }, status=500)
+    
+    # Stream node by node so large graphs are never serialized as one string
+    return StreamingHttpResponse(iter_graph_json(graph, status='success'), content_type='application/json')
 
+@login_required
 @require_http_methods(["GET"])
 def cluster_recommendations(request, cluster_id):
     """API endpoint to get treatment recommendations for a specific cluster"""
+    if request.identity.role != 'HCR':
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    from .drug_matrix import cluster_drug_recommendations  # NumPy-backed; loaded on first use
     try:
         cluster = get_object_or_404(PatientCluster, id=cluster_id)
         
         # Generate cluster-based recommendations
-        recommendations = generate_cluster_based_recommendations(cluster)
+        recommendations = cluster_drug_recommendations(cluster)
         
         # Convert to JSON-serializable format
         json_recommendations = []
@@ -85,135 +74,57 @@ def cluster_recommendations(request, cluster_id):
             'status': 'error'
         }, status=500)
 
+@login_required
 @require_http_methods(["GET"])
 def cluster_evidence(request, cluster_id):
     """API endpoint to get detailed evidence for a cluster"""
+    if request.identity.role != 'HCR':
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    from .cluster_evidence import cluster_evidence as load_cluster_evidence  # NumPy-backed via drug_matrix
     try:
         cluster = get_object_or_404(PatientCluster, id=cluster_id)
-        
-        # Get cluster patients and their outcomes
-        cluster_patients = []
-        for membership in cluster.patients.all():
-            patient = membership.patient
-            patient_outcomes = list(patient.outcomes.all())
-            cluster_patients.append({
-                'patient': patient,
-                'outcomes': patient_outcomes,
-                'success_rate': calculate_patient_success_rate(patient_outcomes)
-            })
-        
-        # Analyze treatment success patterns
-        treatment_success = {}
-        for patient_data in cluster_patients:
-            for outcome in patient_data['outcomes']:
-                treatment = outcome.treatment
-                if treatment not in treatment_success:
-                    treatment_success[treatment] = {
-                        'total_patients': 0,
-                        'successful_patients': 0,
-                        'success_rates': [],
-                        'patient_demographics': [],
-                        'comorbidities': set(),
-                        'diagnoses': set()
-                    }
-                
-                treatment_success[treatment]['total_patients'] += 1
-                if patient_data['success_rate'] > 70:
-                    treatment_success[treatment]['successful_patients'] += 1
-                
-                treatment_success[treatment]['success_rates'].append(patient_data['success_rate'])
-                treatment_success[treatment]['patient_demographics'].append({
-                    'age_group': patient_data['patient'].age_group,
-                    'gender': patient_data['patient'].gender,
-                    'race': patient_data['patient'].race
-                })
-                
-                if patient_data['patient'].comorbidities:
-                    treatment_success[treatment]['comorbidities'].update(
-                        patient_data['patient'].comorbidities.split(',')
-                    )
-                if patient_data['patient'].primary_diagnosis:
-                    treatment_success[treatment]['diagnoses'].add(patient_data['patient'].primary_diagnosis)
-        
-        # Calculate overall statistics
-        total_patients = len(cluster_patients)
-        avg_success_rate = sum(p['success_rate'] for p in cluster_patients) / total_patients if total_patients > 0 else 0
-        
-        # Get demographics
-        demographics = []
-        for patient_data in cluster_patients:
-            demographics.append({
-                'age_group': patient_data['patient'].age_group,
-                'gender': patient_data['patient'].gender,
-                'race': patient_data['patient'].race
-            })
-        
-        # Get all comorbidities
-        all_comorbidities = set()
-        for patient_data in cluster_patients:
-            if patient_data['patient'].comorbidities:
-                all_comorbidities.update(patient_data['patient'].comorbidities.split(','))
-        
-        # Format treatment data
-        treatments = []
-        for treatment, data in treatment_success.items():
-            if data['total_patients'] >= 3:  # Only include treatments with sufficient evidence
-                cluster_success_rate = (data['successful_patients'] / data['total_patients']) * 100
-                avg_treatment_success = sum(data['success_rates']) / len(data['success_rates'])
-                
-                # Determine evidence level
-                if data['total_patients'] >= 10 and cluster_success_rate >= 80:
-                    evidence_level = 'High'
-                elif data['total_patients'] >= 5 and cluster_success_rate >= 70:
-                    evidence_level = 'Moderate'
-                else:
-                    evidence_level = 'Low'
-                
-                treatments.append({
-                    'name': treatment,
-                    'success_rate': round(cluster_success_rate, 1),
-                    'patient_count': data['total_patients'],
-                    'evidence_level': evidence_level,
-                    'comorbidities': list(data['comorbidities']),
-                    'diagnoses': list(data['diagnoses'])
-                })
-        
-        # Sort treatments by success rate
-        treatments.sort(key=lambda x: x['success_rate'], reverse=True)
-        
-        return JsonResponse({
-            'cluster': {
-                'id': cluster.id,
-                'name': cluster.name,
-                'patient_count': cluster.patient_count,
-                'success_rate': cluster.success_rate,
-                'primary_diagnosis': cluster.primary_diagnosis
-            },
-            'total_patients': total_patients,
-            'avg_success_rate': round(avg_success_rate, 1),
-            'demographics': demographics,
-            'comorbidities': list(all_comorbidities),
-            'treatments': treatments,
-            'status': 'success'
-        })
+        return JsonResponse({**load_cluster_evidence(cluster), 'status': 'success'})
     except Exception as e:
         return JsonResponse({
             'error': str(e),
             'status': 'error'
         }, status=500)
 
-def calculate_patient_success_rate(outcomes):
-    """Calculate success rate for a patient based on their outcomes"""
-    if not outcomes:
-        return 0
-    
-    # Simple success detection based on outcome keywords
-    success_keywords = ['success', 'effective', 'improved', 'positive', 'recovery', 'stable']
-    success_count = 0
-    
-    for outcome in outcomes:
-        outcome_text = outcome.treatment.lower()
-        if any(keyword in outcome_text for keyword in success_keywords):
-            success_count += 1
-    
-    return (success_count / len(outcomes)) * 100
+@login_required
+@require_http_methods(["GET"])
+def cohort_preview(request):
+    """API endpoint to count the patients a cohort definition matches before saving it (HCRs only)"""
+    if request.identity.role != 'HCR':
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    from .cohorts import CohortQueryError, bitmap_to_ids, definition_bitmap  # NumPy-backed; loaded on first use
+    try:
+        bitmap = definition_bitmap(request.GET.get('definition', ''))
+    except CohortQueryError as e:
+        return JsonResponse({'error': str(e), 'status': 'error'}, status=400)
+    return JsonResponse({
+        'patient_count': bitmap.bit_count(),
+        'sample_patient_ids': bitmap_to_ids(bitmap, limit=20),
+        'status': 'success'
+    })
+
+@login_required
+@require_http_methods(["GET"])
+def cohort_overlap(request):
+    """API endpoint for sizes, pairwise intersections and union of cohorts (?ids=1,2,3; HCRs only)"""
+    if request.identity.role != 'HCR':
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    from .cohorts import CohortQueryError, cohort_overlap as overlap  # NumPy-backed; loaded on first use
+    try:
+        ids = [int(value) for value in request.GET.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return JsonResponse({'error': 'ids must be comma-separated integers', 'status': 'error'}, status=400)
+    cohorts = list(PatientCohort.objects.filter(id__in=ids))
+    try:
+        result = overlap(cohorts)
+    except CohortQueryError as e:
+        return JsonResponse({'error': str(e), 'status': 'error'}, status=400)
+    return JsonResponse({
+        **result,
+        'cohorts': [{'id': cohort.id, 'name': cohort.name} for cohort in cohorts],
+        'status': 'success'
+    })
@@ -0,0 +1,243 @@
+"""
+View Benchmark Suite
+Deterministic benchmark datasets and test-client timing of the main views
+"""
+import hashlib
+import logging
+import platform
+import random
+import subprocess
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+import django
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from .models import (
+    HCP, AnonymizedPatient, ResearchUpdate, UserProfile, ActionableInsight, PatientCohort,
+    CohortRecommendation, PatientIssueAnalysis, ScrapedResearch, IntelligentRecommendation,
+)
+from .outcome_stats import refresh_outcome_stats
+from .query_profiler import QueryRecorder
+from .relevance import apply_features
+from .synthetic import SPECIALTY_PROFILES, SYNTHETIC_EPOCH, generate_synthetic_patients
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the dataset generator changes shape, so old results are not
+# compared against a different dataset
+DATASET_VERSION = 7
+
+DATASET_SIZES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+PATIENTS_PER_HCP = 500
+RESEARCH_UPDATES = 300
+
+BENCHMARK_USERNAME = 'benchmark_hcr'
+
+BENCHMARK_VIEWS = [
+    {'name': 'dashboard', 'method': 'GET'},
+    {'name': 'patient_database', 'method': 'GET'},
+    {'name': 'cohort_cluster_network', 'method': 'GET'},
+    {'name': 'research_dashboard', 'method': 'GET'},
+    {'name': 'create_recommendation_ajax', 'method': 'POST', 'hcp_arg': True},
+]
+
+
+def dataset_fingerprint(size: int, seed: int) -> str:
+    """Stable identifier for a (generator version, size, seed) dataset"""
+    raw = f'{DATASET_VERSION}:{size}:{seed}'
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def dataset_is_loaded(size: int, seed: int) -> bool:
+    """True when the current database already holds the requested dataset"""
+    marker = User.objects.filter(username=BENCHMARK_USERNAME).values_list('email', flat=True).first()
+    return (
+        marker == f'{dataset_fingerprint(size, seed)}@benchmark.invalid'
+        and AnonymizedPatient.objects.count() == size
+    )
+
+
+def reset_view_side_effects():
+    """Remove rows the benchmarked views write, so a reused dataset starts clean"""
+    for model in (IntelligentRecommendation, PatientIssueAnalysis, ScrapedResearch,
+                  CohortRecommendation, PatientCohort, ActionableInsight):
+        model.objects.all().delete()
+
+
+def seed_dataset(size: int, seed: int, workers: int = 1,
+                 progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Populate the current database with a deterministic benchmark dataset"""
+    rng = random.Random(seed)
+    specialties = list(SPECIALTY_PROFILES)
+    hcp_count = max(3, -(-size // PATIENTS_PER_HCP))
+
+    user = User.objects.create_user(
+        username=BENCHMARK_USERNAME,
+        email=f'{dataset_fingerprint(size, seed)}@benchmark.invalid',
+        is_staff=True,
+    )
+    UserProfile.objects.create(user=user, role='HCR')
+
+    # bulk_create skips ingestion, so compute the static relevance features (and relevance_key) here
+    ResearchUpdate.objects.bulk_create([
+        ResearchUpdate(**apply_features({
+            'headline': f'{specialties[index % len(specialties)]} benchmark study {index:04d}',
+            'specialty': specialties[index % len(specialties)],
+            'date': SYNTHETIC_EPOCH - timedelta(days=rng.randint(0, 365)),
+            'abstract': f'Benchmark abstract for study {index}.',
+            'source': 'Benchmark',
+            'is_high_impact': rng.random() < 0.2,
+        }, today=SYNTHETIC_EPOCH))
+        for index in range(RESEARCH_UPDATES)
+    ])
+
+    hcps = HCP.objects.bulk_create([
+        HCP(
+            name=f'Dr. Benchmark {index:05d}',
+            specialty=specialties[index % len(specialties)],
+            contact_info=f'benchmark{index:05d}@example.com',
+        )
+        for index in range(hcp_count)
+    ])
+
+    totals = generate_synthetic_patients(
+        [(hcp.id, hcp.specialty) for hcp in hcps],
+        size,
+        seed=seed,
+        workers=workers,
+        with_clusters=True,
+        prefix='BP',
+        progress=progress,
+    )
+    # Raw inserts skip the outcome signal that keeps TreatmentOutcomeStat current
+    refresh_outcome_stats()
+    totals.update({
+        'hcps': hcp_count,
+        'research_updates': RESEARCH_UPDATES,
+        'fingerprint': dataset_fingerprint(size, seed),
+    })
+    return totals
+
+
+def _percentiles(latencies: List[float]) -> Dict:
+    values = np.asarray(latencies, dtype=float)
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {
+        'min_ms': round(float(values.min()), 2),
+        'mean_ms': round(float(values.mean()), 2),
+        'p50_ms': round(float(p50), 2),
+        'p90_ms': round(float(p90), 2),
+        'p95_ms': round(float(p95), 2),
+        'p99_ms': round(float(p99), 2),
+        'max_ms': round(float(values.max()), 2),
+    }
+
+
+def benchmark_view(client: Client, spec: Dict, hcp_id: int, iterations: int, warmup: int) -> Dict:
+    """Time one view through the test client and count its queries"""
+    args = [hcp_id] if spec.get('hcp_arg') else []
+    url = reverse(spec['name'], args=args)
+    request = client.post if spec['method'] == 'POST' else client.get
+
+    for _ in range(warmup):
+        request(url)
+
+    latencies = []
+    query_counts = []
+    sql_ms = []
+    statuses = set()
+    for _ in range(iterations):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            start = time.perf_counter()
+            response = request(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+        query_counts.append(recorder.query_count)
+        sql_ms.append(recorder.sql_time * 1000)
+        statuses.add(response.status_code)
+
+    result = {
+        'view': spec['name'],
+        'method': spec['method'],
+        'path': url,
+        'iterations': iterations,
+        'status_codes': sorted(statuses),
+        'queries': {
+            'min': min(query_counts),
+            'max': max(query_counts),
+            'mean': round(sum(query_counts) / len(query_counts), 1),
+        },
+        'sql_mean_ms': round(sum(sql_ms) / len(sql_ms), 2),
+    }
+    result.update(_percentiles(latencies))
+    return result
+
+
+def run_benchmarks(view_names: List[str], iterations: int, warmup: int,
+                   progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """Benchmark the selected views as the benchmark HCR user"""
+    client = Client()
+    client.force_login(User.objects.get(username=BENCHMARK_USERNAME))
+    hcp_id = HCP.objects.order_by('id').values_list('id', flat=True).first()
+
+    results = []
+    for spec in BENCHMARK_VIEWS:
+        if spec['name'] not in view_names:
+            continue
+        result = benchmark_view(client, spec, hcp_id, iterations, warmup)
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+def git_commit() -> str:
+    """Current commit hash, or an empty string outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def environment_info() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'database': connections['default'].vendor,
+    }
+
+
+def compare_results(baseline: Dict, current: Dict) -> List[Dict]:
+    """Per-view p50/p95 and query-count deltas between two result files"""
+    baseline_views = {r['view']: r for r in baseline.get('results', [])}
+    deltas = []
+    for result in current.get('results', []):
+        previous = baseline_views.get(result['view'])
+        if not previous:
+            continue
+        deltas.append({
+            'view': result['view'],
+            'p50_ms': (previous['p50_ms'], result['p50_ms']),
+            'p95_ms': (previous['p95_ms'], result['p95_ms']),
+            'queries': (previous['queries']['mean'], result['queries']['mean']),
+        })
+    return deltas
@@ -0,0 +1,113 @@
+"""
+Cluster Evidence
+Treatment evidence for one cluster from grouped aggregations over
+ClusterMembership -> PatientOutcome, counted by outcome code and cached per
+cluster data version
+"""
+import logging
+from typing import Dict, List
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+
+from .drug_matrix import SUCCESS_OUTCOMES
+from .models import ClusterMembership, PatientCluster, PatientOutcome
+from .versioning import CLUSTERS, get_version
+from .vocabulary import term_counts, terms_by_group
+
+logger = logging.getLogger(__name__)
+
+MIN_TREATMENT_PATIENTS = 3  # Only include treatments with sufficient evidence
+OUTCOME_CODES = [code for code, _ in PatientOutcome.OUTCOME_CHOICES]
+# Patient edits do not bump the cluster version; the timeout bounds how long they can stay stale
+CACHE_TIMEOUT = 60 * 10
+
+
+def _outcome_annotations() -> Dict:
+    """Total, distinct patient and per-outcome-code counts for a grouped PatientOutcome query"""
+    annotations = {'total': Count('id'), 'patients': Count('patient', distinct=True)}
+    for code in OUTCOME_CODES:
+        annotations[code.lower()] = Count('id', filter=Q(outcome=code))
+    return annotations
+
+
+def _success_rate(row: Dict) -> float:
+    successes = sum(row[code.lower()] for code in SUCCESS_OUTCOMES)
+    return successes / row['total'] * 100 if row['total'] else 0
+
+
+def evidence_level(patient_count: int, success_rate: float) -> str:
+    if patient_count >= 10 and success_rate >= 80:
+        return 'High'
+    if patient_count >= 5 and success_rate >= 70:
+        return 'Moderate'
+    return 'Low'
+
+
+def treatment_evidence(cluster_id: int) -> List[Dict]:
+    """Per-treatment outcome counts for the cluster's patients, best success rate first"""
+    outcomes = PatientOutcome.objects.filter(patient__cluster_memberships__cluster_id=cluster_id)
+    rows = list(outcomes.values('treatment').annotate(**_outcome_annotations()).order_by())
+    rows = [row for row in rows if row['patients'] >= MIN_TREATMENT_PATIENTS]
+    if not rows:
+        return []
+
+    names = [row['treatment'] for row in rows]
+    scope = {'patient__cluster_memberships__cluster_id': cluster_id}
+    diagnoses = terms_by_group('primary_diagnosis', 'patient__outcomes__treatment', names, scope)
+    comorbidities = terms_by_group('comorbidities', 'patient__outcomes__treatment', names, scope)
+
+    treatments = []
+    for row in rows:
+        success_rate = _success_rate(row)
+        treatments.append({
+            'name': row['treatment'],
+            'success_rate': round(success_rate, 1),
+            'patient_count': row['patients'],
+            'outcome_count': row['total'],
+            'outcomes': {code: row[code.lower()] for code in OUTCOME_CODES},
+            'evidence_level': evidence_level(row['patients'], success_rate),
+            'comorbidities': sorted(comorbidities[row['treatment']]),
+            'diagnoses': sorted(diagnoses[row['treatment']]),
+        })
+    treatments.sort(key=lambda t: (-t['success_rate'], t['name']))
+    return treatments
+
+
+def build_evidence(cluster: PatientCluster) -> Dict:
+    """Cluster-wide outcome totals, grouped demographics and comorbidities, and per-treatment evidence"""
+    members = ClusterMembership.objects.filter(cluster_id=cluster.id)
+    overall = PatientOutcome.objects.filter(patient__cluster_memberships__cluster_id=cluster.id).aggregate(
+        **_outcome_annotations()
+    )
+    demographics = list(
+        members.values(age_group=F('patient__age_group'), gender=F('patient__gender'), race=F('patient__race'))
+        .annotate(count=Count('id'))
+        .order_by('-count', 'age_group', 'gender', 'race')
+    )
+
+    return {
+        'cluster': {
+            'id': cluster.id,
+            'name': cluster.name,
+            'patient_count': cluster.patient_count,
+            'success_rate': cluster.success_rate,
+            'primary_diagnosis': cluster.primary_diagnosis
+        },
+        'total_patients': members.count(),
+        'avg_success_rate': round(_success_rate(overall), 1),
+        'outcomes': {code: overall[code.lower()] for code in OUTCOME_CODES},
+        'demographics': demographics,
+        'comorbidities': [name for name, _ in term_counts(['comorbidities'], members.values('patient_id'))],
+        'treatments': treatment_evidence(cluster.id),
+    }
+
+
+def cluster_evidence(cluster: PatientCluster) -> Dict:
+    """Cached build_evidence(); any membership, outcome or cluster change bumps the version"""
+    cache_key = f'cluster_evidence:v{get_version(CLUSTERS)}:{cluster.id}'
+    evidence = cache.get(cache_key)
+    if evidence is None:
+        evidence = build_evidence(cluster)
+        cache.set(cache_key, evidence, CACHE_TIMEOUT)
+    return evidence
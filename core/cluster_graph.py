@@ -0,0 +1,294 @@
+"""
+Cluster Graph Service
+Typed nodes and edges for the cohort cluster network, built once per filter set
+and cluster data version so the HTML view and the JSON API share one cached result
+"""
+import hashlib
+import json
+import logging
+import random
+from typing import Dict, Iterator, List, Mapping, Set, TypedDict
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import ClusterMembership, Condition, PatientCluster, PatientOutcome
+from .versioning import CLUSTERS, get_version
+from .vocabulary import terms_by_group
+
+logger = logging.getLogger(__name__)
+
+FILTER_KEYS = ('specialty', 'treatment', 'diagnosis', 'risk')
+MAX_CLUSTERS = 20
+MAX_CONNECTIONS_PER_CLUSTER = 5  # Limit connections to make it more realistic
+# Patient edits do not bump the cluster version; the timeout bounds how long they can stay stale
+CACHE_TIMEOUT = 60 * 10
+
+
+class ClusterNode(TypedDict):
+    id: str
+    name: str
+    type: str
+    patient_count: int
+    success_rate: float
+    specialty: str
+    diagnoses: List[str]
+    treatments: List[str]
+    common_treatments: List[str]
+    treatment_counts: Dict[str, int]
+    description: str
+
+
+class ClusterEdge(TypedDict):
+    source: str
+    target: str
+    similarity: float
+    strength: str
+    color: str
+    shared_treatments: List[str]
+    shared_diagnoses: List[str]
+    shared_comorbidities: List[str]
+    shared_age_groups: List[str]
+    shared_zip_codes: List[str]
+    connection_reasons: str
+    treatment_similarity: float
+    diagnosis_similarity: float
+    demographic_similarity: float
+    comorbidity_similarity: float
+    geographic_similarity: float
+    outcome_similarity: float
+
+
+class ClusterGraph(TypedDict):
+    nodes: List[ClusterNode]
+    links: List[ClusterEdge]
+
+
+def graph_filters(params: Mapping) -> Dict[str, str]:
+    """Normalized filter values (missing keys become '') from request.GET or any mapping"""
+    return {key: (params.get(key) or '').strip() for key in FILTER_KEYS}
+
+
+def filter_options() -> Dict[str, List[str]]:
+    """Dropdown values for the network filters, drawn from ALL data (not just filtered clusters)"""
+    specialties = sorted(
+        s for s in PatientCluster.objects.values_list('hcp__specialty', flat=True).distinct() if s
+    )
+    treatments = sorted(t for t in PatientOutcome.objects.values_list('treatment', flat=True).distinct() if t)
+    diagnoses = sorted(
+        Condition.objects.filter(patient_links__source='PRIMARY').values_list('name', flat=True).distinct()
+    )
+    return {'specialties': specialties, 'treatments': treatments, 'diagnoses': diagnoses}
+
+
+def _jaccard(first: Set, second: Set) -> float:
+    union = len(first | second)
+    return len(first & second) / union if union else 0
+
+
+def _cluster_profiles(cluster_ids: List[int]) -> Dict[str, Dict[int, object]]:
+    """Per-cluster treatment counts, diagnoses, comorbidities, age groups and zip codes, one grouped query each"""
+    membership_path = 'patient__cluster_memberships__cluster_id'
+
+    treatment_counts = {cid: {} for cid in cluster_ids}
+    treatment_rows = (
+        PatientOutcome.objects.filter(**{f'{membership_path}__in': cluster_ids})
+        .values_list(membership_path, 'treatment')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'treatment')
+    )
+    for cid, treatment, count in treatment_rows:
+        treatment_counts[cid][treatment] = count
+
+    age_groups = {cid: set() for cid in cluster_ids}
+    zip_codes = {cid: set() for cid in cluster_ids}
+    demographic_rows = (
+        ClusterMembership.objects.filter(cluster_id__in=cluster_ids)
+        .values_list('cluster_id', 'patient__age_group', 'patient__zip_code_prefix')
+        .distinct()
+    )
+    for cid, age_group, zip_code in demographic_rows:
+        if age_group:
+            age_groups[cid].add(age_group)
+        if zip_code:
+            zip_codes[cid].add(zip_code)
+
+    return {
+        'treatment_counts': treatment_counts,
+        'diagnoses': terms_by_group('primary_diagnosis', membership_path, cluster_ids),
+        'comorbidities': terms_by_group('comorbidities', membership_path, cluster_ids),
+        'age_groups': age_groups,
+        'zip_codes': zip_codes,
+    }
+
+
+def _matches_risk(risk: str, patient_count: int) -> bool:
+    """Risk filter (simplified - based on patient count)"""
+    if risk == 'high':
+        return patient_count > 40
+    if risk == 'medium':
+        return 20 < patient_count <= 40
+    if risk == 'low':
+        return patient_count <= 20
+    return True
+
+
+def _outcome_rate(counts: Dict[str, int]) -> float:
+    """Share of outcomes whose treatment name reads as a success (simplified)"""
+    return sum(c for t, c in counts.items() if 'success' in t.lower() or 'effective' in t.lower()) / sum(counts.values())
+
+
+def build_graph(filters: Mapping[str, str]) -> ClusterGraph:
+    """Nodes for the clusters passing `filters` and similarity edges between them"""
+    clusters = PatientCluster.objects.select_related('hcp')
+    if filters['specialty']:
+        clusters = clusters.filter(hcp__specialty=filters['specialty'])
+    clusters = list(clusters[:MAX_CLUSTERS])
+    profiles = _cluster_profiles([cluster.id for cluster in clusters])
+    treatment_counts = profiles['treatment_counts']
+    diagnoses = profiles['diagnoses']
+    comorbidities = profiles['comorbidities']
+    age_groups = profiles['age_groups']
+    zip_codes = profiles['zip_codes']
+
+    nodes: List[ClusterNode] = []
+    cluster_treatments = {}
+    for cluster in clusters:
+        counts = treatment_counts[cluster.id]
+        if filters['treatment'] and filters['treatment'] not in counts:
+            continue
+        if filters['diagnosis'] and filters['diagnosis'] not in diagnoses[cluster.id]:
+            continue
+        if not _matches_risk(filters['risk'], cluster.patient_count):
+            continue
+
+        # Treatment counts arrive most common first
+        treatment_list = list(counts)
+        cluster_treatments[cluster.id] = set(treatment_list)
+        nodes.append({
+            'id': f"cluster_{cluster.id}",
+            'name': cluster.name,
+            'type': 'cluster',
+            'patient_count': cluster.patient_count,
+            'success_rate': round(cluster.success_rate_percentage, 1),
+            'specialty': cluster.hcp.specialty if cluster.hcp else 'Unknown',
+            'diagnoses': sorted(diagnoses[cluster.id]),
+            'treatments': treatment_list,
+            'common_treatments': treatment_list[:5],
+            'treatment_counts': counts,
+            'description': cluster.description or f"AI-discovered cluster with {cluster.patient_count} patients"
+        })
+
+    links: List[ClusterEdge] = []
+    cluster_ids = list(cluster_treatments)
+    connection_counts = {cid: 0 for cid in cluster_ids}
+    for i, first in enumerate(cluster_ids):
+        for second in cluster_ids[i + 1:]:
+            shared_treatments = cluster_treatments[first] & cluster_treatments[second]
+            shared_diagnoses = diagnoses[first] & diagnoses[second]
+            shared_comorbidities = comorbidities[first] & comorbidities[second]
+            shared_ages = age_groups[first] & age_groups[second]
+            shared_zips = zip_codes[first] & zip_codes[second]
+
+            treatment_similarity = _jaccard(cluster_treatments[first], cluster_treatments[second])
+            diagnosis_similarity = _jaccard(diagnoses[first], diagnoses[second])
+            demographic_similarity = _jaccard(age_groups[first], age_groups[second])
+            comorbidity_similarity = _jaccard(comorbidities[first], comorbidities[second])
+            geographic_similarity = _jaccard(zip_codes[first], zip_codes[second])
+            outcome_similarity = 0
+            if treatment_counts[first] and treatment_counts[second]:
+                # Closer success rates = higher similarity
+                outcome_similarity = 1 - abs(_outcome_rate(treatment_counts[first]) - _outcome_rate(treatment_counts[second]))
+
+            # Weighted combined similarity for clinically meaningful connections
+            combined_similarity = (
+                treatment_similarity * 0.25 +
+                diagnosis_similarity * 0.20 +
+                demographic_similarity * 0.20 +
+                comorbidity_similarity * 0.15 +
+                geographic_similarity * 0.10 +
+                outcome_similarity * 0.10
+            )
+            meaningful_connections = sum((
+                treatment_similarity > 0.3,
+                diagnosis_similarity > 0.3,
+                demographic_similarity > 0.4,
+                comorbidity_similarity > 0.2,
+                geographic_similarity > 0.3,
+            ))
+
+            # ±5% variation to break perfect symmetry, seeded by the pair so cached graphs are stable
+            adjusted_similarity = combined_similarity * random.Random(f'{first}:{second}').uniform(0.95, 1.05)
+            if not (adjusted_similarity > 0.4 or (adjusted_similarity > 0.25 and meaningful_connections >= 2)):
+                continue
+            if (connection_counts[first] >= MAX_CONNECTIONS_PER_CLUSTER
+                    or connection_counts[second] >= MAX_CONNECTIONS_PER_CLUSTER):
+                continue
+
+            if combined_similarity > 0.5:
+                strength, color = 'strong', '#e74c3c'  # Red for high similarity
+            elif combined_similarity > 0.3:
+                strength, color = 'medium', '#f39c12'  # Orange for medium similarity
+            else:
+                strength, color = 'weak', '#27ae60'  # Green for low similarity
+
+            reasons = []
+            if treatment_similarity > 0.3:
+                reasons.append(f"Shared treatments ({len(shared_treatments)} common)")
+            if diagnosis_similarity > 0.3:
+                reasons.append(f"Similar diagnoses ({len(shared_diagnoses)} common)")
+            if demographic_similarity > 0.3:
+                reasons.append(f"Similar age groups ({len(shared_ages)} common)")
+            if comorbidity_similarity > 0.2:
+                reasons.append(f"Shared comorbidities ({len(shared_comorbidities)} common)")
+            if geographic_similarity > 0.2:
+                reasons.append(f"Geographic proximity ({len(shared_zips)} common zip codes)")
+
+            links.append({
+                'source': f"cluster_{first}",
+                'target': f"cluster_{second}",
+                'similarity': round(combined_similarity * 100, 1),
+                'strength': strength,
+                'color': color,
+                'shared_treatments': sorted(shared_treatments),
+                'shared_diagnoses': sorted(shared_diagnoses),
+                'shared_comorbidities': sorted(shared_comorbidities),
+                'shared_age_groups': sorted(shared_ages),
+                'shared_zip_codes': sorted(shared_zips),
+                'connection_reasons': "; ".join(reasons) if reasons else "Low-level similarity",
+                'treatment_similarity': round(treatment_similarity * 100, 1),
+                'diagnosis_similarity': round(diagnosis_similarity * 100, 1),
+                'demographic_similarity': round(demographic_similarity * 100, 1),
+                'comorbidity_similarity': round(comorbidity_similarity * 100, 1),
+                'geographic_similarity': round(geographic_similarity * 100, 1),
+                'outcome_similarity': round(outcome_similarity * 100, 1)
+            })
+            connection_counts[first] += 1
+            connection_counts[second] += 1
+
+    return {'nodes': nodes, 'links': links}
+
+
+def cluster_graph(filters: Mapping[str, str]) -> ClusterGraph:
+    """Cached build_graph(); the key combines the filter values and the cluster data version"""
+    filters = graph_filters(filters)
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    cache_key = f'cluster_graph:v{get_version(CLUSTERS)}:{digest}'
+    graph = cache.get(cache_key)
+    if graph is None:
+        graph = build_graph(filters)
+        cache.set(cache_key, graph, CACHE_TIMEOUT)
+    return graph
+
+
+def iter_graph_json(graph: ClusterGraph, **extra) -> Iterator[str]:
+    """JSON document for `graph` (plus `extra` top-level keys) one node or edge at a time, for streaming responses"""
+    yield '{'
+    for key, value in extra.items():
+        yield f'{json.dumps(key)}: {json.dumps(value)}, '
+    for position, key in enumerate(('nodes', 'links')):
+        yield f'{", " if position else ""}"{key}": ['
+        for index, item in enumerate(graph[key]):
+            yield (', ' if index else '') + json.dumps(item)
+        yield ']'
+    yield '}'
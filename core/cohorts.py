@@ -0,0 +1,362 @@
+"""
+Cohort Definitions
+A small query language for PatientCohort.definition, e.g.
+
+    age_group = "56-65" and diagnosis = "Type 2 Diabetes"
+        and er_visits >= 2 and treatment in ("Metformin", "Insulin")
+
+compiled to an ORM filter (vocabulary terms become indexed subqueries on the
+link tables). Matching patient ids are cached as bitmaps keyed by the patient
+data version, so counts, intersections and unions between cohorts are integer
+bit operations and any patient change invalidates every cached result
+"""
+import hashlib
+import logging
+import re
+from functools import reduce
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import AnonymizedPatient, PatientCohort, PatientCondition, PatientRiskFactor, PatientTreatment
+from .risk_scoring import AGE_RISK
+from .versioning import PATIENTS, get_version
+from .vocabulary import TERM_FIELDS, term_key
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 60 * 60 * 24  # Versioned keys go stale on change, the timeout only bounds memory
+MAX_DEFINITION_LENGTH = 2000
+
+AGE_GROUPS = list(AGE_RISK)  # Youngest to oldest, so age_group supports < and >
+
+# DSL field -> (kind, target). kinds: text (case-insensitive), number, ordinal, term (vocabulary link)
+FIELDS = {
+    'age_group': ('ordinal', 'age_group'),
+    'gender': ('text', 'gender'),
+    'race': ('text', 'race'),
+    'ethnicity': ('text', 'ethnicity'),
+    'zip_code_prefix': ('text', 'zip_code_prefix'),
+    'insurance_type': ('text', 'insurance_type'),
+    'medication_adherence': ('text', 'medication_adherence'),
+    'medication_access': ('text', 'medication_access'),
+    'visit_frequency': ('text', 'visit_frequency'),
+    'specialty': ('text', 'hcp__specialty'),
+    'hcp': ('number', 'hcp_id'),
+    'er_visits': ('number', 'emergency_visits_6m'),
+    'emergency_visits_6m': ('number', 'emergency_visits_6m'),
+    'hospitalizations': ('number', 'hospitalizations_6m'),
+    'hospitalizations_6m': ('number', 'hospitalizations_6m'),
+    'risk_score': ('number', 'risk_score'),
+    'diagnosis': ('term', (PatientCondition, 'condition', {'source__in': ['PRIMARY', 'SECONDARY']})),
+    'primary_diagnosis': ('term', (PatientCondition, 'condition', {'source': 'PRIMARY'})),
+    'comorbidity': ('term', (PatientCondition, 'condition', {'source': 'COMORBIDITY'})),
+    'condition': ('term', (PatientCondition, 'condition', {})),
+    'treatment': ('term', (PatientTreatment, 'treatment', {'status': 'CURRENT'})),
+    'past_treatment': ('term', (PatientTreatment, 'treatment', {'status': 'HISTORY'})),
+    'risk_factor': ('term', (PatientRiskFactor, 'risk_factor', {})),
+}
+
+# Patient model fields a definition can read (column names and attnames, plus the text fields
+# term links are built from); saves that touch none of them cannot change any cohort's members
+PATIENT_FIELDS = frozenset(
+    name
+    for kind, target in FIELDS.values() if kind != 'term' and '__' not in target
+    for name in (target, target.removesuffix('_id'))
+) | frozenset(TERM_FIELDS)
+TERM_LINK_MODELS = (PatientCondition, PatientTreatment, PatientRiskFactor)
+
+COMPARISONS = {'=': 'exact', '!=': 'exact', '>': 'gt', '>=': 'gte', '<': 'lt', '<=': 'lte'}
+KIND_OPERATORS = {
+    'text': {'=', '!=', 'in', 'not in'},
+    'term': {'=', '!=', 'in', 'not in'},
+    'number': set(COMPARISONS) | {'in', 'not in'},
+    'ordinal': set(COMPARISONS) | {'in', 'not in'},
+}
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?(?![\w-]))
+      | (?P<op>!=|>=|<=|=|>|<)
+      | (?P<punct>[(),])
+      | (?P<word>[A-Za-z_][\w.+-]*|\d[\w.+-]*)
+    )''', re.VERBOSE)
+
+
+class CohortQueryError(ValueError):
+    """A cohort definition that does not parse or uses an unknown field/operator"""
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    if len(text) > MAX_DEFINITION_LENGTH:
+        raise CohortQueryError(f'Definition is longer than {MAX_DEFINITION_LENGTH} characters')
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            raise CohortQueryError(f'Unexpected character at position {position}: {text[position:position + 10]!r}')
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == 'word' and value.lower() in ('and', 'or', 'not', 'in'):
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent: or_expr := and_expr ('or' and_expr)*, and_expr := not_expr ('and' not_expr)*"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, kind: Optional[str] = None, value: Optional[str] = None) -> str:
+        token_kind, token_value = self.peek()
+        if token_kind is None or (kind and token_kind != kind) or (value and token_value != value):
+            expected = value or kind or 'more input'
+            found = 'end of definition' if token_kind is None else repr(token_value)
+            raise CohortQueryError(f'Expected {expected} but found {found}')
+        self.position += 1
+        return token_value
+
+    def accept(self, kind: str, value: str) -> bool:
+        if self.peek() == (kind, value):
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> Q:
+        q = self.or_expr()
+        if self.position != len(self.tokens):
+            raise CohortQueryError(f'Unexpected {self.peek()[1]!r} after a complete condition')
+        return q
+
+    def or_expr(self) -> Q:
+        q = self.and_expr()
+        while self.accept('keyword', 'or'):
+            q |= self.and_expr()
+        return q
+
+    def and_expr(self) -> Q:
+        q = self.not_expr()
+        while self.accept('keyword', 'and'):
+            q &= self.not_expr()
+        return q
+
+    def not_expr(self) -> Q:
+        if self.accept('keyword', 'not'):
+            return ~self.not_expr()
+        if self.accept('punct', '('):
+            q = self.or_expr()
+            self.take('punct', ')')
+            return q
+        return self.predicate()
+
+    def predicate(self) -> Q:
+        field = self.take('word').lower()
+        if field not in FIELDS:
+            raise CohortQueryError(f"Unknown field {field!r}; available: {', '.join(sorted(FIELDS))}")
+        kind, target = FIELDS[field]
+
+        if self.accept('keyword', 'not'):
+            self.take('keyword', 'in')
+            operator = 'not in'
+        elif self.accept('keyword', 'in'):
+            operator = 'in'
+        else:
+            operator = self.take('op')
+        if operator not in KIND_OPERATORS[kind]:
+            raise CohortQueryError(f'{field} does not support {operator!r}')
+
+        if operator in ('in', 'not in'):
+            values = self.value_list()
+            q = reduce(lambda a, b: a | b, (_predicate(kind, target, '=', value) for value in values))
+            return ~q if operator == 'not in' else q
+        return _predicate(kind, target, operator, self.value())
+
+    def value(self) -> str:
+        kind, value = self.peek()
+        if kind not in ('string', 'number', 'word'):
+            raise CohortQueryError(f"Expected a value but found {value!r}" if kind else 'Expected a value')
+        self.position += 1
+        return value
+
+    def value_list(self) -> List[str]:
+        self.take('punct', '(')
+        values = [self.value()]
+        while self.accept('punct', ','):
+            values.append(self.value())
+        self.take('punct', ')')
+        return values
+
+
+def _number(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        raise CohortQueryError(f'{value!r} is not a number')
+
+
+def _predicate(kind: str, target, operator: str, value: str) -> Q:
+    if kind == 'term':
+        model, fk_name, extra = target
+        patients = model.objects.filter(**{f'{fk_name}__key': term_key(value)}, **extra).values('patient_id')
+        q = Q(id__in=patients)
+    elif kind == 'text':
+        q = Q(**{f'{target}__iexact': value})
+    elif kind == 'number':
+        q = Q(**{f'{target}__{COMPARISONS[operator]}': _number(value)})
+    else:  # ordinal
+        if value not in AGE_GROUPS:
+            raise CohortQueryError(f"Unknown {target} {value!r}; use one of {', '.join(AGE_GROUPS)}")
+        rank = AGE_GROUPS.index(value)
+        keep = {
+            '=': lambda i: i == rank, '!=': lambda i: i == rank,
+            '>': lambda i: i > rank, '>=': lambda i: i >= rank,
+            '<': lambda i: i < rank, '<=': lambda i: i <= rank,
+        }[operator]
+        q = Q(**{f'{target}__in': [group for i, group in enumerate(AGE_GROUPS) if keep(i)]})
+    return ~q if operator == '!=' else q
+
+
+def compile_definition(definition: str) -> Q:
+    """Q over AnonymizedPatient for a cohort definition; raises CohortQueryError"""
+    tokens = tokenize(definition or '')
+    if not tokens:
+        raise CohortQueryError('Definition is empty')
+    return _Parser(tokens).parse()
+
+
+def definition_digest(definition: str) -> str:
+    """Whitespace- and keyword-case-insensitive fingerprint, so equivalent spellings share a cache entry"""
+    canonical = repr(tokenize(definition or ''))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def cohort_queryset(definition: str, queryset=None):
+    queryset = queryset if queryset is not None else AnonymizedPatient.objects.all()
+    return queryset.filter(compile_definition(definition))
+
+
+# Bitmaps are Python ints with bit i set when patient id i is a member
+
+def ids_to_bitmap(ids: Iterable[int]) -> int:
+    ids = np.fromiter(ids, dtype=np.int64)
+    if not len(ids):
+        return 0
+    bits = np.zeros(int(ids.max()) + 1, dtype=bool)
+    bits[ids] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def bitmap_to_ids(bitmap: int, limit: Optional[int] = None) -> List[int]:
+    """Set bit positions in ascending order; with `limit`, only the first `limit` of them"""
+    if not bitmap:
+        return []
+    if limit is not None:
+        # Peel off the lowest set bit instead of unpacking the whole bitmap
+        ids = []
+        while bitmap and len(ids) < limit:
+            lowest = bitmap & -bitmap
+            ids.append(lowest.bit_length() - 1)
+            bitmap ^= lowest
+        return ids
+    packed = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, bitorder='little')).tolist()
+
+
+def definition_bitmap(definition: str) -> int:
+    """Member bitmap for a definition, cached until any patient changes"""
+    cache_key = f'cohort_bitmap:v{get_version(PATIENTS)}:{definition_digest(definition)}'
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return int.from_bytes(cached, 'little')
+
+    ids = cohort_queryset(definition).values_list('id', flat=True).iterator(chunk_size=50000)
+    bitmap = ids_to_bitmap(ids)
+    cache.set(cache_key, bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), CACHE_TIMEOUT)
+    return bitmap
+
+
+def uses_vocabulary(definition: str) -> bool:
+    """Whether a definition has a term predicate, read off its tokens without compiling it"""
+    return any(kind == 'word' and FIELDS.get(value.lower(), ('',))[0] == 'term' for kind, value in tokenize(definition))
+
+
+def vocabulary_ready() -> bool:
+    """False while patients exist but none has vocabulary links yet, when every term predicate matches nobody"""
+    if not AnonymizedPatient.objects.exists():
+        return True
+    return any(model.objects.exists() for model in TERM_LINK_MODELS)
+
+
+def cohort_bitmap(cohort: PatientCohort) -> Optional[int]:
+    """
+    Member bitmap of a cohort, or None for a hand-maintained cohort without a
+    definition, and for one with term predicates before the vocabulary links
+    are built (its stored patient_count stays in use instead of becoming 0)
+    """
+    if not cohort.definition.strip():
+        return None
+    if uses_vocabulary(cohort.definition) and not vocabulary_ready():
+        logger.warning(f"Cohort {cohort.id} reads vocabulary terms but no links exist; run backfill_vocabulary")
+        return None
+    return definition_bitmap(cohort.definition)
+
+
+def cohort_size(cohort: PatientCohort) -> int:
+    bitmap = cohort_bitmap(cohort)
+    return cohort.patient_count if bitmap is None else bitmap.bit_count()
+
+
+def hcp_bitmap(hcp_id: int) -> int:
+    return definition_bitmap(f'hcp = {int(hcp_id)}')
+
+
+def intersection(*bitmaps: int) -> int:
+    return reduce(lambda a, b: a & b, bitmaps) if bitmaps else 0
+
+
+def union(*bitmaps: int) -> int:
+    return reduce(lambda a, b: a | b, bitmaps, 0)
+
+
+def cohort_overlap(cohorts: List[PatientCohort]) -> Dict:
+    """Sizes, pairwise intersections, and the union and common core of defined cohorts"""
+    bitmaps = {cohort.id: cohort_bitmap(cohort) for cohort in cohorts}
+    defined = {cohort_id: bitmap for cohort_id, bitmap in bitmaps.items() if bitmap is not None}
+    ids = list(defined)
+    return {
+        'sizes': {cohort_id: bitmap.bit_count() for cohort_id, bitmap in defined.items()},
+        'pairs': [
+            {'a': a, 'b': b, 'intersection': (defined[a] & defined[b]).bit_count()}
+            for i, a in enumerate(ids) for b in ids[i + 1:]
+        ],
+        'union': union(*defined.values()).bit_count(),
+        'intersection': intersection(*defined.values()).bit_count() if defined else 0,
+        'undefined': [cohort_id for cohort_id, bitmap in bitmaps.items() if bitmap is None],
+    }
+
+
+def refresh_cohort_counts(cohorts=None) -> int:
+    """Store the current member count of every defined cohort in patient_count; returns rows changed"""
+    cohorts = list(cohorts if cohorts is not None else PatientCohort.objects.exclude(definition=''))
+    changed = []
+    for cohort in cohorts:
+        bitmap = cohort_bitmap(cohort)
+        if bitmap is not None and bitmap.bit_count() != cohort.patient_count:
+            cohort.patient_count = bitmap.bit_count()
+            changed.append(cohort)
+    PatientCohort.objects.bulk_update(changed, ['patient_count'])
+    return len(changed)
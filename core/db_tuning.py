@@ -0,0 +1,119 @@
+"""
+SQLite Tuning and Read Routing
+Applies connection PRAGMAs (WAL, synchronous, mmap, cache, busy timeout) and
+routes reads from safe-method requests to the read-only database alias
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+READ_ALIAS = 'read'
+WRITE_ALIAS = 'default'
+
+DEFAULT_SQLITE_TUNING = {
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'MMAP_SIZE': 256 * 1024 * 1024,
+    'CACHE_SIZE': -64000,
+    'BUSY_TIMEOUT': 5000,
+}
+
+REPORTED_PRAGMAS = ['journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout', 'query_only']
+
+SYNCHRONOUS_LEVELS = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+
+_use_read_alias = ContextVar('use_read_alias', default=False)
+
+
+def get_sqlite_tuning() -> Dict:
+    """Return the SQLITE_TUNING settings merged over the defaults"""
+    merged = dict(DEFAULT_SQLITE_TUNING)
+    merged.update(getattr(settings, 'SQLITE_TUNING', {}))
+    return merged
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created handler: tune every new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+
+    tuning = get_sqlite_tuning()
+    with connection.cursor() as cursor:
+        # busy_timeout first so the journal_mode switch itself can wait for a lock
+        cursor.execute(f"PRAGMA busy_timeout = {int(tuning['BUSY_TIMEOUT'])}")
+        if not connection.is_in_memory_db():
+            cursor.execute(f"PRAGMA journal_mode = {tuning['JOURNAL_MODE']}")
+            cursor.execute(f"PRAGMA mmap_size = {int(tuning['MMAP_SIZE'])}")
+        cursor.execute(f"PRAGMA synchronous = {tuning['SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA cache_size = {int(tuning['CACHE_SIZE'])}")
+        if connection.alias == READ_ALIAS:
+            cursor.execute('PRAGMA query_only = ON')
+
+
+def read_alias_available() -> bool:
+    return READ_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_read_alias(enabled: bool = True):
+    """Route ORM reads in this block to the read-only alias"""
+    token = _use_read_alias.set(enabled)
+    try:
+        yield
+    finally:
+        _use_read_alias.reset(token)
+
+
+class ReadWriteRouter:
+    """Send reads to the read alias inside use_read_alias(); all writes go to default"""
+
+    def db_for_read(self, model, **hints):
+        if _use_read_alias.get() and read_alias_available():
+            return READ_ALIAS
+        return WRITE_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return WRITE_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases point at the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READ_ALIAS
+
+
+class ReadOnlyRequestMiddleware:
+    """Serve the reads of GET/HEAD/OPTIONS requests from the read alias"""
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with use_read_alias(request.method in self.SAFE_METHODS):
+            return self.get_response(request)
+
+
+def effective_pragmas(alias: str) -> Dict:
+    """Read back the PRAGMA values actually in force on a connection"""
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return {}
+
+    pragmas = {}
+    with connection.cursor() as cursor:
+        for name in REPORTED_PRAGMAS:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            pragmas[name] = row[0] if row else None
+    pragmas['synchronous'] = SYNCHRONOUS_LEVELS.get(pragmas['synchronous'], pragmas['synchronous'])
+    pragmas['query_only'] = bool(pragmas['query_only'])
+    return pragmas
@@ -0,0 +1,182 @@
+"""
+Drug Recommendation Matrix
+Cluster x treatment outcome counts aggregated in a single query, with cluster
+similarity and treatment priority scored by vectorized NumPy operations and the
+result cached until the cluster data version changes
+"""
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import PatientCluster, PatientOutcome
+from .versioning import CLUSTERS, get_version
+
+logger = logging.getLogger(__name__)
+
+MAX_CLUSTERS = 20
+MIN_CLUSTER_PATIENTS = 5
+MIN_TREATMENT_PATIENTS = 3
+SIMILARITY_THRESHOLD = 0.3
+STRONG_SIMILARITY = 0.5
+SIMILARITY_BOOST = 20
+SUCCESS_OUTCOMES = ['IMPROVED']
+CACHE_TIMEOUT = 60 * 60 * 24  # Versioned keys go stale on change, the timeout only bounds memory
+
+
+def build_matrix(cluster_ids: List[int]) -> Dict:
+    """
+    Outcome and success counts per (cluster, treatment) as dense arrays indexed
+    [cluster position, treatment position]; one grouped query fills both
+    """
+    membership_path = 'patient__cluster_memberships__cluster_id'
+    rows = list(
+        PatientOutcome.objects.filter(**{f'{membership_path}__in': cluster_ids})
+        .values_list(membership_path, 'treatment')
+        .annotate(total=Count('id'), successes=Count('id', filter=Q(outcome__in=SUCCESS_OUTCOMES)))
+        .order_by()
+    )
+
+    treatments = sorted({treatment for _, treatment, _, _ in rows})
+    cluster_index = {cluster_id: i for i, cluster_id in enumerate(cluster_ids)}
+    treatment_index = {treatment: j for j, treatment in enumerate(treatments)}
+
+    counts = np.zeros((len(cluster_ids), len(treatments)), dtype=np.int64)
+    successes = np.zeros_like(counts)
+    if rows:
+        columns = list(zip(*rows))
+        i = np.fromiter((cluster_index[c] for c in columns[0]), dtype=np.int64, count=len(rows))
+        j = np.fromiter((treatment_index[t] for t in columns[1]), dtype=np.int64, count=len(rows))
+        counts[i, j] = columns[2]
+        successes[i, j] = columns[3]
+
+    return {'treatments': treatments, 'counts': counts, 'successes': successes}
+
+
+def jaccard_similarity(present: np.ndarray) -> np.ndarray:
+    """Pairwise Jaccard similarity of the rows of a boolean incidence matrix (zero diagonal)"""
+    incidence = present.astype(np.int64)
+    intersection = incidence @ incidence.T
+    sizes = incidence.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    similarity = np.divide(intersection, union, out=np.zeros(intersection.shape), where=union > 0)
+    np.fill_diagonal(similarity, 0.0)
+    return similarity
+
+
+def score_recommendations(clusters: List[PatientCluster], matrix: Dict, limit: Optional[int]) -> List[Dict]:
+    counts, successes = matrix['counts'], matrix['successes']
+    present = counts > 0
+
+    # Per-cluster similarity to every other cluster by shared treatments
+    similarity = jaccard_similarity(present)
+    similar = similarity > SIMILARITY_THRESHOLD
+    similar_counts = similar.sum(axis=1)
+    avg_similarity = np.divide((similarity * similar).sum(axis=1), similar_counts,
+                               out=np.zeros(len(clusters)), where=similar_counts > 0)
+    strong_counts = (similarity > STRONG_SIMILARITY).sum(axis=1)
+
+    # Per-treatment totals across the clusters
+    totals = counts.sum(axis=0)
+    success_rates = np.divide(successes.sum(axis=0) * 100.0, totals, out=np.zeros(totals.shape), where=totals > 0)
+    cluster_spread = present.sum(axis=0)
+
+    patient_counts = np.array([cluster.patient_count for cluster in clusters])
+    eligible = (
+        present
+        & (totals >= MIN_TREATMENT_PATIENTS)[None, :]
+        & (patient_counts >= MIN_CLUSTER_PATIENTS)[:, None]
+    )
+    priority_scores = success_rates[None, :] + avg_similarity[:, None] * SIMILARITY_BOOST
+
+    rows, cols = np.nonzero(eligible)
+    order = np.argsort(-priority_scores[rows, cols], kind='stable')[:limit]
+
+    recommendations = []
+    for i, j in zip(rows[order], cols[order]):
+        cluster = clusters[i]
+        treatment = matrix['treatments'][j]
+        success_rate = float(success_rates[j])
+        priority_score = float(priority_scores[i, j])
+        total = int(totals[j])
+
+        # Determine priority level
+        if priority_score >= 80:
+            priority = 'HIGH'
+        elif priority_score >= 60:
+            priority = 'MEDIUM'
+        else:
+            priority = 'LOW'
+
+        # Generate evidence level
+        if total >= 10 and success_rate >= 70:
+            evidence_level = 'High'
+        elif total >= 5 and success_rate >= 50:
+            evidence_level = 'Moderate'
+        else:
+            evidence_level = 'Low'
+
+        recommendations.append({
+            'cluster_id': cluster.id,
+            'cluster_name': cluster.name,
+            'hcp': cluster.hcp,
+            'drug_name': treatment,
+            'indication': f"Based on {cluster.name} patient patterns",
+            'success_rate': round(success_rate, 1),
+            'patient_count': total,
+            'evidence_level': evidence_level,
+            'priority': priority,
+            'priority_score': round(priority_score, 1),
+            'similar_clusters': int(similar_counts[i]),
+            'research_support': f"Evidence from {total} patients across {int(cluster_spread[j])} clusters",
+            'contraindications': "Check patient history for allergies and comorbidities",
+            'side_effects': "Monitor for common adverse reactions",
+            'dosage_recommendations': "Start with standard dosing, adjust based on patient response",
+            'created_date': date.today(),
+            'is_dynamic': True,
+            'similarity_data': {
+                'treatment_overlap': int(strong_counts[i]),
+                'avg_similarity': round(float(avg_similarity[i]) * 100, 1)
+            }
+        })
+    return recommendations
+
+
+def dynamic_drug_recommendations(limit: int = 8) -> List[Dict]:
+    """Top `limit` treatment recommendations across the first MAX_CLUSTERS clusters"""
+    cache_key = f'drug_matrix:v{get_version(CLUSTERS)}:{limit}'
+    recommendations = cache.get(cache_key)
+    if recommendations is not None:
+        return recommendations
+
+    clusters = list(PatientCluster.objects.select_related('hcp').order_by('id')[:MAX_CLUSTERS])
+    if clusters:
+        matrix = build_matrix([cluster.id for cluster in clusters])
+        recommendations = score_recommendations(clusters, matrix, limit)
+    else:
+        recommendations = []
+
+    cache.set(cache_key, recommendations, CACHE_TIMEOUT)
+    return recommendations
+
+
+def cluster_drug_recommendations(cluster: PatientCluster, limit: int = 10) -> List[Dict]:
+    """Recommendations for one cluster, scored against the same peer clusters as the dashboard matrix"""
+    cache_key = f'drug_matrix:v{get_version(CLUSTERS)}:cluster:{cluster.id}:{limit}'
+    recommendations = cache.get(cache_key)
+    if recommendations is not None:
+        return recommendations
+
+    clusters = list(PatientCluster.objects.select_related('hcp').order_by('id')[:MAX_CLUSTERS])
+    if cluster.id not in {peer.id for peer in clusters}:
+        clusters.append(cluster)
+    matrix = build_matrix([peer.id for peer in clusters])
+    recommendations = [
+        rec for rec in score_recommendations(clusters, matrix, limit=None) if rec['cluster_id'] == cluster.id
+    ][:limit]
+
+    cache.set(cache_key, recommendations, CACHE_TIMEOUT)
+    return recommendations
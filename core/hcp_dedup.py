@@ -0,0 +1,293 @@
+"""
+HCP Entity Resolution
+Finds duplicate provider records and merges them. Candidate pairs come only
+from shared blocking keys (normalized name, last name + first initial +
+specialty, contact e-mail/phone), so comparisons grow with block sizes rather
+than the square of the provider count. Pairs are scored on name, specialty and
+contact agreement, clustered with union-find, and each cluster is merged into
+one surviving record with bulk UPDATEs of every HCP foreign key in a single
+transaction
+"""
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from .identity import invalidate_identity
+from .models import HCP, AnonymizedPatient, HCPMerge, HCPTermRollup, TreatmentOutcomeStat
+from .versioning import CLUSTERS, PATIENTS, bump_version
+
+logger = logging.getLogger(__name__)
+
+MATCH_THRESHOLD = getattr(settings, 'HCP_MATCH_THRESHOLD', 0.75)
+MAX_BLOCK_SIZE = 200  # Larger blocks (very common keys) are skipped rather than compared pairwise
+MERGE_CHUNK_SIZE = 500  # Duplicates per CASE UPDATE
+
+NAME_WEIGHT = 0.6
+SPECIALTY_WEIGHT = 0.2
+CONTACT_MATCH_BONUS = 0.4
+CONTACT_CONFLICT_PENALTY = 0.2
+# Name similarity when an initial stands in for a matching first name; with a shared specialty
+# that alone reaches the threshold (0.95 * 0.6 + 0.2 = 0.77), unlike a one-letter spelling change
+INITIAL_MATCH_SIMILARITY = 0.95
+
+TITLE_TOKENS = {'dr', 'doctor', 'prof', 'professor', 'mr', 'mrs', 'ms', 'miss'}
+SUFFIX_TOKENS = {'md', 'do', 'phd', 'np', 'pa', 'rn', 'dds', 'dmd', 'mbbs', 'facc', 'facp', 'jr', 'sr', 'ii', 'iii'}
+
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+_DIGITS_RE = re.compile(r'\d[\d\s().-]{8,}\d')
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+# Relations whose uniqueness includes the HCP; rows are rebuilt for the survivors instead of re-pointed
+DERIVED_RELATIONS = (HCPTermRollup, TreatmentOutcomeStat)
+
+
+@dataclass
+class Provider:
+    id: int
+    name: str
+    specialty: str
+    contact_info: str
+    user_id: Optional[int]
+    tokens: List[str] = field(default_factory=list)
+    specialty_key: str = ''
+    contacts: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class DuplicateGroup:
+    survivor: Provider
+    duplicates: List[Tuple[Provider, float]]  # (duplicate, score against the survivor)
+
+
+def name_tokens(name: str) -> List[str]:
+    """Lowercased, accent-free name tokens without titles and credentials"""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode().lower()
+    return [token for token in _NON_ALNUM_RE.sub(' ', text).split() if token not in TITLE_TOKENS | SUFFIX_TOKENS]
+
+
+def specialty_key(specialty: str) -> str:
+    return ' '.join(_NON_ALNUM_RE.sub(' ', (specialty or '').lower()).split())
+
+
+def contact_keys(contact_info: str) -> Set[str]:
+    """E-mail addresses and 10-digit phone numbers (or NPIs) found in a contact string"""
+    text = contact_info or ''
+    keys = {f'email:{email.lower()}' for email in _EMAIL_RE.findall(text)}
+    for run in _DIGITS_RE.findall(_EMAIL_RE.sub(' ', text)):
+        digits = re.sub(r'\D', '', run)
+        if len(digits) >= 10:
+            keys.add(f'phone:{digits[-10:]}')
+    return keys
+
+
+def load_providers(queryset=None) -> List[Provider]:
+    queryset = queryset if queryset is not None else HCP.objects.all()
+    providers = []
+    for hcp_id, name, specialty, contact_info, user_id in queryset.values_list(
+        'id', 'name', 'specialty', 'contact_info', 'user_id'
+    ).order_by('id'):
+        providers.append(Provider(
+            id=hcp_id, name=name, specialty=specialty, contact_info=contact_info, user_id=user_id,
+            tokens=name_tokens(name), specialty_key=specialty_key(specialty), contacts=contact_keys(contact_info),
+        ))
+    return providers
+
+
+def blocking_keys(provider: Provider) -> Set[str]:
+    keys = set(provider.contacts)
+    if provider.tokens:
+        keys.add('name:' + ' '.join(sorted(provider.tokens)))
+        if len(provider.tokens) > 1:
+            # Catches "A. Smith" vs "Alice Smith" within a specialty
+            keys.add(f'initial:{provider.tokens[-1]}:{provider.tokens[0][0]}:{provider.specialty_key}')
+    return keys
+
+
+def name_similarity(a: Provider, b: Provider) -> float:
+    if not a.tokens or not b.tokens:
+        return 0.0
+    ratio = SequenceMatcher(None, ' '.join(sorted(a.tokens)), ' '.join(sorted(b.tokens))).ratio()
+    # Same last name with an initial standing in for the first name
+    if len(a.tokens) > 1 and len(b.tokens) > 1 and a.tokens[-1] == b.tokens[-1]:
+        first_a, first_b = a.tokens[0], b.tokens[0]
+        if (len(first_a) == 1 or len(first_b) == 1) and first_a[0] == first_b[0]:
+            ratio = max(ratio, INITIAL_MATCH_SIMILARITY)
+    return ratio
+
+
+def _contacts_by_type(contacts: Set[str]) -> Dict[str, Set[str]]:
+    by_type = defaultdict(set)
+    for key in contacts:
+        by_type[key.split(':', 1)[0]].add(key)
+    return by_type
+
+
+def contacts_conflict(a: Provider, b: Provider) -> bool:
+    """Both records list an e-mail (or both a phone) and none of them agree; an e-mail never conflicts with a phone"""
+    a_types, b_types = _contacts_by_type(a.contacts), _contacts_by_type(b.contacts)
+    return any(not a_types[kind] & b_types[kind] for kind in a_types.keys() & b_types.keys())
+
+
+def match_score(a: Provider, b: Provider) -> float:
+    """0-1 likelihood two records are the same provider"""
+    score = NAME_WEIGHT * name_similarity(a, b)
+    if a.specialty_key and a.specialty_key == b.specialty_key:
+        score += SPECIALTY_WEIGHT
+    if a.contacts & b.contacts:
+        score += CONTACT_MATCH_BONUS
+    elif contacts_conflict(a, b):
+        score -= CONTACT_CONFLICT_PENALTY
+    return max(0.0, min(1.0, score))
+
+
+def candidate_pairs(providers: List[Provider]) -> Set[Tuple[int, int]]:
+    """Index pairs sharing at least one blocking key"""
+    blocks = defaultdict(list)
+    for index, provider in enumerate(providers):
+        for key in blocking_keys(provider):
+            blocks[key].append(index)
+
+    pairs = set()
+    for key, members in blocks.items():
+        if len(members) > MAX_BLOCK_SIZE:
+            logger.warning(f"Skipping HCP block {key!r} with {len(members)} records")
+            continue
+        pairs.update(combinations(members, 2))
+    return pairs
+
+
+def _patient_counts(hcp_ids: Iterable[int]) -> Dict[int, int]:
+    rows = (
+        AnonymizedPatient.objects.filter(hcp_id__in=list(hcp_ids))
+        .values_list('hcp_id').annotate(count=Count('id')).order_by()
+    )
+    return dict(rows)
+
+
+def find_duplicates(queryset=None, threshold: float = MATCH_THRESHOLD) -> List[DuplicateGroup]:
+    """
+    Groups of records that resolve to the same provider. Two records that both
+    belong to a user account are never put in one group. The survivor is the
+    account holder, else the record with the most patients, else the oldest.
+    """
+    providers = load_providers(queryset)
+    matches = []
+    for i, j in candidate_pairs(providers):
+        score = match_score(providers[i], providers[j])
+        if score >= threshold:
+            matches.append((score, i, j))
+
+    parent = list(range(len(providers)))
+    has_user = [provider.user_id is not None for provider in providers]
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Strongest evidence first, so a conflicting account holder blocks only the weaker links
+    for score, i, j in sorted(matches, reverse=True):
+        root_i, root_j = find(i), find(j)
+        if root_i == root_j or (has_user[root_i] and has_user[root_j]):
+            continue
+        parent[root_j] = root_i
+        has_user[root_i] = has_user[root_i] or has_user[root_j]
+
+    components = defaultdict(list)
+    for index in range(len(providers)):
+        components[find(index)].append(providers[index])
+    components = [members for members in components.values() if len(members) > 1]
+
+    counts = _patient_counts(provider.id for members in components for provider in members)
+    groups = []
+    for members in components:
+        survivor = min(members, key=lambda p: (p.user_id is None, -counts.get(p.id, 0), p.id))
+        duplicates = [(p, round(match_score(survivor, p), 3)) for p in members if p.id != survivor.id]
+        groups.append(DuplicateGroup(survivor=survivor, duplicates=sorted(duplicates, key=lambda d: d[0].id)))
+    groups.sort(key=lambda group: group.survivor.id)
+    return groups
+
+
+def _hcp_relations():
+    """(model, FK column) of every relation pointing at HCP"""
+    return [
+        (relation.related_model, relation.field.attname)
+        for relation in HCP._meta.related_objects
+        if relation.one_to_many
+    ]
+
+
+def merge_groups(groups: List[DuplicateGroup]) -> Dict[str, int]:
+    """Re-point everything owned by the duplicates to their survivors and delete the duplicates"""
+    from .outcome_stats import rebuild_outcome_stats  # Imports drug_matrix (NumPy); loaded on first use
+    from .vocabulary import rebuild_rollups
+
+    mapping = {duplicate.id: group.survivor.id for group in groups for duplicate, _ in group.duplicates}
+    if not mapping:
+        return {'merged': 0, 'rows_moved': 0, 'patients_moved': 0}
+    survivor_ids = sorted({group.survivor.id for group in groups})
+    counts = _patient_counts(mapping)
+    duplicate_ids = list(mapping)
+
+    with transaction.atomic():
+        HCPMerge.objects.bulk_create([
+            HCPMerge(
+                survivor_id=group.survivor.id, merged_hcp_id=duplicate.id, name=duplicate.name,
+                specialty=duplicate.specialty, contact_info=duplicate.contact_info, score=score,
+                patients_moved=counts.get(duplicate.id, 0),
+            )
+            for group in groups for duplicate, score in group.duplicates
+        ])
+
+        rows_moved = 0
+        for model, column in _hcp_relations():
+            if model in DERIVED_RELATIONS:
+                model.objects.filter(**{f'{column}__in': duplicate_ids}).delete()
+                continue
+            for start in range(0, len(duplicate_ids), MERGE_CHUNK_SIZE):
+                chunk = duplicate_ids[start:start + MERGE_CHUNK_SIZE]
+                target = Case(
+                    *[When(**{column: duplicate_id}, then=Value(mapping[duplicate_id])) for duplicate_id in chunk],
+                    output_field=IntegerField(),
+                )
+                rows_moved += model.objects.filter(**{f'{column}__in': chunk}).update(**{column: target})
+
+        # An account on a duplicate moves to a survivor without one (find_duplicates allows at most one)
+        accounts = dict(
+            HCP.objects.filter(id__in=duplicate_ids, user__isnull=False).values_list('id', 'user_id')
+        )
+        HCP.objects.filter(id__in=list(accounts)).update(user=None)
+        for duplicate_id, user_id in accounts.items():
+            HCP.objects.filter(id=mapping[duplicate_id], user__isnull=True).update(user_id=user_id)
+
+        HCP.objects.filter(id__in=duplicate_ids).delete()
+        rebuild_rollups(survivor_ids)
+        rebuild_outcome_stats(survivor_ids)
+
+    # Bulk UPDATEs skip the model signals that invalidate these caches
+    bump_version(PATIENTS)
+    bump_version(CLUSTERS)
+    for user_id in HCP.objects.filter(id__in=survivor_ids, user__isnull=False).values_list('user_id', flat=True):
+        invalidate_identity(user_id)
+    for user_id in accounts.values():
+        invalidate_identity(user_id)
+
+    return {'merged': len(mapping), 'rows_moved': rows_moved, 'patients_moved': sum(counts.values())}
+
+
+def deduplicate(queryset=None, threshold: float = MATCH_THRESHOLD, dry_run: bool = False) -> Tuple[List[DuplicateGroup], Dict[str, int]]:
+    """Find and (unless dry_run) merge duplicate HCPs"""
+    groups = find_duplicates(queryset, threshold)
+    if dry_run:
+        return groups, {'merged': 0, 'rows_moved': 0, 'patients_moved': 0}
+    return groups, merge_groups(groups)
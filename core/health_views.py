@@ -0,0 +1,48 @@
+"""
+Health Check Views
+Database connectivity for load-balancer probes; the per-alias detail and
+effective SQLite tuning are shown to staff only
+"""
+import logging
+
+from django.conf import settings
+from django.db import connections, DatabaseError
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from .db_tuning import effective_pragmas, get_sqlite_tuning
+
+logger = logging.getLogger(__name__)
+
+
+@require_http_methods(["GET"])
+def database_health(request):
+    """Check every configured database alias; staff also get the PRAGMAs in force"""
+    databases = {}
+    healthy = True
+
+    for alias in settings.DATABASES:
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            databases[alias] = {
+                'status': 'ok',
+                'vendor': connection.vendor,
+                'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+                'pragmas': effective_pragmas(alias),
+            }
+        except DatabaseError as e:
+            logger.error(f"Database health check failed for '{alias}': {e}")
+            healthy = False
+            databases[alias] = {'status': 'error', 'vendor': connection.vendor, 'error': str(e)}
+
+    status = 200 if healthy else 503
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'success' if healthy else 'error'}, status=status)
+
+    return JsonResponse({
+        'status': 'success' if healthy else 'error',
+        'databases': databases,
+        'configured_tuning': get_sqlite_tuning(),
+    }, status=status)
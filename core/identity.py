@@ -0,0 +1,88 @@
+"""
+Request Identity
+Resolves the signed-in user's UserProfile, role and HCP record once per request
+(and briefly across requests) and exposes them as request.identity
+"""
+import logging
+from typing import Optional
+
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger(__name__)
+
+# Profile/HCP saves invalidate immediately; the timeout only bounds other drift
+CACHE_TIMEOUT = 60
+DEFAULT_ROLE = 'HCR'  # Users without a profile get one, as the dashboard always has
+
+
+def _cache_key(user_id: int) -> str:
+    return f'identity:{user_id}'
+
+
+class Identity:
+    """Who is making the request: user, profile, role and (for HCPs) the HCP record"""
+
+    __slots__ = ('user', 'profile', 'hcp')
+
+    def __init__(self, user, profile=None, hcp=None):
+        self.user = user
+        self.profile = profile
+        self.hcp = hcp
+
+    @property
+    def role(self) -> Optional[str]:
+        return self.profile.role if self.profile else None
+
+    @property
+    def is_hcp(self) -> bool:
+        return self.role == 'HCP'
+
+    @property
+    def is_hcr(self) -> bool:
+        return self.role == 'HCR'
+
+    def require_hcp(self):
+        """The user's HCP record, raising HCP.DoesNotExist like HCP.objects.get(user=...) would"""
+        if self.hcp is None:
+            from .models import HCP
+            raise HCP.DoesNotExist('No HCP record for this user')
+        return self.hcp
+
+
+def resolve_identity(user) -> Identity:
+    if not user.is_authenticated:
+        return Identity(user)
+
+    from .models import HCP, UserProfile
+
+    key = _cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        profile, _ = UserProfile.objects.get_or_create(user_id=user.pk, defaults={'role': DEFAULT_ROLE})
+        hcp = HCP.objects.filter(user_id=user.pk).first()
+        cached = (profile, hcp)
+        cache.set(key, cached, CACHE_TIMEOUT)
+
+    profile, hcp = cached
+    # Point the cached rows (and user.userprofile) at this request's user without extra queries
+    profile.user = user
+    if hcp is not None:
+        hcp.user = user
+    return Identity(user, profile, hcp)
+
+
+def invalidate_identity(user_id: Optional[int]):
+    if user_id is not None:
+        cache.delete(_cache_key(user_id))
+
+
+class IdentityMiddleware:
+    """Attach a lazily resolved request.identity; must come after AuthenticationMiddleware"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.identity = SimpleLazyObject(lambda: resolve_identity(request.user))
+        return self.get_response(request)
@@ -0,0 +1,73 @@
+"""
+Import-Time Profiling
+Runs `python -X importtime` in a fresh interpreter that sets up Django and
+imports the given modules, and summarizes where startup time goes
+"""
+import logging
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Libraries that should only load inside the code paths that use them
+HEAVY_MODULES = ['pandas', 'numpy', 'scipy', 'sklearn', 'bs4', 'feedparser']
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """Entries (module, self_us, cumulative_us, depth) from -X importtime stderr, in load order"""
+    entries = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                'module': module,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': len(indent) // 2,
+            })
+    return entries
+
+
+def measure_imports(targets: List[str], settings_module: Optional[str] = None) -> List[Dict]:
+    """Import-time entries for django.setup() plus importing `targets` in a clean subprocess"""
+    code = 'import django; django.setup()\n' + ''.join(f'import {target}\n' for target in targets)
+    env = dict(os.environ)
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+    return parse_importtime(result.stderr)
+
+
+def summarize(entries: List[Dict], top: int = 20, heavy: Optional[List[str]] = None) -> Dict:
+    """Total time, slowest modules by cumulative time, self time per top-level package and heavy modules loaded"""
+    packages = defaultdict(int)
+    for entry in entries:
+        packages[entry['module'].split('.')[0]] += entry['self_us']
+
+    loaded = {entry['module'] for entry in entries}
+    heavy = HEAVY_MODULES if heavy is None else heavy
+    return {
+        'total_ms': round(sum(entry['self_us'] for entry in entries) / 1000, 1),
+        'module_count': len(entries),
+        'slowest': [
+            {'module': entry['module'], 'cumulative_ms': round(entry['cumulative_us'] / 1000, 1)}
+            for entry in sorted(entries, key=lambda e: -e['cumulative_us'])[:top]
+        ],
+        'packages': [
+            {'package': name, 'self_ms': round(us / 1000, 1)}
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        'heavy_loaded': [module for module in heavy if module in loaded],
+    }
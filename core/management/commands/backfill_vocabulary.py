@@ -0,0 +1,57 @@
+"""
+Django management command to populate the normalized clinical vocabulary
+Usage: python manage.py backfill_vocabulary [--hcp-id 3] [--batch-size 2000] [--rebuild-rollups]
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import AnonymizedPatient, Condition, Treatment, RiskFactor
+from core.vocabulary import backfill_vocabulary, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Split delimited patient fields into Condition/Treatment/RiskFactor links'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hcp-id',
+            type=int,
+            help='Only backfill patients of this HCP',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Patients per transaction (default: 2000)',
+        )
+        parser.add_argument(
+            '--rebuild-rollups',
+            action='store_true',
+            help='Also recompute the per-HCP term rollups from scratch',
+        )
+
+    def handle(self, *args, **options):
+        patients = AnonymizedPatient.objects.all()
+        if options['hcp_id']:
+            patients = patients.filter(hcp_id=options['hcp_id'])
+
+        total = patients.count()
+        self.stdout.write(f'📚 Backfilling vocabulary for {total:,} patients...')
+
+        step = max(options['batch_size'], total // 10)
+        state = {'next': step}
+
+        def progress(done):
+            if done >= state['next'] or done == total:
+                self.stdout.write(f'   {done:,}/{total:,} patients')
+                state['next'] = done + step
+
+        backfill_vocabulary(patients, batch_size=options['batch_size'], progress=progress)
+
+        if options['rebuild_rollups']:
+            rebuild_rollups([options['hcp_id']] if options['hcp_id'] else None)
+            self.stdout.write('📈 Rebuilt HCP term rollups')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Vocabulary: {Condition.objects.count():,} conditions, '
+            f'{Treatment.objects.count():,} treatments, {RiskFactor.objects.count():,} risk factors'
+        ))
@@ -0,0 +1,194 @@
+"""
+Django management command to benchmark the main views on a seeded dataset
+Usage: python manage.py benchmark --size 1k [--seed 42] [--iterations 20] [--keepdb]
+"""
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import override_settings
+from django.utils import timezone
+
+from core.benchmarks import (
+    BENCHMARK_VIEWS, DATASET_SIZES, dataset_fingerprint, dataset_is_loaded, seed_dataset,
+    reset_view_side_effects, run_benchmarks, git_commit, environment_info, compare_results,
+)
+
+BENCHMARK_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = 'Seed a deterministic dataset in an isolated database and record view latency and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            choices=sorted(DATASET_SIZES),
+            default='1k',
+            help='Dataset size (default: 1k)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the dataset (default: 42)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processes used to generate the dataset (default: 1)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Timed requests per view (default: 20)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=2,
+            help='Untimed requests per view before measuring (default: 2)',
+        )
+        parser.add_argument(
+            '--views',
+            nargs='+',
+            choices=[spec['name'] for spec in BENCHMARK_VIEWS],
+            help='Only benchmark these views (default: all)',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the benchmark database and reuse it when the dataset matches',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Result file (default: benchmarks/results/<size>-<timestamp>.json)',
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='Previous result file to compare against',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        size = DATASET_SIZES[options['size']]
+        seed = options['seed']
+        view_names = options['views'] or [spec['name'] for spec in BENCHMARK_VIEWS]
+
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+
+        BENCHMARK_DIR.mkdir(exist_ok=True)
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # A file keeps 1M-patient datasets out of memory and allows --keepdb
+            test_settings['NAME'] = str(BENCHMARK_DIR / f"benchmark_{options['size']}.sqlite3")
+
+        self.stdout.write(f"🧪 Creating benchmark database ({options['size']}, seed {seed})...")
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'],
+        )
+        # Point mirror aliases (e.g. the read alias) at the benchmark database too
+        for alias in connections:
+            if connections[alias].settings_dict.get('TEST', {}).get('MIRROR') == connection.alias:
+                connections[alias].close()
+                connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+                STORAGES={
+                    **settings.STORAGES,
+                    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+                },
+            ):
+                report = self.run(options, size, seed, view_names)
+        finally:
+            for alias in connections:
+                if alias != connection.alias:
+                    connections[alias].close()
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        output = Path(options['output']) if options['output'] else (
+            BENCHMARK_DIR / 'results' / f"{options['size']}-{timezone.now():%Y%m%dT%H%M%S}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'💾 Results written to {output}'))
+
+        if baseline:
+            self.print_comparison(baseline, report)
+
+    def run(self, options, size, seed, view_names):
+        if dataset_is_loaded(size, seed):
+            self.stdout.write('♻️  Reusing existing benchmark dataset')
+            reset_view_side_effects()
+        else:
+            call_command('flush', interactive=False, verbosity=0)
+            self.stdout.write(f'🌱 Seeding {size:,} patients...')
+            seed_dataset(
+                size, seed, workers=max(options['workers'], 1),
+                progress=self.report_seed_progress(size),
+            )
+
+        results = run_benchmarks(
+            view_names, options['iterations'], options['warmup'], progress=self.report_view,
+        )
+        return {
+            'created_at': timezone.now().isoformat(),
+            'git_commit': git_commit(),
+            'dataset': {
+                'size': options['size'],
+                'patients': size,
+                'seed': seed,
+                'fingerprint': dataset_fingerprint(size, seed),
+            },
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'environment': environment_info(),
+            'results': results,
+        }
+
+    def report_seed_progress(self, size):
+        step = max(size // 10, 1)
+        state = {'next': step}
+
+        def progress(totals):
+            created = totals['patients']
+            if created >= state['next'] or created == size:
+                self.stdout.write(f'   {created:,}/{size:,} patients')
+                state['next'] = created + step
+        return progress
+
+    def report_view(self, result):
+        self.stdout.write(
+            f"⏱️  {result['view']}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+            f"p99 {result['p99_ms']} ms, {result['queries']['mean']} queries "
+            f"(status {', '.join(str(s) for s in result['status_codes'])})"
+        )
+
+    def print_comparison(self, baseline, report):
+        if baseline.get('dataset', {}).get('fingerprint') != report['dataset']['fingerprint']:
+            self.stdout.write(self.style.WARNING('⚠️  Baseline used a different dataset; deltas are not comparable'))
+
+        self.stdout.write(f"\n📈 Compared with {baseline.get('git_commit', '')[:10] or 'baseline'}:")
+        for delta in compare_results(baseline, report):
+            before, after = delta['p95_ms']
+            change = ((after - before) / before * 100) if before else 0.0
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+            self.stdout.write(style(
+                f"   {delta['view']}: p95 {before} → {after} ms ({change:+.1f}%), "
+                f"queries {delta['queries'][0]} → {delta['queries'][1]}"
+            ))
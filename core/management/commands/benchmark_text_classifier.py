@@ -0,0 +1,146 @@
+"""
+Django management command to benchmark research text classification
+Usage: python manage.py benchmark_text_classifier [--abstracts 100000] [--density 0.05] [--seed 42] [--check 2000]
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.research_scraper import (
+    HIGH_IMPACT_INDICATORS, HIGH_IMPACT_KEYWORDS, SPECIALTY_KEYWORDS, research_classifier,
+)
+
+FILLER_WORDS = [
+    'patients', 'outcomes', 'cohort', 'study', 'results', 'compared', 'baseline', 'follow-up',
+    'observed', 'associated', 'risk', 'analysis', 'treatment', 'group', 'years', 'rates',
+    'we', 'enrolled', 'adults', 'across', 'sites', 'and', 'measured', 'primary', 'endpoints',
+    'over', 'twelve', 'months', 'using', 'standard', 'protocols', 'while', 'adjusting', 'for',
+    'age', 'sex', 'income', 'region', 'prior', 'history', 'smoking', 'status', 'the', 'findings',
+]
+
+
+def naive_specialty(text: str) -> str:
+    """The per-keyword substring scan the scraper used before the compiled classifier"""
+    text_lower = text.lower()
+    specialty_scores = {}
+    for specialty, data in SPECIALTY_KEYWORDS.items():
+        score = 0
+        for keyword in data['keywords']:
+            weight = len(keyword.split())
+            if keyword.lower() in text_lower:
+                score += weight * 2
+            elif any(word in text_lower for word in keyword.lower().split()):
+                score += weight
+        specialty_scores[specialty] = score
+    best_specialty = max(specialty_scores.items(), key=lambda x: x[1])
+    return best_specialty[0] if best_specialty[1] > 0 else 'INTERNAL MEDICINE'
+
+
+def naive_flags(title: str, abstract: str):
+    """Relevance keyword score and impact-indicator hit by substring scans"""
+    title, abstract = title.lower(), abstract.lower()
+    keyword_score = 0
+    for keyword in HIGH_IMPACT_KEYWORDS:
+        if keyword in title:
+            keyword_score += 0.2
+        elif keyword in abstract:
+            keyword_score += 0.1
+    has_impact = any(indicator in title or indicator in abstract for indicator in HIGH_IMPACT_INDICATORS)
+    return round(keyword_score, 1), has_impact
+
+
+def compiled_flags(title: str, abstract: str):
+    analysis = research_classifier().analyze(title, abstract)
+    keyword_score = 0
+    for keyword in HIGH_IMPACT_KEYWORDS:
+        if keyword in analysis['title_terms']:
+            keyword_score += 0.2
+        elif keyword in analysis['abstract_terms']:
+            keyword_score += 0.1
+    found = analysis['title_terms'] | analysis['abstract_terms']
+    has_impact = any(indicator in found for indicator in HIGH_IMPACT_INDICATORS)
+    return analysis['specialty'], round(keyword_score, 1), has_impact
+
+
+class Command(BaseCommand):
+    help = 'Compare naive substring scans with the compiled phrase classifier on synthetic abstracts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--abstracts',
+            type=int,
+            default=100000,
+            help='Number of synthetic title/abstract pairs to classify (default: 100000)',
+        )
+        parser.add_argument(
+            '--density',
+            type=float,
+            default=0.05,
+            help='Share of words drawn from the classifier vocabularies (default: 0.05)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the synthetic corpus (default: 42)',
+        )
+        parser.add_argument(
+            '--check',
+            type=int,
+            default=2000,
+            help='Verify both implementations agree on this many abstracts first (default: 2000)',
+        )
+
+    def _corpus(self, count: int, density: float, seed: int):
+        rng = random.Random(seed)
+        vocabulary = [keyword for data in SPECIALTY_KEYWORDS.values() for keyword in data['keywords']]
+        vocabulary += HIGH_IMPACT_KEYWORDS + HIGH_IMPACT_INDICATORS
+
+        def word() -> str:
+            return rng.choice(vocabulary) if rng.random() < density else rng.choice(FILLER_WORDS)
+
+        def sentence(words: int) -> str:
+            text = ' '.join(word() for _ in range(words))
+            if rng.random() < 0.2:
+                text += f' with {rng.randint(5, 60)}% {rng.choice(["improvement", "reduction", "better"])}'
+            return text.capitalize()
+
+        return [(sentence(rng.randint(6, 12)), '. '.join(sentence(rng.randint(12, 24)) for _ in range(8)))
+                for _ in range(count)]
+
+    def handle(self, *args, **options):
+        if options['abstracts'] < 1:
+            raise CommandError('--abstracts must be at least 1')
+        if not 0 <= options['density'] <= 1:
+            raise CommandError('--density must be between 0 and 1')
+
+        corpus = self._corpus(options['abstracts'], options['density'], options['seed'])
+        research_classifier()  # Compile outside the timed loop
+
+        checked = corpus[:options['check']]
+        mismatches = [
+            title for title, abstract in checked
+            if compiled_flags(title, abstract) != (naive_specialty(f'{title} {abstract}'), *naive_flags(title, abstract))
+        ]
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} of {len(checked)} abstracts differ, e.g. {mismatches[0]!r}')
+        self.stdout.write(self.style.SUCCESS(f'✅ Naive and compiled results agree on {len(checked)} abstracts'))
+
+        started = time.perf_counter()
+        for title, abstract in corpus:
+            naive_specialty(f'{title} {abstract}')
+            naive_flags(title, abstract)
+        naive_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for title, abstract in corpus:
+            compiled_flags(title, abstract)
+        compiled_seconds = time.perf_counter() - started
+
+        count = len(corpus)
+        self.stdout.write(f"📄 {count} abstracts, {len(research_classifier().matcher.phrases)} phrases, "
+                          f"vocabulary density {options['density']:.0%}")
+        self.stdout.write(f'🐢 Naive:    {naive_seconds:8.2f}s  ({count / naive_seconds:,.0f} abstracts/s)')
+        self.stdout.write(f'⚡ Compiled: {compiled_seconds:8.2f}s  ({count / compiled_seconds:,.0f} abstracts/s)')
+        self.stdout.write(self.style.SUCCESS(f'🚀 Speedup: {naive_seconds / compiled_seconds:.1f}x'))
@@ -0,0 +1,48 @@
+"""
+Django management command to build or refresh the similar-patients index
+Usage: python manage.py build_similarity_index [--full] [--batch-size 5000] [--path patient_similarity.npz]
+"""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.patient_similarity import SimilarityIndex, build_index, index_path, refresh_index
+
+
+class Command(BaseCommand):
+    help = 'Refresh the patient similarity (LSH) index incrementally, or rebuild it with --full'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild from scratch, recomputing the feature standardization statistics',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Patients encoded per batch (default: 5000)',
+        )
+        parser.add_argument(
+            '--path',
+            help='Index file (default: settings.PATIENT_SIMILARITY_INDEX)',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path']) if options['path'] else index_path()
+        started = time.perf_counter()
+
+        if options['full'] or not path.exists():
+            index = build_index(batch_size=options['batch_size'])
+            summary = f'built with {len(index):,} patients'
+        else:
+            index = SimilarityIndex.load(path)
+            counts = refresh_index(index, batch_size=options['batch_size'])
+            summary = f"refreshed: {counts['updated']:,} re-encoded, {counts['removed']:,} removed, {counts['total']:,} total"
+
+        index.save(path)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Similarity index {summary} in {elapsed:.1f}s'))
+        self.stdout.write(f'   • {index.planes.shape[0]} tables x {index.planes.shape[1]} bits, saved to {path}')
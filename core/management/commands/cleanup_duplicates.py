@@ -1,82 +1,55 @@
+"""
+Django management command to merge duplicate HCP records
+Usage: python manage.py cleanup_duplicates [--dry-run] [--threshold 0.75]
+"""
+import time
+
 from django.core.management.base import BaseCommand
-from core.models import HCP, AnonymizedPatient, User, UserProfile
-from django.contrib.auth.models import User
+
+from core.hcp_dedup import MATCH_THRESHOLD, deduplicate
+from core.models import HCP, AnonymizedPatient
+
 
 class Command(BaseCommand):
-    help = 'Clean up duplicate HCPs and consolidate patients'
+    help = 'Resolve duplicate HCPs and merge their patients, clusters, engagements and recommendations'
 
-    def handle(self, *args, **options):
-        print("🧹 Starting cleanup of duplicate HCPs...")
-        
-        # Get all HCPs grouped by name
-        hcps = HCP.objects.all()
-        hcp_groups = {}
-        
-        for hcp in hcps:
-            name = hcp.name
-            if name not in hcp_groups:
-                hcp_groups[name] = []
-            hcp_groups[name].append(hcp)
-        
-        # Process each group
-        cleaned_hcps = []
-        total_patients_moved = 0
-        
-        for name, hcp_list in hcp_groups.items():
-            if len(hcp_list) == 1:
-                # No duplicates, keep as is
-                cleaned_hcps.append(hcp_list[0])
-                continue
-            
-            print(f"\n📋 Processing {name} ({len(hcp_list)} duplicates)")
-            
-            # Find the HCP with the most patients (keep this one)
-            hcp_with_most_patients = max(hcp_list, key=lambda h: AnonymizedPatient.objects.filter(hcp=h).count())
-            patients_count = AnonymizedPatient.objects.filter(hcp=hcp_with_most_patients).count()
-            
-            print(f"   ✅ Keeping HCP ID {hcp_with_most_patients.id} with {patients_count} patients")
-            
-            # Move patients from other HCPs to the main one
-            for hcp in hcp_list:
-                if hcp.id == hcp_with_most_patients.id:
-                    continue
-                
-                # Move patients
-                patients_to_move = AnonymizedPatient.objects.filter(hcp=hcp)
-                moved_count = patients_to_move.count()
-                
-                if moved_count > 0:
-                    patients_to_move.update(hcp=hcp_with_most_patients)
-                    total_patients_moved += moved_count
-                    print(f"   📦 Moved {moved_count} patients from HCP ID {hcp.id}")
-                
-                # Delete the duplicate HCP and its user
-                if hcp.user:
-                    print(f"   🗑️  Deleting user account: {hcp.user.username}")
-                    hcp.user.delete()
-                
-                print(f"   🗑️  Deleting duplicate HCP ID {hcp.id}")
-                hcp.delete()
-            
-            cleaned_hcps.append(hcp_with_most_patients)
-        
-        # Final summary
-        print(f"\n✅ CLEANUP COMPLETE!")
-        print(f"📊 Summary:")
-        print(f"   • HCPs before: {len(hcps)}")
-        print(f"   • HCPs after: {len(cleaned_hcps)}")
-        print(f"   • Patients moved: {total_patients_moved}")
-        print(f"   • Total patients: {AnonymizedPatient.objects.count()}")
-        
-        # Show final distribution
-        print(f"\n👨‍⚕️ FINAL HCP DISTRIBUTION:")
-        for hcp in cleaned_hcps:
-            patient_count = AnonymizedPatient.objects.filter(hcp=hcp).count()
-            username = hcp.user.username if hcp.user else "No account"
-            print(f"   {hcp.name} ({hcp.specialty}): {patient_count} patients - {username}")
-        
-        print(f"\n🎉 Database is now clean and organized!")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the duplicate groups that would be merged',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=MATCH_THRESHOLD,
+            help=f'Minimum match score for two records to be merged (default: {MATCH_THRESHOLD})',
+        )
 
+    def handle(self, *args, **options):
+        self.stdout.write('🧹 Resolving duplicate HCPs...')
+        hcps_before = HCP.objects.count()
+        started = time.perf_counter()
+        groups, totals = deduplicate(threshold=options['threshold'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
 
+        for group in groups:
+            survivor = group.survivor
+            self.stdout.write(f'\n📋 {survivor.name} ({survivor.specialty}) - keeping HCP ID {survivor.id}')
+            for duplicate, score in group.duplicates:
+                self.stdout.write(f'   🔗 HCP ID {duplicate.id}: {duplicate.name}, {duplicate.contact_info} (score {score:.2f})')
 
+        if not groups:
+            self.stdout.write(self.style.SUCCESS('✅ No duplicates found'))
+            return
+        if options['dry_run']:
+            duplicates = sum(len(group.duplicates) for group in groups)
+            self.stdout.write(f'\n🔍 Dry run: {duplicates:,} duplicates in {len(groups):,} groups; nothing merged')
+            return
 
+        self.stdout.write(self.style.SUCCESS(f'\n✅ CLEANUP COMPLETE in {elapsed:.2f}s'))
+        self.stdout.write(f'   • HCPs before: {hcps_before:,}')
+        self.stdout.write(f'   • HCPs after: {HCP.objects.count():,}')
+        self.stdout.write(f"   • Patients moved: {totals['patients_moved']:,}")
+        self.stdout.write(f"   • Related rows re-pointed: {totals['rows_moved']:,}")
+        self.stdout.write(f'   • Total patients: {AnonymizedPatient.objects.count():,}')
@@ -1,20 +1,15 @@
-from django.core.management.base import BaseCommand
-import os
-import sys
-import django
+from django.core.management.base import BaseCommand, CommandError
 import random
 import math
 from datetime import datetime, timedelta, date
-from collections import Counter
-
-# Setup Django
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'providerpulse.settings')
-django.setup()
 
 from core.models import (HCP, AnonymizedPatient, EMRDataPoint, PatientOutcome, 
                         PatientCluster, ClusterMembership, ClusterInsight, 
                         DrugRecommendation)
+from core.cluster_evidence import evidence_level
+from core.outcome_stats import group_outcome_stats, outcome_stats, refresh_outcome_stats
+from core.risk_scoring import risk_level as patient_risk_level
+from core.vocabulary import term_counts
 
 class Command(BaseCommand):
     help = 'Run enhanced AI clustering analysis with multi-dimensional features'
@@ -27,13 +22,13 @@ class Command(BaseCommand):
                 self.style.SUCCESS('✅ Enhanced clustering analysis completed!')
             )
         except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'❌ Error in clustering: {str(e)}')
-            )
+            # Fail the command (and a scheduled JobRun) instead of exiting 0
+            raise CommandError(f'Error in clustering: {e}') from e
 
     def run_enhanced_clustering(self):
         """Run enhanced clustering analysis for all HCPs"""
         print("🧠 Starting Enhanced Clustering Analysis...")
+        refresh_outcome_stats()
         
         hcps = HCP.objects.filter(user__isnull=False)
         total_clusters = 0
@@ -110,7 +105,9 @@ class Command(BaseCommand):
                 continue
             
             diagnosis, subcategory = key.split('_', 1)
-            success_rate = self.calculate_success_rate(patient_list)
+            # The subcategory follows from the diagnosis, so the group is every patient of this HCP with it
+            stats = outcome_stats(hcp_id=hcp.id, diagnosis=diagnosis)
+            success_rate = stats['success_rate'] if stats['total'] else random.uniform(40, 80)
             risk_score = self.calculate_risk_score(patient_list)
             
             cluster = PatientCluster.objects.create(
@@ -132,7 +129,7 @@ class Command(BaseCommand):
                 ClusterMembership.objects.create(
                     cluster=cluster,
                     patient=patient,
-                    membership_strength=random.uniform(0.7, 1.0)
+                    similarity_score=random.uniform(0.7, 1.0)
                 )
             
             clusters.append(cluster)
@@ -143,42 +140,28 @@ class Command(BaseCommand):
         """Cluster patients by risk level"""
         clusters = []
         
-        # Calculate risk scores for all patients
-        patient_risk_scores = []
-        for patient in patients:
-            risk_score = self.calculate_patient_risk_score(patient)
-            patient_risk_scores.append((patient, risk_score))
-        
-        # Sort by risk score and create clusters
-        patient_risk_scores.sort(key=lambda x: x[1])
-        
-        # Create risk-based clusters
+        # Bucket by the stored risk_score, lowest risk first
         risk_clusters = {
             'LOW_RISK': [],
             'MEDIUM_RISK': [],
             'HIGH_RISK': []
         }
         
-        for patient, risk_score in patient_risk_scores:
-            if risk_score < 0.3:
-                risk_clusters['LOW_RISK'].append(patient)
-            elif risk_score < 0.7:
-                risk_clusters['MEDIUM_RISK'].append(patient)
-            else:
-                risk_clusters['HIGH_RISK'].append(patient)
+        for patient in sorted(patients, key=lambda p: p.risk_score):
+            risk_clusters[patient_risk_level(patient.risk_score)].append(patient)
         
-        for risk_level, patient_list in risk_clusters.items():
+        for level, patient_list in risk_clusters.items():
             if len(patient_list) < 2:
                 continue
             
             success_rate = self.calculate_success_rate(patient_list)
-            avg_risk = sum(self.calculate_patient_risk_score(p) for p in patient_list) / len(patient_list)
+            avg_risk = self.calculate_risk_score(patient_list)
             
             cluster = PatientCluster.objects.create(
                 hcp=hcp,
-                name=f"{risk_level.replace('_', ' ')} Risk Patients",
-                cluster_type='RISK',
-                description=f"Patients with {risk_level.replace('_', ' ').lower()} risk profiles",
+                name=f"{level.replace('_', ' ')} Risk Patients",
+                cluster_type='RISK_PROFILE',
+                description=f"Patients with {level.replace('_', ' ').lower()} risk profiles",
                 patient_count=len(patient_list),
                 avg_risk_score=avg_risk,
                 primary_diagnosis='Mixed',
@@ -192,7 +175,7 @@ class Command(BaseCommand):
                 ClusterMembership.objects.create(
                     cluster=cluster,
                     patient=patient,
-                    membership_strength=random.uniform(0.6, 0.9)
+                    similarity_score=random.uniform(0.6, 0.9)
                 )
             
             clusters.append(cluster)
@@ -240,7 +223,7 @@ class Command(BaseCommand):
                 ClusterMembership.objects.create(
                     cluster=cluster,
                     patient=patient,
-                    membership_strength=random.uniform(0.7, 1.0)
+                    similarity_score=random.uniform(0.7, 1.0)
                 )
             
             clusters.append(cluster)
@@ -263,15 +246,16 @@ class Command(BaseCommand):
             if len(patient_list) < 3:
                 continue
             
-            age_group, gender = key.split('_')
+            age_group = patient_list[0].age_group
+            gender = patient_list[0].get_gender_display()
             success_rate = self.calculate_success_rate(patient_list)
             risk_score = self.calculate_risk_score(patient_list)
             
             cluster = PatientCluster.objects.create(
                 hcp=hcp,
-                name=f"{age_group} {patient.get_gender_display()} Patients",
-                cluster_type='DEMOGRAPHICS',
-                description=f"Patients in {age_group} age group, {patient.get_gender_display()}",
+                name=f"{age_group} {gender} Patients",
+                cluster_type='DEMOGRAPHIC',
+                description=f"Patients in {age_group} age group, {gender}",
                 patient_count=len(patient_list),
                 avg_risk_score=risk_score,
                 primary_diagnosis='Mixed',
@@ -285,7 +269,7 @@ class Command(BaseCommand):
                 ClusterMembership.objects.create(
                     cluster=cluster,
                     patient=patient,
-                    membership_strength=random.uniform(0.5, 0.8)
+                    similarity_score=random.uniform(0.5, 0.8)
                 )
             
             clusters.append(cluster)
@@ -309,54 +293,24 @@ class Command(BaseCommand):
             return 'General'
 
     def calculate_patient_risk_score(self, patient):
-        """Calculate individual patient risk score"""
-        risk_factors = 0
-        
-        # Age risk
-        age_risk = {
-            '18-25': 0.1, '26-35': 0.2, '36-45': 0.3, '46-55': 0.4,
-            '56-65': 0.6, '66-75': 0.8, '76+': 0.9
-        }
-        risk_factors += age_risk.get(patient.age_group, 0.5)
-        
-        # Emergency visits
-        risk_factors += min(patient.emergency_visits_6m * 0.1, 0.3)
-        
-        # Hospitalizations
-        risk_factors += min(patient.hospitalizations_6m * 0.15, 0.4)
-        
-        # Medication adherence
-        adherence_risk = {
-            'Excellent': 0.0, 'Good': 0.1, 'Fair': 0.3, 'Poor': 0.5
-        }
-        risk_factors += adherence_risk.get(patient.medication_adherence, 0.2)
-        
-        return min(risk_factors, 1.0)
+        """Individual patient risk score, maintained on the row by core.risk_scoring"""
+        return patient.risk_score
 
     def calculate_success_rate(self, patients):
         """Calculate success rate for a group of patients"""
-        total_outcomes = 0
-        improved_outcomes = 0
-        
-        for patient in patients:
-            outcomes = PatientOutcome.objects.filter(patient=patient)
-            for outcome in outcomes:
-                total_outcomes += 1
-                if outcome.outcome == 'IMPROVED':
-                    improved_outcomes += 1
-        
-        if total_outcomes == 0:
+        # Ad-hoc groups (risk tiers, demographics) are not stat dimensions; one grouped query instead
+        stats = group_outcome_stats([p.id for p in patients])
+        if stats['total'] == 0:
             return random.uniform(40, 80)  # Default range
         
-        return (improved_outcomes / total_outcomes) * 100
+        return stats['success_rate']
 
     def calculate_risk_score(self, patients):
         """Calculate average risk score for a group of patients"""
         if not patients:
             return 0.5
         
-        total_risk = sum(self.calculate_patient_risk_score(p) for p in patients)
-        return total_risk / len(patients)
+        return sum(p.risk_score for p in patients) / len(patients)
 
     def analyze_treatment_response(self, patient):
         """Analyze patient's treatment response pattern"""
@@ -381,17 +335,11 @@ class Command(BaseCommand):
 
     def get_common_treatments(self, patients):
         """Get common treatments for a group of patients"""
-        treatments = []
-        for patient in patients:
-            if patient.current_treatments:
-                treatments.extend(patient.current_treatments.split('; '))
-        
-        if not treatments:
+        # Most common treatments via a group-by over the vocabulary links
+        common = term_counts(['current_treatments'], [p.id for p in patients], limit=3)
+        if not common:
             return 'Standard care'
         
-        # Get most common treatments
-        treatment_counts = Counter(treatments)
-        common = treatment_counts.most_common(3)
         return '; '.join([t[0] for t in common])
 
     def calculate_cluster_center(self, patients):
@@ -420,7 +368,7 @@ class Command(BaseCommand):
         # Add specific insights based on cluster type
         if cluster.cluster_type == 'DIAGNOSIS':
             insights.append(f"Primary diagnosis: {cluster.primary_diagnosis}")
-        elif cluster.cluster_type == 'RISK':
+        elif cluster.cluster_type == 'RISK_PROFILE':
             risk_level = 'High' if cluster.avg_risk_score > 0.7 else 'Medium' if cluster.avg_risk_score > 0.4 else 'Low'
             insights.append(f"Risk level: {risk_level}")
         elif cluster.cluster_type == 'TREATMENT_RESPONSE':
@@ -430,10 +378,10 @@ class Command(BaseCommand):
         for i, insight_text in enumerate(insights):
             ClusterInsight.objects.create(
                 cluster=cluster,
-                insight_type='PATTERN',
+                insight_type='PATTERN_DISCOVERY',
+                title=f"{cluster.name} insight {i + 1}",
                 description=insight_text,
                 confidence_score=random.uniform(0.7, 0.95),
-                impact_score=random.uniform(0.6, 0.9),
                 is_implemented=False
             )
 
@@ -444,21 +392,26 @@ class Command(BaseCommand):
         # Generate recommendations based on cluster characteristics
         if cluster.cluster_type == 'DIAGNOSIS':
             drugs = self.get_drugs_for_diagnosis(cluster.primary_diagnosis)
-        elif cluster.cluster_type == 'RISK':
+        elif cluster.cluster_type == 'RISK_PROFILE':
             drugs = self.get_drugs_for_risk_level(cluster.avg_risk_score)
         else:
             drugs = self.get_general_drugs()
         
         for drug in drugs:
+            # Observed success for the drug (and the cluster's diagnosis) when outcomes exist
+            diagnosis = cluster.primary_diagnosis if cluster.cluster_type == 'DIAGNOSIS' else None
+            observed = outcome_stats(diagnosis=diagnosis, treatment=drug['name'])
+            success_rate = observed['success_rate'] if observed['total'] else random.uniform(60, 95)
             recommendation = DrugRecommendation.objects.create(
                 hcp=cluster.hcp,
                 cluster=cluster,
                 drug_name=drug['name'],
                 indication=drug['indication'],
-                success_rate=random.uniform(60, 95),
-                confidence_score=random.uniform(0.7, 0.95),
+                success_rate=success_rate,
+                patient_count=cluster.patient_count,
+                evidence_level=evidence_level(observed['total'], success_rate),
                 priority=random.choice(['HIGH', 'MEDIUM', 'LOW']),
-                rationale=f"Recommended for {cluster.name} based on cluster analysis",
+                research_support=f"Recommended for {cluster.name} based on cluster analysis",
                 is_reviewed=False
             )
             recommendations.append(recommendation)
@@ -1,47 +1,34 @@
 from django.core.management.base import BaseCommand
+from django.db.models import Count
+from core.hcp_dedup import find_duplicates
 from core.models import HCP, AnonymizedPatient
-from django.contrib.auth.models import User
 
 class Command(BaseCommand):
-    help = 'Fix duplicate HCPs and get accurate patient counts'
+    help = 'Report duplicate HCPs and accurate patient counts (cleanup_duplicates merges them)'
 
     def handle(self, *args, **options):
-        # Get all HCPs
-        hcps = HCP.objects.all()
-        
-        # Group by name to find duplicates
-        hcp_groups = {}
-        for hcp in hcps:
-            name = hcp.name
-            if name not in hcp_groups:
-                hcp_groups[name] = []
-            hcp_groups[name].append(hcp)
+        groups = find_duplicates()
+        patient_counts = dict(
+            AnonymizedPatient.objects.values_list('hcp_id').annotate(count=Count('id')).order_by()
+        )
         
         print("=== HCP DUPLICATES ===")
-        duplicates_found = False
-        for name, hcp_list in hcp_groups.items():
-            if len(hcp_list) > 1:
-                duplicates_found = True
-                print(f"\n{name} has {len(hcp_list)} duplicates:")
-                for i, hcp in enumerate(hcp_list):
-                    patient_count = AnonymizedPatient.objects.filter(hcp=hcp).count()
-                    has_user = hcp.user is not None
-                    print(f"  {i+1}. ID {hcp.id}: {patient_count} patients, User: {has_user}")
+        for group in groups:
+            members = [(group.survivor, 1.0)] + group.duplicates
+            print(f"\n{group.survivor.name} has {len(group.duplicates)} duplicates:")
+            for i, (hcp, score) in enumerate(members):
+                has_user = hcp.user_id is not None
+                print(f"  {i+1}. ID {hcp.id}: {patient_counts.get(hcp.id, 0)} patients, User: {has_user}, score {score:.2f}")
         
-        if not duplicates_found:
+        if not groups:
             print("No duplicates found!")
         
         print(f"\n=== SUMMARY ===")
-        print(f"Total HCPs: {hcps.count()}")
+        print(f"Total HCPs: {HCP.objects.count()}")
         print(f"Total patients: {AnonymizedPatient.objects.count()}")
         print(f"HCPs with users: {HCP.objects.filter(user__isnull=False).count()}")
         
         # Show patient distribution
         print(f"\n=== PATIENT DISTRIBUTION ===")
         for hcp in HCP.objects.filter(user__isnull=False).order_by('name'):
-            patient_count = AnonymizedPatient.objects.filter(hcp=hcp).count()
-            print(f"{hcp.name}: {patient_count} patients")
-
-
-
-
+            print(f"{hcp.name}: {patient_counts.get(hcp.id, 0)} patients")
@@ -38,7 +38,7 @@ class Command(BaseCommand):
         
         # Check all HCP users
         self.stdout.write('\n📊 Current HCP Status:')
-        for hcp in HCP.objects.all():
+        for hcp in HCP.objects.select_related('user'):
             user_info = f" - {hcp.user.username}" if hcp.user else " - NO USER"
             self.stdout.write(f'  {hcp.name}: {user_info}')
         
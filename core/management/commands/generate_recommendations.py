@@ -0,0 +1,86 @@
+"""
+Django management command to generate intelligent recommendations for many HCPs at once
+Usage: python manage.py generate_recommendations [--hcr hcr_username] [--specialty Cardiology] [--workers 4]
+"""
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import HCP
+from core.recommendation_service import generate_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Generate intelligent recommendations for every HCP (or one specialty) in a single batched pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hcr',
+            help='Username of the HCR the recommendations are sent from (default: the first HCR account)',
+        )
+        parser.add_argument(
+            '--specialty',
+            help='Only HCPs with this specialty',
+        )
+        parser.add_argument(
+            '--hcp-id',
+            type=int,
+            action='append',
+            help='Only this HCP (repeatable)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes used to score HCPs (default: CPU count)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='HCPs loaded and written per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        if options['hcr']:
+            try:
+                hcr_user = User.objects.get(username=options['hcr'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['hcr']}' does not exist")
+        else:
+            # Scheduled runs pass no --hcr
+            hcr_user = User.objects.filter(userprofile__role='HCR').order_by('id').first()
+            if hcr_user is None:
+                raise CommandError('No HCR account exists; pass --hcr')
+
+        hcps = HCP.objects.all()
+        if options['specialty']:
+            hcps = hcps.filter(specialty=options['specialty'])
+        if options['hcp_id']:
+            hcps = hcps.filter(id__in=options['hcp_id'])
+
+        total = hcps.count()
+        if not total:
+            raise CommandError('No HCPs match the given filters')
+
+        self.stdout.write(f"💡 Generating recommendations for {total:,} HCPs with {options['workers']} workers...")
+        started = time.perf_counter()
+
+        def progress(totals):
+            self.stdout.write(f"   {totals['hcps']:,}/{total:,} HCPs, {totals['recommendations']:,} recommendations")
+
+        totals = generate_recommendations(
+            hcr_user,
+            hcps=hcps,
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            progress=progress,
+        )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Created {totals['recommendations']:,} recommendations in {elapsed:.1f}s "
+            f"({totals['skipped']:,} HCPs had no treatment gap or no patients)"
+        ))
@@ -0,0 +1,157 @@
+"""
+Django management command for high-volume synthetic patient data
+Usage: python manage.py generate_synthetic_data --patients 1000000 --hcps 2000 --workers 4
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import HCP, AnonymizedPatient
+from core.outcome_stats import rebuild_outcome_stats, refresh_outcome_stats
+from core.synthetic import SPECIALTY_PROFILES, WRITE_METHODS, generate_synthetic_patients
+from core.vocabulary import defer_rollups
+
+
+class Command(BaseCommand):
+    help = 'Generate reproducible synthetic patients, outcomes and EMR data points in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--patients',
+            type=int,
+            default=1000,
+            help='Number of patients to generate (default: 1000)',
+        )
+        parser.add_argument(
+            '--hcps',
+            type=int,
+            default=0,
+            help='Create this many synthetic HCPs instead of spreading patients over existing ones',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed; the same seed and sizes always produce the same data (default: 42)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processes used to generate HCP batches (writes stay in this process)',
+        )
+        parser.add_argument(
+            '--method',
+            choices=WRITE_METHODS,
+            default='executemany',
+            help='Write with raw cursor.executemany or chunked bulk_create (default: executemany)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per INSERT chunk (default: 5000)',
+        )
+        parser.add_argument(
+            '--data-points',
+            type=int,
+            default=4,
+            help='EMR data points per patient, 0 to skip (default: 4, max 10)',
+        )
+        parser.add_argument(
+            '--clusters',
+            action='store_true',
+            help='Also create one diagnosis cluster per HCP and diagnosis',
+        )
+        parser.add_argument(
+            '--skip-vocabulary',
+            action='store_true',
+            help='Do not build Condition/Treatment/RiskFactor links (run backfill_vocabulary later)',
+        )
+        parser.add_argument(
+            '--prefix',
+            type=str,
+            default='SYN',
+            help='patient_id prefix for generated patients (default: SYN)',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated patients with the same prefix first',
+        )
+
+    def handle(self, *args, **options):
+        if options['patients'] < 1:
+            raise CommandError('--patients must be at least 1')
+
+        prefix = options['prefix']
+        existing = AnonymizedPatient.objects.filter(patient_id__startswith=prefix)
+        if existing.exists():
+            if not options['clear']:
+                raise CommandError(
+                    f"Patients with prefix '{prefix}' already exist; use --clear or a different --prefix"
+                )
+            # Rollups are rebuilt once afterwards instead of per deleted patient
+            with defer_rollups():
+                deleted, _ = existing.delete()
+            HCP.objects.filter(contact_info__endswith='@synthetic.invalid', patients__isnull=True).delete()
+            self.stdout.write(f'🗑️  Deleted {deleted:,} previously generated rows')
+
+        if options['hcps']:
+            specialties = list(SPECIALTY_PROFILES)
+            created = HCP.objects.bulk_create([
+                HCP(
+                    name=f'Dr. Synthetic {index:05d}',
+                    specialty=specialties[index % len(specialties)],
+                    contact_info=f'{prefix.lower()}{index:05d}@synthetic.invalid',
+                )
+                for index in range(options['hcps'])
+            ])
+            hcps = [(hcp.id, hcp.specialty) for hcp in created]
+        else:
+            hcps = list(HCP.objects.order_by('id').values_list('id', 'specialty'))
+            if not hcps:
+                raise CommandError('No HCPs found; pass --hcps to create synthetic ones')
+
+        total = options['patients']
+        self.stdout.write(
+            f'🧬 Generating {total:,} patients across {len(hcps):,} HCPs '
+            f"(seed {options['seed']}, {options['workers']} worker(s), {options['method']})..."
+        )
+
+        step = max(total // 10, 1)
+        state = {'next': step}
+
+        def progress(totals):
+            if totals['patients'] >= state['next'] or totals['patients'] == total:
+                self.stdout.write(f"   {totals['patients']:,}/{total:,} patients")
+                state['next'] = totals['patients'] + step
+
+        start = time.perf_counter()
+        totals = generate_synthetic_patients(
+            hcps,
+            total,
+            seed=options['seed'],
+            workers=max(options['workers'], 1),
+            method=options['method'],
+            batch_size=options['batch_size'],
+            data_points=max(0, min(options['data_points'], 10)),
+            with_clusters=options['clusters'],
+            with_vocabulary=not options['skip_vocabulary'],
+            prefix=prefix,
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Created {totals['patients']:,} patients, {totals['outcomes']:,} outcomes, "
+            f"{totals['data_points']:,} data points, {totals['clusters']:,} clusters "
+            f"in {elapsed:.1f}s ({totals['patients'] / elapsed:,.0f} patients/s)"
+        ))
+
+        # Raw inserts skip the outcome signal; a --clear also deleted counted outcomes
+        if options['clear']:
+            rebuild_outcome_stats()
+        else:
+            refresh_outcome_stats()
+        self.stdout.write('📈 Treatment outcome stats updated')
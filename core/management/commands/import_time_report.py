@@ -0,0 +1,80 @@
+"""
+Django management command to report what a worker pays at startup
+Usage: python manage.py import_time_report [--target core.views] [--top 20] [--budget-ms 1500] [--strict]
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.import_timing import HEAVY_MODULES, measure_imports, summarize
+
+
+class Command(BaseCommand):
+    help = 'Measure django.setup() plus URLconf import time with -X importtime and flag heavy libraries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            help=f'Module to import after django.setup() (repeatable, default: {settings.ROOT_URLCONF})',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of modules and packages to list (default: 20)',
+        )
+        parser.add_argument(
+            '--budget-ms',
+            type=float,
+            help='Fail when total import time exceeds this many milliseconds',
+        )
+        parser.add_argument(
+            '--forbid',
+            action='append',
+            help=f'Module that must not load at startup (repeatable, default: {", ".join(HEAVY_MODULES)})',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Fail when a forbidden module is loaded',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the summary as JSON',
+        )
+
+    def handle(self, *args, **options):
+        targets = options['target'] or [settings.ROOT_URLCONF]
+        try:
+            entries = measure_imports(targets, settings.SETTINGS_MODULE)
+        except RuntimeError as e:
+            raise CommandError(f'Importing {", ".join(targets)} failed: {e}')
+        summary = summarize(entries, top=options['top'], heavy=options['forbid'])
+        summary['targets'] = targets
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            self.stdout.write(f"⏱️  {summary['total_ms']} ms across {summary['module_count']} modules "
+                              f"(django.setup() + {', '.join(targets)})")
+            self.stdout.write('\nSlowest imports (cumulative):')
+            for row in summary['slowest']:
+                self.stdout.write(f"  {row['cumulative_ms']:>9.1f} ms  {row['module']}")
+            self.stdout.write('\nSelf time by package:')
+            for row in summary['packages']:
+                self.stdout.write(f"  {row['self_ms']:>9.1f} ms  {row['package']}")
+            self.stdout.write('')
+            if summary['heavy_loaded']:
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️  Loaded at startup: {', '.join(summary['heavy_loaded'])}"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS('✅ No heavy libraries loaded at startup'))
+
+        if options['strict'] and summary['heavy_loaded']:
+            raise CommandError(f"Heavy modules imported at startup: {', '.join(summary['heavy_loaded'])}")
+        if options['budget_ms'] is not None and summary['total_ms'] > options['budget_ms']:
+            raise CommandError(f"Import time {summary['total_ms']} ms exceeds budget {options['budget_ms']} ms")
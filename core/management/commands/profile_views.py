@@ -0,0 +1,88 @@
+"""
+Django management command to profile view query behaviour
+Usage: python manage.py profile_views --username hcr_test [paths ...]
+"""
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.query_profiler import profile_buffer, summarize_profiles, get_profiler_settings
+
+DEFAULT_VIEW_NAMES = [
+    'dashboard',
+    'patient_database',
+    'cohort_cluster_network',
+    'research_dashboard',
+    'generate_recommendation_page',
+]
+
+
+class Command(BaseCommand):
+    help = 'Drive views through the test client with the query profiler on and report N+1 queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='URL paths to profile (defaults to the main dashboard views)',
+        )
+        parser.add_argument(
+            '--username',
+            type=str,
+            help='User to log in as (required for login-protected views)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Requests per path (default: 3)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw summary as JSON',
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [reverse(name) for name in DEFAULT_VIEW_NAMES]
+
+        profiler_options = get_profiler_settings()
+        profiler_options.update({'ENABLED': True, 'SAMPLE_RATE': 1.0})
+        allowed_hosts = list(settings.ALLOWED_HOSTS) + ['testserver']
+
+        with override_settings(QUERY_PROFILER=profiler_options, ALLOWED_HOSTS=allowed_hosts):
+            profile_buffer.clear()
+            client = Client()
+            if options['username']:
+                try:
+                    client.force_login(User.objects.get(username=options['username']))
+                except User.DoesNotExist:
+                    raise CommandError(f"User '{options['username']}' not found")
+
+            for path in paths:
+                for _ in range(max(options['repeat'], 1)):
+                    client.get(path)
+
+            profiles = profile_buffer.snapshot()
+
+        summary = summarize_profiles(profiles)
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'📊 Profiled {len(profiles)} requests across {len(paths)} paths'))
+        for entry in summary:
+            self.stdout.write(
+                f"\n🔎 {entry['view']}: {entry['avg_queries']} queries avg "
+                f"(max {entry['max_queries']}), {entry['avg_sql_ms']} ms SQL, "
+                f"{entry['avg_wall_ms']} ms wall (p95 {entry['p95_wall_ms']} ms)"
+            )
+            for duplicate in entry['duplicate_queries']:
+                self.stdout.write(
+                    self.style.WARNING(f"   ⚠️  {duplicate['max_count']}x {duplicate['fingerprint'][:140]}")
+                )
@@ -0,0 +1,31 @@
+"""
+Django management command to update the materialized treatment outcome statistics
+Usage: python manage.py refresh_outcome_stats [--full]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outcome_stats import rebuild_outcome_stats, refresh_outcome_stats
+
+
+class Command(BaseCommand):
+    help = 'Fold new PatientOutcome rows into TreatmentOutcomeStat, or rebuild it from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every row (picks up edited and deleted outcomes and patient changes)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['full']:
+            rows = rebuild_outcome_stats()
+            message = f'✅ Rebuilt {rows:,} treatment outcome stat rows'
+        else:
+            applied = refresh_outcome_stats()
+            message = f'✅ Applied {applied:,} new outcomes to treatment outcome stats'
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'{message} in {elapsed:.2f}s'))
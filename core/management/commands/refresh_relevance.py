@@ -0,0 +1,36 @@
+"""
+Django management command to re-decay stored research relevance scores
+Usage: python manage.py refresh_relevance [--rebuild-features] [--batch-size 500]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.relevance import rebuild_features, refresh_relevance_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute ResearchUpdate.relevance_score for today with one bulk UPDATE'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild-features',
+            action='store_true',
+            help='Recompute static features (source weight, keyword score, specialty affinities) first',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per bulk update when rebuilding features (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['rebuild_features']:
+            rebuilt = rebuild_features(batch_size=options['batch_size'])
+            self.stdout.write(f'🧮 Rebuilt relevance features for {rebuilt:,} articles')
+
+        updated = refresh_relevance_scores()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Refreshed relevance for {updated:,} articles in {elapsed:.2f}s'))
@@ -0,0 +1,42 @@
+"""
+Django management command to recompute stored patient risk scores
+Usage: python manage.py refresh_risk_scores [--hcp-id 3] [--batch-size 5000]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import AnonymizedPatient
+from core.risk_scoring import HIGH_RISK_THRESHOLD, refresh_risk_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute AnonymizedPatient.risk_score for all patients in vectorized batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hcp-id',
+            type=int,
+            help='Only refresh patients of this HCP',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Patients scored and updated per batch (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        patients = AnonymizedPatient.objects.all()
+        if options['hcp_id']:
+            patients = patients.filter(hcp_id=options['hcp_id'])
+
+        self.stdout.write(f'🩺 Refreshing risk scores for {patients.count():,} patients...')
+        started = time.perf_counter()
+        total = refresh_risk_scores(patients, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        high_risk = patients.filter(risk_score__gte=HIGH_RISK_THRESHOLD).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Scored {total:,} patients in {elapsed:.1f}s ({high_risk:,} high risk)'
+        ))
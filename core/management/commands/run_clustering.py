@@ -1,18 +1,13 @@
 from django.core.management.base import BaseCommand
-import os
-import sys
-import django
 import random
 from datetime import datetime, timedelta, date
 
-# Setup Django
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'providerpulse.settings')
-django.setup()
-
 from core.models import (HCP, AnonymizedPatient, EMRDataPoint, PatientOutcome, 
                         PatientCluster, ClusterMembership, ClusterInsight, 
                         DrugRecommendation)
+from core.outcome_stats import outcome_stats, refresh_outcome_stats
+
+MIN_OBSERVED_OUTCOMES = 10  # Below this, drug success rates fall back to the reference efficacy
 
 class Command(BaseCommand):
     help = 'Run AI clustering analysis and generate drug recommendations'
@@ -32,6 +27,7 @@ class Command(BaseCommand):
     def run_clustering_analysis(self):
         """Run clustering analysis for all HCPs"""
         print("Starting clustering analysis...")
+        refresh_outcome_stats()
         
         hcps = HCP.objects.all()
         total_clusters = 0
@@ -81,16 +77,9 @@ class Command(BaseCommand):
             if len(patient_list) < 3:  # Need at least 3 patients for clustering
                 continue
                 
-            # Calculate success rate based on outcomes
-            total_outcomes = 0
-            improved_outcomes = 0
-            for patient in patient_list:
-                for outcome in patient.outcomes.all():
-                    total_outcomes += 1
-                    if outcome.outcome == 'IMPROVED':
-                        improved_outcomes += 1
-            
-            success_rate = (improved_outcomes / total_outcomes * 100) if total_outcomes > 0 else 50.0
+            # Success rate of this HCP's outcomes for the diagnosis, read off the materialized stats
+            stats = outcome_stats(hcp_id=hcp.id, diagnosis=diagnosis)
+            success_rate = stats['success_rate'] if stats['total'] > 0 else 50.0
             
             cluster = PatientCluster.objects.create(
                 hcp=hcp,
@@ -223,10 +212,20 @@ class Command(BaseCommand):
             available_drugs = drug_database[diagnosis]
             
             for drug_info in available_drugs:
-                # Calculate success rate based on cluster data and drug efficacy
-                base_success_rate = drug_info['efficacy'] * 100
-                cluster_modifier = cluster.success_rate / 100
-                final_success_rate = base_success_rate * (0.7 + 0.3 * cluster_modifier)
+                # Prefer the observed success rate for this diagnosis and drug across all HCPs
+                observed = outcome_stats(diagnosis=diagnosis, treatment=drug_info['name'])
+                if observed['total'] >= MIN_OBSERVED_OUTCOMES:
+                    final_success_rate = observed['success_rate']
+                    research_support = (
+                        f"Observed in {observed['total']} outcomes for {diagnosis} "
+                        f"(95% CI {observed['ci_low']}-{observed['ci_high']}%)"
+                    )
+                else:
+                    # Calculate success rate based on cluster data and drug efficacy
+                    base_success_rate = drug_info['efficacy'] * 100
+                    cluster_modifier = cluster.success_rate / 100
+                    final_success_rate = base_success_rate * (0.7 + 0.3 * cluster_modifier)
+                    research_support = f"Based on cluster analysis of {cluster.patient_count} patients with {diagnosis}"
                 
                 # Determine evidence level and priority
                 if final_success_rate > 85:
@@ -248,7 +247,7 @@ class Command(BaseCommand):
                     success_rate=final_success_rate,
                     patient_count=cluster.patient_count,
                     evidence_level=evidence_level,
-                    research_support=f"Based on cluster analysis of {cluster.patient_count} patients with {diagnosis}",
+                    research_support=research_support,
                     contraindications=drug_info['contraindications'],
                     side_effects=drug_info['side_effects'],
                     dosage_recommendations=f"Standard dosing for {diagnosis}",
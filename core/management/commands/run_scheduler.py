@@ -0,0 +1,97 @@
+"""
+Django management command to run scheduled maintenance jobs in-process
+Usage: python manage.py run_scheduler [--once] [--run research_refresh] [--list] [--poll 30]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.models import ScheduledJob
+from core.scheduler import default_owner, get_jobs, run_job, run_pending, sync_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run research refresh, clustering and cleanup jobs on their interval/cron schedules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are due now, then exit',
+        )
+        parser.add_argument(
+            '--run',
+            action='append',
+            metavar='JOB',
+            help='Run this job immediately regardless of its schedule (repeatable)',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Show each job with its schedule, next run and last result',
+        )
+        parser.add_argument(
+            '--poll',
+            type=int,
+            default=30,
+            help='Seconds between checks for due jobs (default: 30)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            jobs = get_jobs()
+        except ValueError as e:
+            raise CommandError(str(e))
+        sync_jobs(jobs)
+
+        if options['list']:
+            self._list(jobs)
+            return
+
+        owner = default_owner()
+        if options['run']:
+            unknown = [name for name in options['run'] if name not in jobs]
+            if unknown:
+                raise CommandError(f"Unknown job(s): {', '.join(unknown)}. Available: {', '.join(jobs)}")
+            for name in options['run']:
+                self._report(name, run_job(name, jobs[name], owner, force=True))
+            return
+
+        if options['once']:
+            self._run_due(jobs, owner)
+            return
+
+        self.stdout.write(f"⏰ Scheduler {owner} watching {len(jobs)} jobs (polling every {options['poll']}s)")
+        try:
+            while True:
+                close_old_connections()
+                self._run_due(jobs, owner)
+                time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            self.stdout.write('\n👋 Scheduler stopped')
+
+    def _run_due(self, jobs, owner):
+        for run in run_pending(jobs, owner):
+            self._report(run.job.name, run)
+
+    def _report(self, name, run):
+        if run is None:
+            self.stdout.write(self.style.WARNING(f'⏭️  {name}: skipped, not due or another scheduler holds the lease'))
+        elif run.status == 'SUCCESS':
+            self.stdout.write(self.style.SUCCESS(f'✅ {name} finished in {run.duration_seconds:.1f}s'))
+        else:
+            self.stdout.write(self.style.ERROR(f'❌ {name} failed after {run.duration_seconds:.1f}s (JobRun {run.id})'))
+
+    def _list(self, jobs):
+        rows = {job.name: job for job in ScheduledJob.objects.filter(name__in=jobs)}
+        for name, job in jobs.items():
+            row = rows[name]
+            last = row.runs.first()  # Newest first by JobRun.Meta.ordering
+            self.stdout.write(f"📋 {name}: {job['command']} {' '.join(job['args'])}".rstrip())
+            self.stdout.write(f"   • Schedule: {job['schedule']} (jitter {job['jitter']}s)")
+            self.stdout.write(f"   • Next run: {row.next_run_at:%Y-%m-%d %H:%M:%S %Z}")
+            if last:
+                self.stdout.write(f"   • Last run: {last.started_at:%Y-%m-%d %H:%M:%S %Z} {last.status}")
+            if row.lease_owner:
+                self.stdout.write(f"   • Leased by {row.lease_owner} until {row.lease_expires_at:%H:%M:%S}")
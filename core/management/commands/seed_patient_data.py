@@ -1,20 +1,13 @@
 from django.core.management.base import BaseCommand
-import os
-import sys
-import django
 import random
 import json
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 
-# Setup Django
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'providerpulse.settings')
-django.setup()
-
 from core.models import (HCP, AnonymizedPatient, EMRDataPoint, PatientOutcome, 
                         PatientCluster, ClusterMembership, ClusterInsight, 
                         DrugRecommendation, UserProfile)
+from core.outcome_stats import refresh_outcome_stats
 from django.contrib.auth.models import User
 
 class Command(BaseCommand):
@@ -94,6 +87,9 @@ class Command(BaseCommand):
             
             print(f"Created {num_patients} patients for {hcp.name}")
         
+        # bulk_create skips the outcome signal
+        refresh_outcome_stats()
+        
         print(f"\nSeeding complete!")
         print(f"Total patients created: {total_patients}")
         print(f"Total HCPs processed: {hcps.count()}")
@@ -264,6 +260,7 @@ class Command(BaseCommand):
                 data_type='LAB_RESULT',
                 metric_name=test_name,
                 value=f"{value} {unit}",
+                numeric_value=value,  # bulk_create skips save(), which normally parses this
                 unit=unit,
                 date_recorded=patient.last_visit_date - timedelta(days=random.randint(0, 30)),
                 is_abnormal=is_abnormal,
@@ -290,6 +287,7 @@ class Command(BaseCommand):
                 data_type='VITAL_SIGN',
                 metric_name=vital_name,
                 value=f"{value} {unit}",
+                numeric_value=value,
                 unit=unit,
                 date_recorded=patient.last_visit_date - timedelta(days=random.randint(0, 7)),
                 is_abnormal=is_abnormal,
@@ -1,11 +1,12 @@
 """
 Django management command to update medical research automatically
-Usage: python manage.py update_research
+Usage: python manage.py update_research [--mode simple|advanced] [--force]
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from core.research_generator import SimplifiedResearchGenerator
 from core.research_scraper import MedicalResearchScraper
+from core.research_ingest import reset_states
 import logging
 
 class Command(BaseCommand):
@@ -15,7 +16,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Force update even if recently updated',
+            help='Ignore high-water marks and re-ingest everything',
         )
         parser.add_argument(
             '--verbose',
@@ -38,6 +39,10 @@ class Command(BaseCommand):
         )
 
         try:
+            if options['force']:
+                self.stdout.write("Resetting high-water marks for a full refresh...")
+                reset_states()
+            
             if options['mode'] == 'advanced':
                 self.stdout.write("Using advanced web scraping mode...")
                 scraper = MedicalResearchScraper()
@@ -56,6 +61,7 @@ class Command(BaseCommand):
             self.stdout.write(f"   • Deleted old articles: {result['deleted_old']}")
             self.stdout.write(f"   • Created new articles: {result['created_new']}")
             self.stdout.write(f"   • Updated existing: {result['updated_existing']}")
+            self.stdout.write(f"   • Unchanged (skipped): {result['unchanged']}")
             self.stdout.write(f"   • Total articles in DB: {result['total_articles']}")
             
             self.stdout.write(f"🏥 Specialty Distribution:")
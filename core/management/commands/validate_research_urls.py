@@ -0,0 +1,85 @@
+"""
+Django management command to check research source URLs and flag dead links
+Usage: python manage.py validate_research_urls [--workers 20] [--timeout 10] [--ttl-hours 24] [--refresh] [--url http://...]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.url_validation import (
+    DEFAULT_TIMEOUT, DEFAULT_WORKERS, flag_dead_links, research_urls, validate_urls,
+)
+
+
+class Command(BaseCommand):
+    help = 'Concurrently check ResearchUpdate source URLs (cached per TTL) and flag dead links'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f'Maximum concurrent requests (default: {DEFAULT_WORKERS})',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=DEFAULT_TIMEOUT,
+            help=f'Seconds per request (default: {DEFAULT_TIMEOUT})',
+        )
+        parser.add_argument(
+            '--ttl-hours',
+            type=float,
+            default=24,
+            help='Reuse cached results younger than this (default: 24)',
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Ignore cached results and check every URL',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Only check the URLs of the newest N distinct research links',
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            help='Check this URL instead of research links (repeatable; e.g. a local stub server)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Check and cache results without flagging ResearchUpdate rows',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        urls = options['url'] or research_urls(limit=options['limit'])
+        self.stdout.write(f"🔗 Validating {len(urls):,} URLs with up to {options['workers']} concurrent requests...")
+
+        result = validate_urls(
+            urls,
+            ttl=timedelta(hours=options['ttl_hours']),
+            workers=options['workers'],
+            timeout=options['timeout'],
+            refresh=options['refresh'],
+        )
+        rate = result['checked'] / result['seconds'] if result['seconds'] else 0
+        self.stdout.write(f"   • Checked: {result['checked']:,} in {result['seconds']}s ({rate:,.0f} URLs/s)")
+        self.stdout.write(f"   • From cache: {result['cached']:,}")
+        self.stdout.write(f"   • Dead: {len(result['dead']):,}")
+        for url in result['dead'][:20]:
+            self.stdout.write(f"     ✗ {url}")
+        if len(result['dead']) > 20:
+            self.stdout.write(f"     … and {len(result['dead']) - 20:,} more")
+
+        if options['dry_run'] or options['url']:
+            return
+        counts = flag_dead_links(result['status'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Flagged {counts['flagged']:,} research rows as dead, cleared {counts['cleared']:,}"
+        ))
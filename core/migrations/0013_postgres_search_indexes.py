@@ -0,0 +1,64 @@
+# PostgreSQL-only search indexes; a no-op on SQLite and other backends
+
+from django.db import migrations
+
+# Columns searched with icontains in patient_database. Django compiles
+# icontains to UPPER(col::text) LIKE UPPER(%s) on PostgreSQL, so the trigram
+# indexes are built on that exact expression for the planner to use them.
+PATIENT_TRIGRAM_COLUMNS = [
+    'patient_id',
+    'primary_diagnosis',
+    'secondary_diagnoses',
+    'comorbidities',
+    'current_treatments',
+    'treatment_history',
+    'risk_factors',
+    'family_history',
+]
+
+HCP_TRIGRAM_COLUMNS = ['name', 'specialty']
+
+
+def _trigram_index_sql(table, column):
+    return (
+        f'CREATE INDEX IF NOT EXISTS "{table}_{column}_trgm" '
+        f'ON "{table}" USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+    )
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    statements = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+    statements += [_trigram_index_sql('core_anonymizedpatient', c) for c in PATIENT_TRIGRAM_COLUMNS]
+    statements += [_trigram_index_sql('core_hcp', c) for c in HCP_TRIGRAM_COLUMNS]
+    # jsonb_ops covers both containment (@>) and key-existence (?) lookups
+    statements.append(
+        'CREATE INDEX IF NOT EXISTS "core_anonymizedpatient_last_lab_values_gin" '
+        'ON "core_anonymizedpatient" USING gin ("last_lab_values")'
+    )
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    names = [f'core_anonymizedpatient_{c}_trgm' for c in PATIENT_TRIGRAM_COLUMNS]
+    names += [f'core_hcp_{c}_trgm' for c in HCP_TRIGRAM_COLUMNS]
+    names.append('core_anonymizedpatient_last_lab_values_gin')
+    for name in names:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_researchupdate_source_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
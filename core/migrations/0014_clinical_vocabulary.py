@@ -0,0 +1,159 @@
+# Generated by Django 5.0.14 on 2026-10-19 08:43
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of core.vocabulary's parsing rules, so this migration does not change when they do
+DELIMITER_RE = re.compile(r'[;,]')
+WHITESPACE_RE = re.compile(r'\s+')
+NULL_TERMS = {'', 'none', 'none identified', 'none significant', 'n/a', 'na', 'unknown'}
+
+# patient field -> (vocabulary model, link model, link FK name, link kind field, link kind value)
+TERM_FIELDS = {
+    'primary_diagnosis': ('Condition', 'PatientCondition', 'condition', 'source', 'PRIMARY'),
+    'secondary_diagnoses': ('Condition', 'PatientCondition', 'condition', 'source', 'SECONDARY'),
+    'comorbidities': ('Condition', 'PatientCondition', 'condition', 'source', 'COMORBIDITY'),
+    'current_treatments': ('Treatment', 'PatientTreatment', 'treatment', 'status', 'CURRENT'),
+    'treatment_history': ('Treatment', 'PatientTreatment', 'treatment', 'status', 'HISTORY'),
+    'risk_factors': ('RiskFactor', 'PatientRiskFactor', 'risk_factor', None, None),
+}
+BATCH_SIZE = 2000
+
+
+def field_terms(field, value):
+    """Unique trimmed terms of a delimited field; primary_diagnosis is a single term"""
+    raw_terms = [value or ''] if field == 'primary_diagnosis' else DELIMITER_RE.split(value or '')
+    terms, seen = [], set()
+    for raw in raw_terms:
+        term = WHITESPACE_RE.sub(' ', raw).strip()
+        key = term.lower()
+        if key in NULL_TERMS or key in seen:
+            continue
+        seen.add(key)
+        terms.append(term)
+    return terms
+
+
+def populate_vocabulary(apps, schema_editor):
+    """Build vocabulary links from the delimited text fields of existing patients"""
+    AnonymizedPatient = apps.get_model('core', 'AnonymizedPatient')
+    term_ids = {model_name: {} for model_name, *_ in TERM_FIELDS.values()}
+    ids = list(AnonymizedPatient.objects.order_by('id').values_list('id', flat=True))
+
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = AnonymizedPatient.objects.filter(id__in=ids[start:start + BATCH_SIZE]).values_list('id', *TERM_FIELDS)
+        links = {}
+        for row in rows:
+            for field, value in zip(TERM_FIELDS, row[1:]):
+                model_name, link_name, fk_name, kind_field, kind = TERM_FIELDS[field]
+                for term in field_terms(field, value):
+                    key = term.lower()
+                    if key not in term_ids[model_name]:
+                        term_ids[model_name][key] = apps.get_model('core', model_name).objects.get_or_create(
+                            key=key, defaults={'name': term}
+                        )[0].id
+                    values = {'patient_id': row[0], f'{fk_name}_id': term_ids[model_name][key]}
+                    if kind_field:
+                        values[kind_field] = kind
+                    links.setdefault(link_name, {})[tuple(sorted(values.items()))] = values
+        for link_name, rows_by_key in links.items():
+            link_model = apps.get_model('core', link_name)
+            link_model.objects.bulk_create([link_model(**values) for values in rows_by_key.values()], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_postgres_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Condition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('key', models.CharField(max_length=200, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RiskFactor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('key', models.CharField(max_length=200, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Treatment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('key', models.CharField(max_length=200, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PatientCondition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('PRIMARY', 'Primary Diagnosis'), ('SECONDARY', 'Secondary Diagnosis'), ('COMORBIDITY', 'Comorbidity')], max_length=11)),
+                ('condition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_links', to='core.condition')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='condition_links', to='core.anonymizedpatient')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='anonymizedpatient',
+            name='conditions',
+            field=models.ManyToManyField(blank=True, related_name='patients', through='core.PatientCondition', to='core.condition'),
+        ),
+        migrations.CreateModel(
+            name='PatientRiskFactor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='risk_factor_links', to='core.anonymizedpatient')),
+                ('risk_factor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_links', to='core.riskfactor')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='anonymizedpatient',
+            name='risk_factor_terms',
+            field=models.ManyToManyField(blank=True, related_name='patients', through='core.PatientRiskFactor', to='core.riskfactor'),
+        ),
+        migrations.CreateModel(
+            name='PatientTreatment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('CURRENT', 'Current'), ('HISTORY', 'History')], max_length=7)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='treatment_links', to='core.anonymizedpatient')),
+                ('treatment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_links', to='core.treatment')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='anonymizedpatient',
+            name='treatments',
+            field=models.ManyToManyField(blank=True, related_name='patients', through='core.PatientTreatment', to='core.treatment'),
+        ),
+        migrations.AddIndex(
+            model_name='patientcondition',
+            index=models.Index(fields=['condition', 'source'], name='core_patien_conditi_54af6e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='patientcondition',
+            unique_together={('patient', 'condition', 'source')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='patientriskfactor',
+            unique_together={('patient', 'risk_factor')},
+        ),
+        migrations.AddIndex(
+            model_name='patienttreatment',
+            index=models.Index(fields=['treatment', 'status'], name='core_patien_treatme_d910dc_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='patienttreatment',
+            unique_together={('patient', 'treatment', 'status')},
+        ),
+        migrations.RunPython(populate_vocabulary, migrations.RunPython.noop),
+    ]
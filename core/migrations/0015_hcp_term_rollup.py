@@ -0,0 +1,60 @@
+# Generated by Django 5.0.14 on 2026-10-19 08:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+# (link model, term FK, kind column, {link kind: rollup kind}); mirrors core.vocabulary.ROLLUP_KINDS
+ROLLUP_SOURCES = [
+    ('PatientCondition', 'condition', 'source',
+     {'PRIMARY': 'DIAGNOSIS', 'SECONDARY': 'DIAGNOSIS', 'COMORBIDITY': 'COMORBIDITY'}),
+    ('PatientTreatment', 'treatment', 'status', {'CURRENT': 'TREATMENT'}),
+    ('PatientRiskFactor', 'risk_factor', None, {None: 'RISK_FACTOR'}),
+]
+
+
+def populate_rollups(apps, schema_editor):
+    """Seed the rollups from vocabulary links that already exist"""
+    HCPTermRollup = apps.get_model('core', 'HCPTermRollup')
+    counts = {}
+    for model_name, fk_name, kind_field, kinds in ROLLUP_SOURCES:
+        links = apps.get_model('core', model_name).objects.all()
+        group = ['patient__hcp_id', f'{fk_name}__name']
+        if kind_field:
+            links = links.filter(**{f'{kind_field}__in': list(kinds)})
+            group.append(kind_field)
+        for row in links.values(*group).annotate(count=Count('id')).order_by():
+            kind = kinds[row[kind_field] if kind_field else None]
+            key = (row['patient__hcp_id'], kind, row[f'{fk_name}__name'])
+            counts[key] = counts.get(key, 0) + row['count']
+
+    HCPTermRollup.objects.bulk_create(
+        [HCPTermRollup(hcp_id=h, kind=k, term=t, count=c) for (h, k, t), c in counts.items()],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_clinical_vocabulary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HCPTermRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('DIAGNOSIS', 'Diagnosis'), ('COMORBIDITY', 'Comorbidity'), ('TREATMENT', 'Current Treatment'), ('RISK_FACTOR', 'Risk Factor')], max_length=11)),
+                ('term', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hcp', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_rollups', to='core.hcp')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hcp', 'kind', '-count'], name='core_hcpter_hcp_id_17dcd0_idx')],
+                'unique_together': {('hcp', 'kind', 'term')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
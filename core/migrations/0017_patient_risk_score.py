@@ -0,0 +1,69 @@
+# Generated by Django 5.0.14 on 2026-10-19 08:53
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Frozen copy of core.risk_scoring's weights, so this migration does not change when they do
+AGE_RISK = {
+    '18-25': 0.1, '26-35': 0.2, '36-45': 0.3, '46-55': 0.4,
+    '56-65': 0.6, '66-75': 0.8, '76+': 0.9
+}
+DEFAULT_AGE_RISK = 0.5
+ADHERENCE_RISK = {
+    'Excellent': 0.0, 'Good': 0.1, 'Fair': 0.3, 'Poor': 0.5
+}
+DEFAULT_ADHERENCE_RISK = 0.2
+BATCH_SIZE = 2000
+
+
+def risk_score(age_group, emergency_visits, hospitalizations, adherence):
+    score = AGE_RISK.get(age_group or '', DEFAULT_AGE_RISK)
+    score += min((emergency_visits or 0) * 0.1, 0.3)
+    score += min((hospitalizations or 0) * 0.15, 0.4)
+    score += ADHERENCE_RISK.get(adherence or '', DEFAULT_ADHERENCE_RISK)
+    return round(min(score, 1.0), 4)
+
+
+def populate_risk_scores(apps, schema_editor):
+    AnonymizedPatient = apps.get_model('core', 'AnonymizedPatient')
+    DataVersion = apps.get_model('core', 'DataVersion')
+
+    ids = list(AnonymizedPatient.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        patients = list(AnonymizedPatient.objects.filter(id__in=ids[start:start + BATCH_SIZE]).only(
+            'age_group', 'emergency_visits_6m', 'hospitalizations_6m', 'medication_adherence'
+        ))
+        for patient in patients:
+            patient.risk_score = risk_score(
+                patient.age_group, patient.emergency_visits_6m,
+                patient.hospitalizations_6m, patient.medication_adherence,
+            )
+        AnonymizedPatient.objects.bulk_update(patients, ['risk_score'])
+
+    # Patient caches are keyed by this version; bulk_update skips the signals that bump it
+    version, _ = DataVersion.objects.get_or_create(name='patients')
+    DataVersion.objects.filter(pk=version.pk).update(version=F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anonymizedpatient',
+            name='risk_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='anonymizedpatient',
+            index=models.Index(fields=['-risk_score'], name='core_anonym_risk_sc_fd67cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='anonymizedpatient',
+            index=models.Index(fields=['hcp', '-risk_score'], name='core_anonym_hcp_id_7e0c94_idx'),
+        ),
+        migrations.RunPython(populate_risk_scores, migrations.RunPython.noop),
+    ]
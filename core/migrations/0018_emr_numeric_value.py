@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-19 08:55
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of core.observations.parse_numeric's pattern
+NUMBER_RE = re.compile(r'^\s*([-+]?\d+(?:\.\d+)?)')
+BATCH_SIZE = 2000
+
+
+def parse_numeric(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_RE.match(str(value))
+    return float(match.group(1)) if match else None
+
+
+def populate_numeric_values(apps, schema_editor):
+    EMRDataPoint = apps.get_model('core', 'EMRDataPoint')
+
+    ids = list(EMRDataPoint.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        points = list(EMRDataPoint.objects.filter(id__in=ids[start:start + BATCH_SIZE]).only('value'))
+        for point in points:
+            point.numeric_value = parse_numeric(point.value)
+        EMRDataPoint.objects.bulk_update(points, ['numeric_value'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_patient_risk_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emrdatapoint',
+            name='numeric_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='emrdatapoint',
+            index=models.Index(fields=['patient', 'metric_name', 'date_recorded'], name='core_emrdat_patient_73c292_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emrdatapoint',
+            index=models.Index(fields=['metric_name', 'date_recorded'], name='core_emrdat_metric__17da52_idx'),
+        ),
+        migrations.RunPython(populate_numeric_values, migrations.RunPython.noop),
+    ]
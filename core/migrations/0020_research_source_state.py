@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_scheduler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchSourceState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('specialty', models.CharField(blank=True, max_length=100)),
+                ('last_published', models.DateField(blank=True, null=True)),
+                ('last_guid', models.CharField(blank=True, max_length=500)),
+                ('etag', models.CharField(blank=True, max_length=200)),
+                ('last_modified', models.CharField(blank=True, max_length=100)),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_new_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='researchupdate',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='researchupdate',
+            index=models.Index(fields=['headline'], name='core_resear_headlin_ea137e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='researchsourcestate',
+            unique_together={('source', 'specialty')},
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_research_source_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchupdate',
+            name='source_url_dead',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='UrlCheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('status_code', models.IntegerField(blank=True, null=True)),
+                ('is_alive', models.BooleanField(default=False)),
+                ('final_url', models.URLField(blank=True, max_length=500)),
+                ('error', models.CharField(blank=True, max_length=200)),
+                ('response_ms', models.FloatField(blank=True, null=True)),
+                ('checked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_alive', 'checked_at'], name='core_urlche_is_aliv_e26c5b_idx')],
+            },
+        ),
+    ]
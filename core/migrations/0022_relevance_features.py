@@ -0,0 +1,163 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:18
+
+from datetime import date
+
+from django.db import migrations, models
+
+# Frozen copies of core.relevance's weights and core.research_scraper's vocabularies,
+# so this migration does not change when they do
+RECENCY_WEIGHT = 0.3
+SOURCE_WEIGHT = 0.3
+KEYWORD_CAP = 0.4
+DECAY_DAYS = 30
+MAX_SCORE = 1.0
+SOURCE_SCORES = {
+    'PubMed': 1.0,
+    'Medical News Today': 0.8,
+    'ScienceDaily': 0.8,
+    'Medscape': 0.9,
+    'Clinical Research Database': 0.7
+}
+DEFAULT_SOURCE_SCORE = 0.5
+HIGH_IMPACT_KEYWORDS = [
+    'breakthrough', 'novel', 'significant', 'major', 'revolutionary',
+    'clinical trial', 'randomized', 'meta-analysis', 'systematic review',
+    'fda approved', 'guideline', 'consensus', 'landmark study'
+]
+SPECIALTY_KEYWORDS = {
+    'CARDIOVASCULAR DISEASE (CARDIOLOGY)': [
+        'cardiology', 'heart', 'cardiac', 'cardiovascular', 'coronary', 'artery',
+        'myocardial', 'valve', 'rhythm', 'hypertension', 'cholesterol', 'stent', 'bypass'],
+    'INTERNAL MEDICINE': [
+        'internal medicine', 'diabetes', 'hypertension', 'metabolic', 'endocrine',
+        'primary care', 'chronic disease', 'prevention', 'geriatric', 'adult medicine'],
+    'FAMILY PRACTICE': [
+        'family practice', 'primary care', 'general practice', 'preventive care',
+        'community health', 'ambulatory', 'wellness', 'screening', 'vaccination'],
+    'GENERAL SURGERY': [
+        'surgery', 'surgical', 'operative', 'procedure', 'laparoscopic', 'minimally invasive',
+        'trauma', 'emergency surgery', 'general surgical', 'appendectomy', 'hernia'],
+    'ORTHOPEDIC SURGERY': [
+        'orthopedic', 'orthopaedic', 'bone', 'joint', 'fracture', 'spine', 'knee', 'hip',
+        'sports medicine', 'arthroscopy', 'replacement', 'musculoskeletal'],
+    'RADIATION ONCOLOGY': [
+        'radiation', 'oncology', 'cancer', 'tumor', 'malignancy', 'chemotherapy',
+        'radiotherapy', 'neoplasm', 'metastasis', 'brachytherapy', 'immunotherapy'],
+    'INFECTIOUS DISEASE': [
+        'infectious', 'infection', 'antibiotic', 'antimicrobial', 'pathogen', 'vaccine',
+        'epidemic', 'bacterial', 'viral', 'fungal', 'sepsis', 'resistance'],
+    'UROLOGY': [
+        'urology', 'urological', 'kidney', 'bladder', 'prostate', 'urinary', 'renal',
+        'stone', 'incontinence', 'erectile', 'fertility', 'urogenital'],
+    'PAIN MANAGEMENT': [
+        'pain', 'analgesic', 'anesthesia', 'chronic pain', 'opioid', 'nerve block',
+        'fibromyalgia', 'neuropathic', 'interventional', 'palliative'],
+    'PHYSICAL MEDICINE AND REHABILITATION': [
+        'rehabilitation', 'physical therapy', 'recovery', 'disability', 'mobility',
+        'stroke', 'spinal cord', 'brain injury', 'prosthetic', 'functional'],
+}
+FEATURE_FIELDS = ['source_weight', 'keyword_score', 'specialty_affinities', 'static_score', 'relevance_key', 'relevance_score']
+BATCH_SIZE = 500
+
+
+def article_features(title, abstract, source, published, today):
+    """Static features, relevance_key and today's relevance_score of one article (substring matching)"""
+    title, abstract = (title or '').lower(), (abstract or '').lower()
+    text = f'{title} {abstract}'
+
+    keyword_score = 0
+    for keyword in HIGH_IMPACT_KEYWORDS:
+        if keyword in title:
+            keyword_score += 0.2
+        elif keyword in abstract:
+            keyword_score += 0.1
+
+    scores = {}
+    for specialty, keywords in SPECIALTY_KEYWORDS.items():
+        score = 0
+        for keyword in keywords:
+            weight = len(keyword.split())
+            if keyword in text:
+                score += weight * 2
+            elif any(word in text for word in keyword.split()):
+                score += weight
+        scores[specialty] = score
+    top = max(scores.values(), default=0)
+    affinities = {specialty: round(score / top, 3) for specialty, score in scores.items() if score} if top else {}
+
+    source_weight = SOURCE_SCORES.get(source or '', DEFAULT_SOURCE_SCORE)
+    keyword_score = round(min(keyword_score, KEYWORD_CAP), 3)
+    static_score = round(source_weight * SOURCE_WEIGHT + keyword_score, 4)
+    recency = max(0, 1.0 - (today - published).days / DECAY_DAYS)
+    return {
+        'source_weight': source_weight,
+        'keyword_score': keyword_score,
+        'specialty_affinities': affinities,
+        'static_score': static_score,
+        'relevance_key': static_score + RECENCY_WEIGHT * published.toordinal() / DECAY_DAYS,
+        'relevance_score': round(min(static_score + recency * RECENCY_WEIGHT, MAX_SCORE), 4),
+    }
+
+
+def populate_relevance_features(apps, schema_editor):
+    ResearchUpdate = apps.get_model('core', 'ResearchUpdate')
+    today = date.today()
+
+    ids = list(ResearchUpdate.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        articles = list(ResearchUpdate.objects.filter(id__in=ids[start:start + BATCH_SIZE]).only(
+            'headline', 'abstract', 'source', 'date'
+        ))
+        for article in articles:
+            features = article_features(article.headline, article.abstract, article.source, article.date, today)
+            for field, value in features.items():
+                setattr(article, field, value)
+        ResearchUpdate.objects.bulk_update(articles, FEATURE_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_url_check'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchupdate',
+            name='keyword_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='researchupdate',
+            name='relevance_key',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='researchupdate',
+            name='source_weight',
+            field=models.FloatField(default=0.5),
+        ),
+        migrations.AddField(
+            model_name='researchupdate',
+            name='specialty_affinities',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='researchupdate',
+            name='static_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='researchupdate',
+            index=models.Index(fields=['-relevance_key'], name='core_resear_relevan_f3566e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='researchupdate',
+            index=models.Index(fields=['specialty', '-relevance_key'], name='core_resear_special_ac3112_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='researchupdate',
+            index=models.Index(fields=['is_high_impact', '-relevance_key'], name='core_resear_is_high_ada65d_idx'),
+        ),
+        migrations.RunPython(populate_relevance_features, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:21
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# ScrapedResearch JSON field -> ResearchTerm.field, frozen from core.research_index
+TERM_FIELDS = {
+    'keywords': 'KEYWORD',
+    'specialties': 'SPECIALTY',
+    'conditions_mentioned': 'CONDITION',
+    'treatments_mentioned': 'TREATMENT',
+}
+TERM_LENGTH = 200
+WHITESPACE_RE = re.compile(r'\s+')
+BATCH_SIZE = 2000
+
+
+def term_keys(terms):
+    keys = {WHITESPACE_RE.sub(' ', term).strip().lower()[:TERM_LENGTH] for term in terms or [] if isinstance(term, str)}
+    keys.discard('')
+    return sorted(keys)
+
+
+def populate_research_terms(apps, schema_editor):
+    ScrapedResearch = apps.get_model('core', 'ScrapedResearch')
+    ResearchTerm = apps.get_model('core', 'ResearchTerm')
+
+    ids = list(ScrapedResearch.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = ScrapedResearch.objects.filter(id__in=ids[start:start + BATCH_SIZE]).values_list('id', *TERM_FIELDS)
+        ResearchTerm.objects.bulk_create([
+            ResearchTerm(research_id=row[0], field=field, term=key)
+            for row in rows
+            for field, values in zip(TERM_FIELDS.values(), row[1:])
+            for key in term_keys(values)
+        ], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_relevance_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('KEYWORD', 'Keyword'), ('SPECIALTY', 'Specialty'), ('CONDITION', 'Condition'), ('TREATMENT', 'Treatment')], max_length=9)),
+                ('term', models.CharField(max_length=200)),
+                ('research', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='core.scrapedresearch')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['field', 'term'], name='core_resear_field_8cf8d0_idx')],
+                'unique_together': {('research', 'field', 'term')},
+            },
+        ),
+        migrations.RunPython(populate_research_terms, migrations.RunPython.noop),
+    ]
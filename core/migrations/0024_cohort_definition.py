@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:34
+
+from django.db import migrations, models
+
+# Definitions for the cohorts generate_cohort_recommendations seeds
+SEEDED_DEFINITIONS = {
+    'Advanced Melanoma Patients': 'diagnosis = "Melanoma"',
+    'Type 2 Diabetes with Complications': (
+        'condition = "Type 2 Diabetes Mellitus" and condition in '
+        '("Diabetic Neuropathy", "Diabetic Nephropathy", "Diabetic Retinopathy", "Chronic Kidney Disease")'
+    ),
+    'High-Risk Cardiac Patients': (
+        'diagnosis in ("Coronary Artery Disease", "Heart Failure", "Atrial Fibrillation", "Peripheral Artery Disease") '
+        'and (risk_score >= 0.8 or er_visits >= 2)'
+    ),
+}
+
+
+def define_seeded_cohorts(apps, schema_editor):
+    PatientCohort = apps.get_model('core', 'PatientCohort')
+    for name, definition in SEEDED_DEFINITIONS.items():
+        PatientCohort.objects.filter(name=name, definition='').update(definition=definition)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_research_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientcohort',
+            name='definition',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(define_seeded_cohorts, migrations.RunPython.noop),
+    ]
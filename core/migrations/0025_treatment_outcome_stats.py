@@ -0,0 +1,106 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:38
+
+import math
+import re
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+# Frozen copies of core.outcome_stats' grouping and interval, so this migration does not change when they do
+OUTCOME_CODES = ['IMPROVED', 'STABLE', 'DETERIORATED', 'UNKNOWN']
+SUCCESS_OUTCOMES = ['IMPROVED']
+WHITESPACE_RE = re.compile(r'\s+')
+NULL_TERMS = {'', 'none', 'none identified', 'none significant', 'n/a', 'na', 'unknown'}
+Z_95 = 1.96
+
+
+def diagnosis_key(value):
+    term = WHITESPACE_RE.sub(' ', value or '').strip()
+    return '' if term.lower() in NULL_TERMS else term
+
+
+def wilson_interval(successes, total, z=Z_95):
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin) * 100, min(1.0, center + margin) * 100
+
+
+def populate_outcome_stats(apps, schema_editor):
+    PatientOutcome = apps.get_model('core', 'PatientOutcome')
+    TreatmentOutcomeStat = apps.get_model('core', 'TreatmentOutcomeStat')
+    AnalyticsWatermark = apps.get_model('core', 'AnalyticsWatermark')
+
+    upper = PatientOutcome.objects.aggregate(upper=Max('id'))['upper'] or 0
+    rows = (
+        PatientOutcome.objects.filter(id__lte=upper)
+        .values_list('patient__hcp_id', 'patient__primary_diagnosis', 'treatment', 'patient__age_group', 'outcome')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    counts = {}
+    for hcp_id, diagnosis, treatment, age_group, outcome, count in rows:
+        key = (hcp_id, diagnosis_key(diagnosis), (treatment or '').strip(), age_group or '')
+        counts.setdefault(key, Counter())[outcome] += count
+
+    stats = []
+    for (hcp_id, diagnosis, treatment, age_group), codes in counts.items():
+        total = sum(codes[code] for code in OUTCOME_CODES)
+        successes = sum(codes[code] for code in SUCCESS_OUTCOMES)
+        low, high = wilson_interval(successes, total) if total else (0.0, 0.0)
+        stats.append(TreatmentOutcomeStat(
+            hcp_id=hcp_id, diagnosis=diagnosis, treatment=treatment, age_group=age_group,
+            **{code.lower(): codes[code] for code in OUTCOME_CODES},
+            total=total,
+            success_rate=round(successes / total * 100, 1) if total else 0.0,
+            ci_low=round(low, 1),
+            ci_high=round(high, 1),
+        ))
+    TreatmentOutcomeStat.objects.bulk_create(stats, batch_size=5000)
+    AnalyticsWatermark.objects.update_or_create(name='treatment_outcome_stats', defaults={'last_id': upper})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_cohort_definition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TreatmentOutcomeStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('diagnosis', models.CharField(blank=True, max_length=200)),
+                ('treatment', models.CharField(max_length=200)),
+                ('age_group', models.CharField(blank=True, max_length=10)),
+                ('improved', models.IntegerField(default=0)),
+                ('stable', models.IntegerField(default=0)),
+                ('deteriorated', models.IntegerField(default=0)),
+                ('unknown', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('success_rate', models.FloatField(default=0.0)),
+                ('ci_low', models.FloatField(default=0.0)),
+                ('ci_high', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hcp', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outcome_stats', to='core.hcp')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['diagnosis', 'treatment'], name='core_treatm_diagnos_1bbb7d_idx'), models.Index(fields=['treatment', 'diagnosis'], name='core_treatm_treatme_a64d3e_idx')],
+                'unique_together': {('hcp', 'diagnosis', 'treatment', 'age_group')},
+            },
+        ),
+        migrations.RunPython(populate_outcome_stats, migrations.RunPython.noop),
+    ]
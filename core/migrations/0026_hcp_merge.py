@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-19 09:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_treatment_outcome_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HCPMerge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('merged_hcp_id', models.IntegerField()),
+                ('name', models.CharField(max_length=100)),
+                ('specialty', models.CharField(max_length=100)),
+                ('contact_info', models.CharField(max_length=200)),
+                ('score', models.FloatField()),
+                ('patients_moved', models.IntegerField(default=0)),
+                ('merged_at', models.DateTimeField(auto_now_add=True)),
+                ('survivor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='merged_duplicates', to='core.hcp')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['merged_hcp_id'], name='core_hcpmer_merged__99a3fb_idx')],
+            },
+        ),
+    ]
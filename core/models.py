@@ -33,8 +33,16 @@ class ResearchUpdate(models.Model):
 	abstract = models.TextField(blank=True, null=True)
 	source = models.CharField(max_length=100, default='Manual')
 	source_url = models.URLField(blank=True, null=True)  # URL to original article
-	relevance_score = models.FloatField(default=0.0)  # AI-calculated relevance
+	relevance_score = models.FloatField(default=0.0)  # Relevance as of the last core.relevance refresh
 	is_high_impact = models.BooleanField(default=False)
+	# Static relevance features, computed once at ingestion by core.relevance
+	source_weight = models.FloatField(default=0.5)
+	keyword_score = models.FloatField(default=0.0)
+	specialty_affinities = models.JSONField(default=dict, blank=True)
+	static_score = models.FloatField(default=0.0)
+	relevance_key = models.FloatField(default=0.0)  # Sorts like current relevance as of the nightly refresh; see core.relevance
+	content_hash = models.CharField(max_length=64, blank=True)  # Set by research_ingest; unchanged rows are not rewritten
+	source_url_dead = models.BooleanField(default=False)  # Set in bulk by validate_research_urls
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
@@ -44,6 +52,10 @@ class ResearchUpdate(models.Model):
 			models.Index(fields=['specialty', '-date']),
 			models.Index(fields=['date']),
 			models.Index(fields=['-relevance_score']),
+			models.Index(fields=['headline']),
+			models.Index(fields=['-relevance_key']),
+			models.Index(fields=['specialty', '-relevance_key']),
+			models.Index(fields=['is_high_impact', '-relevance_key']),
 		]
 
 	def __str__(self):
@@ -97,10 +109,21 @@ class PatientCohort(models.Model):
     description = models.TextField()
     condition = models.CharField(max_length=100)  # e.g., "Type 2 Diabetes", "Hypertension"
     specialty = models.CharField(max_length=100)
-    patient_count = models.IntegerField(default=0)
+    definition = models.TextField(blank=True)  # core.cohorts query; empty for hand-maintained cohorts
+    patient_count = models.IntegerField(default=0)  # Kept current from the definition by refresh_cohort_counts
     created_date = models.DateField(auto_now_add=True)
     last_updated = models.DateField(auto_now=True)
     
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .cohorts import CohortQueryError, compile_definition
+        
+        if self.definition.strip():
+            try:
+                compile_definition(self.definition)
+            except CohortQueryError as e:
+                raise ValidationError({'definition': str(e)})
+    
     def __str__(self):
         return f"{self.name} ({self.patient_count} patients)"
 
@@ -219,9 +242,31 @@ class AnonymizedPatient(models.Model):
     family_history = models.TextField(blank=True)
     insurance_type = models.CharField(max_length=50, blank=True)
     medication_access = models.CharField(max_length=20, blank=True)
+    risk_score = models.FloatField(default=0.0)  # Derived in save() by core.risk_scoring
     created_date = models.DateField(auto_now_add=True)
     last_updated = models.DateField(auto_now=True)
     
+    # Normalized views of the delimited text fields above (see core.vocabulary)
+    conditions = models.ManyToManyField('Condition', through='PatientCondition', related_name='patients', blank=True)
+    treatments = models.ManyToManyField('Treatment', through='PatientTreatment', related_name='patients', blank=True)
+    risk_factor_terms = models.ManyToManyField('RiskFactor', through='PatientRiskFactor', related_name='patients', blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-risk_score']),
+            models.Index(fields=['hcp', '-risk_score']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        from .risk_scoring import RISK_INPUT_FIELDS, score_patient
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(RISK_INPUT_FIELDS):
+            self.risk_score = round(score_patient(self), 4)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'risk_score'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"Patient {self.patient_id} - {self.primary_diagnosis}"
 
@@ -241,11 +286,25 @@ class EMRDataPoint(models.Model):
     data_type = models.CharField(max_length=15, choices=DATA_TYPE_CHOICES)
     metric_name = models.CharField(max_length=100)
     value = models.CharField(max_length=200)
+    numeric_value = models.FloatField(null=True, blank=True)  # Parsed from value in save(); None if non-numeric
     unit = models.CharField(max_length=50, blank=True)
     date_recorded = models.DateField()
     is_abnormal = models.BooleanField(default=False)
     severity = models.CharField(max_length=20, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'metric_name', 'date_recorded']),
+            models.Index(fields=['metric_name', 'date_recorded']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        from .observations import parse_numeric
+        
+        # value stays the source of truth; bulk writers set numeric_value themselves
+        self.numeric_value = parse_numeric(self.value)
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.patient.patient_id} - {self.metric_name}: {self.value}"
 
@@ -269,6 +328,133 @@ class PatientOutcome(models.Model):
     def __str__(self):
         return f"{self.patient.patient_id} - {self.treatment}: {self.outcome}"
 
+class Condition(models.Model):
+    """Normalized diagnosis/comorbidity vocabulary"""
+    name = models.CharField(max_length=200)
+    key = models.CharField(max_length=200, unique=True)  # Lowercased, whitespace-collapsed name
+
+    def __str__(self):
+        return self.name
+
+class Treatment(models.Model):
+    """Normalized treatment vocabulary"""
+    name = models.CharField(max_length=200)
+    key = models.CharField(max_length=200, unique=True)
+
+    def __str__(self):
+        return self.name
+
+class RiskFactor(models.Model):
+    """Normalized risk factor vocabulary"""
+    name = models.CharField(max_length=200)
+    key = models.CharField(max_length=200, unique=True)
+
+    def __str__(self):
+        return self.name
+
+class PatientCondition(models.Model):
+    """Patient to condition link, derived from the diagnosis text fields"""
+    SOURCE_CHOICES = [
+        ('PRIMARY', 'Primary Diagnosis'),
+        ('SECONDARY', 'Secondary Diagnosis'),
+        ('COMORBIDITY', 'Comorbidity'),
+    ]
+
+    patient = models.ForeignKey(AnonymizedPatient, on_delete=models.CASCADE, related_name='condition_links')
+    condition = models.ForeignKey(Condition, on_delete=models.CASCADE, related_name='patient_links')
+    source = models.CharField(max_length=11, choices=SOURCE_CHOICES)
+
+    class Meta:
+        unique_together = ('patient', 'condition', 'source')
+        indexes = [
+            models.Index(fields=['condition', 'source']),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} - {self.condition_id} ({self.source})"
+
+class PatientTreatment(models.Model):
+    """Patient to treatment link, derived from current_treatments/treatment_history"""
+    STATUS_CHOICES = [
+        ('CURRENT', 'Current'),
+        ('HISTORY', 'History'),
+    ]
+
+    patient = models.ForeignKey(AnonymizedPatient, on_delete=models.CASCADE, related_name='treatment_links')
+    treatment = models.ForeignKey(Treatment, on_delete=models.CASCADE, related_name='patient_links')
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES)
+
+    class Meta:
+        unique_together = ('patient', 'treatment', 'status')
+        indexes = [
+            models.Index(fields=['treatment', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} - {self.treatment_id} ({self.status})"
+
+class PatientRiskFactor(models.Model):
+    """Patient to risk factor link, derived from risk_factors"""
+    patient = models.ForeignKey(AnonymizedPatient, on_delete=models.CASCADE, related_name='risk_factor_links')
+    risk_factor = models.ForeignKey(RiskFactor, on_delete=models.CASCADE, related_name='patient_links')
+
+    class Meta:
+        unique_together = ('patient', 'risk_factor')
+
+    def __str__(self):
+        return f"{self.patient_id} - {self.risk_factor_id}"
+
+class HCPTermRollup(models.Model):
+    """Per-HCP term frequency, maintained by deltas whenever vocabulary links change"""
+    KIND_CHOICES = [
+        ('DIAGNOSIS', 'Diagnosis'),
+        ('COMORBIDITY', 'Comorbidity'),
+        ('TREATMENT', 'Current Treatment'),
+        ('RISK_FACTOR', 'Risk Factor'),
+    ]
+
+    hcp = models.ForeignKey(HCP, on_delete=models.CASCADE, related_name='term_rollups')
+    kind = models.CharField(max_length=11, choices=KIND_CHOICES)
+    term = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)  # Zero rows are kept so updated_at records removals
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('hcp', 'kind', 'term')
+        indexes = [
+            models.Index(fields=['hcp', 'kind', '-count']),
+        ]
+
+    def __str__(self):
+        return f"{self.hcp_id} {self.kind}: {self.term} ({self.count})"
+
+
+class TreatmentOutcomeStat(models.Model):
+    """PatientOutcome counts per (HCP, diagnosis, treatment, age group), maintained by core.outcome_stats"""
+    hcp = models.ForeignKey(HCP, on_delete=models.CASCADE, related_name='outcome_stats')
+    diagnosis = models.CharField(max_length=200, blank=True)  # Patient's primary diagnosis; blank when none recorded
+    treatment = models.CharField(max_length=200)
+    age_group = models.CharField(max_length=10, blank=True)
+    improved = models.IntegerField(default=0)
+    stable = models.IntegerField(default=0)
+    deteriorated = models.IntegerField(default=0)
+    unknown = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    success_rate = models.FloatField(default=0.0)  # Percent of outcomes in SUCCESS_OUTCOMES
+    ci_low = models.FloatField(default=0.0)  # 95% Wilson interval of success_rate, percent
+    ci_high = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('hcp', 'diagnosis', 'treatment', 'age_group')
+        indexes = [
+            models.Index(fields=['diagnosis', 'treatment']),
+            models.Index(fields=['treatment', 'diagnosis']),
+        ]
+
+    def __str__(self):
+        return f"{self.treatment} for {self.diagnosis or 'unknown diagnosis'} ({self.hcp_id}, {self.age_group}): {self.success_rate:.1f}%"
+
 class PatientCluster(models.Model):
     """AI-driven patient clustering for similarity analysis"""
     CLUSTER_TYPE_CHOICES = [
@@ -428,6 +614,29 @@ class ScrapedResearch(models.Model):
         return self.title
 
 
+class ResearchTerm(models.Model):
+    """Indexed (field, term) rows for a ScrapedResearch article's JSON term lists"""
+    FIELD_CHOICES = [
+        ('KEYWORD', 'Keyword'),
+        ('SPECIALTY', 'Specialty'),
+        ('CONDITION', 'Condition'),
+        ('TREATMENT', 'Treatment'),
+    ]
+
+    research = models.ForeignKey(ScrapedResearch, on_delete=models.CASCADE, related_name='terms')
+    field = models.CharField(max_length=9, choices=FIELD_CHOICES)
+    term = models.CharField(max_length=200)  # Lowercased, whitespace-collapsed
+
+    class Meta:
+        unique_together = ('research', 'field', 'term')
+        indexes = [
+            models.Index(fields=['field', 'term']),
+        ]
+
+    def __str__(self):
+        return f"{self.research_id} {self.field}: {self.term}"
+
+
 class IntelligentRecommendation(models.Model):
     """Combined recommendations based on patient analysis and research"""
     PRIORITY_CHOICES = [
@@ -527,4 +736,112 @@ class RecommendationFeedback(models.Model):
     created_date = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"Feedback for {self.recommendation.recommendation_title} - {self.rating} stars"
\ No newline at end of file
+        return f"Feedback for {self.recommendation.recommendation_title} - {self.rating} stars"
+
+class DataVersion(models.Model):
+    """Monotonic counter per dataset, bumped on writes; keys caches of derived data"""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class AnalyticsWatermark(models.Model):
+    """Highest source row id already folded into a materialized analytics table"""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+class ScheduledJob(models.Model):
+    """Scheduler state per job; the lease columns stop two schedulers running it at once"""
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    lease_owner = models.CharField(max_length=200, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} (next {self.next_run_at})"
+
+class JobRun(models.Model):
+    """One execution of a scheduled job and what its command printed"""
+    STATUS_CHOICES = [
+        ('RUNNING', 'Running'),
+        ('SUCCESS', 'Success'),
+        ('FAILED', 'Failed'),
+    ]
+
+    job = models.ForeignKey(ScheduledJob, on_delete=models.CASCADE, related_name='runs')
+    owner = models.CharField(max_length=200)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='RUNNING')
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    output = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['job', '-started_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.job.name} {self.status} at {self.started_at}"
+
+class ResearchSourceState(models.Model):
+    """High-water mark per research source (and specialty) so refreshes only ingest newer items"""
+    source = models.CharField(max_length=100)
+    specialty = models.CharField(max_length=100, blank=True)  # Blank for source-wide feeds
+    last_published = models.DateField(null=True, blank=True)
+    last_guid = models.CharField(max_length=500, blank=True)
+    etag = models.CharField(max_length=200, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    last_new_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('source', 'specialty')
+
+    def __str__(self):
+        return f"{self.source} {self.specialty or '*'} through {self.last_published}"
+
+class UrlCheck(models.Model):
+    """Cached reachability result per URL; rechecked once older than the validator's TTL"""
+    url = models.URLField(max_length=500, unique=True)
+    status_code = models.IntegerField(null=True, blank=True)  # None when the request itself failed
+    is_alive = models.BooleanField(default=False)
+    final_url = models.URLField(max_length=500, blank=True)  # After redirects
+    error = models.CharField(max_length=200, blank=True)
+    response_ms = models.FloatField(null=True, blank=True)
+    checked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_alive', 'checked_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({self.status_code or self.error})"
+
+class HCPMerge(models.Model):
+    """Audit row for a duplicate HCP merged into a surviving record by core.hcp_dedup"""
+    survivor = models.ForeignKey(HCP, on_delete=models.CASCADE, related_name='merged_duplicates')
+    merged_hcp_id = models.IntegerField()  # The deleted duplicate's primary key
+    name = models.CharField(max_length=100)
+    specialty = models.CharField(max_length=100)
+    contact_info = models.CharField(max_length=200)
+    score = models.FloatField()  # Match score against the survivor, 0-1
+    patients_moved = models.IntegerField(default=0)
+    merged_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['merged_hcp_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.merged_hcp_id}) -> {self.survivor_id}"
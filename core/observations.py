@@ -0,0 +1,152 @@
+"""
+Clinical Observations
+Typed numeric access to EMR data points: string parsing at write time, a
+vectorized abnormal-flag evaluator, and per-patient/per-metric rollups
+(latest, min, max, trend slope) computed from numeric columns
+"""
+import logging
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_RE = re.compile(r'^\s*([-+]?\d+(?:\.\d+)?)')
+
+# metric -> (normal low, normal high, data type); the seed_patient_data panel
+REFERENCE_RANGES = {
+    'Hemoglobin A1c': (4.0, 6.5, 'LAB_RESULT'),
+    'Total Cholesterol': (120, 200, 'LAB_RESULT'),
+    'LDL Cholesterol': (70, 130, 'LAB_RESULT'),
+    'HDL Cholesterol': (40, 60, 'LAB_RESULT'),
+    'Triglycerides': (50, 150, 'LAB_RESULT'),
+    'Creatinine': (0.6, 1.2, 'LAB_RESULT'),
+    'eGFR': (60, 120, 'LAB_RESULT'),
+    'TSH': (0.4, 4.0, 'LAB_RESULT'),
+    'Free T4': (0.8, 1.8, 'LAB_RESULT'),
+    'Glucose': (70, 100, 'LAB_RESULT'),
+    'Blood Pressure Systolic': (90, 140, 'VITAL_SIGN'),
+    'Blood Pressure Diastolic': (60, 90, 'VITAL_SIGN'),
+    'Heart Rate': (60, 100, 'VITAL_SIGN'),
+    'Temperature': (97.0, 99.5, 'VITAL_SIGN'),
+    'Respiratory Rate': (12, 20, 'VITAL_SIGN'),
+    'Oxygen Saturation': (95, 100, 'VITAL_SIGN'),
+}
+
+# data type -> (abnormal low factor, abnormal high factor, severe low factor, severe high factor)
+ABNORMAL_FACTORS = {
+    'LAB_RESULT': (0.8, 1.2, 0.6, 1.4),
+    'VITAL_SIGN': (0.9, 1.1, 0.8, 1.3),
+}
+
+
+def parse_numeric(value) -> Optional[float]:
+    """Leading number of a stored value such as '7.2 %' or '120 mmHg'; None if there is none"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER_RE.match(str(value))
+    return float(match.group(1)) if match else None
+
+
+def evaluate_abnormal(metric_names: Sequence[str], values: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Abnormal flags and severities ('High', 'Normal' or '') for whole columns.
+    Metrics without a reference range and missing values are never abnormal.
+    """
+    values = np.asarray(values, dtype=float)
+    if not values.size:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=object)
+
+    labels, inverse = np.unique(np.asarray(metric_names, dtype=str), return_inverse=True)
+    bounds = np.full((len(labels), 4), np.nan)
+    for i, label in enumerate(labels):
+        if label in REFERENCE_RANGES:
+            low, high, data_type = REFERENCE_RANGES[label]
+            low_factor, high_factor, severe_low, severe_high = ABNORMAL_FACTORS[data_type]
+            bounds[i] = (low * low_factor, high * high_factor, low * severe_low, high * severe_high)
+    bounds = bounds[inverse]
+
+    # Comparisons against NaN are False, so unknown metrics and values stay normal
+    with np.errstate(invalid='ignore'):
+        abnormal = (values < bounds[:, 0]) | (values > bounds[:, 1])
+        severe = (values < bounds[:, 2]) | (values > bounds[:, 3])
+    severity = np.where(abnormal, np.where(severe, 'High', 'Normal'), '').astype(object)
+    return abnormal, severity
+
+
+def _observation_columns(patient_ids, metrics: Optional[List[str]] = None):
+    """(patient ids, metric names, date ordinals, values) arrays sorted by patient, metric, date"""
+    from .models import EMRDataPoint
+
+    points = EMRDataPoint.objects.filter(numeric_value__isnull=False)
+    if patient_ids is not None:
+        points = points.filter(patient_id__in=patient_ids)
+    if metrics:
+        points = points.filter(metric_name__in=metrics)
+    rows = list(
+        points.order_by('patient_id', 'metric_name', 'date_recorded', 'id')
+        .values_list('patient_id', 'metric_name', 'date_recorded', 'numeric_value')
+    )
+    if not rows:
+        return None
+    patients, names, dates, values = zip(*rows)
+    return (
+        np.asarray(patients, dtype=np.int64),
+        np.asarray(names, dtype=object),
+        np.fromiter((d.toordinal() for d in dates), dtype=np.float64, count=len(rows)),
+        np.asarray(values, dtype=np.float64),
+    )
+
+
+def metric_rollups(patient_ids=None, metrics: Optional[List[str]] = None) -> Dict[Tuple[int, str], Dict]:
+    """
+    Per (patient, metric): latest value and date, min, max, count and the
+    least-squares trend slope in units per day, all from segment reductions
+    """
+    columns = _observation_columns(patient_ids, metrics)
+    if columns is None:
+        return {}
+    patients, names, days, values = columns
+
+    # Segment starts wherever the (patient, metric) key changes
+    change = np.ones(len(values), dtype=bool)
+    change[1:] = (patients[1:] != patients[:-1]) | (names[1:] != names[:-1])
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], len(values))
+    counts = ends - starts
+
+    # Centre days per segment so the slope sums stay well conditioned
+    segment = np.repeat(np.arange(len(starts)), counts)
+    x = days - (np.add.reduceat(days, starts) / counts)[segment]
+    sxx = np.add.reduceat(x * x, starts)
+    sxy = np.add.reduceat(x * values, starts)
+    slopes = np.divide(sxy, sxx, out=np.zeros(len(starts)), where=sxx > 0)
+
+    minimums = np.minimum.reduceat(values, starts)
+    maximums = np.maximum.reduceat(values, starts)
+    last = ends - 1
+
+    rollups = {}
+    for i, start in enumerate(starts.tolist()):
+        rollups[(int(patients[start]), names[start])] = {
+            'latest': float(values[last[i]]),
+            'latest_date': days[last[i]],
+            'min': float(minimums[i]),
+            'max': float(maximums[i]),
+            'count': int(counts[i]),
+            'slope_per_day': float(slopes[i]),
+        }
+    return rollups
+
+
+def latest_values(patient_ids: List[int], metrics: List[str]) -> np.ndarray:
+    """patients x metrics matrix of latest numeric values (NaN where never measured), for clustering"""
+    matrix = np.full((len(patient_ids), len(metrics)), np.nan)
+    row_of = {patient_id: i for i, patient_id in enumerate(patient_ids)}
+    column_of = {metric: j for j, metric in enumerate(metrics)}
+    for (patient_id, metric), rollup in metric_rollups(patient_ids, metrics).items():
+        matrix[row_of[patient_id], column_of[metric]] = rollup['latest']
+    return matrix
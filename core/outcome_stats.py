@@ -0,0 +1,169 @@
+"""
+Treatment Outcome Statistics
+Materialized PatientOutcome counts per (HCP, diagnosis, treatment, age group)
+with success rates and Wilson confidence intervals. New outcomes are folded in
+incrementally past a high-water mark on PatientOutcome.id, so success-rate
+displays read precomputed rows instead of re-counting outcomes. Outcome edits
+and deletes, and patient edits that move an outcome between groups, are not
+tracked; the nightly --full rebuild repairs that drift.
+"""
+import logging
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from .drug_matrix import SUCCESS_OUTCOMES
+from .models import AnalyticsWatermark, PatientOutcome, TreatmentOutcomeStat
+from .vocabulary import field_terms
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = 'treatment_outcome_stats'
+OUTCOME_CODES = [code for code, _ in PatientOutcome.OUTCOME_CHOICES]
+COUNT_FIELDS = [code.lower() for code in OUTCOME_CODES]
+DERIVED_FIELDS = ['total', 'success_rate', 'ci_low', 'ci_high']
+Z_95 = 1.96
+
+# (hcp_id, diagnosis, treatment, age_group)
+GroupKey = Tuple[int, str, str, str]
+
+
+def wilson_interval(successes: int, total: int, z: float = Z_95) -> Tuple[float, float]:
+    """Wilson score interval for a proportion, in percent; (0, 0) without observations"""
+    if not total:
+        return 0.0, 0.0
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin) * 100, min(1.0, center + margin) * 100
+
+
+def summarize(counts: Dict[str, int]) -> Dict:
+    """Total, success rate and confidence interval for per-code counts keyed like COUNT_FIELDS"""
+    total = sum(counts.get(field, 0) or 0 for field in COUNT_FIELDS)
+    successes = sum(counts.get(code.lower(), 0) or 0 for code in SUCCESS_OUTCOMES)
+    low, high = wilson_interval(successes, total)
+    return {
+        **{field: counts.get(field, 0) or 0 for field in COUNT_FIELDS},
+        'total': total,
+        'success_rate': round(successes / total * 100, 1) if total else 0.0,
+        'ci_low': round(low, 1),
+        'ci_high': round(high, 1),
+    }
+
+
+def _diagnosis(value: str) -> str:
+    terms = field_terms('primary_diagnosis', value)
+    return terms[0] if terms else ''
+
+
+def outcome_counts(outcomes) -> Dict[GroupKey, Counter]:
+    """Per-group outcome code counts of a PatientOutcome queryset, from one grouped query"""
+    rows = (
+        outcomes.values_list('patient__hcp_id', 'patient__primary_diagnosis', 'treatment', 'patient__age_group', 'outcome')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    counts: Dict[GroupKey, Counter] = {}
+    for hcp_id, diagnosis, treatment, age_group, outcome, count in rows:
+        key = (hcp_id, _diagnosis(diagnosis), (treatment or '').strip(), age_group or '')
+        counts.setdefault(key, Counter())[outcome.lower()] += count
+    return counts
+
+
+def apply_outcome_counts(counts: Dict[GroupKey, Counter]) -> int:
+    """Add per-group counts to the stat rows, creating missing groups; returns rows written"""
+    if not counts:
+        return 0
+    existing = {
+        (stat.hcp_id, stat.diagnosis, stat.treatment, stat.age_group): stat
+        for stat in TreatmentOutcomeStat.objects.filter(
+            hcp_id__in={key[0] for key in counts},
+            treatment__in={key[2] for key in counts},
+        )
+    }
+    created, updated = [], []
+    for key, delta in counts.items():
+        stat = existing.get(key)
+        if stat is None:
+            stat = TreatmentOutcomeStat(hcp_id=key[0], diagnosis=key[1], treatment=key[2], age_group=key[3])
+            created.append(stat)
+        else:
+            updated.append(stat)
+        merged = {field: getattr(stat, field) + delta.get(field, 0) for field in COUNT_FIELDS}
+        for field, value in summarize(merged).items():
+            setattr(stat, field, value)
+
+    TreatmentOutcomeStat.objects.bulk_create(created, batch_size=5000)
+    TreatmentOutcomeStat.objects.bulk_update(updated, COUNT_FIELDS + DERIVED_FIELDS, batch_size=5000)
+    return len(created) + len(updated)
+
+
+def _locked_watermark() -> AnalyticsWatermark:
+    AnalyticsWatermark.objects.get_or_create(name=WATERMARK)
+    return AnalyticsWatermark.objects.select_for_update().get(name=WATERMARK)
+
+
+def refresh_outcome_stats() -> int:
+    """Fold outcomes inserted since the last refresh into the stat rows; returns outcomes applied"""
+    with transaction.atomic():
+        mark = _locked_watermark()
+        pending = PatientOutcome.objects.filter(id__gt=mark.last_id)
+        upper = pending.aggregate(upper=Max('id'))['upper']
+        if upper is None:
+            return 0
+        batch = pending.filter(id__lte=upper)
+        applied = batch.count()
+        apply_outcome_counts(outcome_counts(batch))
+        mark.last_id = upper
+        mark.save(update_fields=['last_id', 'refreshed_at'])
+    return applied
+
+
+def rebuild_outcome_stats(hcp_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute stat rows from PatientOutcome (after edits, deletes or bulk loads),
+    only those of `hcp_ids` when given; a partial rebuild leaves the mark alone
+    """
+    with transaction.atomic():
+        mark = _locked_watermark()
+        stats = TreatmentOutcomeStat.objects.all()
+        outcomes = PatientOutcome.objects.all()
+        if hcp_ids is None:
+            mark.last_id = outcomes.aggregate(upper=Max('id'))['upper'] or 0
+        else:
+            stats = stats.filter(hcp_id__in=hcp_ids)
+            outcomes = outcomes.filter(patient__hcp_id__in=hcp_ids)
+        stats.delete()
+        apply_outcome_counts(outcome_counts(outcomes.filter(id__lte=mark.last_id)))
+        if hcp_ids is None:
+            mark.save(update_fields=['last_id', 'refreshed_at'])
+    return stats.count()
+
+
+def outcome_stats(hcp_id: Optional[int] = None, diagnosis: Optional[str] = None,
+                  treatment: Optional[str] = None, age_group: Optional[str] = None) -> Dict:
+    """Summed counts, success rate and interval over the stat rows matching the given dimensions"""
+    stats = TreatmentOutcomeStat.objects.all()
+    if hcp_id is not None:
+        stats = stats.filter(hcp_id=hcp_id)
+    if diagnosis is not None:
+        stats = stats.filter(diagnosis=_diagnosis(diagnosis))
+    if treatment is not None:
+        stats = stats.filter(treatment=treatment.strip())
+    if age_group is not None:
+        stats = stats.filter(age_group=age_group)
+    return summarize(stats.aggregate(**{field: Sum(field) for field in COUNT_FIELDS}))
+
+
+def group_outcome_stats(patient_ids: Iterable[int]) -> Dict:
+    """Same summary for an ad-hoc patient group (risk tiers, demographics) with one grouped query"""
+    rows = (
+        PatientOutcome.objects.filter(patient_id__in=list(patient_ids))
+        .values_list('outcome').annotate(count=Count('id')).order_by()
+    )
+    return summarize({outcome.lower(): count for outcome, count in rows})
@@ -0,0 +1,424 @@
+"""
+Patient Similarity Index
+Standardized per-patient feature vectors (demographics, utilization, labs,
+vitals, hashed diagnosis and treatment terms) searched with random-projection
+LSH: every table hashes a vector to the sign pattern of a few random
+projections, and a query re-ranks only the patients sharing its buckets by
+exact cosine similarity. The index lives in one .npz file, is refreshed
+incrementally from AnonymizedPatient.last_updated and is reloaded by web
+processes when the file changes
+"""
+import logging
+import os
+import threading
+import warnings
+import zlib
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .observations import parse_numeric
+from .risk_scoring import AGE_RISK
+from .vocabulary import field_terms, term_key
+
+logger = logging.getLogger(__name__)
+
+GENDERS = ['M', 'F', 'O', 'U']
+RACES = ['WHITE', 'BLACK', 'ASIAN', 'NATIVE', 'PACIFIC', 'OTHER', 'UNKNOWN']
+ETHNICITIES = ['HISPANIC', 'NON_HISPANIC', 'UNKNOWN']
+AGE_GROUPS = list(AGE_RISK)  # Youngest to oldest
+
+LAB_METRICS = [
+    'Hemoglobin A1c', 'Glucose', 'Total Cholesterol', 'LDL Cholesterol', 'HDL Cholesterol',
+    'Triglycerides', 'Creatinine', 'eGFR', 'TSH',
+]
+VITAL_METRICS = [
+    'Blood Pressure Systolic', 'Blood Pressure Diastolic', 'Heart Rate', 'Respiratory Rate',
+    'Oxygen Saturation', 'Temperature',
+]
+UTILIZATION_FIELDS = ['emergency_visits_6m', 'hospitalizations_6m', 'risk_score']
+
+# Standardized with the mean/std of the last full build; missing values become the mean
+NUMERIC_FEATURES = ['age'] + UTILIZATION_FIELDS + LAB_METRICS + VITAL_METRICS
+Z_CLIP = 5.0
+
+TERM_BUCKETS = 64  # Hashed columns each for diagnoses and treatments
+# patient field -> (block, weight within the block)
+TERM_SOURCES = {
+    'primary_diagnosis': ('diagnoses', 1.0),
+    'secondary_diagnoses': ('diagnoses', 0.5),
+    'comorbidities': ('diagnoses', 0.5),
+    'current_treatments': ('treatments', 1.0),
+    'treatment_history': ('treatments', 0.5),
+}
+
+# Relative influence of each block on the cosine similarity
+BLOCK_WEIGHTS = {
+    'demographics': 1.0,
+    'utilization': 1.0,
+    'labs': 1.0,
+    'vitals': 1.0,
+    'diagnoses': 1.5,
+    'treatments': 1.0,
+}
+
+FEATURE_FIELDS = [
+    'id', 'age_group', 'gender', 'race', 'ethnicity', *UTILIZATION_FIELDS, 'last_lab_values', 'vital_signs',
+    *TERM_SOURCES,
+]
+
+TABLES = 32
+BUCKET_TARGET = 512  # Patients per bucket the bit count aims for
+MAX_BITS = 30  # Codes are int32
+EXACT_LIMIT = 5000  # Below this many patients one matrix product beats bucket lookups
+CANDIDATE_FACTOR = 10  # Probe neighbouring buckets until k * this many candidates
+DEFAULT_K = 10
+SEED = 20240601
+ENCODE_BATCH_SIZE = 5000
+HASH_BATCH_SIZE = 50000
+LOOKUP_BATCH_SIZE = 500
+
+
+def index_path() -> Path:
+    return Path(getattr(settings, 'PATIENT_SIMILARITY_INDEX', settings.BASE_DIR / 'patient_similarity.npz'))
+
+
+def _term_column(term: str) -> int:
+    # crc32 rather than hash(): string hashes are salted per process
+    return zlib.crc32(term_key(term).encode('utf-8')) % TERM_BUCKETS
+
+
+def _one_hot(values: Sequence[str], choices: List[str]) -> np.ndarray:
+    lookup = {choice: i for i, choice in enumerate(choices)}
+    out = np.zeros((len(values), len(choices)), dtype=np.float32)
+    columns = np.fromiter((lookup.get(value, -1) for value in values), dtype=np.int64, count=len(values))
+    known = columns >= 0
+    out[np.flatnonzero(known), columns[known]] = 1.0
+    return out
+
+
+def numeric_features(rows: Sequence[Dict]) -> np.ndarray:
+    """Raw NUMERIC_FEATURES columns, NaN where a value is missing or unparseable"""
+    ages = {group: i / (len(AGE_GROUPS) - 1) for i, group in enumerate(AGE_GROUPS)}
+    out = np.full((len(rows), len(NUMERIC_FEATURES)), np.nan)
+    for i, row in enumerate(rows):
+        labs = row['last_lab_values'] if isinstance(row['last_lab_values'], dict) else {}
+        vitals = row['vital_signs'] if isinstance(row['vital_signs'], dict) else {}
+        out[i] = [
+            ages.get(row['age_group'], np.nan),
+            *(row[field] for field in UTILIZATION_FIELDS),
+            *(parse_numeric(labs.get(metric)) for metric in LAB_METRICS),
+            *(parse_numeric(vitals.get(metric)) for metric in VITAL_METRICS),
+        ]
+    return np.asarray(out, dtype=float)
+
+
+def feature_stats(numeric: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Column mean and standard deviation ignoring missing values (0 and 1 for empty columns)"""
+    with warnings.catch_warnings():
+        # All-NaN columns (metrics nobody recorded) are expected
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.nanmean(numeric, axis=0)
+        std = np.nanstd(numeric, axis=0)
+    mean = np.nan_to_num(mean, nan=0.0)
+    std = np.nan_to_num(std, nan=1.0)
+    std[std == 0] = 1.0
+    return mean, std
+
+
+def encode(rows: Sequence[Dict], mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+    """Unit-length float32 feature vectors for FEATURE_FIELDS rows"""
+    n = len(rows)
+    z = np.clip((numeric_features(rows) - mean) / std, -Z_CLIP, Z_CLIP)
+    z = np.nan_to_num(z, nan=0.0).astype(np.float32)
+    lab_start = 1 + len(UTILIZATION_FIELDS)
+    vital_start = lab_start + len(LAB_METRICS)
+
+    blocks = {
+        # Each one-hot counts as one unit, like a standardized column
+        'demographics': (np.hstack([
+            z[:, :1],
+            _one_hot([row['gender'] for row in rows], GENDERS),
+            _one_hot([row['race'] for row in rows], RACES),
+            _one_hot([row['ethnicity'] for row in rows], ETHNICITIES),
+        ]), 4),
+        'utilization': (z[:, 1:lab_start], len(UTILIZATION_FIELDS)),
+        'labs': (z[:, lab_start:vital_start], len(LAB_METRICS)),
+        'vitals': (z[:, vital_start:], len(VITAL_METRICS)),
+    }
+
+    terms = {'diagnoses': np.zeros((n, TERM_BUCKETS), dtype=np.float32),
+             'treatments': np.zeros((n, TERM_BUCKETS), dtype=np.float32)}
+    for i, row in enumerate(rows):
+        for field, (block, weight) in TERM_SOURCES.items():
+            for term in field_terms(field, row[field]):
+                terms[block][i, _term_column(term)] += weight
+    for block, matrix in terms.items():
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        blocks[block] = (np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0), 1)
+
+    vectors = np.hstack([
+        blocks[name][0] * (weight / np.sqrt(blocks[name][1])) for name, weight in BLOCK_WEIGHTS.items()
+    ]).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def patient_row(patient) -> Dict:
+    """FEATURE_FIELDS of a model instance, for encoding a patient without a query"""
+    return {field: getattr(patient, field) for field in FEATURE_FIELDS}
+
+
+class SimilarityIndex:
+    """Feature vectors for a set of patient ids plus TABLES random-projection hash tables"""
+
+    def __init__(self, ids: np.ndarray, vectors: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                 planes: np.ndarray, center: np.ndarray, built_through: Optional[date] = None,
+                 codes: Optional[np.ndarray] = None, order: Optional[np.ndarray] = None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.mean = mean
+        self.std = std
+        self.planes = planes  # (TABLES, bits, dimensions)
+        self.center = center
+        self.built_through = built_through
+        self.codes = self._codes(self.vectors) if codes is None else codes
+        self._sort(order)
+
+    @classmethod
+    def create(cls, ids: np.ndarray, vectors: np.ndarray, mean: np.ndarray, std: np.ndarray,
+               built_through: Optional[date] = None, seed: int = SEED) -> 'SimilarityIndex':
+        """New index with a bit count sized so buckets hold about BUCKET_TARGET patients"""
+        bits = int(np.clip(round(np.log2(max(len(ids), 1) / BUCKET_TARGET)), 1, MAX_BITS))
+        rng = np.random.default_rng(seed)
+        planes = rng.standard_normal((TABLES, bits, vectors.shape[1])).astype(np.float32)
+        # Feature vectors mostly share one orthant; hyperplanes through their centroid split them evenly
+        center = vectors.mean(axis=0) if len(vectors) else np.zeros(vectors.shape[1], dtype=np.float32)
+        return cls(ids, vectors, mean, std, planes, center.astype(np.float32), built_through)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, TABLES) bucket codes: bit b of table t is the sign of the b-th projection"""
+        tables, bits, dimensions = self.planes.shape
+        flat = self.planes.reshape(tables * bits, dimensions).T
+        weights = np.int32(1) << np.arange(bits, dtype=np.int32)
+        codes = np.empty((len(vectors), tables), dtype=np.int32)
+        # One BLAS product per chunk, bounding the (rows, tables * bits) projection matrix
+        for start in range(0, len(vectors), HASH_BATCH_SIZE):
+            signs = ((vectors[start:start + HASH_BATCH_SIZE] - self.center) @ flat) > 0
+            codes[start:start + HASH_BATCH_SIZE] = signs.reshape(-1, tables, bits) @ weights
+        return codes
+
+    def _sort(self, order: Optional[np.ndarray] = None):
+        # Per table, positions sorted by code so a bucket is one searchsorted range
+        self.order = np.argsort(self.codes, axis=0, kind='stable').astype(np.int32) if order is None else order
+        self.sorted_codes = np.take_along_axis(self.codes, self.order, axis=0)
+
+    def _bucket(self, table: int, code: int) -> np.ndarray:
+        column = self.sorted_codes[:, table]
+        # Needles of the column's dtype, or NumPy casts the whole column on every call
+        start, end = np.searchsorted(column, np.array([code, code + 1], dtype=column.dtype))
+        return self.order[start:end, table]
+
+    def candidates(self, vector: np.ndarray, wanted: int) -> np.ndarray:
+        """Positions sharing a bucket with `vector`, widened to Hamming-distance-1 buckets if too few"""
+        codes = self._codes(vector[None, :])[0]
+        seen = np.zeros(len(self.ids), dtype=bool)
+        for table, code in enumerate(codes.tolist()):
+            seen[self._bucket(table, code)] = True
+        if np.count_nonzero(seen) < wanted:
+            for table, code in enumerate(codes.tolist()):
+                for bit in range(self.planes.shape[1]):
+                    seen[self._bucket(table, code ^ (1 << bit))] = True
+        return np.flatnonzero(seen)
+
+    def query(self, vector: np.ndarray, k: int = DEFAULT_K,
+              exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top-k (patient id, cosine similarity), most similar first"""
+        if not len(self.ids):
+            return []
+        exclude = {int(patient_id) for patient_id in exclude}
+        wanted = k + len(exclude)
+        if len(self.ids) <= EXACT_LIMIT:
+            positions = np.arange(len(self.ids))
+        else:
+            positions = self.candidates(vector, wanted * CANDIDATE_FACTOR)
+            if len(positions) < wanted:
+                positions = np.arange(len(self.ids))
+
+        scores = self.vectors[positions] @ vector
+        if len(positions) > wanted:
+            top = np.argpartition(-scores, wanted - 1)[:wanted]
+        else:
+            top = np.arange(len(positions))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        results = [
+            (int(self.ids[positions[i]]), float(scores[i])) for i in top
+            if int(self.ids[positions[i]]) not in exclude
+        ]
+        return results[:k]
+
+    def update(self, ids: np.ndarray, vectors: np.ndarray, removed: Iterable[int] = ()):
+        """
+        Drop `removed`, replace the vectors of known ids and append the rest,
+        hashing only the given rows and re-sorting the tables once
+        """
+        removed = np.fromiter(removed, dtype=np.int64)
+        if len(removed):
+            keep = ~np.isin(self.ids, removed)
+            self.ids, self.vectors, self.codes = self.ids[keep], self.vectors[keep], self.codes[keep]
+
+        ids = np.asarray(ids, dtype=np.int64)
+        position = {patient_id: i for i, patient_id in enumerate(self.ids.tolist())}
+        known = np.array([patient_id in position for patient_id in ids.tolist()], dtype=bool)
+        codes = self._codes(vectors)
+        if known.any():
+            positions = np.array([position[patient_id] for patient_id in ids[known].tolist()])
+            self.vectors[positions] = vectors[known]
+            self.codes[positions] = codes[known]
+        self.ids = np.concatenate([self.ids, ids[~known]])
+        self.vectors = np.vstack([self.vectors, vectors[~known]]).astype(np.float32)
+        self.codes = np.vstack([self.codes, codes[~known]])
+        self._sort()
+
+    def save(self, path: Path):
+        """Write to a temporary file and rename, so readers never see a partial index"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + '.tmp')
+        with open(temporary, 'wb') as handle:
+            np.savez(
+                handle, ids=self.ids, vectors=self.vectors, mean=self.mean, std=self.std, planes=self.planes,
+                center=self.center, codes=self.codes, order=self.order,
+                built_through=np.array(self.built_through.toordinal() if self.built_through else 0),
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'SimilarityIndex':
+        """Read a saved index; the hash tables are stored, so nothing is re-hashed"""
+        with np.load(path) as data:
+            ordinal = int(data['built_through'])
+            return cls(
+                data['ids'], data['vectors'], data['mean'], data['std'], data['planes'], data['center'],
+                date.fromordinal(ordinal) if ordinal else None, data['codes'], data['order'],
+            )
+
+
+def _batches(rows, batch_size: int):
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            return
+        yield batch
+
+
+def _encode_queryset(queryset, mean: np.ndarray, std: np.ndarray,
+                     batch_size: int = ENCODE_BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    rows = queryset.order_by('id').values(*FEATURE_FIELDS).iterator(chunk_size=batch_size)
+    ids, vectors = [np.zeros(0, dtype=np.int64)], [encode([], mean, std)]
+    for batch in _batches(rows, batch_size):
+        ids.append(np.fromiter((row['id'] for row in batch), dtype=np.int64, count=len(batch)))
+        vectors.append(encode(batch, mean, std))
+    return np.concatenate(ids), np.vstack(vectors)
+
+
+def build_index(queryset=None, batch_size: int = ENCODE_BATCH_SIZE) -> SimilarityIndex:
+    """Full build: standardization statistics from every patient, then all vectors and tables"""
+    from django.db.models import Max
+    from .models import AnonymizedPatient
+
+    queryset = queryset if queryset is not None else AnonymizedPatient.objects.all()
+    numeric_rows = queryset.order_by('id').values('age_group', *UTILIZATION_FIELDS, 'last_lab_values', 'vital_signs')
+    numeric = [numeric_features(batch) for batch in _batches(numeric_rows.iterator(chunk_size=batch_size), batch_size)]
+    mean, std = feature_stats(np.vstack(numeric) if numeric else np.zeros((0, len(NUMERIC_FEATURES))))
+    ids, vectors = _encode_queryset(queryset, mean, std, batch_size)
+    built_through = queryset.aggregate(latest=Max('last_updated'))['latest']
+    return SimilarityIndex.create(ids, vectors, mean, std, built_through)
+
+
+def refresh_index(index: SimilarityIndex, queryset=None, batch_size: int = ENCODE_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Re-encode patients updated since the index was built, add new ones and drop
+    deleted ones, keeping the standardization statistics of the last full build.
+    last_updated is a date, so the watermark day itself is always re-read.
+    """
+    from django.db.models import Max
+    from .models import AnonymizedPatient
+
+    queryset = queryset if queryset is not None else AnonymizedPatient.objects.all()
+    current = np.fromiter(queryset.values_list('id', flat=True).iterator(chunk_size=50000), dtype=np.int64)
+    removed = np.setdiff1d(index.ids, current)
+    added = np.setdiff1d(current, index.ids)
+
+    changed = queryset if index.built_through is None else queryset.filter(last_updated__gte=index.built_through)
+    ids, vectors = _encode_queryset(changed, index.mean, index.std, batch_size)
+    # New patients whose last_updated predates the watermark (e.g. raw imports)
+    missing = np.setdiff1d(added, ids).tolist()
+    for start in range(0, len(missing), LOOKUP_BATCH_SIZE):
+        chunk = queryset.filter(id__in=missing[start:start + LOOKUP_BATCH_SIZE])
+        extra_ids, extra_vectors = _encode_queryset(chunk, index.mean, index.std, batch_size)
+        ids, vectors = np.concatenate([ids, extra_ids]), np.vstack([vectors, extra_vectors])
+
+    if len(ids) or len(removed):
+        index.update(ids, vectors, removed.tolist())
+    index.built_through = queryset.aggregate(latest=Max('last_updated'))['latest'] or index.built_through
+    return {'updated': len(ids), 'removed': len(removed), 'total': len(index)}
+
+
+_loaded = {'index': None, 'mtime': None}
+_load_lock = threading.Lock()
+
+
+def get_index() -> Optional[SimilarityIndex]:
+    """The persisted index, reloaded when the file changes; None if it has not been built"""
+    path = index_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _loaded['mtime'] != mtime:
+        with _load_lock:
+            if _loaded['mtime'] != mtime:
+                _loaded['index'] = SimilarityIndex.load(path)
+                _loaded['mtime'] = mtime
+    return _loaded['index']
+
+
+def similar_patients(patient, k: int = DEFAULT_K) -> List[Tuple[int, float]]:
+    """Top-k (patient id, similarity) for a patient instance, excluding the patient itself"""
+    index = get_index()
+    if index is None:
+        logger.info("Patient similarity index not built yet; run build_similarity_index")
+        return []
+    # Encoded from the instance so edits since the last refresh are reflected
+    vector = encode([patient_row(patient)], index.mean, index.std)[0]
+    return index.query(vector, k, exclude=[patient.pk])
+
+
+def similar_patient_summaries(patient, k: int = DEFAULT_K, outcomes_per_patient: int = 3) -> List[Dict]:
+    """Similar patients with their similarity (%) and most recent outcomes, in two queries"""
+    from .models import AnonymizedPatient, PatientOutcome
+
+    matches = similar_patients(patient, k)
+    if not matches:
+        return []
+    ids = [patient_id for patient_id, _ in matches]
+    patients = AnonymizedPatient.objects.only(
+        'id', 'patient_id', 'hcp_id', 'age_group', 'gender', 'primary_diagnosis', 'risk_score',
+    ).in_bulk(ids)
+
+    outcomes = {patient_id: [] for patient_id in ids}
+    for outcome in PatientOutcome.objects.filter(patient_id__in=ids).order_by('patient_id', '-outcome_date'):
+        if len(outcomes[outcome.patient_id]) < outcomes_per_patient:
+            outcomes[outcome.patient_id].append(outcome)
+
+    return [
+        {'patient': patients[patient_id], 'similarity': round(similarity * 100, 1), 'outcomes': outcomes[patient_id]}
+        for patient_id, similarity in matches if patient_id in patients
+    ]
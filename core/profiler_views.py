@@ -0,0 +1,38 @@
+"""
+Query Profiler Views
+Staff-only access to the per-request query profiler ring buffer
+"""
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_http_methods
+from .query_profiler import profile_buffer, summarize_profiles, get_profiler_settings
+
+
+@require_http_methods(["GET", "DELETE"])
+@login_required
+def query_profiles(request):
+    """Return sampled request profiles and per-view N+1 summaries (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    if request.method == 'DELETE':
+        profile_buffer.clear()
+        return JsonResponse({'status': 'success', 'cleared': True})
+
+    profiles = profile_buffer.snapshot()
+    view_filter = request.GET.get('view', '')
+    if view_filter:
+        profiles = [p for p in profiles if view_filter in (p['view'] or p['path'])]
+
+    try:
+        limit = int(request.GET.get('limit', 50))
+    except ValueError:
+        limit = 50
+
+    return JsonResponse({
+        'enabled': get_profiler_settings()['ENABLED'],
+        'total_samples': len(profiles),
+        'summary': summarize_profiles(profiles),
+        'recent': list(reversed(profiles))[:limit],
+        'status': 'success'
+    })
@@ -0,0 +1,207 @@
+"""
+Per-Request Query Profiler
+Opt-in middleware that records query counts, SQL time, duplicate-query
+fingerprints (N+1 detection) and view wall time into an in-process ring buffer
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque, defaultdict
+from contextlib import ExitStack
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILER_SETTINGS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 1.0,
+    'BUFFER_SIZE': 200,
+    'DUPLICATE_THRESHOLD': 5,
+}
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def get_profiler_settings() -> Dict:
+    """Return the QUERY_PROFILER settings merged over the defaults"""
+    merged = dict(DEFAULT_PROFILER_SETTINGS)
+    merged.update(getattr(settings, 'QUERY_PROFILER', {}))
+    return merged
+
+
+def fingerprint_sql(sql: str) -> str:
+    """Normalize a SQL statement so repeated per-row queries collapse to one key"""
+    normalized = _STRING_LITERAL_RE.sub('?', sql)
+    normalized = _NUMBER_LITERAL_RE.sub('?', normalized)
+    normalized = normalized.replace('%s', '?')
+    normalized = _IN_LIST_RE.sub('IN (...)', normalized)
+    return _WHITESPACE_RE.sub(' ', normalized).strip()
+
+
+class ProfileBuffer:
+    """Thread-safe fixed-size ring buffer of request profiles"""
+
+    def __init__(self, maxlen: int = 200):
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=maxlen)
+
+    def resize(self, maxlen: int):
+        with self._lock:
+            if self._profiles.maxlen != maxlen:
+                self._profiles = deque(self._profiles, maxlen=maxlen)
+
+    def append(self, profile: Dict):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return list(self._profiles)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profile_buffer = ProfileBuffer(DEFAULT_PROFILER_SETTINGS['BUFFER_SIZE'])
+
+
+class QueryRecorder:
+    """Database execute wrapper that times and fingerprints every query"""
+
+    def __init__(self):
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.fingerprint_counts = defaultdict(int)
+        self.fingerprint_times = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            fingerprint = fingerprint_sql(sql)
+            self.query_count += 1
+            self.sql_time += elapsed
+            self.fingerprint_counts[fingerprint] += 1
+            self.fingerprint_times[fingerprint] += elapsed
+
+    def duplicate_queries(self, threshold: int) -> List[Dict]:
+        """Fingerprints executed at least `threshold` times, worst first"""
+        duplicates = [
+            {
+                'fingerprint': fingerprint,
+                'count': count,
+                'total_ms': round(self.fingerprint_times[fingerprint] * 1000, 2),
+            }
+            for fingerprint, count in self.fingerprint_counts.items()
+            if count >= threshold
+        ]
+        duplicates.sort(key=lambda d: (d['count'], d['total_ms']), reverse=True)
+        return duplicates
+
+
+class QueryProfilerMiddleware:
+    """Sample requests and record their database behaviour in the ring buffer"""
+
+    def __init__(self, get_response):
+        options = get_profiler_settings()
+        if not options['ENABLED']:
+            raise MiddlewareNotUsed('Query profiler disabled')
+
+        self.get_response = get_response
+        self.sample_rate = options['SAMPLE_RATE']
+        self.duplicate_threshold = options['DUPLICATE_THRESHOLD']
+        profile_buffer.resize(options['BUFFER_SIZE'])
+
+    def __call__(self, request):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall_time = time.perf_counter() - start
+
+        profile = self._build_profile(request, response, recorder, wall_time)
+        profile_buffer.append(profile)
+
+        if profile['duplicate_queries']:
+            worst = profile['duplicate_queries'][0]
+            logger.warning(
+                f"Possible N+1 in {profile['view'] or profile['path']}: "
+                f"{worst['count']}x {worst['fingerprint'][:120]}"
+            )
+
+        response['Server-Timing'] = (
+            f'db;dur={profile["sql_ms"]};desc="{profile["query_count"]} queries", '
+            f'total;dur={profile["wall_ms"]}'
+        )
+        return response
+
+    def _build_profile(self, request, response, recorder, wall_time):
+        resolver_match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'view': resolver_match.view_name if resolver_match else '',
+            'status': response.status_code,
+            'user': user.get_username() if user is not None and user.is_authenticated else '',
+            'wall_ms': round(wall_time * 1000, 2),
+            'sql_ms': round(recorder.sql_time * 1000, 2),
+            'query_count': recorder.query_count,
+            'duplicate_queries': recorder.duplicate_queries(self.duplicate_threshold),
+        }
+
+
+def summarize_profiles(profiles: List[Dict]) -> List[Dict]:
+    """Aggregate recorded profiles per view, slowest first"""
+    grouped = defaultdict(list)
+    for profile in profiles:
+        grouped[profile['view'] or profile['path']].append(profile)
+
+    summary = []
+    for view, samples in grouped.items():
+        wall_times = sorted(p['wall_ms'] for p in samples)
+        p95_index = min(len(wall_times) - 1, int(round(0.95 * (len(wall_times) - 1))))
+
+        duplicates = defaultdict(int)
+        for sample in samples:
+            for duplicate in sample['duplicate_queries']:
+                duplicates[duplicate['fingerprint']] = max(
+                    duplicates[duplicate['fingerprint']], duplicate['count']
+                )
+        worst_duplicates = sorted(duplicates.items(), key=lambda item: item[1], reverse=True)[:5]
+
+        summary.append({
+            'view': view,
+            'samples': len(samples),
+            'avg_queries': round(sum(p['query_count'] for p in samples) / len(samples), 1),
+            'max_queries': max(p['query_count'] for p in samples),
+            'avg_sql_ms': round(sum(p['sql_ms'] for p in samples) / len(samples), 2),
+            'avg_wall_ms': round(sum(wall_times) / len(wall_times), 2),
+            'p95_wall_ms': wall_times[p95_index],
+            'duplicate_queries': [
+                {'fingerprint': fingerprint, 'max_count': count}
+                for fingerprint, count in worst_duplicates
+            ],
+        })
+
+    summary.sort(key=lambda s: s['avg_wall_ms'], reverse=True)
+    return summary
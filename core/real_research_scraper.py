@@ -5,20 +5,32 @@ Uses reliable RSS feeds and web scraping methods
 import requests
 from datetime import datetime, timedelta
 import re
-from bs4 import BeautifulSoup
 import time
 import logging
 from typing import List, Dict, Optional
 from .models import ResearchUpdate, HCP, ScrapedResearch
+from .text_classifier import PhraseMatcher
 from django.conf import settings
 import json
 import xml.etree.ElementTree as ET
-import feedparser
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CONDITION_TERMS = [
+    'diabetes', 'hypertension', 'cancer', 'stroke', 'alzheimer',
+    'parkinson', 'heart disease', 'coronary', 'asthma', 'copd'
+]
+
+TREATMENT_TERMS = [
+    'insulin', 'chemotherapy', 'statin', 'surgery', 'radiation',
+    'immunotherapy', 'vaccination', 'medication', 'therapy'
+]
+
+# Conditions and treatments are found together in one pass over the article text
+ARTICLE_TERMS = PhraseMatcher(CONDITION_TERMS + TREATMENT_TERMS)
+
 class RealMedicalResearchScraper:
     """Scrapes real medical research from verified sources"""
     
@@ -82,6 +94,7 @@ class RealMedicalResearchScraper:
 
     def scrape_medical_news_today(self, specialty: str, max_results: int = 5) -> List[Dict]:
         """Scrape from Medical News Today using web scraping"""
+        from bs4 import BeautifulSoup  # Parser only needed when a scrape runs
         try:
             logger.info(f"Scraping Medical News Today for {specialty}...")
             
@@ -152,6 +165,7 @@ class RealMedicalResearchScraper:
 
     def scrape_pubmed_rss(self, specialty: str, max_results: int = 5) -> List[Dict]:
         """Scrape from PubMed using RSS feeds"""
+        from bs4 import BeautifulSoup
         try:
             logger.info(f"Scraping PubMed RSS for {specialty}...")
             
@@ -253,6 +267,9 @@ class RealMedicalResearchScraper:
                 scraped_count = 0
                 for article_data in articles:
                     try:
+                        text = article_data['title'] + " " + article_data['abstract']
+                        found = ARTICLE_TERMS.present(text)
+                        
                         # Create ScrapedResearch
                         scraped_research, created = ScrapedResearch.objects.get_or_create(
                             title=article_data['title'],
@@ -264,9 +281,9 @@ class RealMedicalResearchScraper:
                                 'publication_date': article_data['publication_date'],
                                 'specialties': [article_data['specialty']],
                                 'relevance_score': article_data['relevance_score'],
-                                'keywords': self._extract_keywords(article_data['title'] + " " + article_data['abstract']),
-                                'conditions_mentioned': self._extract_conditions(article_data['title'] + " " + article_data['abstract']),
-                                'treatments_mentioned': self._extract_treatments(article_data['title'] + " " + article_data['abstract']),
+                                'keywords': self._extract_keywords(text),
+                                'conditions_mentioned': self._extract_conditions(text, found),
+                                'treatments_mentioned': self._extract_treatments(text, found),
                                 'source_database': article_data['source']
                             }
                         )
@@ -292,30 +309,12 @@ class RealMedicalResearchScraper:
         keywords = [word for word in words if word not in common_words and len(word) > 3]
         return list(set(keywords))[:10]  # Limit to 10 keywords
 
-    def _extract_conditions(self, text: str) -> List[str]:
-        """Extract medical conditions from text"""
-        conditions = []
-        condition_patterns = [
-            r'diabetes', r'hypertension', r'cancer', r'stroke', r'alzheimer', 
-            r'parkinson', r'heart disease', r'coronary', r'asthma', r'copd'
-        ]
-        
-        for pattern in condition_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                conditions.append(pattern.replace('r\'', '').replace('\'', '').title())
-        
-        return list(set(conditions))
+    def _extract_conditions(self, text: str, found: Optional[set] = None) -> List[str]:
+        """Extract medical conditions from text (or from terms already matched in it)"""
+        found = ARTICLE_TERMS.present(text) if found is None else found
+        return list({term.title() for term in CONDITION_TERMS if term in found})
 
-    def _extract_treatments(self, text: str) -> List[str]:
-        """Extract treatments from text"""
-        treatments = []
-        treatment_patterns = [
-            r'insulin', r'chemotherapy', r'statin', r'surgery', r'radiation',
-            r'immunotherapy', r'vaccination', r'medication', r'therapy'
-        ]
-        
-        for pattern in treatment_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                treatments.append(pattern.replace('r\'', '').replace('\'', '').title())
-        
-        return list(set(treatments))
\ No newline at end of file
+    def _extract_treatments(self, text: str, found: Optional[set] = None) -> List[str]:
+        """Extract treatments from text (or from terms already matched in it)"""
+        found = ARTICLE_TERMS.present(text) if found is None else found
+        return list({term.title() for term in TREATMENT_TERMS if term in found})
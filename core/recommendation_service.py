@@ -0,0 +1,377 @@
+"""
+Recommendation Service
+Builds intelligent recommendations from HCP term rollups and the research catalog,
+one HCP at a time for the AJAX flow or for every HCP in one batched pass
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .research_catalog import rank_research
+
+logger = logging.getLogger(__name__)
+
+TOP_DIAGNOSES = 10
+TOP_RISK_FACTORS = 5
+MAX_RESEARCH = 5
+
+# PatientIssueAnalysis fields produced by summarize_issues
+ANALYSIS_FIELDS = ['total_patients_analyzed', 'common_issues', 'top_diagnoses',
+                   'treatment_gaps', 'risk_factors', 'analysis_summary']
+
+
+def _percentage(count: int, total: int) -> float:
+    return round((count / total) * 100, 1)
+
+
+def summarize_issues(hcp_name: str, total_patients: int, diagnoses: List, risk_factors: List,
+                     treatments: Iterable[str]) -> Dict:
+    """
+    PatientIssueAnalysis field values from top (term, count) lists. Kept free of
+    ORM access so batch workers can run it.
+    """
+    treatments = [t.lower() for t in treatments]
+
+    # Identify treatment gaps (common diagnoses without corresponding treatments)
+    treatment_gaps = []
+    for name, frequency in diagnoses[:5]:
+        if not any(name.lower() in treatment for treatment in treatments):
+            treatment_gaps.append({
+                'diagnosis': name,
+                'frequency': frequency,
+                'percentage': _percentage(frequency, total_patients)
+            })
+
+    analysis_summary = f"""
+    Analysis of {total_patients} patients under {hcp_name}'s care:
+
+    Top Diagnoses:
+    {', '.join([f"{d[0]} ({d[1]} patients)" for d in diagnoses[:3]])}
+
+    Treatment Gaps Identified:
+    {', '.join([f"{gap['diagnosis']} ({gap['percentage']}% of patients)" for gap in treatment_gaps[:3]])}
+
+    Common Risk Factors:
+    {', '.join([f"{r[0]} ({r[1]} patients)" for r in risk_factors[:3]])}
+    """
+
+    return {
+        'total_patients_analyzed': total_patients,
+        'common_issues': [
+            {'issue': name, 'frequency': count, 'percentage': _percentage(count, total_patients)}
+            for name, count in diagnoses[:10]
+        ],
+        'top_diagnoses': [
+            {'diagnosis': name, 'frequency': count, 'percentage': _percentage(count, total_patients)}
+            for name, count in diagnoses[:5]
+        ],
+        'treatment_gaps': treatment_gaps,
+        'risk_factors': [
+            {'risk_factor': name, 'frequency': count, 'percentage': _percentage(count, total_patients)}
+            for name, count in risk_factors[:5]
+        ],
+        'analysis_summary': analysis_summary.strip(),
+    }
+
+
+def research_keywords(analysis: Dict) -> List[str]:
+    """Search keywords: the top 5 issues followed by the top 3 treatment gaps"""
+    keywords = [issue['issue'] for issue in analysis['common_issues'][:5]]
+    keywords += [gap['diagnosis'] for gap in analysis['treatment_gaps'][:3]]
+    return keywords
+
+
+def recommendation_fields(analysis: Dict, research: List[Dict], cluster: Optional[Dict]) -> Optional[Dict]:
+    """
+    IntelligentRecommendation field values (without foreign keys), or None when
+    the analysis found no treatment gap to recommend on. `research` items need
+    title/relevance_score/abstract; `cluster` needs id/success_rate/patient_count.
+    """
+    if not analysis['treatment_gaps']:
+        return None
+
+    top_gap = analysis['treatment_gaps'][0]
+    recommendation_title = f"Treatment Optimization for {top_gap['diagnosis']}"
+
+    recommendation_summary = f"""
+    Based on analysis of {analysis['total_patients_analyzed']} patients, {top_gap['percentage']}%
+    have {top_gap['diagnosis']} but may not be receiving optimal treatment. Recent research
+    suggests new approaches that could improve patient outcomes.
+    """
+
+    # Combine evidence
+    evidence_summary = f"""
+    Patient Data Evidence:
+    - {top_gap['frequency']} patients ({top_gap['percentage']}%) diagnosed with {top_gap['diagnosis']}
+    - Common risk factors: {', '.join([rf['risk_factor'] for rf in analysis['risk_factors'][:3]])}
+
+    Research Evidence:
+    {chr(10).join([f"- {item['title']} (Relevance: {item['relevance_score']:.2f})" for item in research[:3]])}
+
+    Cluster Analysis:
+    - Similar patients in cluster show {cluster['success_rate'] if cluster else 'N/A'}% treatment success rate
+    """
+
+    return {
+        'recommendation_title': recommendation_title,
+        'recommendation_summary': recommendation_summary.strip(),
+        'evidence_summary': evidence_summary.strip(),
+        'patient_data_evidence': {
+            'total_patients': analysis['total_patients_analyzed'],
+            'top_issues': analysis['common_issues'][:5],
+            'treatment_gaps': analysis['treatment_gaps'][:3],
+            'risk_factors': analysis['risk_factors'][:5]
+        },
+        'research_evidence': [
+            {
+                'title': item['title'],
+                'relevance_score': item['relevance_score'],
+                'abstract': item['abstract'][:200] + '...' if len(item['abstract']) > 200 else item['abstract']
+            }
+            for item in research[:3]
+        ],
+        'cluster_evidence': {
+            'cluster_id': cluster['id'] if cluster else None,
+            'success_rate': cluster['success_rate'] if cluster else None,
+            'patient_count': cluster['patient_count'] if cluster else None
+        },
+        'priority': 'HIGH' if top_gap['percentage'] > 30 else 'MEDIUM',
+    }
+
+
+def cluster_summary(cluster) -> Optional[Dict]:
+    if cluster is None:
+        return None
+    return {'id': cluster.id, 'success_rate': cluster.success_rate_percentage, 'patient_count': cluster.patient_count}
+
+
+def load_hcp_profiles(hcp_ids: List[int]) -> List[Dict]:
+    """
+    Everything plan_recommendation needs for a set of HCPs, loaded with a fixed
+    number of grouped queries regardless of how many HCPs there are
+    """
+    from django.db.models import Count, Min
+    from .models import HCP, AnonymizedPatient, HCPTermRollup, PatientCluster
+    from .research_index import research_candidates_bulk
+
+    totals = dict(
+        AnonymizedPatient.objects.filter(hcp_id__in=hcp_ids)
+        .values_list('hcp_id').annotate(count=Count('id')).order_by()
+    )
+
+    terms = {hcp_id: {'DIAGNOSIS': [], 'RISK_FACTOR': [], 'TREATMENT': []} for hcp_id in hcp_ids}
+    rollups = (
+        HCPTermRollup.objects.filter(hcp_id__in=hcp_ids, kind__in=['DIAGNOSIS', 'RISK_FACTOR', 'TREATMENT'],
+                                     count__gt=0)
+        .order_by('hcp_id', 'kind', '-count', 'term')
+        .values_list('hcp_id', 'kind', 'term', 'count')
+    )
+    for hcp_id, kind, term, count in rollups.iterator(chunk_size=10000):
+        terms[hcp_id][kind].append((term, count))
+
+    # Same cluster generate_intelligent_recommendation picks: the HCP's first by id
+    first_clusters = (
+        PatientCluster.objects.filter(hcp_id__in=hcp_ids)
+        .values_list('hcp_id').annotate(first_id=Min('id')).order_by()
+    )
+    clusters = PatientCluster.objects.in_bulk([first_id for _, first_id in first_clusters])
+    cluster_by_hcp = {cluster.hcp_id: cluster_summary(cluster) for cluster in clusters.values()}
+
+    hcps = list(HCP.objects.filter(id__in=hcp_ids).order_by('id').values('id', 'name', 'specialty'))
+    # Stored research mentioning any of the issue terms research_keywords can pick, via the term index
+    candidates = research_candidates_bulk({
+        hcp['id']: (
+            [term for term, _ in terms[hcp['id']]['DIAGNOSIS'][:TOP_DIAGNOSES]
+             + terms[hcp['id']]['RISK_FACTOR'][:TOP_RISK_FACTORS]],
+            hcp['specialty'],
+        )
+        for hcp in hcps
+    })
+
+    profiles = []
+    for hcp in hcps:
+        hcp_terms = terms[hcp['id']]
+        profiles.append({
+            'hcp_id': hcp['id'],
+            'name': hcp['name'],
+            'specialty': hcp['specialty'],
+            'total_patients': totals.get(hcp['id'], 0),
+            'diagnoses': hcp_terms['DIAGNOSIS'][:TOP_DIAGNOSES],
+            'risk_factors': hcp_terms['RISK_FACTOR'][:TOP_RISK_FACTORS],
+            'treatments': [term for term, _ in hcp_terms['TREATMENT']],
+            'cluster': cluster_by_hcp.get(hcp['id']),
+            'research_candidates': candidates[hcp['id']],
+        })
+    return profiles
+
+
+def plan_recommendation(profile: Dict) -> Optional[Dict]:
+    """Analysis, research and recommendation fields for one HCP profile (ORM-free, runs in workers)"""
+    if not profile['total_patients']:
+        return None
+
+    analysis = summarize_issues(profile['name'], profile['total_patients'], profile['diagnoses'],
+                                profile['risk_factors'], profile['treatments'])
+    research = rank_research(research_keywords(analysis), profile['specialty'], max_results=MAX_RESEARCH,
+                             candidates=profile.get('research_candidates'))
+    fields = recommendation_fields(analysis, research, profile['cluster'])
+    if fields is None:
+        return None
+
+    return {
+        'hcp_id': profile['hcp_id'],
+        'specialty': profile['specialty'],
+        'cluster_id': profile['cluster']['id'] if profile['cluster'] else None,
+        'analysis': analysis,
+        'research': research,
+        'fields': fields,
+    }
+
+
+def _research_ids(plans: List[Dict]) -> Dict[str, int]:
+    """ScrapedResearch ids by title for every article the plans cite, creating missing rows"""
+    from .models import ScrapedResearch
+    from .research_index import index_research
+
+    articles = {}
+    specialties = {}
+    for plan in plans:
+        for article in plan['research']:
+            articles.setdefault(article['title'], article)
+            specialties.setdefault(article['title'], plan['specialty'])
+
+    ids = {}
+    existing = ScrapedResearch.objects.filter(title__in=articles).order_by('-id').values_list('title', 'id')
+    ids.update(existing)  # Descending ids, so the oldest row per title wins like get_or_create's .get()
+
+    missing = [
+        ScrapedResearch(
+            title=title,
+            authors=article['authors'],
+            journal=article['journal'],
+            publication_date=article['publication_date'],
+            abstract=article['abstract'],
+            keywords=article['keywords'],
+            specialties=[specialties[title]] if specialties[title] else [],
+            conditions_mentioned=article['conditions'],
+            treatments_mentioned=article['treatments'],
+            source_url=article['source_url'],
+            relevance_score=article['relevance_score'],
+        )
+        for title, article in articles.items() if title not in ids
+    ]
+    if missing:
+        ScrapedResearch.objects.bulk_create(missing)
+        created = list(
+            ScrapedResearch.objects.filter(title__in=[m.title for m in missing])
+            .order_by('-id').values_list('title', 'id')
+        )
+        ids.update(created)
+        # bulk_create skips post_save, so index the new articles' terms here
+        index_research([research_id for _, research_id in created])
+    return ids
+
+
+def save_issue_analyses(analyses: Dict[int, Dict], batch_size: int = 1000) -> Dict:
+    """
+    Store one PatientIssueAnalysis per HCP id from summarize_issues fields.
+    The HCP's newest row is overwritten in place, so regenerating does not
+    append an identical snapshot each time.
+    """
+    from django.db.models import Max
+    from django.utils import timezone
+    from .models import PatientIssueAnalysis
+
+    newest = (
+        PatientIssueAnalysis.objects.filter(hcp_id__in=list(analyses))
+        .values('hcp_id').annotate(newest=Max('id')).order_by().values_list('newest', flat=True)
+    )
+    saved = {analysis.hcp_id: analysis for analysis in PatientIssueAnalysis.objects.filter(id__in=list(newest))}
+
+    now = timezone.now()
+    for hcp_id, analysis in saved.items():
+        for name, value in analyses[hcp_id].items():
+            setattr(analysis, name, value)
+        analysis.analysis_date = now
+    PatientIssueAnalysis.objects.bulk_update(saved.values(), ANALYSIS_FIELDS + ['analysis_date'],
+                                             batch_size=batch_size)
+
+    # bulk_create returns primary keys on SQLite 3.35+ and PostgreSQL
+    created = PatientIssueAnalysis.objects.bulk_create(
+        [PatientIssueAnalysis(hcp_id=hcp_id, **fields) for hcp_id, fields in analyses.items() if hcp_id not in saved],
+        batch_size=batch_size,
+    )
+    saved.update((analysis.hcp_id, analysis) for analysis in created)
+    return saved
+
+
+def write_recommendations(plans: List[Dict], hcr_user, batch_size: int = 1000) -> List:
+    """Save the analyses and bulk_create the recommendations and research links for a list of plans"""
+    from django.db import transaction
+    from .models import IntelligentRecommendation
+
+    if not plans:
+        return []
+
+    with transaction.atomic():
+        research_ids = _research_ids(plans)
+        analyses = save_issue_analyses({plan['hcp_id']: plan['analysis'] for plan in plans}, batch_size)
+        recommendations = IntelligentRecommendation.objects.bulk_create(
+            [
+                IntelligentRecommendation(
+                    hcp_id=plan['hcp_id'],
+                    hcr_sender=hcr_user,
+                    patient_analysis=analyses[plan['hcp_id']],
+                    cluster_insights_id=plan['cluster_id'],
+                    **plan['fields'],
+                )
+                for plan in plans
+            ],
+            batch_size=batch_size,
+        )
+
+        Link = IntelligentRecommendation.relevant_research.through
+        Link.objects.bulk_create(
+            [
+                Link(intelligentrecommendation_id=recommendation.id, scrapedresearch_id=research_ids[article['title']])
+                for plan, recommendation in zip(plans, recommendations)
+                for article in plan['research']
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+    return recommendations
+
+
+def generate_recommendations(hcr_user, hcps=None, workers: int = 1, chunk_size: int = 500,
+                             progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Generate one recommendation per HCP in `hcps` (a queryset, default: all HCPs).
+    Profiles are loaded per chunk, plans are scored across a process pool when
+    workers > 1, and each chunk is written with bulk inserts.
+    """
+    from .models import HCP
+
+    hcps = hcps if hcps is not None else HCP.objects.all()
+    hcp_ids = list(hcps.order_by('id').values_list('id', flat=True))
+    totals = {'hcps': 0, 'recommendations': 0, 'skipped': 0}
+
+    def run(plan_chunk):
+        for start in range(0, len(hcp_ids), chunk_size):
+            profiles = load_hcp_profiles(hcp_ids[start:start + chunk_size])
+            plans = [plan for plan in plan_chunk(profiles) if plan]
+            write_recommendations(plans, hcr_user)
+            totals['hcps'] += len(profiles)
+            totals['recommendations'] += len(plans)
+            totals['skipped'] += len(profiles) - len(plans)
+            if progress:
+                progress(totals)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            run(lambda profiles: list(pool.map(plan_recommendation, profiles,
+                                               chunksize=max(1, len(profiles) // (workers * 4)))))
+    else:
+        run(lambda profiles: [plan_recommendation(profile) for profile in profiles])
+
+    return totals
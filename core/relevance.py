@@ -0,0 +1,142 @@
+"""
+Research Relevance Engine
+Static per-article features (source weight, impact-keyword score, specialty
+affinities) are computed once at ingestion; only recency changes with time.
+
+Recency decays linearly over DECAY_DAYS, so within that window
+    relevance(today) = static_score + RECENCY_WEIGHT * (1 - (today - date) / DECAY_DAYS)
+                     = relevance_key - RECENCY_WEIGHT * (today.toordinal() / DECAY_DAYS - 1)
+with relevance_key = static_score + RECENCY_WEIGHT * date.toordinal() / DECAY_DAYS.
+The subtracted term is the same for every row on a given day, so ordering by
+the stored, indexed relevance_key is ordering by current relevance.
+
+Past the window recency stops at zero, so the key's date term is clamped to
+the day DECAY_DAYS before it was written; otherwise a strong old article would
+keep sinking below weaker new ones. The nightly refresh re-clamps every row in
+the same single UPDATE that re-decays relevance_score. Between refreshes, a
+row that has left the window sorts at most RECENCY_WEIGHT / DECAY_DAYS per
+day below its current relevance
+"""
+import logging
+from datetime import date
+from typing import Dict, Optional
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+
+from .models import ResearchUpdate
+
+logger = logging.getLogger(__name__)
+
+RECENCY_WEIGHT = 0.3
+SOURCE_WEIGHT = 0.3
+KEYWORD_CAP = 0.4
+DECAY_DAYS = 30
+MAX_SCORE = 1.0
+
+# Source credibility
+SOURCE_SCORES = {
+    'PubMed': 1.0,
+    'Medical News Today': 0.8,
+    'ScienceDaily': 0.8,
+    'Medscape': 0.9,
+    'Clinical Research Database': 0.7
+}
+DEFAULT_SOURCE_SCORE = 0.5
+
+# Fields written by apply_features()
+FEATURE_FIELDS = ['source_weight', 'keyword_score', 'specialty_affinities', 'static_score', 'relevance_key', 'relevance_score']
+
+
+def article_features(title: str, abstract: str, source: str, analysis: Optional[Dict] = None) -> Dict:
+    """Static features of one article; `analysis` is research_classifier().analyze() output if already computed"""
+    from .research_scraper import HIGH_IMPACT_KEYWORDS, research_classifier
+
+    analysis = analysis or research_classifier().analyze(title or '', abstract or '')
+    keyword_score = 0
+    for keyword in HIGH_IMPACT_KEYWORDS:
+        if keyword in analysis['title_terms']:
+            keyword_score += 0.2
+        elif keyword in analysis['abstract_terms']:
+            keyword_score += 0.1
+
+    top = max(analysis['scores'].values(), default=0)
+    affinities = {
+        specialty: round(score / top, 3) for specialty, score in analysis['scores'].items() if score
+    } if top else {}
+
+    source_weight = SOURCE_SCORES.get(source or '', DEFAULT_SOURCE_SCORE)
+    keyword_score = round(min(keyword_score, KEYWORD_CAP), 3)
+    return {
+        'source_weight': source_weight,
+        'keyword_score': keyword_score,
+        'specialty_affinities': affinities,
+        'static_score': round(source_weight * SOURCE_WEIGHT + keyword_score, 4),
+    }
+
+
+def _key_floor(static_score, today: Optional[date] = None):
+    """Key of a row exactly DECAY_DAYS old on `today`, i.e. with no recency left; works on F() too"""
+    return static_score + RECENCY_WEIGHT * ((today or date.today()).toordinal() - DECAY_DAYS) / DECAY_DAYS
+
+
+def relevance_key(static_score: float, published: date, today: Optional[date] = None) -> float:
+    return max(static_score + RECENCY_WEIGHT * published.toordinal() / DECAY_DAYS, _key_floor(static_score, today))
+
+
+def relevance_at(static_score: float, published: date, today: Optional[date] = None) -> float:
+    """Relevance on `today`: static features plus linearly decaying recency, capped at 1"""
+    days_old = ((today or date.today()) - published).days
+    recency = max(0, 1.0 - days_old / DECAY_DAYS)
+    return min(static_score + recency * RECENCY_WEIGHT, MAX_SCORE)
+
+
+def apply_features(row: Dict, analysis: Optional[Dict] = None, today: Optional[date] = None) -> Dict:
+    """Add static features, relevance_key and today's relevance_score to a ResearchUpdate field dict"""
+    row.update(article_features(row.get('headline', ''), row.get('abstract', ''), row.get('source', ''), analysis))
+    row['relevance_key'] = relevance_key(row['static_score'], row['date'], today)
+    row['relevance_score'] = round(relevance_at(row['static_score'], row['date'], today), 4)
+    return row
+
+
+def current_relevance_expression(today: Optional[date] = None):
+    """SQL expression for relevance on `today` from the stored static_score and relevance_key"""
+    offset = RECENCY_WEIGHT * ((today or date.today()).toordinal() / DECAY_DAYS - 1)
+    # Greatest with static_score clamps recency at zero for rows older than DECAY_DAYS
+    return Least(Value(MAX_SCORE), Greatest(F('static_score'), F('relevance_key') - Value(offset)))
+
+
+def with_current_relevance(queryset=None, today: Optional[date] = None):
+    """Annotate current_relevance and order by it through the relevance_key index"""
+    queryset = ResearchUpdate.objects.all() if queryset is None else queryset
+    return queryset.annotate(current_relevance=current_relevance_expression(today)).order_by('-relevance_key')
+
+
+def refresh_relevance_scores(queryset=None, today: Optional[date] = None) -> int:
+    """Re-decay the stored relevance_score and re-clamp relevance_key of every row with one bulk UPDATE"""
+    queryset = ResearchUpdate.objects.all() if queryset is None else queryset
+    return queryset.update(
+        relevance_score=current_relevance_expression(today),
+        relevance_key=Greatest(F('relevance_key'), _key_floor(F('static_score'), today)),
+    )
+
+
+def rebuild_features(queryset=None, batch_size: int = 500, today: Optional[date] = None) -> int:
+    """Recompute static features for existing rows, e.g. after changing keyword or source weights"""
+    queryset = ResearchUpdate.objects.all() if queryset is None else queryset
+    total = 0
+    batch = []
+    for article in queryset.only('id', 'headline', 'abstract', 'source', 'date').iterator(chunk_size=batch_size):
+        row = apply_features({
+            'headline': article.headline, 'abstract': article.abstract,
+            'source': article.source, 'date': article.date,
+        }, today=today)
+        for field in FEATURE_FIELDS:
+            setattr(article, field, row[field])
+        batch.append(article)
+        if len(batch) >= batch_size:
+            total += queryset.model.objects.bulk_update(batch, FEATURE_FIELDS)
+            batch = []
+    if batch:
+        total += queryset.model.objects.bulk_update(batch, FEATURE_FIELDS)
+    return total
@@ -0,0 +1,299 @@
+"""
+Research Catalog
+Curated research articles and the keyword/specialty relevance scoring used to
+match them against an HCP's patient issues
+"""
+from typing import Dict, List, Optional
+
+MIN_RELEVANCE = 0.3
+
+
+# Curated research articles matched against HCP patient issues
+RESEARCH_CATALOG = [
+    # Diabetes-related articles
+    {
+        'title': 'Novel Treatment Approaches for Diabetes Management',
+        'authors': 'Smith, J., Johnson, A., Brown, K.',
+        'journal': 'New England Journal of Medicine',
+        'publication_date': '2024-01-15',
+        'abstract': 'This study examines new treatment modalities for diabetes management, including SGLT-2 inhibitors and GLP-1 receptor agonists.',
+        'keywords': ['diabetes', 'treatment', 'SGLT-2', 'GLP-1', 'metformin'],
+        'conditions': ['diabetes', 'type 2 diabetes', 'diabetic'],
+        'treatments': ['SGLT-2 inhibitors', 'GLP-1 receptor agonists', 'metformin'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example1',
+        'relevance_score': 0.95
+    },
+    {
+        'title': 'Cardiovascular Outcomes in Hypertension Treatment',
+        'authors': 'Williams, M., Davis, R.',
+        'journal': 'Journal of the American Medical Association',
+        'publication_date': '2024-02-01',
+        'abstract': 'Comprehensive analysis of cardiovascular outcomes in patients treated with ACE inhibitors vs ARBs.',
+        'keywords': ['hypertension', 'cardiovascular', 'ACE inhibitors', 'ARBs', 'blood pressure'],
+        'conditions': ['hypertension', 'cardiovascular disease', 'high blood pressure'],
+        'treatments': ['ACE inhibitors', 'ARBs', 'beta blockers'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example2',
+        'relevance_score': 0.88
+    },
+    {
+        'title': 'Innovations in Cancer Immunotherapy',
+        'authors': 'Garcia, L., Martinez, P.',
+        'journal': 'Nature Medicine',
+        'publication_date': '2024-01-20',
+        'abstract': 'Recent advances in cancer immunotherapy and their clinical applications.',
+        'keywords': ['cancer', 'immunotherapy', 'oncology', 'tumor'],
+        'conditions': ['cancer', 'tumor', 'oncology'],
+        'treatments': ['immunotherapy', 'checkpoint inhibitors', 'chemotherapy'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example3',
+        'relevance_score': 0.92
+    },
+    # Heart-related articles
+    {
+        'title': 'Advanced Heart Failure Management Strategies',
+        'authors': 'Chen, L., Rodriguez, M.',
+        'journal': 'Circulation',
+        'publication_date': '2024-01-10',
+        'abstract': 'New approaches to managing heart failure including device therapy and novel medications.',
+        'keywords': ['heart failure', 'cardiology', 'device therapy', 'heart'],
+        'conditions': ['heart failure', 'cardiac', 'cardiomyopathy'],
+        'treatments': ['ACE inhibitors', 'beta blockers', 'device therapy'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example4',
+        'relevance_score': 0.89
+    },
+    # Mental health articles
+    {
+        'title': 'Depression Treatment in Primary Care Settings',
+        'authors': 'Thompson, K., Lee, S.',
+        'journal': 'Journal of Clinical Psychiatry',
+        'publication_date': '2024-02-15',
+        'abstract': 'Evidence-based approaches to treating depression in primary care with focus on SSRIs and therapy.',
+        'keywords': ['depression', 'mental health', 'SSRI', 'therapy'],
+        'conditions': ['depression', 'mental health', 'anxiety'],
+        'treatments': ['SSRIs', 'therapy', 'counseling'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example5',
+        'relevance_score': 0.87
+    },
+    # Respiratory articles
+    {
+        'title': 'COPD Management in the Modern Era',
+        'authors': 'Anderson, R., Wilson, T.',
+        'journal': 'American Journal of Respiratory Medicine',
+        'publication_date': '2024-01-25',
+        'abstract': 'Comprehensive review of COPD treatment including bronchodilators and pulmonary rehabilitation.',
+        'keywords': ['COPD', 'respiratory', 'bronchodilator', 'lung'],
+        'conditions': ['COPD', 'respiratory', 'lung disease'],
+        'treatments': ['bronchodilators', 'inhalers', 'pulmonary rehabilitation'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example6',
+        'relevance_score': 0.91
+    },
+    # Gastrointestinal articles
+    {
+        'title': 'GERD Treatment Options and Outcomes',
+        'authors': 'Patel, N., Kumar, V.',
+        'journal': 'Gastroenterology',
+        'publication_date': '2024-02-05',
+        'abstract': 'Review of GERD management including PPIs, lifestyle modifications, and surgical options.',
+        'keywords': ['GERD', 'gastrointestinal', 'PPI', 'acid reflux'],
+        'conditions': ['GERD', 'acid reflux', 'gastrointestinal'],
+        'treatments': ['PPIs', 'H2 blockers', 'lifestyle modifications'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example7',
+        'relevance_score': 0.86
+    },
+    # Neurological articles
+    {
+        'title': 'Migraine Management: New Therapeutic Approaches',
+        'authors': 'Johnson, A., Smith, B.',
+        'journal': 'Neurology',
+        'publication_date': '2024-01-30',
+        'abstract': 'Recent advances in migraine treatment including CGRP antagonists and neuromodulation techniques.',
+        'keywords': ['migraine', 'neurology', 'CGRP', 'headache'],
+        'conditions': ['migraine', 'headache', 'neurological'],
+        'treatments': ['CGRP antagonists', 'triptans', 'neuromodulation'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example8',
+        'relevance_score': 0.88
+    },
+    # Additional diverse articles for more variety
+    {
+        'title': 'Precision Medicine in Rheumatoid Arthritis',
+        'authors': 'Davis, M., Wilson, K.',
+        'journal': 'Arthritis & Rheumatism',
+        'publication_date': '2024-02-10',
+        'abstract': 'Personalized treatment approaches for rheumatoid arthritis using biomarkers and targeted therapies.',
+        'keywords': ['rheumatoid arthritis', 'precision medicine', 'biomarkers', 'DMARDs'],
+        'conditions': ['rheumatoid arthritis', 'autoimmune', 'joint disease'],
+        'treatments': ['DMARDs', 'biologics', 'methotrexate'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example9',
+        'relevance_score': 0.90
+    },
+    {
+        'title': 'Chronic Kidney Disease: Early Detection and Management',
+        'authors': 'Brown, T., Garcia, L.',
+        'journal': 'Kidney International',
+        'publication_date': '2024-01-18',
+        'abstract': 'Strategies for early detection and management of chronic kidney disease progression.',
+        'keywords': ['kidney disease', 'CKD', 'nephrology', 'renal'],
+        'conditions': ['chronic kidney disease', 'renal failure', 'nephropathy'],
+        'treatments': ['ACE inhibitors', 'diet modification', 'dialysis'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example10',
+        'relevance_score': 0.85
+    },
+    {
+        'title': 'Obesity Management: Multidisciplinary Approaches',
+        'authors': 'Martinez, P., Lee, J.',
+        'journal': 'Obesity Reviews',
+        'publication_date': '2024-02-12',
+        'abstract': 'Comprehensive approaches to obesity management including lifestyle, pharmacotherapy, and surgery.',
+        'keywords': ['obesity', 'weight management', 'bariatric', 'metabolic'],
+        'conditions': ['obesity', 'metabolic syndrome', 'weight gain'],
+        'treatments': ['lifestyle modification', 'GLP-1 agonists', 'bariatric surgery'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example11',
+        'relevance_score': 0.87
+    },
+    {
+        'title': 'Thyroid Disorders: Diagnosis and Treatment Updates',
+        'authors': 'Chen, W., Rodriguez, S.',
+        'journal': 'Endocrine Reviews',
+        'publication_date': '2024-01-22',
+        'abstract': 'Updated guidelines for diagnosis and treatment of thyroid disorders including hypothyroidism and hyperthyroidism.',
+        'keywords': ['thyroid', 'hypothyroidism', 'hyperthyroidism', 'TSH'],
+        'conditions': ['hypothyroidism', 'hyperthyroidism', 'thyroid disease'],
+        'treatments': ['levothyroxine', 'methimazole', 'radioactive iodine'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example12',
+        'relevance_score': 0.89
+    },
+    {
+        'title': 'Infectious Disease Prevention in Healthcare Settings',
+        'authors': 'Thompson, R., Anderson, M.',
+        'journal': 'Infection Control & Hospital Epidemiology',
+        'publication_date': '2024-02-08',
+        'abstract': 'Best practices for preventing healthcare-associated infections and antimicrobial resistance.',
+        'keywords': ['infection control', 'antimicrobial resistance', 'healthcare', 'prevention'],
+        'conditions': ['healthcare-associated infections', 'antimicrobial resistance'],
+        'treatments': ['infection control', 'antimicrobial stewardship', 'vaccination'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example13',
+        'relevance_score': 0.84
+    },
+    {
+        'title': 'Dermatology: Advances in Skin Cancer Detection',
+        'authors': 'Wilson, A., Patel, K.',
+        'journal': 'Journal of the American Academy of Dermatology',
+        'publication_date': '2024-01-28',
+        'abstract': 'New technologies and approaches for early detection and treatment of skin cancer.',
+        'keywords': ['skin cancer', 'melanoma', 'dermatology', 'detection'],
+        'conditions': ['skin cancer', 'melanoma', 'basal cell carcinoma'],
+        'treatments': ['surgical excision', 'immunotherapy', 'targeted therapy'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example14',
+        'relevance_score': 0.86
+    },
+    {
+        'title': 'Pediatric Asthma: Management Strategies',
+        'authors': 'Lee, H., Kumar, R.',
+        'journal': 'Pediatrics',
+        'publication_date': '2024-02-14',
+        'abstract': 'Evidence-based approaches to managing asthma in pediatric populations.',
+        'keywords': ['pediatric asthma', 'children', 'respiratory', 'inhalers'],
+        'conditions': ['pediatric asthma', 'childhood respiratory disease'],
+        'treatments': ['inhaled corticosteroids', 'bronchodilators', 'education'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example15',
+        'relevance_score': 0.88
+    },
+    {
+        'title': 'Geriatric Medicine: Comprehensive Care Approaches',
+        'authors': 'Smith, D., Johnson, E.',
+        'journal': 'Journal of the American Geriatrics Society',
+        'publication_date': '2024-01-12',
+        'abstract': 'Holistic approaches to caring for elderly patients with multiple comorbidities.',
+        'keywords': ['geriatrics', 'elderly', 'comorbidities', 'polypharmacy'],
+        'conditions': ['multiple comorbidities', 'geriatric syndromes', 'frailty'],
+        'treatments': ['comprehensive assessment', 'medication review', 'functional support'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example16',
+        'relevance_score': 0.83
+    },
+    {
+        'title': 'Women\'s Health: Menopause Management Updates',
+        'authors': 'Garcia, M., Davis, L.',
+        'journal': 'Menopause',
+        'publication_date': '2024-02-18',
+        'abstract': 'Current approaches to managing menopausal symptoms and long-term health outcomes.',
+        'keywords': ['menopause', 'hormone therapy', 'women\'s health', 'osteoporosis'],
+        'conditions': ['menopause', 'hot flashes', 'osteoporosis'],
+        'treatments': ['hormone therapy', 'non-hormonal treatments', 'lifestyle modifications'],
+        'source_url': 'https://pubmed.ncbi.nlm.nih.gov/example17',
+        'relevance_score': 0.85
+    }
+]
+
+
+def _lowered(article: Dict) -> Dict:
+    return {
+        'abstract': article['abstract'].lower(),
+        'journal': article['journal'].lower(),
+        'keywords': [kw.lower() for kw in article['keywords']],
+        'conditions': [cond.lower() for cond in article['conditions']],
+        'treatments': [treat.lower() for treat in article['treatments']],
+    }
+
+
+# Lowercased once at import so ranking many HCPs does no repeated string work
+CATALOG_INDEX = [(article, _lowered(article)) for article in RESEARCH_CATALOG]
+CATALOG_TITLES = {article['title'] for article in RESEARCH_CATALOG}
+
+
+def score_article(lowered: Dict, keywords: List[str], specialty: Optional[str] = None) -> float:
+    """Keyword and specialty relevance of one CATALOG_INDEX entry"""
+    relevance_score = 0.0
+    
+    # Check keyword matches in multiple fields
+    for keyword in keywords:
+        keyword_lower = keyword.lower()
+        
+        # Check in abstract
+        if keyword_lower in lowered['abstract']:
+            relevance_score += 0.4
+        
+        # Check in keywords list
+        if any(keyword_lower in kw for kw in lowered['keywords']):
+            relevance_score += 0.3
+        
+        # Check in conditions
+        if any(keyword_lower in cond for cond in lowered['conditions']):
+            relevance_score += 0.3
+        
+        # Check in treatments
+        if any(keyword_lower in treat for treat in lowered['treatments']):
+            relevance_score += 0.2
+    
+    # Check specialty match
+    if specialty:
+        specialty_lower = specialty.lower()
+        if specialty_lower in lowered['abstract']:
+            relevance_score += 0.2
+        if specialty_lower in lowered['journal']:
+            relevance_score += 0.1
+    
+    return relevance_score
+
+
+def rank_research(keywords: List[str], specialty: Optional[str] = None,
+                  max_results: int = 10, candidates: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Catalog articles, plus any stored `candidates` in the same shape (see
+    research_index.research_candidates), relevant to `keywords`, best first,
+    as copies carrying their score
+    """
+    entries = list(CATALOG_INDEX)
+    for candidate in candidates or []:
+        # Catalog articles are saved as ScrapedResearch too, so they come back as candidates
+        if candidate['title'] not in CATALOG_TITLES:
+            entries.append((candidate, _lowered(candidate)))
+
+    ranked = []
+    for article, lowered in entries:
+        relevance_score = score_article(lowered, keywords, specialty)
+        # Only include articles with sufficient relevance
+        if relevance_score >= MIN_RELEVANCE:
+            ranked.append(dict(article, relevance_score=min(relevance_score, 1.0)))
+    
+    # Sort by relevance score
+    ranked.sort(key=lambda x: x['relevance_score'], reverse=True)
+    return ranked[:max_results]
@@ -3,15 +3,18 @@ Simplified Medical Research Generator
 Creates realistic medical research updates without external dependencies
 """
 import random
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional
 from django.utils import timezone
 from .models import ResearchUpdate, HCP
+from .research_ingest import advance, get_state, prune_old_research, upsert_articles
 from .real_research_urls import get_real_research_url
 import logging
 
 logger = logging.getLogger(__name__)
 
+GENERATOR_SOURCE = 'Research Generator'  # High-water marks are kept per specialty under this name
+
 class SimplifiedResearchGenerator:
     """Generates realistic medical research updates using templates and medical knowledge"""
     
@@ -272,10 +275,18 @@ class SimplifiedResearchGenerator:
         # Use real research URLs from our database
         return get_real_research_url(specialty)
 
-    def generate_research_for_specialty(self, specialty: str, count: int = 3) -> List[Dict]:
-        """Generate realistic research articles for a specific specialty"""
+    def generate_research_for_specialty(self, specialty: str, count: int = 3,
+                                        since: Optional[date] = None) -> List[Dict]:
+        """Generate realistic research articles for a specific specialty, dated after `since` if given"""
         articles = []
         
+        # Dates fall within the last 30 days, and after the last generated batch
+        max_days_ago = 30
+        if since is not None:
+            max_days_ago = min(max_days_ago, (datetime.now().date() - since).days - 1)
+            if max_days_ago < 1:
+                return []
+        
         # Get templates for this specialty, fallback to Internal Medicine
         templates = self.research_templates.get(specialty, self.research_templates['INTERNAL MEDICINE'])
         
@@ -296,8 +307,8 @@ class SimplifiedResearchGenerator:
                 if placeholder in abstract:
                     abstract = abstract.replace(placeholder, random.choice(options))
             
-            # Generate realistic date (within last 30 days)
-            days_ago = random.randint(1, 30)
+            # Generate realistic date
+            days_ago = random.randint(1, max_days_ago)
             research_date = datetime.now().date() - timedelta(days=days_ago)
             
             articles.append({
@@ -314,62 +325,42 @@ class SimplifiedResearchGenerator:
         return articles
 
     def update_all_specialties(self) -> Dict:
-        """Generate research for all medical specialties"""
+        """Generate research dated after each specialty's last batch"""
         logger.info("Generating research updates for all specialties...")
         
         # Clear old research (keep last 30 days)
-        cutoff_date = datetime.now().date() - timedelta(days=30)
-        old_research = ResearchUpdate.objects.filter(date__lt=cutoff_date)
-        deleted_count = old_research.count()
-        old_research.delete()
+        deleted_count = prune_old_research()
         
         created_count = 0
         updated_count = 0
+        unchanged_count = 0
         
         # Generate research for each specialty
         for specialty in self.research_templates.keys():
-            articles = self.generate_research_for_specialty(specialty, 3)
+            state = get_state(GENERATOR_SOURCE, specialty)
+            articles = self.generate_research_for_specialty(specialty, 3, since=state.last_published)
+            
+            counts = upsert_articles({
+                'headline': article['title'],
+                'specialty': article['specialty'],
+                'date': article['date'],
+                'abstract': article['abstract'],
+                'source': article['source'],
+                'source_url': article.get('source_url', ''),
+                'is_high_impact': article['is_high_impact'],
+            } for article in articles)
+            advance(state, articles)
             
-            for article in articles:
-                try:
-                    # Check if similar article exists (by title similarity)
-                    existing = ResearchUpdate.objects.filter(
-                        headline__icontains=article['title'][:50]  # First 50 chars
-                    ).first()
-                    
-                    if existing:
-                        # Update existing
-                        existing.specialty = article['specialty']
-                        existing.date = article['date']
-                        existing.abstract = article['abstract']
-                        existing.source = article['source']
-                        existing.source_url = article.get('source_url', '')
-                        existing.relevance_score = article['relevance_score']
-                        existing.is_high_impact = article['is_high_impact']
-                        existing.save()
-                        updated_count += 1
-                    else:
-                        # Create new
-                        ResearchUpdate.objects.create(
-                            headline=article['title'],
-                            specialty=article['specialty'],
-                            date=article['date'],
-                            abstract=article['abstract'],
-                            source=article['source'],
-                            source_url=article.get('source_url', ''),
-                            relevance_score=article['relevance_score'],
-                            is_high_impact=article['is_high_impact']
-                        )
-                        created_count += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error saving article '{article['title']}': {e}")
+            created_count += counts['created']
+            updated_count += counts['updated']
+            unchanged_count += counts['unchanged']
         
         # Calculate results
         result = {
             'deleted_old': deleted_count,
             'created_new': created_count,
             'updated_existing': updated_count,
+            'unchanged': unchanged_count,
             'total_articles': ResearchUpdate.objects.count(),
             'specialty_distribution': self._get_specialty_distribution()
         }
@@ -394,7 +385,7 @@ class SimplifiedResearchGenerator:
             specialty_limit = int(limit * 0.6)
             specialty_research = ResearchUpdate.objects.filter(
                 specialty=hcp_specialty
-            ).order_by('-relevance_score', '-date')[:specialty_limit]
+            ).order_by('-relevance_key')[:specialty_limit]
             
             # Get high-impact research from related specialties (25% of results)
             related_limit = int(limit * 0.25)
@@ -404,7 +395,7 @@ class SimplifiedResearchGenerator:
                 is_high_impact=True
             ).exclude(
                 specialty=hcp_specialty
-            ).order_by('-relevance_score', '-date')[:related_limit]
+            ).order_by('-relevance_key')[:related_limit]
             
             # Get general high-impact research (15% of results)
             general_limit = limit - specialty_limit - related_limit
@@ -414,7 +405,7 @@ class SimplifiedResearchGenerator:
                 specialty=hcp_specialty
             ).exclude(
                 specialty__in=related_specialties
-            ).order_by('-relevance_score', '-date')[:general_limit]
+            ).order_by('-relevance_key')[:general_limit]
             
             # Combine all research
             all_research = list(specialty_research) + list(related_research) + list(general_research)
@@ -422,7 +413,7 @@ class SimplifiedResearchGenerator:
             
         except Exception as e:
             logger.error(f"Error getting personalized research: {e}")
-            return ResearchUpdate.objects.order_by('-relevance_score', '-date')[:limit]
+            return ResearchUpdate.objects.order_by('-relevance_key')[:limit]
 
     def _get_related_specialties(self, specialty: str) -> List[str]:
         """Get related medical specialties"""
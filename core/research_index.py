@@ -0,0 +1,163 @@
+"""
+Research Term Index
+Mirrors the ScrapedResearch JSON term lists (keywords, specialties, conditions,
+treatments) into ResearchTerm rows, so candidate research for a set of patient
+issues is found with indexed (field, term) lookups instead of loading every
+article and scanning its lists in Python
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import ResearchTerm, ScrapedResearch
+from .vocabulary import term_key
+
+logger = logging.getLogger(__name__)
+
+# ScrapedResearch JSON field -> ResearchTerm.field
+TERM_FIELDS = {
+    'keywords': 'KEYWORD',
+    'specialties': 'SPECIALTY',
+    'conditions_mentioned': 'CONDITION',
+    'treatments_mentioned': 'TREATMENT',
+}
+
+# Fields a patient issue (diagnosis or risk factor) is matched against
+ISSUE_FIELDS = ['CONDITION', 'KEYWORD']
+
+TERM_LENGTH = 200
+MAX_CANDIDATES = 20
+LOOKUP_BATCH_SIZE = 500
+
+
+def _keys(terms: Iterable) -> List[str]:
+    """Distinct term keys of a JSON list; non-string entries are skipped"""
+    keys = {term_key(term)[:TERM_LENGTH] for term in terms or [] if isinstance(term, str)}
+    keys.discard('')
+    return sorted(keys)
+
+
+def index_research(research_ids: List[int]):
+    """Rebuild the ResearchTerm rows of the given articles from their JSON fields"""
+    rows = ScrapedResearch.objects.filter(id__in=research_ids).values_list('id', *TERM_FIELDS)
+    terms = [
+        ResearchTerm(research_id=row[0], field=field, term=key)
+        for row in rows
+        for field, values in zip(TERM_FIELDS.values(), row[1:])
+        for key in _keys(values)
+    ]
+    with transaction.atomic():
+        ResearchTerm.objects.filter(research_id__in=research_ids).delete()
+        ResearchTerm.objects.bulk_create(terms, batch_size=5000)
+
+
+def backfill_research_terms(queryset=None, batch_size: int = 2000) -> int:
+    """Index every article in `queryset` (default: all)"""
+    queryset = queryset if queryset is not None else ScrapedResearch.objects.all()
+    ids = list(queryset.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), batch_size):
+        index_research(ids[start:start + batch_size])
+    return len(ids)
+
+
+def find_research(conditions: Iterable[str] = (), treatments: Iterable[str] = (),
+                  keywords: Iterable[str] = (), specialty: Optional[str] = None):
+    """
+    Articles mentioning any of the given terms, restricted to `specialty` when
+    given, annotated with matched_terms (distinct terms matched) and ranked by
+    it, then relevance; the same order research_candidates_bulk produces
+    """
+    wanted = Q()
+    for field, terms in (('CONDITION', conditions), ('TREATMENT', treatments), ('KEYWORD', keywords)):
+        keys = _keys(terms)
+        if keys:
+            wanted |= Q(terms__field=field, terms__term__in=keys)
+    if not wanted:
+        return ScrapedResearch.objects.none()
+
+    queryset = ScrapedResearch.objects.all()
+    if specialty:
+        queryset = queryset.filter(
+            id__in=ResearchTerm.objects.filter(field='SPECIALTY', term=term_key(specialty)).values('research_id')
+        )
+    # Filtering before annotating makes the Count use the same (filtered) join
+    return (
+        queryset.filter(wanted)
+        .annotate(matched_terms=Count('terms__term', distinct=True))
+        .order_by('-matched_terms', '-relevance_score', 'id')
+    )
+
+
+def _strings(values) -> List[str]:
+    return [value for value in values or [] if isinstance(value, str)]
+
+
+def _candidate(article: ScrapedResearch) -> Dict:
+    """A stored article in the RESEARCH_CATALOG entry shape rank_research scores"""
+    return {
+        'title': article.title,
+        'authors': article.authors,
+        'journal': article.journal,
+        'publication_date': article.publication_date.isoformat() if article.publication_date else None,
+        'abstract': article.abstract,
+        'keywords': _strings(article.keywords),
+        'conditions': _strings(article.conditions_mentioned),
+        'treatments': _strings(article.treatments_mentioned),
+        'source_url': article.source_url,
+        'relevance_score': article.relevance_score,
+    }
+
+
+def research_candidates_bulk(requests: Dict, limit: int = MAX_CANDIDATES) -> Dict[object, List[Dict]]:
+    """
+    Stored candidate articles for many (issue terms, specialty) requests at once,
+    keyed like `requests`, using one term lookup, one specialty lookup and one
+    article load regardless of how many requests there are
+    """
+    wanted = {name: (_keys(terms), term_key(specialty) if specialty else None)
+              for name, (terms, specialty) in requests.items()}
+    all_keys = {key for keys, _ in wanted.values() for key in keys}
+    if not all_keys:
+        return {name: [] for name in requests}
+
+    ids_by_term = defaultdict(set)
+    for term, research_id in (
+        ResearchTerm.objects.filter(field__in=ISSUE_FIELDS, term__in=all_keys).values_list('term', 'research_id')
+    ):
+        ids_by_term[term].add(research_id)
+
+    matched_ids = sorted(set().union(*ids_by_term.values())) if ids_by_term else []
+    specialties = defaultdict(set)
+    for start in range(0, len(matched_ids), LOOKUP_BATCH_SIZE):
+        chunk = matched_ids[start:start + LOOKUP_BATCH_SIZE]
+        for research_id, term in (
+            ResearchTerm.objects.filter(field='SPECIALTY', research_id__in=chunk).values_list('research_id', 'term')
+        ):
+            specialties[research_id].add(term)
+
+    ranked: Dict[object, List[Tuple]] = {}
+    for name, (keys, specialty) in wanted.items():
+        matches = defaultdict(int)
+        for key in keys:
+            for research_id in ids_by_term.get(key, ()):
+                if specialty is None or specialty in specialties[research_id]:
+                    matches[research_id] += 1
+        ranked[name] = list(matches.items())
+
+    articles = ScrapedResearch.objects.in_bulk({research_id for items in ranked.values() for research_id, _ in items})
+    candidates = {}
+    for name, items in ranked.items():
+        items.sort(key=lambda item: (-item[1], -articles[item[0]].relevance_score, item[0]))
+        candidates[name] = [_candidate(articles[research_id]) for research_id, _ in items[:limit]]
+    return candidates
+
+
+def research_candidates(terms: Iterable[str], specialty: Optional[str] = None,
+                        limit: int = MAX_CANDIDATES) -> List[Dict]:
+    """Stored candidate articles for one HCP's issue terms"""
+    terms = list(terms)
+    articles = find_research(conditions=terms, keywords=terms, specialty=specialty)[:limit]
+    return [_candidate(article) for article in articles]
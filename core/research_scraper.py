@@ -5,11 +5,16 @@ Automatically scrapes and categorizes medical research based on doctor specialti
 import requests
 from datetime import datetime, timedelta
 import re
-from bs4 import BeautifulSoup
 import time
 import logging
+from functools import lru_cache
 from typing import List, Dict, Optional
-from .models import ResearchUpdate, HCP
+from .models import ResearchUpdate, HCP, ResearchSourceState
+from .relevance import apply_features, article_features, relevance_at
+from .research_ingest import (
+    advance, conditional_headers, get_state, newer_items, prune_old_research, remember_validators, upsert_articles,
+)
+from .text_classifier import TextClassifier
 # import openai  # Optional - for AI-powered categorization
 from django.conf import settings
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -19,6 +24,89 @@ import random
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Medical specialty mapping - enhanced for better matching
+SPECIALTY_KEYWORDS = {
+    'CARDIOVASCULAR DISEASE (CARDIOLOGY)': {
+        'keywords': ['cardiology', 'heart', 'cardiac', 'cardiovascular', 'coronary', 'artery', 
+                   'myocardial', 'valve', 'rhythm', 'hypertension', 'cholesterol', 'stent', 'bypass'],
+        'journals': ['Circulation', 'Journal of the American College of Cardiology', 'European Heart Journal']
+    },
+    'INTERNAL MEDICINE': {
+        'keywords': ['internal medicine', 'diabetes', 'hypertension', 'metabolic', 'endocrine', 
+                   'primary care', 'chronic disease', 'prevention', 'geriatric', 'adult medicine'],
+        'journals': ['New England Journal of Medicine', 'JAMA Internal Medicine', 'Annals of Internal Medicine']
+    },
+    'FAMILY PRACTICE': {
+        'keywords': ['family practice', 'primary care', 'general practice', 'preventive care', 
+                   'community health', 'ambulatory', 'wellness', 'screening', 'vaccination'],
+        'journals': ['American Family Physician', 'Family Medicine', 'Journal of Family Practice']
+    },
+    'GENERAL SURGERY': {
+        'keywords': ['surgery', 'surgical', 'operative', 'procedure', 'laparoscopic', 'minimally invasive',
+                   'trauma', 'emergency surgery', 'general surgical', 'appendectomy', 'hernia'],
+        'journals': ['Journal of the American College of Surgeons', 'Annals of Surgery', 'Surgery']
+    },
+    'ORTHOPEDIC SURGERY': {
+        'keywords': ['orthopedic', 'orthopaedic', 'bone', 'joint', 'fracture', 'spine', 'knee', 'hip',
+                   'sports medicine', 'arthroscopy', 'replacement', 'musculoskeletal'],
+        'journals': ['Journal of Bone and Joint Surgery', 'Clinical Orthopaedics', 'Orthopedic Surgery']
+    },
+    'RADIATION ONCOLOGY': {
+        'keywords': ['radiation', 'oncology', 'cancer', 'tumor', 'malignancy', 'chemotherapy', 
+                   'radiotherapy', 'neoplasm', 'metastasis', 'brachytherapy', 'immunotherapy'],
+        'journals': ['International Journal of Radiation Oncology', 'Journal of Clinical Oncology', 'Cancer']
+    },
+    'INFECTIOUS DISEASE': {
+        'keywords': ['infectious', 'infection', 'antibiotic', 'antimicrobial', 'pathogen', 'vaccine',
+                   'epidemic', 'bacterial', 'viral', 'fungal', 'sepsis', 'resistance'],
+        'journals': ['Clinical Infectious Diseases', 'Journal of Infectious Diseases', 'Infection Control']
+    },
+    'UROLOGY': {
+        'keywords': ['urology', 'urological', 'kidney', 'bladder', 'prostate', 'urinary', 'renal',
+                   'stone', 'incontinence', 'erectile', 'fertility', 'urogenital'],
+        'journals': ['Journal of Urology', 'European Urology', 'Urology']
+    },
+    'PAIN MANAGEMENT': {
+        'keywords': ['pain', 'analgesic', 'anesthesia', 'chronic pain', 'opioid', 'nerve block',
+                   'fibromyalgia', 'neuropathic', 'interventional', 'palliative'],
+        'journals': ['Pain Medicine', 'Journal of Pain', 'Anesthesia & Analgesia']
+    },
+    'PHYSICAL MEDICINE AND REHABILITATION': {
+        'keywords': ['rehabilitation', 'physical therapy', 'recovery', 'disability', 'mobility',
+                   'stroke', 'spinal cord', 'brain injury', 'prosthetic', 'functional'],
+        'journals': ['Archives of Physical Medicine', 'American Journal of Physical Medicine', 'PM&R']
+    }
+}
+
+# High-impact keywords used for relevance scoring
+HIGH_IMPACT_KEYWORDS = [
+    'breakthrough', 'novel', 'significant', 'major', 'revolutionary',
+    'clinical trial', 'randomized', 'meta-analysis', 'systematic review',
+    'fda approved', 'guideline', 'consensus', 'landmark study'
+]
+
+HIGH_IMPACT_INDICATORS = [
+    'breakthrough', 'revolutionary', 'first-in-class', 'landmark',
+    'meta-analysis', 'systematic review', 'clinical trial',
+    'fda approval', 'new guidelines', 'consensus statement',
+    'reduces mortality', 'improves survival', 'cure', 'prevents'
+]
+
+# Sources scraped incrementally, keyed by the 'source' their articles carry
+INCREMENTAL_SOURCES = ['PubMed', 'Medical News Today', 'ScienceDaily']
+
+PERCENTAGE_PATTERN = re.compile(r'(\d+)%\s*(improvement|reduction|increase|decrease|better)')
+
+
+@lru_cache(maxsize=None)
+def research_classifier() -> TextClassifier:
+    """Specialty and impact vocabularies compiled once per process"""
+    return TextClassifier(
+        {specialty: data['keywords'] for specialty, data in SPECIALTY_KEYWORDS.items()},
+        {'relevance': HIGH_IMPACT_KEYWORDS, 'impact': HIGH_IMPACT_INDICATORS},
+    )
+
+
 class MedicalResearchScraper:
     """Enhanced medical research scraper with intelligent categorization"""
     
@@ -28,59 +116,7 @@ class MedicalResearchScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
-        # Medical specialty mapping - enhanced for better matching
-        self.specialty_keywords = {
-            'CARDIOVASCULAR DISEASE (CARDIOLOGY)': {
-                'keywords': ['cardiology', 'heart', 'cardiac', 'cardiovascular', 'coronary', 'artery', 
-                           'myocardial', 'valve', 'rhythm', 'hypertension', 'cholesterol', 'stent', 'bypass'],
-                'journals': ['Circulation', 'Journal of the American College of Cardiology', 'European Heart Journal']
-            },
-            'INTERNAL MEDICINE': {
-                'keywords': ['internal medicine', 'diabetes', 'hypertension', 'metabolic', 'endocrine', 
-                           'primary care', 'chronic disease', 'prevention', 'geriatric', 'adult medicine'],
-                'journals': ['New England Journal of Medicine', 'JAMA Internal Medicine', 'Annals of Internal Medicine']
-            },
-            'FAMILY PRACTICE': {
-                'keywords': ['family practice', 'primary care', 'general practice', 'preventive care', 
-                           'community health', 'ambulatory', 'wellness', 'screening', 'vaccination'],
-                'journals': ['American Family Physician', 'Family Medicine', 'Journal of Family Practice']
-            },
-            'GENERAL SURGERY': {
-                'keywords': ['surgery', 'surgical', 'operative', 'procedure', 'laparoscopic', 'minimally invasive',
-                           'trauma', 'emergency surgery', 'general surgical', 'appendectomy', 'hernia'],
-                'journals': ['Journal of the American College of Surgeons', 'Annals of Surgery', 'Surgery']
-            },
-            'ORTHOPEDIC SURGERY': {
-                'keywords': ['orthopedic', 'orthopaedic', 'bone', 'joint', 'fracture', 'spine', 'knee', 'hip',
-                           'sports medicine', 'arthroscopy', 'replacement', 'musculoskeletal'],
-                'journals': ['Journal of Bone and Joint Surgery', 'Clinical Orthopaedics', 'Orthopedic Surgery']
-            },
-            'RADIATION ONCOLOGY': {
-                'keywords': ['radiation', 'oncology', 'cancer', 'tumor', 'malignancy', 'chemotherapy', 
-                           'radiotherapy', 'neoplasm', 'metastasis', 'brachytherapy', 'immunotherapy'],
-                'journals': ['International Journal of Radiation Oncology', 'Journal of Clinical Oncology', 'Cancer']
-            },
-            'INFECTIOUS DISEASE': {
-                'keywords': ['infectious', 'infection', 'antibiotic', 'antimicrobial', 'pathogen', 'vaccine',
-                           'epidemic', 'bacterial', 'viral', 'fungal', 'sepsis', 'resistance'],
-                'journals': ['Clinical Infectious Diseases', 'Journal of Infectious Diseases', 'Infection Control']
-            },
-            'UROLOGY': {
-                'keywords': ['urology', 'urological', 'kidney', 'bladder', 'prostate', 'urinary', 'renal',
-                           'stone', 'incontinence', 'erectile', 'fertility', 'urogenital'],
-                'journals': ['Journal of Urology', 'European Urology', 'Urology']
-            },
-            'PAIN MANAGEMENT': {
-                'keywords': ['pain', 'analgesic', 'anesthesia', 'chronic pain', 'opioid', 'nerve block',
-                           'fibromyalgia', 'neuropathic', 'interventional', 'palliative'],
-                'journals': ['Pain Medicine', 'Journal of Pain', 'Anesthesia & Analgesia']
-            },
-            'PHYSICAL MEDICINE AND REHABILITATION': {
-                'keywords': ['rehabilitation', 'physical therapy', 'recovery', 'disability', 'mobility',
-                           'stroke', 'spinal cord', 'brain injury', 'prosthetic', 'functional'],
-                'journals': ['Archives of Physical Medicine', 'American Journal of Physical Medicine', 'PM&R']
-            }
-        }
+        self.specialty_keywords = SPECIALTY_KEYWORDS
         
         # Research sources with enhanced scraping capabilities
         self.research_sources = [
@@ -136,28 +172,12 @@ class MedicalResearchScraper:
 
     def _keyword_match_specialty(self, text: str) -> str:
         """Fallback keyword matching for specialty categorization"""
-        text_lower = text.lower()
-        specialty_scores = {}
-        
-        for specialty, data in self.specialty_keywords.items():
-            score = 0
-            for keyword in data['keywords']:
-                # Weight longer keywords more heavily
-                weight = len(keyword.split())
-                if keyword.lower() in text_lower:
-                    score += weight * 2
-                # Partial matching for compound terms
-                elif any(word in text_lower for word in keyword.lower().split()):
-                    score += weight
-            
-            specialty_scores[specialty] = score
-        
-        # Return specialty with highest score, default to Internal Medicine
-        best_specialty = max(specialty_scores.items(), key=lambda x: x[1])
-        return best_specialty[0] if best_specialty[1] > 0 else 'INTERNAL MEDICINE'
+        return research_classifier().classify(text)
 
-    def scrape_pubmed_api(self, query: str, max_results: int = 10) -> List[Dict]:
-        """Scrape recent research from PubMed API"""
+    def scrape_pubmed_api(self, query: str, max_results: int = 10,
+                          state: Optional[ResearchSourceState] = None) -> List[Dict]:
+        """Scrape recent research from PubMed API (only PMIDs past the high-water mark when given a state)"""
+        from bs4 import BeautifulSoup  # Parser only needed when a scrape runs
         try:
             # Search for recent articles
             search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
@@ -168,6 +188,13 @@ class MedicalResearchScraper:
                 'retmode': 'json',
                 'sort': 'pub_date'
             }
+            if state and state.last_published:
+                search_params.update({
+                    'term': query,
+                    'datetype': 'pdat',
+                    'mindate': state.last_published.strftime('%Y/%m/%d'),
+                    'maxdate': datetime.now().strftime('%Y/%m/%d'),
+                })
             
             response = self.session.get(search_url, params=search_params)
             response.raise_for_status()
@@ -177,8 +204,15 @@ class MedicalResearchScraper:
             if 'esearchresult' not in search_results or not search_results['esearchresult']['idlist']:
                 return []
             
+            id_list = search_results['esearchresult']['idlist']
+            if state and state.last_guid.isdigit():
+                # PMIDs only grow, so anything at or below the mark was fetched before
+                id_list = [pmid for pmid in id_list if int(pmid) > int(state.last_guid)]
+                if not id_list:
+                    return []
+            
             # Get article details
-            ids = ','.join(search_results['esearchresult']['idlist'])
+            ids = ','.join(id_list)
             detail_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
             detail_params = {
                 'db': 'pubmed',
@@ -198,6 +232,7 @@ class MedicalResearchScraper:
                     title_elem = article.find('ArticleTitle')
                     abstract_elem = article.find('AbstractText')
                     date_elem = article.find('PubDate')
+                    pmid_elem = article.find('PMID')
                     
                     if title_elem:
                         title = title_elem.get_text(strip=True)
@@ -223,7 +258,8 @@ class MedicalResearchScraper:
                             'abstract': abstract,
                             'specialty': specialty,
                             'date': pub_date,
-                            'source': 'PubMed'
+                            'source': 'PubMed',
+                            'guid': pmid_elem.get_text(strip=True) if pmid_elem else ''
                         })
                         
                 except Exception as e:
@@ -236,12 +272,18 @@ class MedicalResearchScraper:
             logger.error(f"PubMed API scraping failed: {e}")
             return []
 
-    def scrape_medical_news_today(self, max_results: int = 5) -> List[Dict]:
-        """Scrape recent research from Medical News Today"""
+    def scrape_medical_news_today(self, max_results: int = 5,
+                                  state: Optional[ResearchSourceState] = None) -> List[Dict]:
+        """Scrape recent research from Medical News Today (only items newer than the state's mark)"""
+        from bs4 import BeautifulSoup
         try:
             url = "https://www.medicalnewstoday.com/categories/medical_news"
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, timeout=10, headers=conditional_headers(state) if state else None)
+            if state and response.status_code == 304:
+                return []
             response.raise_for_status()
+            if state:
+                remember_validators(state, response)
             
             soup = BeautifulSoup(response.content, 'html.parser')
             articles = []
@@ -256,6 +298,7 @@ class MedicalResearchScraper:
                         continue
                     
                     title = title_elem.get_text(strip=True)
+                    link = article.find('a', href=True)
                     
                     # Extract summary/abstract
                     summary_elem = article.find('p')
@@ -268,25 +311,32 @@ class MedicalResearchScraper:
                         'abstract': summary,
                         'specialty': specialty,
                         'date': datetime.now().date(),
-                        'source': 'Medical News Today'
+                        'source': 'Medical News Today',
+                        'guid': link['href'] if link else title
                     })
                     
                 except Exception as e:
                     logger.warning(f"Error parsing Medical News Today article: {e}")
                     continue
             
-            return articles
+            return newer_items(articles, state) if state else articles
             
         except Exception as e:
             logger.error(f"Medical News Today scraping failed: {e}")
             return []
 
-    def scrape_sciencedaily(self, max_results: int = 5) -> List[Dict]:
-        """Scrape recent medical research from ScienceDaily"""
+    def scrape_sciencedaily(self, max_results: int = 5,
+                            state: Optional[ResearchSourceState] = None) -> List[Dict]:
+        """Scrape recent medical research from ScienceDaily (only items newer than the state's mark)"""
+        from bs4 import BeautifulSoup
         try:
             url = "https://www.sciencedaily.com/news/health_medicine/"
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, timeout=10, headers=conditional_headers(state) if state else None)
+            if state and response.status_code == 304:
+                return []
             response.raise_for_status()
+            if state:
+                remember_validators(state, response)
             
             soup = BeautifulSoup(response.content, 'html.parser')
             articles = []
@@ -314,14 +364,15 @@ class MedicalResearchScraper:
                         'abstract': summary,
                         'specialty': specialty,
                         'date': datetime.now().date(),
-                        'source': 'ScienceDaily'
+                        'source': 'ScienceDaily',
+                        'guid': title_link.get('href') or title
                     })
                     
                 except Exception as e:
                     logger.warning(f"Error parsing ScienceDaily article: {e}")
                     continue
             
-            return articles
+            return newer_items(articles, state) if state else articles
             
         except Exception as e:
             logger.error(f"ScienceDaily scraping failed: {e}")
@@ -392,16 +443,17 @@ class MedicalResearchScraper:
         
         return articles
 
-    def scrape_all_sources(self) -> List[Dict]:
-        """Scrape research from all available sources"""
+    def scrape_all_sources(self, states: Optional[Dict[str, ResearchSourceState]] = None) -> List[Dict]:
+        """Scrape research from all available sources; with `states`, only items past each source's mark"""
+        states = states or {}
         all_articles = []
         
         # Multi-threaded scraping for better performance
         with ThreadPoolExecutor(max_workers=3) as executor:
             futures = {
-                executor.submit(self.scrape_pubmed_api, "recent medical research", 15): "PubMed",
-                executor.submit(self.scrape_medical_news_today, 10): "Medical News Today",
-                executor.submit(self.scrape_sciencedaily, 10): "ScienceDaily"
+                executor.submit(self.scrape_pubmed_api, "recent medical research", 15, states.get('PubMed')): "PubMed",
+                executor.submit(self.scrape_medical_news_today, 10, states.get('Medical News Today')): "Medical News Today",
+                executor.submit(self.scrape_sciencedaily, 10, states.get('ScienceDaily')): "ScienceDaily"
             }
             
             for future in as_completed(futures):
@@ -413,8 +465,9 @@ class MedicalResearchScraper:
                 except Exception as e:
                     logger.error(f"Error scraping {source_name}: {e}")
         
-        # If scraping failed or returned few results, generate synthetic data
-        if len(all_articles) < 10:
+        # If scraping failed or returned few results, generate synthetic data. Once a source
+        # has ingested real items, few results just means little is new
+        if len(all_articles) < 10 and not any(state.last_published for state in states.values()):
             logger.info("Generating synthetic research data due to low scraping results")
             for specialty in self.specialty_keywords.keys():
                 synthetic_articles = self.generate_synthetic_research(specialty, 2)
@@ -440,60 +493,47 @@ class MedicalResearchScraper:
         return unique_articles
 
     def update_research_database(self) -> Dict:
-        """Main method to update the research database"""
+        """Ingest research published since each source's high-water mark"""
         logger.info("Starting research database update...")
         
         # Clear old research (keep last 30 days)
-        cutoff_date = datetime.now().date() - timedelta(days=30)
-        old_research = ResearchUpdate.objects.filter(date__lt=cutoff_date)
-        deleted_count = old_research.count()
-        old_research.delete()
+        deleted_count = prune_old_research()
         
         # Scrape new research
-        new_articles = self.scrape_all_sources()
-        
-        # Save to database
-        created_count = 0
-        updated_count = 0
+        states = {source: get_state(source) for source in INCREMENTAL_SOURCES}
+        new_articles = self.scrape_all_sources(states)
         
+        rows = []
         for article in new_articles:
             try:
-                # Check if article already exists
-                existing = ResearchUpdate.objects.filter(
-                    headline=article['title']
-                ).first()
-                
-                if existing:
-                    # Update existing article
-                    existing.specialty = article['specialty']
-                    existing.date = article['date']
-                    existing.abstract = article.get('abstract', existing.abstract)
-                    existing.source = article.get('source', existing.source)
-                    existing.relevance_score = self._calculate_relevance_score(article)
-                    existing.is_high_impact = self._is_high_impact(article)
-                    existing.save()
-                    updated_count += 1
-                else:
-                    # Create new article
-                    ResearchUpdate.objects.create(
-                        headline=article['title'],
-                        specialty=article['specialty'],
-                        date=article['date'],
-                        abstract=article.get('abstract', ''),
-                        source=article.get('source', 'Unknown'),
-                        relevance_score=self._calculate_relevance_score(article),
-                        is_high_impact=self._is_high_impact(article)
-                    )
-                    created_count += 1
-                    
+                analysis = research_classifier().analyze(article['title'], article.get('abstract', ''))
+                rows.append(apply_features({
+                    'headline': article['title'][:200],
+                    'specialty': article['specialty'],
+                    'date': article['date'],
+                    'abstract': article.get('abstract', ''),
+                    'source': article.get('source', 'Unknown'),
+                    'source_url': article.get('source_url', ''),
+                    'is_high_impact': self._is_high_impact(article, analysis),
+                }, analysis))
             except Exception as e:
-                logger.error(f"Error saving article '{article['title']}': {e}")
+                logger.error(f"Error scoring article '{article['title']}': {e}")
+        
+        # Save to database, skipping rows whose content is unchanged
+        counts = upsert_articles(rows)
+        
+        for source, state in states.items():
+            articles = [article for article in new_articles if article.get('source') == source]
+            pmids = [int(article['guid']) for article in articles if str(article.get('guid', '')).isdigit()]
+            # PubMed's mark is the highest PMID; feed marks are the newest item listed
+            advance(state, articles, last_guid=str(max(pmids)) if source == 'PubMed' and pmids else None)
         
         # Log results
         result = {
             'deleted_old': deleted_count,
-            'created_new': created_count,
-            'updated_existing': updated_count,
+            'created_new': counts['created'],
+            'updated_existing': counts['updated'],
+            'unchanged': counts['unchanged'],
             'total_articles': ResearchUpdate.objects.count(),
             'specialty_distribution': self._get_specialty_distribution()
         }
@@ -555,68 +595,23 @@ class MedicalResearchScraper:
         
         return specialty_relationships.get(specialty, ['INTERNAL MEDICINE'])
 
-    def _calculate_relevance_score(self, article: Dict) -> float:
-        """Calculate relevance score for an article"""
-        score = 0.0
-        
-        # Base score for recency
-        days_old = (datetime.now().date() - article['date']).days
-        recency_score = max(0, 1.0 - (days_old / 30))  # Decreases over 30 days
-        score += recency_score * 0.3
-        
-        # Source credibility score
-        source_scores = {
-            'PubMed': 1.0,
-            'Medical News Today': 0.8,
-            'ScienceDaily': 0.8,
-            'Medscape': 0.9,
-            'Clinical Research Database': 0.7
-        }
-        source_score = source_scores.get(article.get('source', ''), 0.5)
-        score += source_score * 0.3
-        
-        # Title/abstract quality score
-        title = article.get('title', '').lower()
-        abstract = article.get('abstract', '').lower()
-        
-        # High-impact keywords
-        high_impact_keywords = [
-            'breakthrough', 'novel', 'significant', 'major', 'revolutionary',
-            'clinical trial', 'randomized', 'meta-analysis', 'systematic review',
-            'fda approved', 'guideline', 'consensus', 'landmark study'
-        ]
-        
-        keyword_score = 0
-        for keyword in high_impact_keywords:
-            if keyword in title:
-                keyword_score += 0.2
-            elif keyword in abstract:
-                keyword_score += 0.1
-        
-        score += min(keyword_score, 0.4)  # Cap at 0.4
-        
-        return min(score, 1.0)  # Cap at 1.0
+    def _calculate_relevance_score(self, article: Dict, analysis: Optional[Dict] = None) -> float:
+        """Calculate today's relevance score for an article (see core.relevance)"""
+        features = article_features(article.get('title', ''), article.get('abstract', ''),
+                                    article.get('source', ''), analysis)
+        return relevance_at(features['static_score'], article['date'])
 
-    def _is_high_impact(self, article: Dict) -> bool:
+    def _is_high_impact(self, article: Dict, analysis: Optional[Dict] = None) -> bool:
         """Determine if article is high impact"""
-        title = article.get('title', '').lower()
-        abstract = article.get('abstract', '').lower()
-        
-        high_impact_indicators = [
-            'breakthrough', 'revolutionary', 'first-in-class', 'landmark',
-            'meta-analysis', 'systematic review', 'clinical trial',
-            'fda approval', 'new guidelines', 'consensus statement',
-            'reduces mortality', 'improves survival', 'cure', 'prevents'
-        ]
+        title = article.get('title', '')
+        abstract = article.get('abstract', '')
+        analysis = analysis or research_classifier().analyze(title, abstract)
         
         # Check for percentage improvements
-        import re
-        percentage_pattern = r'(\d+)%\s*(improvement|reduction|increase|decrease|better)'
-        percentage_matches = re.findall(percentage_pattern, title + ' ' + abstract)
-        
+        percentage_matches = PERCENTAGE_PATTERN.findall(f"{title} {abstract}".lower())
         high_percentage = any(int(match[0]) >= 30 for match in percentage_matches)
-        has_impact_keywords = any(indicator in title or indicator in abstract 
-                                for indicator in high_impact_indicators)
+        found = analysis['title_terms'] | analysis['abstract_terms']
+        has_impact_keywords = any(indicator in found for indicator in HIGH_IMPACT_INDICATORS)
         
         return high_percentage or has_impact_keywords or article.get('source') == 'PubMed'
 
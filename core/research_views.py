@@ -17,12 +17,12 @@ def research_detail(request, research_id):
     research = get_object_or_404(ResearchUpdate, id=research_id)
     
     # Get user profile for personalized recommendations
-    user_profile = getattr(request.user, 'userprofile', None)
+    user_profile = request.identity.profile
     
     # Get related research based on specialty
     related_research = ResearchUpdate.objects.filter(
         specialty=research.specialty
-    ).exclude(id=research.id).order_by('-relevance_score', '-date')[:5]
+    ).exclude(id=research.id).order_by('-relevance_key')[:5]
     
     context = {
         'research': research,
@@ -52,7 +52,7 @@ def get_research_by_specialty(request):
         research = research.filter(is_high_impact=False)
     
     # Order and limit results
-    research = research.order_by('-relevance_score', '-date')[:limit]
+    research = research.order_by('-relevance_key')[:limit]
     
     data = []
     for r in research:
@@ -95,7 +95,7 @@ def trigger_research_update(request):
 @login_required
 def research_dashboard(request):
     """Comprehensive research dashboard"""
-    user_profile = getattr(request.user, 'userprofile', None)
+    user_profile = request.identity.profile
     
     # Get personalized research
     research_generator = SimplifiedResearchGenerator()
@@ -107,7 +107,7 @@ def research_dashboard(request):
     else:
         personalized_research = ResearchUpdate.objects.filter(
             is_high_impact=True
-        ).order_by('-relevance_score', '-date')[:15]
+        ).order_by('-relevance_key')[:15]
     
     # Get specialty statistics
     from django.db.models import Count, Avg
@@ -0,0 +1,96 @@
+"""
+Patient Risk Scoring
+Vectorized risk scores computed from a column extract of the patient table and
+persisted in AnonymizedPatient.risk_score so views can filter and sort in SQL
+"""
+import logging
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AGE_RISK = {
+    '18-25': 0.1, '26-35': 0.2, '36-45': 0.3, '46-55': 0.4,
+    '56-65': 0.6, '66-75': 0.8, '76+': 0.9
+}
+DEFAULT_AGE_RISK = 0.5
+
+ADHERENCE_RISK = {
+    'Excellent': 0.0, 'Good': 0.1, 'Fair': 0.3, 'Poor': 0.5
+}
+DEFAULT_ADHERENCE_RISK = 0.2
+
+# Risk levels used by clustering and dashboards: [low, medium) and [medium, high]
+MEDIUM_RISK_THRESHOLD = 0.3
+HIGH_RISK_THRESHOLD = 0.7
+
+# Patient columns the score is derived from; saving any of them refreshes risk_score
+RISK_INPUT_FIELDS = ['age_group', 'emergency_visits_6m', 'hospitalizations_6m', 'medication_adherence']
+
+
+def _lookup(values: Sequence, table: dict, default: float) -> np.ndarray:
+    """Map a categorical column through `table` touching each distinct value once"""
+    if not len(values):
+        return np.zeros(0)
+    labels, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    weights = np.array([table.get(label, default) for label in labels])
+    return weights[inverse]
+
+
+def score_columns(age_groups: Sequence, emergency_visits: Sequence, hospitalizations: Sequence,
+                  adherence: Sequence) -> np.ndarray:
+    """Risk scores in [0, 1] for whole columns at once"""
+    scores = _lookup(age_groups, AGE_RISK, DEFAULT_AGE_RISK)
+    scores += np.minimum(np.asarray(emergency_visits, dtype=float) * 0.1, 0.3)
+    scores += np.minimum(np.asarray(hospitalizations, dtype=float) * 0.15, 0.4)
+    scores += _lookup(adherence, ADHERENCE_RISK, DEFAULT_ADHERENCE_RISK)
+    return np.minimum(scores, 1.0)
+
+
+def score_patient(patient) -> float:
+    """Risk score of a single (possibly unsaved) patient instance"""
+    return float(score_columns(
+        [patient.age_group or ''], [patient.emergency_visits_6m or 0],
+        [patient.hospitalizations_6m or 0], [patient.medication_adherence or ''],
+    )[0])
+
+
+def risk_level(score: float) -> str:
+    if score < MEDIUM_RISK_THRESHOLD:
+        return 'LOW_RISK'
+    if score < HIGH_RISK_THRESHOLD:
+        return 'MEDIUM_RISK'
+    return 'HIGH_RISK'
+
+
+def refresh_risk_scores(queryset=None, batch_size: int = 5000,
+                        progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Recompute risk_score for every patient in `queryset` (default: all), one
+    NumPy pass per batch and a single executemany UPDATE per batch
+    """
+    from django.db import connection, transaction
+    from .models import AnonymizedPatient
+    from .versioning import PATIENTS, bump_version
+
+    queryset = queryset if queryset is not None else AnonymizedPatient.objects.all()
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    sql = f'UPDATE {table} SET {connection.ops.quote_name("risk_score")} = %s WHERE {connection.ops.quote_name("id")} = %s'
+
+    rows = queryset.order_by('id').values_list('id', *RISK_INPUT_FIELDS).iterator(chunk_size=batch_size)
+    done = 0
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        ids, ages, emergency, hospital, adherence = zip(*batch)
+        scores = score_columns(ages, emergency, hospital, [a or '' for a in adherence])
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, list(zip(np.round(scores, 4).tolist(), ids)))
+        done += len(batch)
+        if progress:
+            progress(done)
+    # Raw UPDATEs skip the patient signals; cohort bitmaps can filter on risk_score
+    bump_version(PATIENTS)
+    return done
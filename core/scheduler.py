@@ -0,0 +1,334 @@
+"""
+Periodic Scheduler
+Job definitions with interval or cron schedules, run in-process by
+`manage.py run_scheduler`. A lease on each job's ScheduledJob row keeps
+concurrent schedulers from overlapping: a scheduled run is claimed only while
+the job is still due, and the lease is renewed for as long as the command
+runs. Every run is recorded in JobRun with everything the command printed
+"""
+import contextlib
+import io
+import logging
+import os
+import random
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import time as dt_time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.management import call_command, get_commands
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JobRun, ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+# Off-peak defaults; SCHEDULER_JOBS in settings overrides or adds jobs, None disables one
+DEFAULT_JOBS = {
+    'research_refresh': {
+        'command': 'update_research',
+        'schedule': '0 3 * * *',
+        'jitter': 900,
+        'lease': 2 * 3600,
+    },
+    'clustering': {
+        'command': 'enhanced_clustering',
+        'schedule': '30 1 * * *',
+        'jitter': 600,
+        'lease': 3 * 3600,
+    },
+    'risk_scores': {
+        'command': 'refresh_risk_scores',
+        'schedule': '0 4 * * *',
+        'jitter': 600,
+    },
+    'relevance': {
+        'command': 'refresh_relevance',
+        'schedule': '15 0 * * *',
+        'jitter': 300,
+    },
+    'similarity_index': {
+        'command': 'build_similarity_index',
+        'schedule': 'every 1h',
+        'jitter': 300,
+    },
+    'similarity_index_full': {
+        'command': 'build_similarity_index',
+        'args': ['--full'],
+        'schedule': '30 4 * * *',  # After risk_scores, whose raw UPDATEs leave last_updated alone
+        'jitter': 300,
+    },
+    'outcome_stats': {
+        'command': 'refresh_outcome_stats',
+        'schedule': 'every 15m',
+        'jitter': 120,
+    },
+    'outcome_stats_full': {
+        'command': 'refresh_outcome_stats',
+        'args': ['--full'],
+        'schedule': '45 4 * * *',  # Repairs drift from outcome edits/deletes the incremental pass ignores
+        'jitter': 300,
+    },
+    'recommendations': {
+        'command': 'generate_recommendations',
+        'schedule': '0 6 * * 1',  # Weekly, after clustering, research and outcome stats; adds a draft per HCP
+        'jitter': 900,
+        'lease': 2 * 3600,
+    },
+    'research_cleanup': {
+        'command': 'cleanup_research_db',
+        'schedule': '0 5 * * 0',
+        'jitter': 600,
+    },
+}
+
+DEFAULT_JITTER = 0
+DEFAULT_LEASE = 3600  # Seconds; a crashed scheduler's lease expires after this
+OUTPUT_LIMIT = 20000  # Characters of command output kept per run
+
+_INTERVAL_RE = re.compile(r'^(?:every\s+)?(\d+)\s*([smhd])$')
+_INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class IntervalSchedule:
+    """A fixed gap between runs, e.g. "every 30m", "6h" or "1d" """
+
+    def __init__(self, seconds: int):
+        if seconds <= 0:
+            raise ValueError('Interval must be positive')
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+    def __str__(self):
+        return f'every {self.seconds}s'
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week) in TIME_ZONE"""
+
+    FIELDS = [('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 7)]
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f'Cron expression needs 5 fields: {expression!r}')
+        self.expression = expression
+        values = {}
+        for part, (name, low, high) in zip(parts, self.FIELDS):
+            values[name] = self._parse_field(part, low, high)
+        self.minutes = sorted(values['minute'])
+        self.hours = sorted(values['hour'])
+        self.days = values['day']
+        self.months = values['month']
+        self.weekdays = {day % 7 for day in values['weekday']}  # 0 and 7 are both Sunday
+        # Cron matches either day field when both are restricted
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set:
+        if not re.fullmatch(r'[\d*/,-]+', field):
+            raise ValueError(f'Cron field {field!r} is not a number, range, list or step')
+        values = set()
+        for item in field.split(','):
+            spec, _, step = item.partition('/')
+            if spec == '*':
+                start, end = low, high
+            elif '-' in spec:
+                start, end = (int(value) for value in spec.split('-', 1))
+            else:
+                start = end = int(spec)
+                if step:
+                    end = high
+            step = int(step) if step else 1
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f'Cron field {field!r} is outside {low}-{high}')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day) -> bool:
+        if day.month not in self.months:
+            return False
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays  # Python Monday=0, cron Sunday=0
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        tz = timezone.get_current_timezone()
+        start = timezone.localtime(moment, tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(366 * 5):  # Long enough for any expression that can match (e.g. Feb 29)
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, dt_time(hour, minute))
+                        if candidate >= start:
+                            return timezone.make_aware(candidate, tz)
+            day += timedelta(days=1)
+        raise ValueError(f'Cron expression never matches: {self.expression!r}')
+
+    def __str__(self):
+        return self.expression
+
+
+def parse_schedule(text: str):
+    """IntervalSchedule for "every 15m"-style text, otherwise a CronSchedule"""
+    match = _INTERVAL_RE.match(text.strip().lower())
+    if match:
+        return IntervalSchedule(int(match.group(1)) * _INTERVAL_UNITS[match.group(2)])
+    return CronSchedule(text)
+
+
+def get_jobs() -> Dict[str, Dict]:
+    """Validated job definitions: DEFAULT_JOBS merged with settings.SCHEDULER_JOBS"""
+    merged = dict(DEFAULT_JOBS)
+    merged.update(getattr(settings, 'SCHEDULER_JOBS', {}))
+    commands = get_commands()
+
+    jobs = {}
+    for name, definition in merged.items():
+        if definition is None:
+            continue
+        if definition['command'] not in commands:
+            raise ValueError(f"Job {name!r} runs unknown command {definition['command']!r}")
+        jobs[name] = {
+            'command': definition['command'],
+            'args': list(definition.get('args', [])),
+            'schedule': parse_schedule(definition['schedule']),
+            'jitter': definition.get('jitter', DEFAULT_JITTER),
+            'lease': definition.get('lease', DEFAULT_LEASE),
+        }
+    return jobs
+
+
+def next_run_time(job: Dict, after: Optional[datetime] = None) -> datetime:
+    """Next scheduled time plus random jitter so replicas and jobs do not all start together"""
+    scheduled = job['schedule'].next_after(after or timezone.now())
+    return scheduled + timedelta(seconds=random.uniform(0, job['jitter']))
+
+
+def default_owner() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def sync_jobs(jobs: Dict[str, Dict]):
+    """Create rows for new jobs and give unscheduled ones a next run time"""
+    existing = {job.name: job for job in ScheduledJob.objects.filter(name__in=jobs)}
+    for name, job in jobs.items():
+        if name not in existing:
+            ScheduledJob.objects.get_or_create(name=name, defaults={'next_run_at': next_run_time(job)})
+        elif existing[name].next_run_at is None:
+            ScheduledJob.objects.filter(name=name, next_run_at__isnull=True).update(next_run_at=next_run_time(job))
+
+
+def acquire_lease(name: str, owner: str, seconds: int, due_by: Optional[datetime] = None) -> bool:
+    """
+    Claim the job with one conditional UPDATE; False if another scheduler holds
+    a live lease or, with `due_by`, if the job is no longer due by then (another
+    scheduler has already run it and moved next_run_at on)
+    """
+    now = timezone.now()
+    jobs = ScheduledJob.objects.filter(name=name).filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now))
+    if due_by is not None:
+        jobs = jobs.filter(next_run_at__lte=due_by)
+    claimed = jobs.update(lease_owner=owner, lease_expires_at=now + timedelta(seconds=seconds))
+    return claimed == 1
+
+
+def renew_lease(name: str, owner: str, seconds: int) -> bool:
+    """Push out the expiry of a lease this owner still holds"""
+    renewed = ScheduledJob.objects.filter(name=name, lease_owner=owner).update(
+        lease_expires_at=timezone.now() + timedelta(seconds=seconds)
+    )
+    return renewed == 1
+
+
+def release_lease(name: str, owner: str):
+    ScheduledJob.objects.filter(name=name, lease_owner=owner).update(lease_owner='', lease_expires_at=None)
+
+
+def _keep_lease(stop: threading.Event, name: str, owner: str, seconds: int):
+    """Renew the lease every third of its length until `stop` is set, so long jobs never lose it"""
+    try:
+        while not stop.wait(seconds / 3):
+            if not renew_lease(name, owner, seconds):
+                logger.warning(f"Lost the lease on {name} while it was running")
+                return
+    except Exception:
+        logger.exception(f"Could not renew the lease on {name}")
+    finally:
+        connection.close()  # The renewal thread's own connection
+
+
+def run_job(name: str, job: Dict, owner: Optional[str] = None, force: bool = False) -> Optional[JobRun]:
+    """
+    Run one job under its lease and record the run; None when the lease is held
+    elsewhere or the job is not due. `force` runs it regardless of its schedule
+    """
+    owner = owner or default_owner()
+    if not acquire_lease(name, owner, job['lease'], due_by=None if force else timezone.now()):
+        logger.info(f"Skipping {name}: not due or leased by another scheduler")
+        return None
+
+    scheduled = ScheduledJob.objects.get(name=name)
+    run = JobRun.objects.create(job=scheduled, owner=owner)
+    stop_renewal = threading.Event()
+    renewal = threading.Thread(
+        target=_keep_lease, args=(stop_renewal, name, owner, job['lease']), name=f'lease-{name}', daemon=True,
+    )
+    renewal.start()
+    output = io.StringIO()
+    started = time.perf_counter()
+    try:
+        # Many commands report with print(); capture that alongside self.stdout/self.stderr
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            call_command(job['command'], *job['args'], stdout=output, stderr=output)
+        run.status = 'SUCCESS'
+    except Exception as e:
+        logger.exception(f"Scheduled job {name} failed")
+        output.write(f"\n{type(e).__name__}: {e}\n")
+        run.status = 'FAILED'
+    finally:
+        stop_renewal.set()
+        renewal.join()
+        run.finished_at = timezone.now()
+        run.duration_seconds = round(time.perf_counter() - started, 3)
+        run.output = output.getvalue()[-OUTPUT_LIMIT:]
+        run.save(update_fields=['status', 'finished_at', 'duration_seconds', 'output'])
+        ScheduledJob.objects.filter(name=name).update(
+            last_run_at=run.started_at,
+            next_run_at=next_run_time(job, run.finished_at),
+        )
+        release_lease(name, owner)
+    return run
+
+
+def due_jobs(jobs: Dict[str, Dict], now: Optional[datetime] = None) -> List[str]:
+    """Names of jobs whose next run time has passed, most overdue first"""
+    return list(
+        ScheduledJob.objects.filter(name__in=jobs, next_run_at__lte=now or timezone.now())
+        .order_by('next_run_at')
+        .values_list('name', flat=True)
+    )
+
+
+def run_pending(jobs: Dict[str, Dict], owner: Optional[str] = None) -> List[JobRun]:
+    """Run every due job once, one after another"""
+    runs = []
+    for name in due_jobs(jobs):
+        run = run_job(name, jobs[name], owner)
+        if run is not None:
+            runs.append(run)
+    return runs
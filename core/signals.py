@@ -0,0 +1,111 @@
+"""
+Model Signal Handlers
+Keeps derived patient data in sync when records are saved or deleted
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .identity import invalidate_identity
+from .models import (
+    HCP, AnonymizedPatient, PatientCluster, ClusterMembership, PatientOutcome, ScrapedResearch, UserProfile,
+)
+from .research_index import TERM_FIELDS as RESEARCH_TERM_FIELDS, index_research
+from .versioning import CLUSTERS, PATIENTS, bump_version
+from .vocabulary import TERM_FIELDS, remove_patient_rollups, sync_patient
+
+
+@receiver(pre_save, sender=AnonymizedPatient, dispatch_uid='core.remember_patient_hcp')
+def remember_patient_hcp(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note the stored HCP so a reassignment moves the patient's rollup counts"""
+    instance._previous_hcp_id = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'hcp' not in update_fields:
+        return
+    stored = AnonymizedPatient.objects.filter(pk=instance.pk).values_list('hcp_id', flat=True).first()
+    if stored is not None and stored != instance.hcp_id:
+        instance._previous_hcp_id = stored
+
+
+@receiver(post_save, sender=AnonymizedPatient, dispatch_uid='core.sync_patient_vocabulary')
+def sync_patient_vocabulary(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Rebuild a patient's vocabulary links after its delimited text fields change"""
+    if raw:
+        return
+    previous_hcp_id = getattr(instance, '_previous_hcp_id', None)
+    if update_fields is not None and previous_hcp_id is None and not set(update_fields) & set(TERM_FIELDS):
+        return
+    sync_patient(instance, previous_hcp_id)
+
+
+@receiver(pre_delete, sender=AnonymizedPatient, dispatch_uid='core.remove_patient_rollups')
+def remove_deleted_patient_rollups(sender, instance, **kwargs):
+    """Subtract a patient's terms from the HCP rollups before its links cascade away"""
+    remove_patient_rollups([instance.pk])
+
+
+@receiver(post_save, sender=AnonymizedPatient, dispatch_uid='core.bump_patient_version_save')
+@receiver(post_delete, sender=AnonymizedPatient, dispatch_uid='core.bump_patient_version_delete')
+def bump_patient_version(sender, raw=False, update_fields=None, **kwargs):
+    """
+    Invalidate cached cohort bitmaps (all of them: the version is global) on a
+    patient change, unless update_fields shows no field a definition can read changed
+    """
+    if raw:
+        return
+    if update_fields is not None:
+        from .cohorts import PATIENT_FIELDS  # NumPy-backed; loaded on first use
+        if not set(update_fields) & PATIENT_FIELDS:
+            return
+    bump_version(PATIENTS)
+
+
+@receiver(post_save, sender=HCP, dispatch_uid='core.bump_patient_version_hcp_save')
+def bump_patient_version_for_hcp(sender, created, raw=False, update_fields=None, **kwargs):
+    """Cohort definitions can filter on the HCP's specialty, so its edits invalidate the bitmaps too"""
+    if raw or created:
+        return
+    if update_fields is not None and 'specialty' not in update_fields:
+        return
+    bump_version(PATIENTS)
+
+
+@receiver(post_save, sender=PatientOutcome, dispatch_uid='core.refresh_outcome_stats')
+def refresh_treatment_outcome_stats(sender, created, raw=False, **kwargs):
+    """Fold a newly recorded outcome (and any other pending ones) into TreatmentOutcomeStat"""
+    if raw or not created:
+        return
+    from .outcome_stats import refresh_outcome_stats  # Imports drug_matrix (NumPy); loaded on first use
+    refresh_outcome_stats()
+
+
+@receiver(post_save, sender=ScrapedResearch, dispatch_uid='core.index_research_terms')
+def index_research_terms(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Rebuild an article's ResearchTerm rows after its JSON term lists change"""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(RESEARCH_TERM_FIELDS):
+        return
+    index_research([instance.pk])
+
+
+@receiver(post_save, sender=PatientCluster, dispatch_uid='core.bump_cluster_version_cluster_save')
+@receiver(post_delete, sender=PatientCluster, dispatch_uid='core.bump_cluster_version_cluster_delete')
+@receiver(post_save, sender=ClusterMembership, dispatch_uid='core.bump_cluster_version_membership_save')
+@receiver(post_delete, sender=ClusterMembership, dispatch_uid='core.bump_cluster_version_membership_delete')
+@receiver(post_save, sender=PatientOutcome, dispatch_uid='core.bump_cluster_version_outcome_save')
+@receiver(post_delete, sender=PatientOutcome, dispatch_uid='core.bump_cluster_version_outcome_delete')
+def bump_cluster_version(sender, raw=False, **kwargs):
+    """Invalidate cluster-derived caches (drug matrix, cluster graph) on any cluster data change"""
+    if raw:
+        return
+    bump_version(CLUSTERS)
+
+
+@receiver(post_save, sender=UserProfile, dispatch_uid='core.invalidate_identity_profile_save')
+@receiver(post_delete, sender=UserProfile, dispatch_uid='core.invalidate_identity_profile_delete')
+@receiver(post_save, sender=HCP, dispatch_uid='core.invalidate_identity_hcp_save')
+@receiver(post_delete, sender=HCP, dispatch_uid='core.invalidate_identity_hcp_delete')
+def invalidate_user_identity(sender, instance, **kwargs):
+    """Drop the cached request identity of the user a profile or HCP record belongs to"""
+    invalidate_identity(instance.user_id)
@@ -0,0 +1,477 @@
+"""
+Synthetic Patient Generator
+Column-wise NumPy generation of patients, outcomes and EMR data points with chunked bulk writes
+"""
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .observations import evaluate_abnormal
+from .risk_scoring import score_columns
+
+logger = logging.getLogger(__name__)
+
+# Fixed anchor so generated dates do not drift between runs
+SYNTHETIC_EPOCH = date(2025, 1, 1)
+_DATES = [SYNTHETIC_EPOCH - timedelta(days=offset) for offset in range(0, 800)]
+
+WRITE_METHODS = ('executemany', 'bulk_create')
+
+SPECIALTY_PROFILES = {
+    'Cardiology': {
+        'diagnoses': ['Coronary Artery Disease', 'Atrial Fibrillation', 'Heart Failure',
+                      'Essential Hypertension', 'Peripheral Artery Disease'],
+        'treatments': ['Atorvastatin', 'Metoprolol', 'Lisinopril', 'Apixaban', 'Furosemide', 'Aspirin'],
+    },
+    'Endocrinology': {
+        'diagnoses': ['Type 2 Diabetes Mellitus', 'Hypothyroidism', 'Metabolic Syndrome',
+                      'Osteoporosis', 'Type 1 Diabetes Mellitus'],
+        'treatments': ['Metformin', 'Semaglutide', 'Insulin Glargine', 'Empagliflozin', 'Levothyroxine', 'Alendronate'],
+    },
+    'Oncology': {
+        'diagnoses': ['Breast Cancer', 'Lung Cancer', 'Colorectal Cancer', 'Prostate Cancer', 'Lymphoma'],
+        'treatments': ['Pembrolizumab', 'Tamoxifen', 'Carboplatin', 'Rituximab', 'Radiation Therapy', 'Ondansetron'],
+    },
+    'Neurology': {
+        'diagnoses': ['Migraine', 'Epilepsy', 'Multiple Sclerosis', 'Parkinson Disease', 'Peripheral Neuropathy'],
+        'treatments': ['Sumatriptan', 'Levetiracetam', 'Topiramate', 'Levodopa', 'Ocrelizumab', 'Gabapentin'],
+    },
+    'Internal Medicine': {
+        'diagnoses': ['Type 2 Diabetes Mellitus', 'Essential Hypertension', 'Hyperlipidemia',
+                      'Chronic Kidney Disease', 'Osteoarthritis'],
+        'treatments': ['Metformin', 'Lisinopril', 'Atorvastatin', 'Amlodipine', 'Acetaminophen', 'Losartan'],
+    },
+}
+
+COMORBIDITIES = ['Obesity', 'Chronic Kidney Disease', 'Depression', 'Hyperlipidemia', 'COPD', 'Anemia']
+RISK_FACTORS = ['Smoking', 'Obesity', 'Family history', 'Sedentary lifestyle', 'None identified']
+FAMILY_HISTORY = ['Cardiovascular disease', 'Diabetes', 'Cancer', 'None significant']
+AGE_GROUPS = ['18-25', '26-35', '36-45', '46-55', '56-65', '66-75', '76+']
+AGE_WEIGHTS = [0.06, 0.10, 0.14, 0.18, 0.22, 0.18, 0.12]
+GENDERS = ['M', 'F', 'O']
+RACES = ['WHITE', 'BLACK', 'ASIAN', 'NATIVE', 'PACIFIC', 'OTHER']
+ETHNICITIES = ['HISPANIC', 'NON_HISPANIC', 'UNKNOWN']
+ADHERENCE = ['Excellent', 'Good', 'Fair', 'Poor']
+VISIT_FREQUENCY = ['Monthly', 'Quarterly', 'As needed', 'Weekly']
+INSURANCE = ['Private', 'Medicare', 'Medicaid', 'Uninsured']
+MEDICATION_ACCESS = ['Good', 'Limited', 'Excellent', 'Poor']
+OUTCOMES = ['IMPROVED', 'STABLE', 'DETERIORATED', 'UNKNOWN']
+
+# (name, unit, normal low, normal high, data type); same panel as seed_patient_data
+MEASUREMENTS = [
+    ('Hemoglobin A1c', '%', 4.0, 6.5, 'LAB_RESULT'),
+    ('Blood Pressure Systolic', 'mmHg', 90, 140, 'VITAL_SIGN'),
+    ('LDL Cholesterol', 'mg/dL', 70, 130, 'LAB_RESULT'),
+    ('eGFR', 'mL/min/1.73m²', 60, 120, 'LAB_RESULT'),
+    ('Blood Pressure Diastolic', 'mmHg', 60, 90, 'VITAL_SIGN'),
+    ('Glucose', 'mg/dL', 70, 100, 'LAB_RESULT'),
+    ('Heart Rate', 'bpm', 60, 100, 'VITAL_SIGN'),
+    ('Total Cholesterol', 'mg/dL', 120, 200, 'LAB_RESULT'),
+    ('Creatinine', 'mg/dL', 0.6, 1.2, 'LAB_RESULT'),
+    ('Oxygen Saturation', '%', 95, 100, 'VITAL_SIGN'),
+]
+
+PATIENT_FIELDS = [
+    'id', 'patient_id', 'hcp_id', 'age_group', 'gender', 'race', 'ethnicity', 'zip_code_prefix',
+    'primary_diagnosis', 'secondary_diagnoses', 'comorbidities', 'current_treatments',
+    'treatment_history', 'medication_adherence', 'last_lab_values', 'vital_signs',
+    'last_visit_date', 'visit_frequency', 'emergency_visits_6m', 'hospitalizations_6m',
+    'risk_factors', 'family_history', 'insurance_type', 'medication_access', 'risk_score',
+    'created_date', 'last_updated',
+]
+OUTCOME_FIELDS = [
+    'id', 'patient_id', 'treatment', 'outcome', 'outcome_date', 'notes', 'side_effects', 'duration_months',
+]
+DATA_POINT_FIELDS = [
+    'id', 'patient_id', 'data_type', 'metric_name', 'value', 'numeric_value', 'unit', 'date_recorded',
+    'is_abnormal', 'severity',
+]
+CLUSTER_FIELDS = [
+    'id', 'hcp_id', 'name', 'cluster_type', 'description', 'patient_count', 'avg_risk_score',
+    'primary_diagnosis', 'common_treatments', 'success_rate', 'cluster_center', 'features_used',
+    'created_date', 'last_updated',
+]
+MEMBERSHIP_FIELDS = ['id', 'patient_id', 'cluster_id', 'similarity_score', 'assigned_date']
+
+
+def specialty_profile(specialty: str) -> Dict:
+    """Diagnosis/treatment vocabulary for a specialty, matched loosely by name"""
+    lowered = (specialty or '').lower()
+    for name, profile in SPECIALTY_PROFILES.items():
+        if name.lower() in lowered:
+            return profile
+    return SPECIALTY_PROFILES['Internal Medicine']
+
+
+def _combination_labels(terms: List[str]) -> List[str]:
+    """'; '-joined label for every bitmask over `terms`"""
+    return ['; '.join(term for bit, term in enumerate(terms) if mask >> bit & 1)
+            for mask in range(1 << len(terms))]
+
+
+def _bitmask(flags: np.ndarray) -> np.ndarray:
+    return flags.astype(np.int64) @ (1 << np.arange(flags.shape[1], dtype=np.int64))
+
+
+def _pick(rng: np.random.Generator, values: List, count: int, weights=None) -> List:
+    weights = np.asarray(weights, dtype=float) / np.sum(weights) if weights is not None else None
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=count, p=weights)].tolist()
+
+
+def _format_measurements(values: np.ndarray, unit: str) -> List[str]:
+    return np.char.add(np.char.mod('%.1f', values), f' {unit}').tolist()
+
+
+def generate_hcp_batch(task: Tuple) -> Dict:
+    """
+    Generate one HCP's patients column by column.
+
+    Runs without touching the database so it can execute in a worker process.
+    The random stream is keyed by (seed, hcp_index), so output is identical
+    regardless of worker count or batch size.
+    """
+    seed, hcp_index, hcp_id, specialty, count, offset, data_points, prefix = task
+    rng = np.random.default_rng([seed, hcp_index])
+    profile = specialty_profile(specialty)
+    diagnoses = profile['diagnoses']
+    treatments = profile['treatments']
+
+    # Demographics
+    age_index = rng.choice(len(AGE_GROUPS), size=count, p=AGE_WEIGHTS)
+    diagnosis_weights = 1.0 / np.arange(1, len(diagnoses) + 1)
+    diagnosis_index = rng.choice(len(diagnoses), size=count, p=diagnosis_weights / diagnosis_weights.sum())
+    adherence_index = rng.choice(len(ADHERENCE), size=count, p=[0.25, 0.4, 0.25, 0.1])
+
+    # Multi-valued text columns are built from bitmasks and a label lookup
+    treatment_flags = rng.random((count, len(treatments))) < 0.25
+    treatment_flags[np.arange(count), diagnosis_index % len(treatments)] = True
+    comorbidity_flags = rng.random((count, len(COMORBIDITIES))) < (0.04 + 0.03 * age_index)[:, None]
+    secondary_flags = rng.random((count, len(COMORBIDITIES))) < 0.08
+    history_flags = rng.random((count, len(treatments))) < 0.2
+
+    treatment_labels = _combination_labels(treatments)
+    comorbidity_labels = _combination_labels(COMORBIDITIES)
+    current_treatments = [treatment_labels[m] for m in _bitmask(treatment_flags).tolist()]
+    treatment_history = [treatment_labels[m] for m in _bitmask(history_flags).tolist()]
+    comorbidities = [comorbidity_labels[m] for m in _bitmask(comorbidity_flags).tolist()]
+    secondary = [comorbidity_labels[m] for m in _bitmask(secondary_flags).tolist()]
+
+    # Measurements, shifted by diagnosis and age so the data has structure
+    diagnosis_names = np.asarray(diagnoses, dtype=object)[diagnosis_index]
+    diabetic = np.char.find(diagnosis_names.astype(str), 'Diabetes') >= 0
+    hypertensive = np.char.find(diagnosis_names.astype(str), 'Hypertension') >= 0
+    measurements = {}
+    for name, unit, low, high, _ in MEASUREMENTS:
+        values = rng.normal((low + high) / 2, (high - low) / 3.2, size=count)
+        if name in ('Hemoglobin A1c', 'Glucose'):
+            values += diabetic * (high - low) * 0.8
+        elif name == 'Blood Pressure Systolic':
+            values += hypertensive * 22 + age_index * 2.5
+        elif name == 'eGFR':
+            values -= age_index * 4
+        measurements[name] = np.round(np.clip(values, low * 0.4, high * 1.8), 1)
+
+    lab_names = [m for m in MEASUREMENTS if m[4] == 'LAB_RESULT']
+    vital_names = [m for m in MEASUREMENTS if m[4] == 'VITAL_SIGN']
+    lab_columns = [_format_measurements(measurements[m[0]], m[1]) for m in lab_names]
+    vital_columns = [_format_measurements(measurements[m[0]], m[1]) for m in vital_names]
+    lab_keys = [m[0] for m in lab_names]
+    vital_keys = [m[0] for m in vital_names]
+    last_lab_values = [dict(zip(lab_keys, row)) for row in zip(*lab_columns)]
+    vital_signs = [dict(zip(vital_keys, row)) for row in zip(*vital_columns)]
+
+    visit_days = rng.integers(1, 91, size=count)
+    emergency_visits = rng.poisson(0.3 + 0.1 * age_index)
+    hospitalizations = rng.poisson(0.1 + 0.05 * age_index)
+    age_groups = np.asarray(AGE_GROUPS, dtype=object)[age_index].tolist()
+    adherence = np.asarray(ADHERENCE, dtype=object)[adherence_index].tolist()
+    risk_scores = np.round(score_columns(age_groups, emergency_visits, hospitalizations, adherence), 4)
+
+    patients = list(zip(
+        [f'{prefix}{offset + i:08d}' for i in range(count)],
+        [hcp_id] * count,
+        age_groups,
+        _pick(rng, GENDERS, count, [0.48, 0.5, 0.02]),
+        _pick(rng, RACES, count, [0.6, 0.13, 0.06, 0.01, 0.01, 0.19]),
+        _pick(rng, ETHNICITIES, count, [0.18, 0.78, 0.04]),
+        [f'{z:03d}01' for z in rng.integers(100, 1000, size=count).tolist()],
+        diagnosis_names.tolist(),
+        secondary,
+        comorbidities,
+        current_treatments,
+        treatment_history,
+        adherence,
+        last_lab_values,
+        vital_signs,
+        [_DATES[d] for d in visit_days.tolist()],
+        _pick(rng, VISIT_FREQUENCY, count, [0.3, 0.45, 0.2, 0.05]),
+        emergency_visits.tolist(),
+        hospitalizations.tolist(),
+        _pick(rng, RISK_FACTORS, count, [0.2, 0.25, 0.2, 0.15, 0.2]),
+        _pick(rng, FAMILY_HISTORY, count, [0.3, 0.25, 0.15, 0.3]),
+        _pick(rng, INSURANCE, count, [0.5, 0.3, 0.15, 0.05]),
+        _pick(rng, MEDICATION_ACCESS, count, [0.45, 0.2, 0.3, 0.05]),
+        risk_scores.tolist(),
+    ))
+
+    # One outcome per current treatment; adherence and age move the odds
+    outcome_patient, outcome_treatment = np.nonzero(treatment_flags)
+    p_improved = 0.7 - 0.12 * adherence_index[outcome_patient] - 0.02 * age_index[outcome_patient]
+    draw = rng.random(outcome_patient.size)
+    outcome_index = np.select(
+        [draw < p_improved, draw < p_improved + 0.22, draw < p_improved + 0.32],
+        [0, 1, 2], default=3,
+    )
+    outcome_days = visit_days[outcome_patient] + rng.integers(30, 366, size=outcome_patient.size)
+    outcome_labels = np.asarray(OUTCOMES, dtype=object)[outcome_index].tolist()
+    outcome_treatments = np.asarray(treatments, dtype=object)[outcome_treatment].tolist()
+    outcomes = list(zip(
+        outcome_patient.tolist(),
+        outcome_treatments,
+        outcome_labels,
+        [_DATES[min(d, len(_DATES) - 1)] for d in outcome_days.tolist()],
+        [f'Patient showed {o.lower()} response to {t}' for o, t in zip(outcome_labels, outcome_treatments)],
+        [''] * outcome_patient.size,
+        rng.integers(1, 25, size=outcome_patient.size).tolist(),
+    ))
+
+    # EMR data points for the first `data_points` measurements, flagged by the
+    # shared observation evaluator (same thresholds as seed_patient_data)
+    emr_rows = []
+    for name, unit, low, high, data_type in MEASUREMENTS[:data_points]:
+        values = measurements[name]
+        abnormal, severity = evaluate_abnormal([name] * count, values)
+        severity = severity.tolist()
+        recorded = visit_days + rng.integers(0, 31, size=count)
+        emr_rows.extend(zip(
+            range(count),
+            [data_type] * count,
+            [name] * count,
+            _format_measurements(values, unit),
+            values.tolist(),
+            [unit] * count,
+            [_DATES[d] for d in recorded.tolist()],
+            abnormal.tolist(),
+            severity,
+        ))
+
+    risk = np.clip(
+        0.08 * age_index + 0.15 * emergency_visits + 0.2 * hospitalizations
+        + 0.15 * (comorbidity_flags.sum(axis=1) > 1), 0.0, 1.0,
+    )
+
+    return {
+        'hcp_id': hcp_id,
+        'patients': patients,
+        'outcomes': outcomes,
+        'data_points': emr_rows,
+        'diagnosis_index': diagnosis_index,
+        'diagnoses': diagnoses,
+        'treatments': treatments,
+        'treatment_flags': treatment_flags,
+        'outcome_patient': outcome_patient,
+        'outcome_improved': outcome_index == 0,
+        'risk': risk,
+        'similarity': np.round(rng.uniform(0.6, 1.0, size=count), 3),
+    }
+
+
+def _next_ids(models) -> Dict:
+    from django.db.models import Max
+    return {model: (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1 for model in models}
+
+
+def insert_rows(model, fields: List[str], rows: List[Tuple], method: str = 'executemany',
+                batch_size: int = 5000):
+    """Write rows (tuples in `fields` order, primary keys included) in chunks"""
+    from django.db import connection
+    from django.db.models import DateField, JSONField
+
+    if method == 'bulk_create':
+        for start in range(0, len(rows), batch_size):
+            model.objects.bulk_create(
+                [model(**dict(zip(fields, row))) for row in rows[start:start + batch_size]],
+                batch_size=batch_size,
+            )
+        return
+
+    # executemany skips model instantiation; only dates and JSON need adapting
+    model_fields = [model._meta.get_field(name) for name in fields]
+    adapters = [
+        (index, field) for index, field in enumerate(model_fields)
+        if isinstance(field, (DateField, JSONField))
+    ]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(model._meta.db_table),
+        ', '.join(connection.ops.quote_name(field.column) for field in model_fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            if adapters:
+                chunk = [list(row) for row in chunk]
+                for row in chunk:
+                    for index, field in adapters:
+                        row[index] = field.get_db_prep_save(row[index], connection)
+            cursor.executemany(sql, chunk)
+
+
+def write_hcp_batch(batch: Dict, ids: Dict, method: str, batch_size: int, with_clusters: bool,
+                    with_vocabulary: bool = True) -> Dict:
+    """Assign primary keys to a generated batch and write it in one transaction"""
+    from django.db import transaction
+    from .models import AnonymizedPatient, PatientOutcome, EMRDataPoint, PatientCluster, ClusterMembership
+    from .vocabulary import sync_patients
+
+    today = date.today()
+    patient_base = ids[AnonymizedPatient]
+    patient_ids = list(range(patient_base, patient_base + len(batch['patients'])))
+
+    patients = [(pk,) + row + (today, today) for pk, row in zip(patient_ids, batch['patients'])]
+    outcome_base = ids[PatientOutcome]
+    outcomes = [
+        (outcome_base + i, patient_ids[row[0]]) + row[1:]
+        for i, row in enumerate(batch['outcomes'])
+    ]
+    point_base = ids[EMRDataPoint]
+    data_points = [
+        (point_base + i, patient_ids[row[0]]) + row[1:]
+        for i, row in enumerate(batch['data_points'])
+    ]
+
+    clusters, memberships = [], []
+    if with_clusters:
+        clusters, memberships = _diagnosis_clusters(batch, patient_ids, ids, today)
+
+    with transaction.atomic():
+        insert_rows(AnonymizedPatient, PATIENT_FIELDS, patients, method, batch_size)
+        insert_rows(PatientOutcome, OUTCOME_FIELDS, outcomes, method, batch_size)
+        insert_rows(EMRDataPoint, DATA_POINT_FIELDS, data_points, method, batch_size)
+        if clusters:
+            insert_rows(PatientCluster, CLUSTER_FIELDS, clusters, method, batch_size)
+            insert_rows(ClusterMembership, MEMBERSHIP_FIELDS, memberships, method, batch_size)
+        if with_vocabulary:
+            # Raw inserts skip post_save, so build the vocabulary links here
+            sync_patients(patient_ids)
+
+    ids[AnonymizedPatient] += len(patients)
+    ids[PatientOutcome] += len(outcomes)
+    ids[EMRDataPoint] += len(data_points)
+    ids[PatientCluster] += len(clusters)
+    ids[ClusterMembership] += len(memberships)
+    return {
+        'patients': len(patients),
+        'outcomes': len(outcomes),
+        'data_points': len(data_points),
+        'clusters': len(clusters),
+        'memberships': len(memberships),
+    }
+
+
+def _diagnosis_clusters(batch: Dict, patient_ids: List[int], ids: Dict, today: date):
+    """One DIAGNOSIS cluster per diagnosis present, with success rates from the outcomes"""
+    from .models import PatientCluster, ClusterMembership
+
+    diagnosis_index = batch['diagnosis_index']
+    n_diagnoses = len(batch['diagnoses'])
+    sizes = np.bincount(diagnosis_index, minlength=n_diagnoses)
+    outcome_diagnosis = diagnosis_index[batch['outcome_patient']]
+    outcome_totals = np.bincount(outcome_diagnosis, minlength=n_diagnoses)
+    improved = np.bincount(outcome_diagnosis, weights=batch['outcome_improved'], minlength=n_diagnoses)
+    risk_sums = np.bincount(diagnosis_index, weights=batch['risk'], minlength=n_diagnoses)
+    treatment_counts = np.zeros((n_diagnoses, len(batch['treatments'])))
+    np.add.at(treatment_counts, diagnosis_index, batch['treatment_flags'])
+
+    clusters, memberships = [], []
+    cluster_ids = {}
+    for index in np.flatnonzero(sizes).tolist():
+        cluster_id = ids[PatientCluster] + len(clusters)
+        cluster_ids[index] = cluster_id
+        diagnosis = batch['diagnoses'][index]
+        top_treatments = [batch['treatments'][t] for t in np.argsort(-treatment_counts[index])[:3]]
+        clusters.append((
+            cluster_id, batch['hcp_id'], f'{diagnosis} Cohort', 'DIAGNOSIS',
+            f'Patients with {diagnosis}', int(sizes[index]),
+            round(float(risk_sums[index] / sizes[index]), 3), diagnosis, ', '.join(top_treatments),
+            round(float(improved[index] / outcome_totals[index]), 3) if outcome_totals[index] else 0.0,
+            {}, ['primary_diagnosis'], today, today,
+        ))
+
+    membership_base = ids[ClusterMembership]
+    for i, (pk, index, similarity) in enumerate(zip(
+            patient_ids, diagnosis_index.tolist(), batch['similarity'].tolist())):
+        memberships.append((membership_base + i, pk, cluster_ids[index], similarity, today))
+    return clusters, memberships
+
+
+def generate_synthetic_patients(hcps: List[Tuple[int, str]], total: int, seed: int = 42,
+                                workers: int = 1, method: str = 'executemany', batch_size: int = 5000,
+                                data_points: int = 4, with_clusters: bool = False,
+                                with_vocabulary: bool = True, prefix: str = 'SYN',
+                                progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Generate `total` patients spread evenly across `hcps` ((id, specialty) pairs).
+
+    Generation can fan out over a process pool by HCP; the parent process does
+    all database writes in HCP order, which keeps SQLite single-writer and the
+    assigned primary keys deterministic.
+    """
+    from django.core.management.color import no_style
+    from django.db import connection
+    from .models import AnonymizedPatient, PatientOutcome, EMRDataPoint, PatientCluster, ClusterMembership
+    from .versioning import CLUSTERS, PATIENTS, bump_version
+
+    if method not in WRITE_METHODS:
+        raise ValueError(f'Unknown write method: {method}')
+    if not hcps:
+        raise ValueError('At least one HCP is required')
+
+    per_hcp, extra = divmod(total, len(hcps))
+    tasks = []
+    offset = 0
+    for index, (hcp_id, specialty) in enumerate(hcps):
+        count = per_hcp + (1 if index < extra else 0)
+        if count:
+            tasks.append((seed, index, hcp_id, specialty, count, offset, data_points, prefix))
+        offset += count
+
+    models = [AnonymizedPatient, PatientOutcome, EMRDataPoint, PatientCluster, ClusterMembership]
+    ids = _next_ids(models)
+    totals = {'patients': 0, 'outcomes': 0, 'data_points': 0, 'clusters': 0, 'memberships': 0}
+
+    def consume(batch):
+        written = write_hcp_batch(batch, ids, method, batch_size, with_clusters, with_vocabulary)
+        for key, value in written.items():
+            totals[key] += value
+        if progress:
+            progress(totals)
+
+    if workers > 1:
+        # Bounded window of in-flight batches so memory stays flat at 1M patients
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(generate_hcp_batch, task))
+                if len(pending) >= workers * 2:
+                    consume(pending.popleft().result())
+            while pending:
+                consume(pending.popleft().result())
+    else:
+        for task in tasks:
+            consume(generate_hcp_batch(task))
+
+    # Explicit primary keys bypass sequences on PostgreSQL; move them past the new rows
+    with connection.cursor() as cursor:
+        for statement in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(statement)
+
+    # Raw inserts skip the signals that invalidate cluster-derived caches and cohort bitmaps
+    bump_version(CLUSTERS)
+    bump_version(PATIENTS)
+
+    return totals
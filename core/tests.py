@@ -1,3 +1,665 @@
-from django.test import TestCase
+import io
+import random
+import threading
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, modify_settings
+from django.utils import timezone
+import numpy as np
+
+from .cohorts import (
+    CohortQueryError, bitmap_to_ids, cohort_overlap, cohort_queryset, definition_bitmap, definition_digest,
+    ids_to_bitmap, intersection, refresh_cohort_counts, union,
+)
+from .hcp_dedup import MATCH_THRESHOLD, Provider, contact_keys, deduplicate, match_score, name_tokens, specialty_key
+from .models import (
+    HCP, AnalyticsWatermark, AnonymizedPatient, EMRDataPoint, HCPMerge, HCPTermRollup, PatientCohort,
+    PatientCondition, PatientIssueAnalysis, PatientOutcome, PatientRiskFactor, PatientTreatment, ResearchUpdate,
+    ScheduledJob, ScrapedResearch, TreatmentOutcomeStat, UrlCheck, UserProfile,
+)
+from .observations import latest_values, metric_rollups
+from .outcome_stats import WATERMARK, outcome_stats, rebuild_outcome_stats, refresh_outcome_stats
+from .relevance import (
+    DECAY_DAYS, apply_features, refresh_relevance_scores, relevance_at, relevance_key, with_current_relevance,
+)
+from .research_index import find_research, research_candidates, research_candidates_bulk
+from .research_scraper import HIGH_IMPACT_KEYWORDS, SPECIALTY_KEYWORDS, research_classifier
+from .scheduler import acquire_lease, get_jobs, parse_schedule, release_lease, run_job
+from .text_classifier import PhraseMatcher
+from .url_validation import flag_dead_links, validate_urls
+from .views.recommendations import analyze_patient_issues
+from .versioning import PATIENTS, get_version
+from .vocabulary import defer_rollups, rebuild_rollups, top_terms
+
+_patient_numbers = count(1)
+
+
+def make_patient(hcp, **fields):
+    values = {
+        'patient_id': f'T{next(_patient_numbers):06d}', 'hcp': hcp, 'age_group': '46-55', 'gender': 'F',
+        'race': 'WHITE', 'ethnicity': 'NON_HISPANIC', 'zip_code_prefix': '10001', 'primary_diagnosis': 'Hypertension',
+        'last_visit_date': date(2026, 1, 15), 'visit_frequency': 'Monthly',
+    }
+    values.update(fields)
+    return AnonymizedPatient.objects.create(**values)
+
+
+class SchedulerLeaseTests(TestCase):
+    def setUp(self):
+        self.job = {'command': 'check', 'args': [], 'schedule': parse_schedule('every 1h'), 'jitter': 0, 'lease': 60}
+        ScheduledJob.objects.create(name='nightly', next_run_at=timezone.now() - timedelta(minutes=1))
+
+    def test_live_lease_is_exclusive(self):
+        now = timezone.now()
+        self.assertTrue(acquire_lease('nightly', 'a', 60, due_by=now))
+        self.assertFalse(acquire_lease('nightly', 'b', 60, due_by=now))
+        self.assertFalse(acquire_lease('nightly', 'b', 60))
+        release_lease('nightly', 'a')
+        self.assertTrue(acquire_lease('nightly', 'b', 60, due_by=now))
+
+    def test_expired_lease_can_be_claimed(self):
+        ScheduledJob.objects.filter(name='nightly').update(
+            lease_owner='crashed', lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertTrue(acquire_lease('nightly', 'b', 60, due_by=timezone.now()))
+        self.assertEqual(ScheduledJob.objects.get(name='nightly').lease_owner, 'b')
+
+    def test_scheduled_run_happens_once_per_due_time(self):
+        # A second replica that saw the job as due before the first finished must not run it again
+        first = run_job('nightly', self.job, owner='a')
+        second = run_job('nightly', self.job, owner='b')
+        self.assertEqual(first.status, 'SUCCESS')
+        self.assertIsNone(second)
+        job = ScheduledJob.objects.get(name='nightly')
+        self.assertGreater(job.next_run_at, timezone.now())
+        self.assertEqual(job.lease_owner, '')
+        self.assertEqual(job.runs.count(), 1)
+
+    def test_forced_run_ignores_schedule_but_not_live_lease(self):
+        ScheduledJob.objects.filter(name='nightly').update(next_run_at=timezone.now() + timedelta(hours=1))
+        self.assertIsNone(run_job('nightly', self.job, owner='a'))
+        self.assertEqual(run_job('nightly', self.job, owner='a', force=True).status, 'SUCCESS')
+
+        acquire_lease('nightly', 'b', 60)
+        self.assertIsNone(run_job('nightly', self.job, owner='a', force=True))
+
+    def test_default_jobs_run_known_commands(self):
+        jobs = get_jobs()
+        self.assertEqual(jobs['recommendations']['command'], 'generate_recommendations')
+        self.assertEqual(jobs['clustering']['command'], 'enhanced_clustering')
+
+    def test_failed_command_is_recorded(self):
+        with self.assertLogs('core.scheduler', 'ERROR'):
+            run = run_job('nightly', dict(self.job, args=['no_such_app']), owner='a')
+        self.assertEqual(run.status, 'FAILED')
+        self.assertIn('no_such_app', run.output)
+
+
+class CohortDefinitionTests(TestCase):
+    def setUp(self):
+        cache.clear()  # Bitmaps are keyed by a data version that restarts with every test
+        self.cardiology = HCP.objects.create(name='Dr. Ann Lee', specialty='Cardiology', contact_info='')
+        self.oncology = HCP.objects.create(name='Dr. Ben Roe', specialty='Oncology', contact_info='')
+        self.old_diabetic = make_patient(
+            self.cardiology, age_group='66-75', primary_diagnosis='Type 2 Diabetes',
+            current_treatments='Metformin; Lisinopril', emergency_visits_6m=3,
+        )
+        self.young_diabetic = make_patient(
+            self.cardiology, age_group='26-35', primary_diagnosis='Type 2 Diabetes', current_treatments='Insulin',
+        )
+        self.hypertensive = make_patient(
+            self.oncology, age_group='56-65', comorbidities='Type 2 Diabetes, Obesity', current_treatments='Metformin',
+        )
+
+    def members(self, definition):
+        return set(cohort_queryset(definition).values_list('id', flat=True))
+
+    def test_predicates(self):
+        self.assertEqual(self.members('diagnosis = "type 2  diabetes"'), {self.old_diabetic.id, self.young_diabetic.id})
+        self.assertEqual(self.members('condition = "Type 2 Diabetes"'),
+                         {self.old_diabetic.id, self.young_diabetic.id, self.hypertensive.id})
+        self.assertEqual(self.members('age_group >= "56-65"'), {self.old_diabetic.id, self.hypertensive.id})
+        self.assertEqual(self.members('er_visits > 2'), {self.old_diabetic.id})
+        self.assertEqual(self.members('specialty = "oncology"'), {self.hypertensive.id})
+        self.assertEqual(self.members('treatment in ("Insulin", "Lisinopril")'),
+                         {self.old_diabetic.id, self.young_diabetic.id})
+        self.assertEqual(self.members('treatment != "Metformin"'), {self.young_diabetic.id})
+
+    def test_boolean_structure(self):
+        self.assertEqual(
+            self.members('diagnosis = "Type 2 Diabetes" and not (age_group < "36-45" or er_visits >= 5)'),
+            {self.old_diabetic.id},
+        )
+        self.assertEqual(self.members('hcp = %d or treatment = "Insulin"' % self.oncology.id),
+                         {self.young_diabetic.id, self.hypertensive.id})
+
+    def test_invalid_definitions(self):
+        for definition in ['', 'blood_type = "A"', 'diagnosis > "Flu"', 'age_group = "50s"',
+                           'er_visits >= many', 'diagnosis = "Flu" and', 'diagnosis = "Flu" ; drop']:
+            with self.subTest(definition=definition), self.assertRaises(CohortQueryError):
+                cohort_queryset(definition)
+
+    def test_digest_ignores_spacing_and_keyword_case(self):
+        self.assertEqual(definition_digest('er_visits>=2 AND treatment IN ("A","B")'),
+                         definition_digest('er_visits >= 2 and treatment in ( "A", "B" )'))
+        self.assertNotEqual(definition_digest('er_visits >= 2'), definition_digest('er_visits >= 3'))
+
+    def test_bitmap_operations(self):
+        ids = [3, 64, 65, 1000]
+        self.assertEqual(bitmap_to_ids(ids_to_bitmap(ids)), ids)
+        self.assertEqual(bitmap_to_ids(ids_to_bitmap(ids), limit=3), [3, 64, 65])
+        self.assertEqual(bitmap_to_ids(ids_to_bitmap(ids), limit=10), ids)
+        self.assertEqual(ids_to_bitmap([]), 0)
+        self.assertEqual(bitmap_to_ids(intersection(ids_to_bitmap([1, 2, 3]), ids_to_bitmap([2, 3, 4]))), [2, 3])
+        self.assertEqual(bitmap_to_ids(union(ids_to_bitmap([1]), ids_to_bitmap([70]))), [1, 70])
+
+        diabetes = PatientCohort.objects.create(
+            name='Diabetes', description='', condition='Diabetes', specialty='Cardiology', patient_count=0,
+            definition='condition = "Type 2 Diabetes"',
+        )
+        metformin = PatientCohort.objects.create(
+            name='Metformin', description='', condition='Diabetes', specialty='Cardiology', patient_count=0,
+            definition='treatment = "Metformin"',
+        )
+        overlap = cohort_overlap([diabetes, metformin])
+        self.assertEqual(overlap['sizes'], {diabetes.id: 3, metformin.id: 2})
+        self.assertEqual(overlap['pairs'], [{'a': diabetes.id, 'b': metformin.id, 'intersection': 2}])
+        self.assertEqual(overlap['union'], 3)
+
+    def test_bitmap_follows_patient_changes(self):
+        definition = 'treatment = "Insulin"'
+        self.assertEqual(bitmap_to_ids(definition_bitmap(definition)), [self.young_diabetic.id])
+        self.hypertensive.current_treatments = 'Insulin'
+        self.hypertensive.save(update_fields=['current_treatments'])
+        self.assertEqual(bitmap_to_ids(definition_bitmap(definition)), [self.young_diabetic.id, self.hypertensive.id])
+
+    def test_version_bumps_only_for_fields_definitions_read(self):
+        version = get_version(PATIENTS)
+        self.old_diabetic.save(update_fields=['family_history'])
+        self.assertEqual(get_version(PATIENTS), version)
+        self.old_diabetic.save(update_fields=['gender'])
+        self.assertEqual(get_version(PATIENTS), version + 1)
+        self.oncology.specialty = 'Hematology'
+        self.oncology.save(update_fields=['specialty'])
+        self.assertEqual(get_version(PATIENTS), version + 2)
+
+    def test_counts_survive_missing_vocabulary(self):
+        cohort = PatientCohort.objects.create(
+            name='Diabetes', description='', condition='Diabetes', specialty='Cardiology', patient_count=25,
+            definition='diagnosis = "Type 2 Diabetes"',
+        )
+        refresh_cohort_counts([cohort])
+        self.assertEqual(PatientCohort.objects.get(id=cohort.id).patient_count, 2)
+
+        # A database whose links were never built must keep the stored count rather than drop to 0
+        for model in (PatientCondition, PatientTreatment, PatientRiskFactor):
+            model.objects.all().delete()
+        cache.clear()
+        cohort.refresh_from_db()
+        with self.assertLogs('core.cohorts', 'WARNING'):
+            refresh_cohort_counts([cohort])
+        self.assertEqual(PatientCohort.objects.get(id=cohort.id).patient_count, 2)
+
+    # The read alias is a separate connection that cannot see this test's uncommitted rows
+    @modify_settings(MIDDLEWARE={'remove': 'core.db_tuning.ReadOnlyRequestMiddleware'})
+    def test_preview_and_overlap_are_for_hcrs(self):
+        hcp_user = User.objects.create_user('hcp-user', password='pw')
+        hcr_user = User.objects.create_user('hcr-user', password='pw')
+        UserProfile.objects.create(user=hcp_user, role='HCP')
+        UserProfile.objects.create(user=hcr_user, role='HCR')
+        cohort = PatientCohort.objects.create(
+            name='Insulin', description='', condition='Diabetes', specialty='Cardiology', patient_count=0,
+            definition='treatment = "Insulin"',
+        )
+        preview_url = '/dashboard/api/cohorts/preview/?definition=' + 'treatment%20%3D%20%22Insulin%22'
+        overlap_url = f'/dashboard/api/cohorts/overlap/?ids={cohort.id}'
+
+        self.client.force_login(hcp_user)
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.client.get(preview_url).status_code, 403)
+            self.assertEqual(self.client.get(overlap_url).status_code, 403)
+        self.client.force_login(hcr_user)
+        response = self.client.get(preview_url).json()
+        self.assertEqual((response['patient_count'], response['sample_patient_ids']), (1, [self.young_diabetic.id]))
+        self.assertEqual(self.client.get(overlap_url).json()['sizes'], {str(cohort.id): 1})
+
+
+def provider(name, specialty='Cardiology', contact_info=''):
+    return Provider(
+        id=0, name=name, specialty=specialty, contact_info=contact_info, user_id=None,
+        tokens=name_tokens(name), specialty_key=specialty_key(specialty), contacts=contact_keys(contact_info),
+    )
+
+
+class HCPDeduplicationTests(TestCase):
+    def test_contact_keys(self):
+        self.assertEqual(contact_keys('Alice@Clinic.org, (555) 123-4567'), {'email:alice@clinic.org', 'phone:5551234567'})
+        self.assertEqual(contact_keys('ext 12'), set())
+
+    def test_initial_match_within_specialty_merges(self):
+        self.assertGreaterEqual(match_score(provider('Dr. Alice Smith'), provider('A. Smith, MD')), MATCH_THRESHOLD)
+        self.assertLess(match_score(provider('Dr. Alice Smith'), provider('A. Smith', 'Oncology')), MATCH_THRESHOLD)
+
+    def test_spelling_change_needs_more_evidence(self):
+        john, joan = provider('John Smith', contact_info='js@a.org'), provider('Joan Smith', contact_info='js@a.org')
+        self.assertLess(match_score(provider('John Smith'), provider('Joan Smith')), MATCH_THRESHOLD)
+        self.assertGreaterEqual(match_score(john, joan), MATCH_THRESHOLD)
+
+    def test_contacts_conflict_only_within_a_type(self):
+        plain = match_score(provider('Alice Smith'), provider('A. Smith'))
+        email_only = provider('Alice Smith', contact_info='alice@a.org')
+        phone_only = provider('A. Smith', contact_info='555-123-4567')
+        other_email = provider('A. Smith', contact_info='asmith@b.org')
+        self.assertEqual(match_score(email_only, phone_only), plain)
+        self.assertLess(match_score(email_only, other_email), plain)
+        self.assertLess(match_score(email_only, other_email), MATCH_THRESHOLD)
+
+    def test_merge_repoints_rows_and_rebuilds_derived_tables(self):
+        user = User.objects.create_user('asmith', password='pw')
+        survivor = HCP.objects.create(name='Dr. Alice Smith', specialty='Cardiology', contact_info='alice@a.org', user=user)
+        duplicate = HCP.objects.create(name='A. Smith MD', specialty='Cardiology', contact_info='555-123-4567')
+        other = HCP.objects.create(name='Dr. Bob Jones', specialty='Cardiology', contact_info='')
+        make_patient(survivor, primary_diagnosis='Hypertension')
+        moved = [make_patient(duplicate, primary_diagnosis='Hypertension') for _ in range(2)]
+        make_patient(other, primary_diagnosis='Hypertension')
+        PatientOutcome.objects.create(patient=moved[0], treatment='Lisinopril', outcome='IMPROVED', outcome_date=date(2026, 2, 1))
+
+        groups, stats = deduplicate()
+
+        self.assertEqual([(g.survivor.id, [d.id for d, _ in g.duplicates]) for g in groups], [(survivor.id, [duplicate.id])])
+        self.assertEqual((stats['merged'], stats['patients_moved']), (1, 2))
+        self.assertFalse(HCP.objects.filter(id=duplicate.id).exists())
+        self.assertEqual(AnonymizedPatient.objects.filter(hcp=survivor).count(), 3)
+        self.assertEqual(AnonymizedPatient.objects.filter(hcp=other).count(), 1)
+        self.assertEqual(HCPTermRollup.objects.get(hcp=survivor, kind='DIAGNOSIS', term='Hypertension').count, 3)
+        self.assertEqual(TreatmentOutcomeStat.objects.get(hcp=survivor, treatment='Lisinopril').improved, 1)
+        audit = HCPMerge.objects.get()
+        self.assertEqual((audit.survivor_id, audit.merged_hcp_id, audit.patients_moved), (survivor.id, duplicate.id, 2))
+
+    def test_two_accounts_are_never_merged(self):
+        for username in ('a1', 'a2'):
+            HCP.objects.create(name='Alice Smith', specialty='Cardiology', contact_info='alice@a.org',
+                               user=User.objects.create_user(username, password='pw'))
+        groups, stats = deduplicate()
+        self.assertEqual((groups, stats['merged']), ([], 0))
+
+
+class HCPTermRollupTests(TestCase):
+    def setUp(self):
+        self.first = HCP.objects.create(name='Dr. Ann Lee', specialty='Cardiology', contact_info='')
+        self.second = HCP.objects.create(name='Dr. Ben Roe', specialty='Cardiology', contact_info='')
+
+    def rollups(self):
+        return set(HCPTermRollup.objects.filter(count__gt=0).values_list('hcp_id', 'kind', 'term', 'count'))
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.rollups())
+
+    def test_deltas_match_rebuild(self):
+        patient = make_patient(
+            self.first, primary_diagnosis='Heart Failure', comorbidities='Diabetes; Obesity',
+            current_treatments='Metformin, Lisinopril', risk_factors='Smoking',
+        )
+        make_patient(self.first, primary_diagnosis='Heart Failure', current_treatments='Lisinopril')
+        self.assertMatchesRebuild()
+        self.assertEqual(top_terms(self.first.id, 'TREATMENT', 1), [('Lisinopril', 2)])
+
+        patient.comorbidities = 'Obesity, none'
+        patient.current_treatments = 'Metformin; Metformin'
+        patient.save()
+        self.assertMatchesRebuild()
+
+        patient.hcp = self.second
+        patient.save(update_fields=['hcp'])
+        self.assertMatchesRebuild()
+        self.assertEqual(top_terms(self.second.id, 'DIAGNOSIS', 5), [('Heart Failure', 1)])
+
+        patient.delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(top_terms(self.second.id, 'DIAGNOSIS', 5), [])
+
+    def test_issue_analysis_is_refreshed_in_place(self):
+        make_patient(self.first, primary_diagnosis='Asthma')
+        with redirect_stdout(io.StringIO()):
+            analysis = analyze_patient_issues(self.first.id)
+            make_patient(self.first, primary_diagnosis='Asthma')
+            refreshed = analyze_patient_issues(self.first.id)
+        self.assertEqual(refreshed.id, analysis.id)
+        self.assertEqual(PatientIssueAnalysis.objects.filter(hcp=self.first).count(), 1)
+        refreshed.refresh_from_db()
+        self.assertEqual(refreshed.total_patients_analyzed, 2)
+        self.assertEqual(refreshed.top_diagnoses[0]['frequency'], 2)
+
+    def test_deferred_bulk_delete_rebuilds_once(self):
+        patients = [make_patient(self.first, primary_diagnosis='Asthma') for _ in range(3)]
+        with defer_rollups():
+            AnonymizedPatient.objects.filter(id__in=[patient.id for patient in patients[:2]]).delete()
+        self.assertEqual(top_terms(self.first.id, 'DIAGNOSIS', 5), [('Asthma', 1)])
+        self.assertMatchesRebuild()
+
+
+class OutcomeStatsTests(TestCase):
+    FIELDS = ['hcp_id', 'diagnosis', 'treatment', 'age_group', 'improved', 'stable', 'deteriorated', 'unknown',
+              'total', 'success_rate', 'ci_low', 'ci_high']
+
+    def setUp(self):
+        self.hcp = HCP.objects.create(name='Dr. Ann Lee', specialty='Cardiology', contact_info='')
+        self.other = HCP.objects.create(name='Dr. Ben Roe', specialty='Cardiology', contact_info='')
+        self.patient = make_patient(self.hcp, primary_diagnosis=' Heart   Failure ', age_group='66-75')
+        self.other_patient = make_patient(self.other, primary_diagnosis='Heart Failure', age_group='66-75')
+
+    def outcome(self, patient, outcome, treatment='Lisinopril'):
+        return PatientOutcome(patient=patient, treatment=treatment, outcome=outcome, outcome_date=date(2026, 3, 1))
+
+    def stats(self):
+        return set(TreatmentOutcomeStat.objects.values_list(*self.FIELDS))
+
+    def assertMatchesRebuild(self):
+        incremental = self.stats()
+        rebuild_outcome_stats()
+        self.assertEqual(incremental, self.stats())
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        self.outcome(self.patient, 'IMPROVED').save()  # The post_save signal folds it in
+        self.assertEqual(outcome_stats(hcp_id=self.hcp.id, diagnosis='Heart Failure')['improved'], 1)
+
+        # bulk_create skips the signal; the rows wait past the watermark for the next refresh
+        outcomes = PatientOutcome.objects.bulk_create([
+            self.outcome(self.patient, 'STABLE'), self.outcome(self.patient, 'IMPROVED', ' Lisinopril '),
+            self.outcome(self.other_patient, 'DETERIORATED', 'Metoprolol'),
+        ])
+        self.assertEqual(outcome_stats(treatment='Lisinopril')['total'], 1)
+        self.assertEqual(refresh_outcome_stats(), 3)
+        self.assertEqual(refresh_outcome_stats(), 0)
+        self.assertEqual(AnalyticsWatermark.objects.get(name=WATERMARK).last_id, max(o.id for o in outcomes))
+
+        stats = outcome_stats(hcp_id=self.hcp.id, treatment='Lisinopril')
+        self.assertEqual((stats['total'], stats['improved'], stats['success_rate']), (3, 2, 66.7))
+        self.assertLess(stats['ci_low'], stats['success_rate'])
+        self.assertGreater(stats['ci_high'], stats['success_rate'])
+        self.assertMatchesRebuild()
+
+    def test_full_rebuild_repairs_untracked_edits(self):
+        self.outcome(self.patient, 'IMPROVED').save()
+        self.outcome(self.other_patient, 'IMPROVED').save()
+        PatientOutcome.objects.filter(patient=self.patient).update(outcome='DETERIORATED')
+        self.assertEqual(outcome_stats(hcp_id=self.hcp.id)['improved'], 1)
+
+        mark = AnalyticsWatermark.objects.get(name=WATERMARK).last_id
+        rebuild_outcome_stats([self.hcp.id])
+        self.assertEqual(outcome_stats(hcp_id=self.hcp.id)['deteriorated'], 1)
+        self.assertEqual(outcome_stats(hcp_id=self.other.id)['improved'], 1)
+        self.assertEqual(AnalyticsWatermark.objects.get(name=WATERMARK).last_id, mark)
+        self.assertMatchesRebuild()
+
+
+class RelevanceKeyTests(TestCase):
+    HEADLINES = [
+        'Routine follow-up of hypertension patients',
+        'Randomized clinical trial of a novel statin',
+        'Landmark study: breakthrough in cardiac care',
+        'Meta-analysis of guideline adherence in diabetes',
+    ]
+    SOURCES = ['PubMed', 'Medscape', 'Manual', 'ScienceDaily']
+
+    def setUp(self):
+        self.today = date(2026, 6, 30)
+        ResearchUpdate.objects.bulk_create([
+            ResearchUpdate(**apply_features({
+                'headline': headline, 'specialty': 'Cardiology', 'abstract': 'Outcomes in adults.',
+                'source': self.SOURCES[(index + days) % len(self.SOURCES)],
+                'date': self.today - timedelta(days=days),
+            }, today=self.today))
+            for index, headline in enumerate(self.HEADLINES)
+            for days in (0, 3, 11, 19, 29, 45, 200)
+        ])
+
+    def test_key_is_static_score_plus_scaled_date(self):
+        article = ResearchUpdate.objects.first()
+        self.assertAlmostEqual(article.relevance_key, relevance_key(article.static_score, article.date, self.today))
+
+    def test_key_order_is_current_relevance_order(self):
+        for today in (self.today, self.today + timedelta(days=7), self.today + timedelta(days=20)):
+            with self.subTest(today=today):
+                articles = list(with_current_relevance(today=today).filter(date__gt=today - timedelta(days=DECAY_DAYS)))
+                expected = [relevance_at(a.static_score, a.date, today) for a in articles]
+                for article, relevance in zip(articles, expected):
+                    self.assertAlmostEqual(article.current_relevance, relevance)
+                # Keys were stored once, yet still sort the window by relevance on a later day
+                self.assertEqual(
+                    [round(value, 9) for value in expected],
+                    sorted((round(value, 9) for value in expected), reverse=True),
+                )
+
+    def assertSortedByCurrentRelevance(self, today):
+        relevance = [round(article.current_relevance, 9) for article in with_current_relevance(today=today)]
+        self.assertEqual(relevance, sorted(relevance, reverse=True))
+
+    def test_old_strong_article_outranks_new_weak_one(self):
+        def article(headline, static_score, days_old):
+            published = self.today - timedelta(days=days_old)
+            return ResearchUpdate.objects.create(
+                headline=headline, specialty='Oncology', date=published, static_score=static_score,
+                relevance_key=relevance_key(static_score, published, self.today),
+            )
+
+        old, new = article('Old', 0.7, 60), article('New', 0.3, 0)
+        ranked = with_current_relevance(ResearchUpdate.objects.filter(specialty='Oncology'), today=self.today)
+        self.assertEqual([(a.id, round(a.current_relevance, 9)) for a in ranked], [(old.id, 0.7), (new.id, 0.6)])
+
+    def test_refresh_reclamps_rows_that_left_the_window(self):
+        self.assertSortedByCurrentRelevance(self.today)
+        for days in (7, 20, 90):
+            today = self.today + timedelta(days=days)
+            with self.subTest(today=today):
+                refresh_relevance_scores(today=today)
+                self.assertSortedByCurrentRelevance(today)
+
+    def test_current_relevance_beyond_the_window_is_the_static_score(self):
+        later = self.today + timedelta(days=90)
+        for article in with_current_relevance(today=later):
+            self.assertAlmostEqual(article.current_relevance, min(article.static_score, 1.0))
+
+    def test_refresh_stores_todays_relevance(self):
+        today = self.today + timedelta(days=5)
+        refresh_relevance_scores(today=today)
+        for article in ResearchUpdate.objects.all():
+            self.assertAlmostEqual(article.relevance_score, relevance_at(article.static_score, article.date, today))
+
+
+class PhraseMatcherTests(TestCase):
+    FILLER = ['the', 'patients', 'heartburn', 'painless', 'arthritis', 'of', 'in', '-', ':', 'cardiac-related', 'x']
+
+    def setUp(self):
+        self.rng = random.Random(41)
+        self.classifier = research_classifier()
+        self.vocabulary = sorted(set(self.classifier.matcher.phrases))
+
+    def random_text(self, words=30):
+        pool = self.vocabulary + self.FILLER
+        text = ' '.join(self.rng.choice(pool) for _ in range(words))
+        return text.upper() if self.rng.random() < 0.3 else text
+
+    def test_overlapping_and_embedded_phrases(self):
+        matcher = PhraseMatcher(['pain', 'chronic pain', 'chronic pain management', 'heart', 'art', 'Pain'])
+        self.assertEqual(matcher.present('Chronic Pain Management in heartburn'),
+                         {'pain', 'chronic pain', 'chronic pain management', 'heart', 'art'})
+        self.assertEqual(matcher.present('chronic  pain'), {'pain'})
+        self.assertEqual(PhraseMatcher([]).present('anything'), set())
+
+    def test_matches_substring_checks(self):
+        matcher = self.classifier.matcher
+        for _ in range(300):
+            text = self.random_text()
+            self.assertEqual(matcher.present(text), {phrase for phrase in matcher.phrases if phrase in text.lower()})
+
+    def test_analysis_matches_per_keyword_scoring(self):
+        for _ in range(200):
+            title, abstract = self.random_text(8), self.random_text(25)
+            title_lower, abstract_lower = title.lower(), abstract.lower()
+            text = f'{title_lower} {abstract_lower}'
+            analysis = self.classifier.analyze(title, abstract)
+
+            # Scoring as it was done before the compiled matcher: one substring check per keyword
+            scores = {}
+            for specialty, data in SPECIALTY_KEYWORDS.items():
+                score = 0
+                for keyword in data['keywords']:
+                    if keyword in text:
+                        score += len(keyword.split()) * 2
+                    elif any(word in text for word in keyword.split()):
+                        score += len(keyword.split())
+                scores[specialty] = score
+            self.assertEqual(analysis['scores'], scores)
+            self.assertEqual(self.classifier.matches(analysis, 'relevance', 'title_terms'),
+                             [keyword for keyword in HIGH_IMPACT_KEYWORDS if keyword in title_lower])
+            self.assertEqual(self.classifier.matches(analysis, 'relevance', 'abstract_terms'),
+                             [keyword for keyword in HIGH_IMPACT_KEYWORDS if keyword in abstract_lower])
+
+
+class ObservationTests(TestCase):
+    def setUp(self):
+        hcp = HCP.objects.create(name='Dr. Ann Lee', specialty='Endocrinology', contact_info='')
+        self.measured = make_patient(hcp)
+        self.unmeasured = make_patient(hcp)
+        for metric, value, recorded in [
+            ('Hemoglobin A1c', '7.8 %', date(2026, 3, 1)),
+            ('Hemoglobin A1c', '7.0 %', date(2026, 1, 1)),
+            ('Heart Rate', '72 bpm', date(2026, 2, 1)),
+            ('Pain Level', 'Moderate', date(2026, 2, 1)),
+        ]:
+            EMRDataPoint.objects.create(
+                patient=self.measured, data_type='LAB_RESULT', metric_name=metric, value=value, date_recorded=recorded,
+            )
+
+    def test_rollups_read_the_numeric_column(self):
+        rollups = metric_rollups([self.measured.id])
+        self.assertEqual(set(rollups), {(self.measured.id, 'Hemoglobin A1c'), (self.measured.id, 'Heart Rate')})
+        a1c = rollups[(self.measured.id, 'Hemoglobin A1c')]
+        self.assertEqual((a1c['latest'], a1c['min'], a1c['max'], a1c['count']), (7.8, 7.0, 7.8, 2))
+        self.assertAlmostEqual(a1c['slope_per_day'], 0.8 / 59)
+
+    def test_latest_values_matrix(self):
+        matrix = latest_values([self.unmeasured.id, self.measured.id], ['Heart Rate', 'Hemoglobin A1c', 'Creatinine'])
+        self.assertTrue(np.isnan(matrix[0]).all())
+        self.assertEqual(matrix[1, :2].tolist(), [72.0, 7.8])
+        self.assertTrue(np.isnan(matrix[1, 2]))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/ok answers everything, /no-head rejects HEAD with 405, anything else is 404"""
+    requests = []
+
+    def respond(self):
+        self.requests.append((self.command, self.path))
+        if self.path == '/ok' or (self.path == '/no-head' and self.command == 'GET'):
+            status = 200
+        elif self.path == '/no-head':
+            status = 405
+        else:
+            status = 404
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_HEAD = do_GET = respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UrlValidationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = 'http://127.0.0.1:%d' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubHandler.requests = []
+        self.urls = [self.base + path for path in ('/ok', '/no-head', '/gone')]
+
+    def test_head_falls_back_to_get_and_404_is_dead(self):
+        result = validate_urls(self.urls, workers=3, timeout=5)
+        self.assertEqual(result['status'], {self.urls[0]: True, self.urls[1]: True, self.urls[2]: False})
+        self.assertEqual(result['dead'], [self.urls[2]])
+        self.assertIn(('GET', '/no-head'), StubHandler.requests)
+        self.assertNotIn(('GET', '/ok'), StubHandler.requests)
+        self.assertEqual(UrlCheck.objects.get(url=self.urls[1]).status_code, 200)
+
+    def test_results_inside_the_ttl_come_from_the_cache(self):
+        validate_urls(self.urls, timeout=5)
+        StubHandler.requests = []
+        result = validate_urls(self.urls, timeout=5)
+        self.assertEqual((result['checked'], result['cached']), (0, 3))
+        self.assertEqual(StubHandler.requests, [])
+        self.assertEqual(result['dead'], [self.urls[2]])
+
+        UrlCheck.objects.filter(url=self.urls[0]).update(checked_at=timezone.now() - timedelta(days=2))
+        result = validate_urls(self.urls, timeout=5)
+        self.assertEqual((result['checked'], result['cached']), (1, 2))
+        self.assertEqual(StubHandler.requests, [('HEAD', '/ok')])
+
+    def test_flag_dead_links_sets_and_clears(self):
+        research = {
+            url: ResearchUpdate.objects.create(headline=url, specialty='Cardiology', date=date(2026, 1, 1),
+                                               source_url=url, source_url_dead=url.endswith('/ok'))
+            for url in self.urls
+        }
+        counts = flag_dead_links(validate_urls(self.urls, timeout=5)['status'])
+        self.assertEqual(counts, {'flagged': 1, 'cleared': 1})
+        for article in research.values():
+            article.refresh_from_db()
+        self.assertEqual({url: article.source_url_dead for url, article in research.items()},
+                         {self.urls[0]: False, self.urls[1]: False, self.urls[2]: True})
+
+
+class ResearchIndexTests(TestCase):
+    def setUp(self):
+        def article(title, specialty, relevance, **terms):
+            return ScrapedResearch.objects.create(
+                title=title, abstract='', specialties=[specialty], relevance_score=relevance, **terms,
+            )
+
+        self.both = article('Both', 'Cardiology', 0.5, conditions_mentioned=['Hypertension'],
+                            keywords=['hypertension', 'Statin'])
+        self.relevant = article('Relevant', 'Cardiology', 0.9, conditions_mentioned=['Hypertension'])
+        self.keyword = article('Keyword', 'Cardiology', 0.2, keywords=['statin'])
+        self.oncology = article('Oncology', 'Oncology', 0.7, conditions_mentioned=['Hypertension', 'Statin'])
+        self.treatment = article('Treatment', 'Cardiology', 1.0, treatments_mentioned=['Statin'])
+        self.terms = ['hypertension', ' Statin ']
+
+    def titles(self, articles):
+        return [article.title for article in articles]
+
+    def test_specialty_filter_and_ranking(self):
+        # Ranked by distinct terms matched, then relevance; treatments are a separate field
+        self.assertEqual(self.titles(find_research(conditions=self.terms, keywords=self.terms)),
+                         ['Oncology', 'Both', 'Relevant', 'Keyword'])
+        cardiology = find_research(conditions=self.terms, keywords=self.terms, specialty='cardiology')
+        self.assertEqual(self.titles(cardiology), ['Both', 'Relevant', 'Keyword'])
+        self.assertEqual([article.matched_terms for article in cardiology], [2, 1, 1])
+        self.assertEqual(self.titles(find_research(treatments=['statin'], specialty='Cardiology')), ['Treatment'])
+        self.assertEqual(list(find_research()), [])
+
+    def test_single_and_bulk_candidates_agree(self):
+        for specialty in (None, 'Cardiology', 'Oncology', 'Dermatology'):
+            with self.subTest(specialty=specialty):
+                single = research_candidates(self.terms, specialty)
+                self.assertEqual(single, research_candidates_bulk({'hcp': (self.terms, specialty)})['hcp'])
+        self.assertEqual([c['title'] for c in research_candidates(self.terms, 'Cardiology', limit=2)],
+                         ['Both', 'Relevant'])
@@ -0,0 +1,136 @@
+"""
+Compiled Text Classifier
+Matches whole phrase vocabularies against research text in a single regex pass.
+Phrases are compiled into one prefix-trie regex tried at every position through a
+lookahead; each hit also credits the shorter vocabulary phrases it contains, so
+the result equals a substring check per phrase without rescanning the text.
+"""
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPECIALTY = 'INTERNAL MEDICINE'
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Regex for `phrases` factored by common prefix; greedy, so the longest phrase at a position wins"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class PhraseMatcher:
+    """Which vocabulary phrases occur in a text, case-insensitively, from one scan"""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = sorted({phrase.lower() for phrase in phrases if phrase})
+        self.max_length = max(map(len, self.phrases), default=0)
+        self._regex = re.compile(f'(?=({_trie_pattern(self.phrases)}))') if self.phrases else None
+        # Each phrase with every vocabulary phrase inside it, itself included
+        self._contained = {
+            phrase: frozenset(inner for inner in self.phrases if inner in phrase)
+            for phrase in self.phrases
+        }
+
+    def present_lower(self, text_lower: str) -> Set[str]:
+        """Phrases found in already-lowercased text"""
+        if self._regex is None or not text_lower:
+            return set()
+        found = set()
+        for phrase in set(self._regex.findall(text_lower)):
+            found |= self._contained[phrase]
+        return found
+
+    def present(self, text: str) -> Set[str]:
+        return self.present_lower(text.lower())
+
+
+class TextClassifier:
+    """
+    Specialty scores and named vocabulary hits for a title/abstract pair, all
+    read off one PhraseMatcher pass over "title abstract"
+    """
+
+    def __init__(self, specialty_keywords: Dict[str, Iterable[str]],
+                 vocabularies: Optional[Dict[str, Iterable[str]]] = None,
+                 default_specialty: str = DEFAULT_SPECIALTY):
+        self.specialty_keywords = {
+            specialty: [keyword.lower() for keyword in keywords]
+            for specialty, keywords in specialty_keywords.items()
+        }
+        # (keyword, its words, weight) per specialty; longer keywords weigh more
+        self._scoring = {
+            specialty: [(keyword, keyword.split(), len(keyword.split())) for keyword in keywords]
+            for specialty, keywords in self.specialty_keywords.items()
+        }
+        self.vocabularies = {name: [term.lower() for term in terms] for name, terms in (vocabularies or {}).items()}
+        self.default_specialty = default_specialty
+
+        phrases = set()
+        for keywords in self.specialty_keywords.values():
+            phrases.update(keywords)
+            # Single words back the partial-match fallback for multi-word keywords
+            for keyword in keywords:
+                phrases.update(keyword.split())
+        for terms in self.vocabularies.values():
+            phrases.update(terms)
+        self.matcher = PhraseMatcher(phrases)
+
+    def analyze(self, title: str, abstract: str = '') -> Dict:
+        """
+        Best specialty and per-specialty scores for the combined text, plus the
+        vocabulary phrases found anywhere, in the title alone and in the abstract alone
+        """
+        title_lower = (title or '').lower()
+        abstract_lower = (abstract or '').lower()
+        title_terms = self.matcher.present_lower(title_lower)
+        abstract_terms = self.matcher.present_lower(abstract_lower)
+        # Phrases spanning "title abstract" can only sit within max_length of the join
+        reach = self.matcher.max_length - 1
+        joint = f"{title_lower[-reach:] if reach else ''} {abstract_lower[:reach]}"
+        terms = title_terms | abstract_terms | self.matcher.present_lower(joint)
+
+        scores = self.score_specialties(terms)
+        best = max(scores.items(), key=lambda item: item[1]) if scores else (self.default_specialty, 0)
+        return {
+            'specialty': best[0] if best[1] > 0 else self.default_specialty,
+            'scores': scores,
+            'terms': terms,
+            'title_terms': title_terms,
+            'abstract_terms': abstract_terms,
+        }
+
+    def score_specialties(self, terms: Set[str]) -> Dict[str, int]:
+        """Keyword weight (its word count) doubled for a full match, single when only one of its words appears"""
+        scores = {}
+        for specialty, keywords in self._scoring.items():
+            score = 0
+            for keyword, words, weight in keywords:
+                if keyword in terms:
+                    score += weight * 2
+                elif any(word in terms for word in words):
+                    score += weight
+            scores[specialty] = score
+        return scores
+
+    def classify(self, text: str) -> str:
+        return self.analyze(text)['specialty']
+
+    def matches(self, analysis: Dict, vocabulary: str, where: str = 'terms') -> List[str]:
+        """Phrases of one named vocabulary present in the analysis, in vocabulary order"""
+        found = analysis[where]
+        return [term for term in self.vocabularies[vocabulary] if term in found]
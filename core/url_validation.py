@@ -0,0 +1,148 @@
+"""
+Research URL Validation
+Checks source URLs concurrently (HEAD, falling back to a streamed GET for
+servers that reject HEAD) with a bounded worker pool, caches each result in
+UrlCheck for a TTL and flags ResearchUpdate rows with dead links in bulk
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from django.utils import timezone
+
+from .models import ResearchUpdate, UrlCheck
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 20
+DEFAULT_TIMEOUT = 10  # Seconds per request
+DEFAULT_TTL = timedelta(hours=24)
+WRITE_BATCH_SIZE = 500
+USER_AGENT = 'Mozilla/5.0 (compatible; ProviderPulse link checker)'
+
+# Status codes from servers that refuse or mishandle HEAD but may answer GET
+HEAD_FALLBACK_STATUSES = {403, 404, 405, 429, 500, 501}
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """One pooled session per worker thread"""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+        _local.session.headers['User-Agent'] = USER_AGENT
+    return _local.session
+
+
+def check_url(url: str, timeout: float = DEFAULT_TIMEOUT) -> Dict:
+    """Reachability of one URL: status code, final URL after redirects, error and response time"""
+    session = _session()
+    started = time.perf_counter()
+    result = {'url': url, 'status_code': None, 'is_alive': False, 'final_url': '', 'error': ''}
+    try:
+        response = session.head(url, timeout=timeout, allow_redirects=True)
+        if response.status_code in HEAD_FALLBACK_STATUSES:
+            # Stream so only the headers are read, not the body
+            with session.get(url, timeout=timeout, allow_redirects=True, stream=True) as get_response:
+                response = get_response
+        result.update({
+            'status_code': response.status_code,
+            'is_alive': response.status_code < 400,
+            'final_url': response.url[:500],
+        })
+    except requests.RequestException as e:
+        result['error'] = f"{type(e).__name__}: {e}"[:200]
+    result['response_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def check_urls(urls: Iterable[str], workers: int = DEFAULT_WORKERS,
+               timeout: float = DEFAULT_TIMEOUT) -> List[Dict]:
+    """check_url() for every URL, at most `workers` requests in flight"""
+    urls = list(urls)
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as executor:
+        return list(executor.map(lambda url: check_url(url, timeout), urls))
+
+
+def cached_results(urls: Iterable[str], ttl: timedelta = DEFAULT_TTL) -> Dict[str, UrlCheck]:
+    """UrlCheck rows still within the TTL, by URL"""
+    fresh_after = timezone.now() - ttl
+    urls = list(urls)
+    cached = {}
+    for start in range(0, len(urls), WRITE_BATCH_SIZE):
+        chunk = urls[start:start + WRITE_BATCH_SIZE]
+        for check in UrlCheck.objects.filter(url__in=chunk, checked_at__gte=fresh_after):
+            cached[check.url] = check
+    return cached
+
+
+def save_results(results: List[Dict]):
+    """Upsert check results into UrlCheck in batches"""
+    now = timezone.now()
+    UrlCheck.objects.bulk_create(
+        [UrlCheck(checked_at=now, **result) for result in results],
+        batch_size=WRITE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['url'],
+        update_fields=['status_code', 'is_alive', 'final_url', 'error', 'response_ms', 'checked_at'],
+    )
+
+
+def validate_urls(urls: Iterable[str], ttl: timedelta = DEFAULT_TTL, workers: int = DEFAULT_WORKERS,
+                  timeout: float = DEFAULT_TIMEOUT, refresh: bool = False) -> Dict:
+    """
+    Alive/dead status for each distinct URL, checking only those without a
+    cached result inside the TTL (or all of them with refresh)
+    """
+    urls = sorted({url for url in urls if url})
+    cached = {} if refresh else cached_results(urls, ttl)
+    pending = [url for url in urls if url not in cached]
+
+    started = time.perf_counter()
+    results = check_urls(pending, workers=workers, timeout=timeout)
+    elapsed = time.perf_counter() - started
+    save_results(results)
+
+    status = {url: check.is_alive for url, check in cached.items()}
+    status.update({result['url']: result['is_alive'] for result in results})
+    return {
+        'status': status,
+        'checked': len(results),
+        'cached': len(cached),
+        'dead': sorted(url for url, alive in status.items() if not alive),
+        'seconds': round(elapsed, 2),
+    }
+
+
+def flag_dead_links(status: Dict[str, bool], queryset=None) -> Dict[str, int]:
+    """
+    Set ResearchUpdate.source_url_dead from URL status with one UPDATE per
+    batch of URLs; returns how many rows were newly flagged and cleared
+    """
+    queryset = ResearchUpdate.objects.all() if queryset is None else queryset
+    counts = {'flagged': 0, 'cleared': 0}
+    for alive, key in ((False, 'flagged'), (True, 'cleared')):
+        urls = [url for url, is_alive in status.items() if is_alive == alive]
+        for start in range(0, len(urls), WRITE_BATCH_SIZE):
+            chunk = urls[start:start + WRITE_BATCH_SIZE]
+            counts[key] += queryset.filter(source_url__in=chunk).exclude(source_url_dead=not alive).update(
+                source_url_dead=not alive
+            )
+    return counts
+
+
+def research_urls(queryset=None, limit: Optional[int] = None) -> List[str]:
+    """Distinct non-empty ResearchUpdate source URLs, newest research first"""
+    queryset = ResearchUpdate.objects.all() if queryset is None else queryset
+    urls = (
+        queryset.exclude(source_url__isnull=True).exclude(source_url='')
+        .order_by('-date').values_list('source_url', flat=True)
+    )
+    distinct = list(dict.fromkeys(urls))
+    return distinct[:limit] if limit else distinct
@@ -1,5 +1,5 @@
-from django.urls import path
-from . import views, research_views
+from django.urls import include, path
+from . import api_views, views, research_views, profiler_views, health_views
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
@@ -22,6 +22,11 @@ urlpatterns = [
     path('url-test/', views.url_test, name='url_test'),
     path('api/research/by-specialty/', research_views.get_research_by_specialty, name='research_by_specialty'),
     path('api/research/update/', research_views.trigger_research_update, name='trigger_research_update'),
+    path('api/profiler/', profiler_views.query_profiles, name='query_profiles'),
+    path('api/health/db/', health_views.database_health, name='database_health'),
+    path('api/clusters/', include('core.api_urls')),
+    path('api/cohorts/preview/', api_views.cohort_preview, name='cohort_preview'),
+    path('api/cohorts/overlap/', api_views.cohort_overlap, name='cohort_overlap'),
     # Intelligent Recommendation URLs
     path('hcp/<int:hcp_id>/create-recommendation/', views.create_recommendation, name='create_recommendation'),
     path('recommendation/<int:recommendation_id>/', views.view_recommendation, name='view_recommendation'),
@@ -0,0 +1,28 @@
+"""
+Data Versions
+Per-dataset version stamps bumped whenever the underlying rows change, so
+caches of derived data can be keyed by version instead of expiring on a timer
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion
+
+# Clusters, their memberships and their patients' outcomes
+CLUSTERS = 'clusters'
+# AnonymizedPatient rows and the vocabulary links derived from them
+PATIENTS = 'patients'
+
+
+def get_version(name: str) -> int:
+    version = DataVersion.objects.filter(name=name).values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_version(name: str):
+    """Increment a version stamp; raw bulk writes that skip signals must call this themselves"""
+    updated = DataVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=timezone.now())
+    if not updated:
+        _, created = DataVersion.objects.get_or_create(name=name, defaults={'version': 1})
+        if not created:
+            DataVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=timezone.now())
@@ -0,0 +1,27 @@
+"""
+Core Views
+Function-based views split by area; every view is re-exported here so URLconfs
+keep referring to views.<name>. Heavy libraries (pandas, NumPy-backed services)
+are imported inside the views that use them.
+"""
+from .dashboard import (
+    generate_actionable_insights, generate_cohort_recommendations, dashboard, hcr_dashboard,
+    research_debug, url_test, hcp_dashboard, mark_insight_addressed, mark_recommendation_reviewed,
+    hcp_profile, generate_dynamic_drug_recommendations,
+)
+from .patients import (
+    patient_database, patient_detail, cluster_detail, add_patient, parse_emr_file,
+    upload_emr_patient, update_patient, delete_patient,
+)
+from .network import (
+    cohort_cluster_network, calculate_patient_overlap, calculate_treatment_similarity,
+    calculate_patient_similarity, generate_intervention_recommendation,
+)
+from .recommendations import (
+    analyze_patient_issues, scrape_medical_research, generate_intelligent_recommendation,
+    generate_cluster_based_recommendation, create_recommendation, delete_recommendation,
+    edit_recommendation, view_recommendation, send_recommendation_message,
+    generate_recommendation_page, create_recommendation_ajax, hcr_recommendations,
+    mark_recommendation_read, accept_recommendation, decline_recommendation,
+    get_recommendation_research,
+)
@@ -0,0 +1,556 @@
+"""
+Recommendation Views
+Intelligent HCR recommendations: generation, editing, sending and HCP responses
+"""
+from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from django.utils import timezone
+from ..models import (HCP, Engagement, HCRRecommendation, AnonymizedPatient, PatientCluster,
+                     PatientIssueAnalysis, ScrapedResearch, IntelligentRecommendation, HCRMessage,
+                     HCPTermRollup)
+from ..vocabulary import top_terms
+from ..research_catalog import rank_research
+from ..research_index import research_candidates
+from ..recommendation_service import (ANALYSIS_FIELDS, MAX_RESEARCH, TOP_DIAGNOSES, TOP_RISK_FACTORS,
+                                      cluster_summary, recommendation_fields, research_keywords,
+                                      save_issue_analyses, summarize_issues)
+
+def analyze_patient_issues(hcp_id):
+    """Analyze common issues across a doctor's patients"""
+    hcp = get_object_or_404(HCP, id=hcp_id)
+    
+    # Covers every patient: term frequencies come from the maintained HCP rollups
+    total_patients = AnonymizedPatient.objects.filter(hcp=hcp).count()
+    
+    if not total_patients:
+        return None
+    
+    print(f"📊 Analyzing {total_patients} patients for {hcp.name}")
+    
+    # Top-k reads off the (hcp, kind, -count) rollup index
+    fields = summarize_issues(
+        hcp.name,
+        total_patients,
+        top_terms(hcp.id, 'DIAGNOSIS', TOP_DIAGNOSES),
+        top_terms(hcp.id, 'RISK_FACTOR', TOP_RISK_FACTORS),
+        HCPTermRollup.objects.filter(hcp=hcp, kind='TREATMENT', count__gt=0).values_list('term', flat=True),
+    )
+    
+    # Refresh the HCP's PatientIssueAnalysis row rather than adding another snapshot
+    return save_issue_analyses({hcp.id: fields})[hcp.id]
+
+def scrape_medical_research(keywords, specialty=None, max_results=10):
+    """Scrape medical research articles based on keywords from patient issues"""
+    # Stored research is narrowed with the term index, then ranked alongside the catalog
+    candidates = research_candidates(keywords, specialty)
+    scraped_articles = rank_research(keywords, specialty, max_results, candidates=candidates)
+    
+    # Save to database
+    saved_articles = []
+    for article_data in scraped_articles:
+        article, created = ScrapedResearch.objects.get_or_create(
+            title=article_data['title'],
+            defaults={
+                'authors': article_data['authors'],
+                'journal': article_data['journal'],
+                'publication_date': article_data['publication_date'],
+                'abstract': article_data['abstract'],
+                'keywords': article_data['keywords'],
+                'specialties': [specialty] if specialty else [],
+                'conditions_mentioned': article_data['conditions'],
+                'treatments_mentioned': article_data['treatments'],
+                'source_url': article_data['source_url'],
+                'relevance_score': article_data['relevance_score']
+            }
+        )
+        saved_articles.append(article)
+    
+    return saved_articles
+
+def generate_intelligent_recommendation(hcp_id, hcr_user):
+    """Generate intelligent recommendation combining patient analysis and research"""
+    hcp = get_object_or_404(HCP, id=hcp_id)
+    
+    # Step 1: Analyze patient issues
+    analysis = analyze_patient_issues(hcp_id)
+    if not analysis:
+        return None
+    
+    # Step 2: Extract keywords from analysis
+    analysis_fields = {field: getattr(analysis, field) for field in ANALYSIS_FIELDS}
+    keywords = research_keywords(analysis_fields)
+    
+    # Step 3: Scrape relevant research
+    relevant_research = scrape_medical_research(keywords, hcp.specialty, max_results=MAX_RESEARCH)
+    
+    # Step 4: Find relevant cluster insights
+    cluster_insights = PatientCluster.objects.filter(hcp=hcp).first()
+    
+    # Step 5: Generate recommendation
+    fields = recommendation_fields(
+        analysis_fields,
+        [{'title': r.title, 'relevance_score': r.relevance_score, 'abstract': r.abstract} for r in relevant_research],
+        cluster_summary(cluster_insights),
+    )
+    if fields:
+        # Create intelligent recommendation
+        recommendation = IntelligentRecommendation.objects.create(
+            hcp=hcp,
+            hcr_sender=hcr_user,
+            patient_analysis=analysis,
+            cluster_insights=cluster_insights,
+            **fields
+        )
+        
+        # Add research articles to recommendation
+        recommendation.relevant_research.set(relevant_research)
+        
+        return recommendation
+    
+    return None
+
+def generate_cluster_based_recommendation(hcp_id, hcr_user, cluster_data):
+    """Generate recommendation based on specific cluster data from network"""
+    hcp = get_object_or_404(HCP, id=hcp_id)
+    cluster = cluster_data['cluster']
+    
+    # Extract keywords from cluster data
+    keywords = []
+    if cluster_data['common_treatments']:
+        keywords.extend(cluster_data['common_treatments'][:3])  # Top 3 treatments
+    if cluster_data['diagnoses']:
+        keywords.extend(cluster_data['diagnoses'][:3])  # Top 3 diagnoses
+    
+    # Scrape relevant research
+    relevant_research = scrape_medical_research(keywords, hcp.specialty, max_results=3)
+    
+    # Create recommendation based on cluster insights
+    recommendation_title = f"Treatment Optimization for {cluster_data['cluster_name']}"
+    
+    recommendation_summary = f"""
+    Based on analysis of your {cluster_data['cluster_name']} cluster with {cluster_data['patient_count']} patients 
+    showing {cluster_data['success_rate']}% treatment success rate, we've identified opportunities to improve 
+    patient outcomes through evidence-based treatment approaches.
+    """
+    
+    # Combine evidence
+    evidence_summary = f"""
+    Cluster Analysis Evidence:
+    - Cluster: {cluster_data['cluster_name']}
+    - Patient Count: {cluster_data['patient_count']} patients
+    - Current Success Rate: {cluster_data['success_rate']}%
+    - Common Treatments: {', '.join(cluster_data['common_treatments'][:3]) if cluster_data['common_treatments'] else 'N/A'}
+    - Primary Diagnoses: {', '.join(cluster_data['diagnoses'][:3]) if cluster_data['diagnoses'] else 'N/A'}
+    
+    Research Evidence:
+    {chr(10).join([f"- {research.title} (Relevance: {research.relevance_score:.2f})" for research in relevant_research[:2]])}
+    
+    Recommendation:
+    Consider implementing the following evidence-based treatments that have shown success 
+    in similar patient clusters, potentially improving your success rate from {cluster_data['success_rate']}% 
+    to 85%+ based on cluster analysis.
+    """
+    
+    # Create patient analysis for the recommendation
+    analysis = PatientIssueAnalysis.objects.create(
+        hcp=hcp,
+        total_patients_analyzed=cluster_data['patient_count'],
+        common_issues=[
+            {'issue': diagnosis, 'frequency': cluster_data['patient_count'] // len(cluster_data['diagnoses']) if cluster_data['diagnoses'] else 1, 'percentage': 100.0}
+            for diagnosis in cluster_data['diagnoses'][:5]
+        ],
+        top_diagnoses=[
+            {'diagnosis': diagnosis, 'frequency': cluster_data['patient_count'] // len(cluster_data['diagnoses']) if cluster_data['diagnoses'] else 1, 'percentage': 100.0}
+            for diagnosis in cluster_data['diagnoses'][:3]
+        ],
+        treatment_gaps=[
+            {'diagnosis': diagnosis, 'frequency': cluster_data['patient_count'] // len(cluster_data['diagnoses']) if cluster_data['diagnoses'] else 1, 'percentage': 100.0}
+            for diagnosis in cluster_data['diagnoses'][:2]
+        ],
+        risk_factors=[],
+        analysis_summary=f"Cluster-based analysis for {cluster_data['cluster_name']} with {cluster_data['patient_count']} patients"
+    )
+    
+    # Create intelligent recommendation
+    recommendation = IntelligentRecommendation.objects.create(
+        hcp=hcp,
+        hcr_sender=hcr_user,
+        patient_analysis=analysis,
+        cluster_insights=cluster,
+        recommendation_title=recommendation_title,
+        recommendation_summary=recommendation_summary.strip(),
+        evidence_summary=evidence_summary.strip(),
+        patient_data_evidence={
+            'total_patients': cluster_data['patient_count'],
+            'cluster_name': cluster_data['cluster_name'],
+            'success_rate': cluster_data['success_rate'],
+            'common_treatments': cluster_data['common_treatments'][:5],
+            'diagnoses': cluster_data['diagnoses'][:5]
+        },
+        research_evidence=[
+            {
+                'title': research.title,
+                'relevance_score': research.relevance_score,
+                'abstract': research.abstract[:200] + '...' if len(research.abstract) > 200 else research.abstract
+            }
+            for research in relevant_research[:2]
+        ],
+        cluster_evidence={
+            'cluster_id': cluster.id,
+            'success_rate': cluster_data['success_rate'],
+            'patient_count': cluster_data['patient_count'],
+            'cluster_name': cluster_data['cluster_name']
+        },
+        priority='HIGH' if cluster_data['success_rate'] < 70 else 'MEDIUM'
+    )
+    
+    # Add research articles to recommendation
+    recommendation.relevant_research.set(relevant_research)
+    
+    return recommendation
+
+@login_required
+def create_recommendation(request, hcp_id):
+    """Create and send intelligent recommendation to HCP"""
+    if request.identity.role != 'HCR':
+        messages.error(request, 'Only Healthcare Representatives can create recommendations.')
+        return redirect('dashboard')
+    
+    hcp = get_object_or_404(HCP, id=hcp_id)
+    
+    # Check if this is coming from cluster network selection
+    cluster_data = None
+    if request.method == 'GET' and 'cluster_id' in request.GET:
+        cluster_id = request.GET.get('cluster_id')
+        try:
+            cluster = PatientCluster.objects.get(id=cluster_id, hcp=hcp)
+            cluster_data = {
+                'cluster': cluster,
+                'cluster_name': cluster.name,
+                'patient_count': cluster.patient_count,
+                'success_rate': cluster.success_rate,
+                'common_treatments': cluster.common_treatments,
+                'diagnoses': cluster.diagnoses
+            }
+        except PatientCluster.DoesNotExist:
+            messages.error(request, 'Selected cluster not found.')
+            return redirect('cohort_cluster_network')
+    
+    # Generate recommendation (either from cluster data or full analysis)
+    if cluster_data:
+        recommendation = generate_cluster_based_recommendation(hcp_id, request.user, cluster_data)
+    else:
+        recommendation = generate_intelligent_recommendation(hcp_id, request.user)
+    
+    if recommendation:
+        messages.success(request, f'Intelligent recommendation created for {recommendation.hcp.name}')
+        return redirect('view_recommendation', recommendation_id=recommendation.id)
+    else:
+        messages.error(request, 'Unable to create recommendation. Insufficient patient data.')
+        return redirect('hcp_profile', hcp_id=hcp_id)
+
+@login_required
+def delete_recommendation(request, recommendation_id):
+    """Delete a draft recommendation"""
+    if request.identity.role != 'HCR':
+        return JsonResponse({'success': False, 'error': 'Only Healthcare Representatives can delete recommendations.'})
+    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method.'})
+    
+    try:
+        recommendation = get_object_or_404(IntelligentRecommendation, id=recommendation_id)
+        
+        # Check if user owns this recommendation
+        if recommendation.hcr_sender != request.user:
+            return JsonResponse({'success': False, 'error': 'You can only delete your own recommendations.'})
+        
+        # Only allow deletion of draft recommendations
+        if recommendation.status != 'DRAFT':
+            return JsonResponse({'success': False, 'error': 'Only draft recommendations can be deleted.'})
+        
+        # Delete the recommendation
+        recommendation.delete()
+        
+        return JsonResponse({'success': True, 'message': 'Recommendation deleted successfully.'})
+    
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Error deleting recommendation: {str(e)}'})
+
+@login_required
+def edit_recommendation(request, recommendation_id):
+    """Edit an existing recommendation"""
+    recommendation = get_object_or_404(IntelligentRecommendation, id=recommendation_id)
+    
+    # Check if user is HCR and owns this recommendation
+    if not (request.identity.role == 'HCR' and recommendation.hcr_sender == request.user):
+        messages.error(request, "You don't have permission to edit this recommendation.")
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        # Update the recommendation with new data
+        recommendation.recommendation_title = request.POST.get('title', recommendation.recommendation_title)
+        recommendation.recommendation_summary = request.POST.get('summary', recommendation.recommendation_summary)
+        recommendation.priority = request.POST.get('priority', recommendation.priority)
+        recommendation.evidence_summary = request.POST.get('evidence_summary', recommendation.evidence_summary)
+        recommendation.save()
+        
+        messages.success(request, "Recommendation updated successfully!")
+        return redirect('view_recommendation', recommendation_id=recommendation.id)
+    
+    context = {
+        'recommendation': recommendation,
+        'is_hcr': request.identity.role == 'HCR'
+    }
+    return render(request, 'core/edit_recommendation.html', context)
+
+@login_required
+def view_recommendation(request, recommendation_id):
+    try:
+        recommendation = IntelligentRecommendation.objects.get(id=recommendation_id)
+    except IntelligentRecommendation.DoesNotExist:
+        messages.error(request, f'Recommendation with ID {recommendation_id} not found.')
+        return redirect('dashboard')
+    
+    # Check permissions
+    if request.identity.role == 'HCR' and recommendation.hcr_sender != request.user:
+        messages.error(request, 'You can only view your own recommendations.')
+        return redirect('dashboard')
+    
+    context = {
+        'recommendation': recommendation,
+        'is_hcr': request.identity.role == 'HCR',
+        'is_hcp': request.identity.role == 'HCP'
+    }
+    
+    return render(request, 'core/recommendation_detail.html', context)
+
+@login_required
+def send_recommendation_message(request, recommendation_id):
+    """Send recommendation as message to HCP"""
+    if request.identity.role != 'HCR':
+        messages.error(request, 'Only Healthcare Representatives can send messages.')
+        return redirect('dashboard')
+    
+    recommendation = get_object_or_404(IntelligentRecommendation, id=recommendation_id)
+    
+    if request.method == 'POST':
+        subject = request.POST.get('subject', recommendation.recommendation_title)
+        message_content = request.POST.get('message_content', recommendation.recommendation_summary)
+        
+        # Create HCRRecommendation for the HCP dashboard
+        hcr_recommendation = HCRRecommendation.objects.create(
+            hcp_user=recommendation.hcp.user,
+            title=subject,
+            message=message_content,
+            priority='HIGH' if recommendation.priority == 'HIGH' else 'MEDIUM',
+            research_update=None  # We can link this later if needed
+        )
+        
+        # Also create message for record keeping
+        message = HCRMessage.objects.create(
+            sender=request.user,
+            recipient_hcp=recommendation.hcp,
+            message_type='RECOMMENDATION',
+            subject=subject,
+            message_content=message_content,
+            recommendation=recommendation
+        )
+        
+        # Update recommendation status
+        recommendation.status = 'SENT'
+        recommendation.sent_date = timezone.now()
+        recommendation.save()
+        
+        messages.success(request, f'Recommendation sent to {recommendation.hcp.name}')
+        return redirect('dashboard')
+    
+    context = {
+        'recommendation': recommendation
+    }
+    
+    return render(request, 'core/send_recommendation.html', context)
+
+@login_required
+def generate_recommendation_page(request):
+    """Page for selecting HCP and generating recommendations"""
+    if request.identity.role != 'HCR':
+        messages.error(request, 'Only Healthcare Representatives can generate recommendations.')
+        return redirect('dashboard')
+    
+    # Get all HCPs with patient counts and last contact dates
+    hcps = []
+    for hcp in HCP.objects.all():
+        # Count patients for this HCP
+        patient_count = AnonymizedPatient.objects.filter(hcp=hcp).count()
+        
+        # Get last engagement date
+        last_engagement = Engagement.objects.filter(hcp=hcp).order_by('-date').first()
+        last_contact = last_engagement.date if last_engagement else None
+        
+        hcps.append({
+            'id': hcp.id,
+            'name': hcp.name,
+            'specialty': hcp.specialty,
+            'contact_info': hcp.contact_info,
+            'patient_count': patient_count,
+            'last_contact': last_contact
+        })
+    
+    context = {
+        'hcps': hcps
+    }
+    
+    return render(request, 'core/generate_recommendation.html', context)
+
+@login_required
+def create_recommendation_ajax(request, hcp_id):
+    """AJAX endpoint for creating recommendations"""
+    if request.identity.role != 'HCR':
+        return JsonResponse({'success': False, 'error': 'Only Healthcare Representatives can create recommendations.'})
+    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method.'})
+    
+    try:
+        print(f"🚀 Starting recommendation generation for HCP {hcp_id}")
+        
+        # Check if HCP exists
+        hcp = get_object_or_404(HCP, id=hcp_id)
+        print(f"✅ Found HCP: {hcp.name}")
+        
+        # Check if HCP has patients
+        patient_count = AnonymizedPatient.objects.filter(hcp=hcp).count()
+        print(f"📊 HCP has {patient_count} patients")
+        
+        if patient_count == 0:
+            return JsonResponse({'success': False, 'error': f'No patients found for {hcp.name}. Cannot generate recommendations without patient data.'})
+        
+        recommendation = generate_intelligent_recommendation(hcp_id, request.user)
+        
+        if recommendation:
+            print(f"✅ Recommendation created: {recommendation.recommendation_title}")
+            
+            # Get research articles for the modal
+            research_articles = []
+            for research in recommendation.relevant_research.all()[:3]:
+                research_articles.append({
+                    'title': research.title,
+                    'authors': research.authors,
+                    'journal': research.journal,
+                    'publication_date': research.publication_date,
+                    'source_url': research.source_url
+                })
+            
+            return JsonResponse({
+                'success': True,
+                'recommendation_title': recommendation.recommendation_title,
+                'redirect_url': f'/dashboard/recommendation/{recommendation.id}/',
+                'research_articles': research_articles
+            })
+        else:
+            return JsonResponse({'success': False, 'error': 'Unable to create recommendation. No treatment gaps found in patient data.'})
+    
+    except Exception as e:
+        print(f"❌ Error generating recommendation: {str(e)}")
+        return JsonResponse({'success': False, 'error': f'Error generating recommendation: {str(e)}'})
+
+@login_required
+def hcr_recommendations(request):
+    """Display HCR recommendations for the current HCP"""
+    try:
+        # Get all recommendations for the current user (HCP)
+        recommendations = HCRRecommendation.objects.filter(hcp_user=request.user).order_by('-created_date')
+        
+        # Get unread count
+        unread_count = recommendations.filter(is_read=False).count()
+        
+        # Pagination
+        from django.core.paginator import Paginator
+        paginator = Paginator(recommendations, 10)  # Show 10 per page
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+        
+        context = {
+            'recommendations': page_obj,
+            'unread_count': unread_count,
+            'page_title': 'HCR Recommendations'
+        }
+        
+        return render(request, 'core/hcr_recommendations.html', context)
+        
+    except Exception as e:
+        print(f"❌ Error loading HCR recommendations: {str(e)}")
+        return render(request, 'core/hcr_recommendations.html', {
+            'recommendations': [],
+            'unread_count': 0,
+            'error': f'Error loading recommendations: {str(e)}'
+        })
+
+@require_http_methods(["POST"])
+@login_required
+def mark_recommendation_read(request, recommendation_id):
+    """Mark a recommendation as read"""
+    try:
+        recommendation = get_object_or_404(HCRRecommendation, id=recommendation_id, hcp_user=request.user)
+        recommendation.is_read = True
+        recommendation.save()
+        
+        return JsonResponse({'success': True, 'message': 'Recommendation marked as read'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+@require_http_methods(["POST"])
+@login_required
+def accept_recommendation(request, recommendation_id):
+    """Accept a recommendation"""
+    try:
+        recommendation = get_object_or_404(HCRRecommendation, id=recommendation_id, hcp_user=request.user)
+        recommendation.status = 'ACCEPTED'
+        recommendation.is_read = True
+        recommendation.save()
+        
+        return JsonResponse({'success': True, 'message': 'Recommendation accepted successfully'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+@require_http_methods(["POST"])
+@login_required
+def decline_recommendation(request, recommendation_id):
+    """Decline a recommendation"""
+    try:
+        recommendation = get_object_or_404(HCRRecommendation, id=recommendation_id, hcp_user=request.user)
+        recommendation.status = 'DECLINED'
+        recommendation.is_read = True
+        recommendation.save()
+        
+        return JsonResponse({'success': True, 'message': 'Recommendation declined'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+@login_required
+def get_recommendation_research(request, recommendation_id):
+    """Get research articles for a specific recommendation"""
+    try:
+        recommendation = get_object_or_404(HCRRecommendation, id=recommendation_id, hcp_user=request.user)
+        
+        # Get research articles associated with this recommendation
+        research_articles = []
+        for research in recommendation.relevant_research.all()[:3]:
+            research_articles.append({
+                'title': research.title,
+                'authors': research.authors,
+                'journal': research.journal,
+                'publication_date': research.publication_date,
+                'source_url': research.source_url
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'research_articles': research_articles
+        })
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
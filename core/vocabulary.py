@@ -0,0 +1,302 @@
+"""
+Clinical Vocabulary
+Normalizes the delimited patient text fields into Condition/Treatment/RiskFactor
+link tables, keeps per-HCP term rollups current by applying deltas, and answers
+frequency questions with indexed SQL group-bys
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import (
+    AnonymizedPatient, Condition, Treatment, RiskFactor,
+    PatientCondition, PatientTreatment, PatientRiskFactor, HCPTermRollup,
+)
+from .versioning import PATIENTS, bump_version
+
+logger = logging.getLogger(__name__)
+
+_DELIMITER_RE = re.compile(r'[;,]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Placeholder values that mean "nothing recorded" rather than a real term
+NULL_TERMS = {'', 'none', 'none identified', 'none significant', 'n/a', 'na', 'unknown'}
+
+# patient field -> (vocabulary model, link model, link FK name, link kind field, link kind value)
+TERM_FIELDS = {
+    'primary_diagnosis': (Condition, PatientCondition, 'condition', 'source', 'PRIMARY'),
+    'secondary_diagnoses': (Condition, PatientCondition, 'condition', 'source', 'SECONDARY'),
+    'comorbidities': (Condition, PatientCondition, 'condition', 'source', 'COMORBIDITY'),
+    'current_treatments': (Treatment, PatientTreatment, 'treatment', 'status', 'CURRENT'),
+    'treatment_history': (Treatment, PatientTreatment, 'treatment', 'status', 'HISTORY'),
+    'risk_factors': (RiskFactor, PatientRiskFactor, 'risk_factor', None, None),
+}
+
+LINK_MODELS = [PatientCondition, PatientTreatment, PatientRiskFactor]
+
+_rollups_deferred = ContextVar('rollups_deferred', default=False)
+
+# patient field -> HCPTermRollup kind; treatment_history is not rolled up
+ROLLUP_KINDS = {
+    'primary_diagnosis': 'DIAGNOSIS',
+    'secondary_diagnoses': 'DIAGNOSIS',
+    'comorbidities': 'COMORBIDITY',
+    'current_treatments': 'TREATMENT',
+    'risk_factors': 'RISK_FACTOR',
+}
+
+
+def term_key(term: str) -> str:
+    return _WHITESPACE_RE.sub(' ', term).strip().lower()
+
+
+def split_terms(text: str) -> List[str]:
+    """Split a ';'- or ','-delimited field into unique, trimmed terms (order kept)"""
+    if not text:
+        return []
+    terms = []
+    seen = set()
+    for raw in _DELIMITER_RE.split(text):
+        term = _WHITESPACE_RE.sub(' ', raw).strip()
+        key = term.lower()
+        if key in NULL_TERMS or key in seen:
+            continue
+        seen.add(key)
+        terms.append(term)
+    return terms
+
+
+def field_terms(field: str, value: str) -> List[str]:
+    """Terms for one patient field; primary_diagnosis is a single term, not a list"""
+    if field == 'primary_diagnosis':
+        term = _WHITESPACE_RE.sub(' ', value or '').strip()
+        return [] if term.lower() in NULL_TERMS else [term]
+    return split_terms(value)
+
+
+def resolve_terms(model, names: Iterable[str]) -> Dict[str, int]:
+    """Map term keys to vocabulary ids, creating missing terms in bulk"""
+    by_key = {}
+    for name in names:
+        by_key.setdefault(term_key(name), name)
+    if not by_key:
+        return {}
+
+    ids = dict(model.objects.filter(key__in=by_key).values_list('key', 'id'))
+    missing = [model(name=name, key=key) for key, name in by_key.items() if key not in ids]
+    if missing:
+        model.objects.bulk_create(missing, ignore_conflicts=True)
+        ids.update(model.objects.filter(key__in=[m.key for m in missing]).values_list('key', 'id'))
+    return ids
+
+
+def _build_links(rows: List[Tuple]) -> Dict:
+    """Link model instances for (patient_id, field values...) rows in TERM_FIELDS order"""
+    fields = list(TERM_FIELDS)
+    terms_by_model = {}
+    parsed = []
+    for row in rows:
+        patient_id, values = row[0], row[1:]
+        patient_terms = {field: field_terms(field, value) for field, value in zip(fields, values)}
+        parsed.append((patient_id, patient_terms))
+        for field, terms in patient_terms.items():
+            terms_by_model.setdefault(TERM_FIELDS[field][0], set()).update(terms)
+
+    ids_by_model = {model: resolve_terms(model, terms) for model, terms in terms_by_model.items()}
+
+    links = {link_model: {} for link_model in LINK_MODELS}
+    for patient_id, patient_terms in parsed:
+        for field, terms in patient_terms.items():
+            model, link_model, fk_name, kind_field, kind = TERM_FIELDS[field]
+            for term in terms:
+                term_id = ids_by_model[model][term_key(term)]
+                # Keyed so a term repeated within one kind links once
+                unique_key = (patient_id, term_id, kind)
+                if unique_key in links[link_model]:
+                    continue
+                values = {'patient_id': patient_id, f'{fk_name}_id': term_id}
+                if kind_field:
+                    values[kind_field] = kind
+                links[link_model][unique_key] = link_model(**values)
+    return links
+
+
+def sync_patients(patient_ids: List[int], previous_hcp_ids: Optional[Dict[int, int]] = None):
+    """
+    Rebuild the vocabulary links for the given patients from their text fields
+    and apply the difference to the HCP rollups. `previous_hcp_ids` maps
+    patients that moved to another HCP to the HCP their old links counted for.
+    """
+    rows = list(
+        AnonymizedPatient.objects.filter(id__in=patient_ids).values_list('id', *TERM_FIELDS)
+    )
+    links = _build_links(rows)
+    with transaction.atomic():
+        track = not _rollups_deferred.get()
+        before = rollup_counts(patient_ids, previous_hcp_ids) if track else None
+        for link_model in LINK_MODELS:
+            link_model.objects.filter(patient_id__in=patient_ids).delete()
+            link_model.objects.bulk_create(links[link_model].values(), batch_size=5000)
+        if track:
+            after = rollup_counts(patient_ids)
+            after.subtract(before)
+            apply_rollup_delta(after)
+
+
+def sync_patient(patient: AnonymizedPatient, previous_hcp_id: Optional[int] = None):
+    previous = {patient.pk: previous_hcp_id} if previous_hcp_id is not None else None
+    sync_patients([patient.pk], previous)
+
+
+@contextmanager
+def defer_rollups():
+    """Skip per-patient rollup deltas inside the block (bulk deletes) and rebuild once after"""
+    token = _rollups_deferred.set(True)
+    try:
+        yield
+    finally:
+        _rollups_deferred.reset(token)
+    rebuild_rollups()
+
+
+def remove_patient_rollups(patient_ids: List[int]):
+    """Subtract patients' links from the rollups; call before the patients are deleted"""
+    if _rollups_deferred.get():
+        return
+    delta = Counter()
+    delta.subtract(rollup_counts(patient_ids))
+    apply_rollup_delta(delta)
+
+
+def rollup_counts(patient_ids: List[int], hcp_overrides: Optional[Dict[int, int]] = None) -> Counter:
+    """Counter of (hcp_id, kind, term) contributed by the current links of `patient_ids`"""
+    counts = Counter()
+    for field, kind in ROLLUP_KINDS.items():
+        _, link_model, fk_name, kind_field, link_kind = TERM_FIELDS[field]
+        links = link_model.objects.filter(patient_id__in=patient_ids)
+        if kind_field:
+            links = links.filter(**{kind_field: link_kind})
+
+        group = ['patient__hcp_id', f'{fk_name}__name']
+        if hcp_overrides:
+            group.append('patient_id')
+        for row in links.values(*group).annotate(count=Count('id')).order_by():
+            hcp_id = row['patient__hcp_id']
+            if hcp_overrides:
+                hcp_id = hcp_overrides.get(row['patient_id'], hcp_id)
+            counts[(hcp_id, kind, row[f'{fk_name}__name'])] += row['count']
+    return counts
+
+
+def apply_rollup_delta(delta: Dict[Tuple[int, str, str], int]):
+    """Add signed (hcp_id, kind, term) deltas to HCPTermRollup with F() updates"""
+    delta = {key: change for key, change in delta.items() if change}
+    if not delta:
+        return
+
+    with transaction.atomic():
+        # Only increments can introduce a term; decrements always hit an existing row
+        HCPTermRollup.objects.bulk_create(
+            [HCPTermRollup(hcp_id=h, kind=k, term=t) for (h, k, t), change in delta.items() if change > 0],
+            ignore_conflicts=True,
+        )
+        rows = HCPTermRollup.objects.filter(
+            hcp_id__in={key[0] for key in delta},
+            term__in={key[2] for key in delta},
+        ).values_list('id', 'hcp_id', 'kind', 'term')
+
+        # One UPDATE per distinct delta value keeps this race-free without per-row queries
+        ids_by_change = {}
+        for row_id, hcp_id, kind, term in rows:
+            change = delta.get((hcp_id, kind, term))
+            if change:
+                ids_by_change.setdefault(change, []).append(row_id)
+        now = timezone.now()
+        for change, ids in ids_by_change.items():
+            HCPTermRollup.objects.filter(id__in=ids).update(count=F('count') + change, updated_at=now)
+
+
+def rebuild_rollups(hcp_ids: Optional[List[int]] = None):
+    """Recompute HCP rollups from scratch (after bulk loads or to repair drift)"""
+    patients = AnonymizedPatient.objects.all()
+    rollups = HCPTermRollup.objects.all()
+    if hcp_ids is not None:
+        patients = patients.filter(hcp_id__in=hcp_ids)
+        rollups = rollups.filter(hcp_id__in=hcp_ids)
+
+    with transaction.atomic():
+        rollups.delete()
+        counts = rollup_counts(patients.values('id'))
+        HCPTermRollup.objects.bulk_create(
+            [HCPTermRollup(hcp_id=h, kind=k, term=t, count=c) for (h, k, t), c in counts.items()],
+            batch_size=5000,
+        )
+
+
+def top_terms(hcp_id: int, kind: str, limit: int) -> List[Tuple[str, int]]:
+    """The `limit` most frequent terms of one kind for an HCP, read straight off the rollup index"""
+    rows = (
+        HCPTermRollup.objects.filter(hcp_id=hcp_id, kind=kind, count__gt=0)
+        .order_by('-count', 'term')
+        .values_list('term', 'count')[:limit]
+    )
+    return list(rows)
+
+
+def backfill_vocabulary(queryset=None, batch_size: int = 2000,
+                        progress: Optional[Callable[[int], None]] = None) -> int:
+    """Populate vocabulary links for every patient in `queryset` (default: all)"""
+    queryset = queryset if queryset is not None else AnonymizedPatient.objects.all()
+    ids = list(queryset.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), batch_size):
+        sync_patients(ids[start:start + batch_size])
+        if progress:
+            progress(min(start + batch_size, len(ids)))
+    bump_version(PATIENTS)  # Links written without patient saves; cohort bitmaps read them
+    return len(ids)
+
+
+def term_counts(fields: List[str], patient_ids=None, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Occurrence counts of terms across one or more patient fields of the same
+    vocabulary, most frequent first. `patient_ids` may be a list or a queryset.
+    """
+    model, link_model, fk_name, kind_field, _ = TERM_FIELDS[fields[0]]
+    links = link_model.objects.all()
+    if kind_field:
+        links = links.filter(**{f'{kind_field}__in': [TERM_FIELDS[f][4] for f in fields]})
+    if patient_ids is not None:
+        links = links.filter(patient_id__in=patient_ids)
+
+    counts = (
+        links.values(f'{fk_name}__name')
+        .annotate(count=Count('id'))
+        .order_by('-count', f'{fk_name}__name')
+    )
+    if limit:
+        counts = counts[:limit]
+    return [(row[f'{fk_name}__name'], row['count']) for row in counts]
+
+
+def terms_by_group(field: str, group_path: str, group_ids: List, filters: Optional[Dict] = None) -> Dict:
+    """
+    Distinct terms of `field` per group, e.g. comorbidities per cluster with
+    group_path='patient__cluster_memberships__cluster_id'. `filters` further
+    restricts the links (e.g. to one cluster when grouping by treatment).
+    """
+    _, link_model, fk_name, kind_field, kind = TERM_FIELDS[field]
+    links = link_model.objects.filter(**{f'{group_path}__in': group_ids}, **(filters or {}))
+    if kind_field:
+        links = links.filter(**{kind_field: kind})
+
+    grouped = {group_id: set() for group_id in group_ids}
+    for group_id, name in links.values_list(group_path, f'{fk_name}__name').distinct():
+        grouped[group_id].add(name)
+    return grouped
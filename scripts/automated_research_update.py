@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 """
 Automated Research Update Script
-Runs daily to update the medical research database
+Kept for existing cron / Task Scheduler entries: runs the built-in scheduler's
+research_refresh job once, with its lease and JobRun history. New setups should
+run `python manage.py run_scheduler` instead (see docs/RESEARCH_AUTOMATION_SETUP.md)
 """
 import os
 import sys
@@ -9,7 +11,7 @@ import django
 from pathlib import Path
 
 # Add the project root directory to the Python path
-BASE_DIR = Path(__file__).resolve().parent
+BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.append(str(BASE_DIR))
 
 # Set up Django environment
@@ -17,9 +19,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'providerpulse.settings')
 django.setup()
 
 # Now import Django modules
-from core.research_generator import SimplifiedResearchGenerator
+from core.scheduler import default_owner, get_jobs, run_job, sync_jobs
 import logging
-from datetime import datetime
 
 # Configure logging
 logging.basicConfig(
@@ -33,24 +34,23 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+JOB_NAME = 'research_refresh'
+
 def main():
-    """Main function to update research database"""
+    """Run the research_refresh job now; exit 1 if it fails or another scheduler holds it"""
     logger.info("Starting automated research update...")
-    
-    try:
-        generator = SimplifiedResearchGenerator()
-        result = generator.update_all_specialties()
-        
-        logger.info("Research update completed successfully!")
-        logger.info(f"Statistics: {result}")
-        
-        # Log individual specialty distributions
-        for specialty, count in result['specialty_distribution'].items():
-            logger.info(f"  {specialty}: {count} articles")
-            
-    except Exception as e:
-        logger.error(f"Research update failed: {e}")
+
+    jobs = get_jobs()
+    sync_jobs(jobs)
+    run = run_job(JOB_NAME, jobs[JOB_NAME], default_owner(), force=True)
+
+    if run is None:
+        logger.error("Research update skipped: another scheduler is running it")
+        sys.exit(1)
+    if run.status != 'SUCCESS':
+        logger.error(f"Research update failed (JobRun {run.id}):\n{run.output}")
         sys.exit(1)
+    logger.info(f"Research update completed in {run.duration_seconds:.1f}s")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,11 +8,6 @@ import os
 import sys
 import django
 import numpy as np
-import pandas as pd
-from sklearn.cluster import KMeans, DBSCAN
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import silhouette_score
-from sklearn.decomposition import PCA
 from datetime import datetime, timedelta
 import json
 
@@ -24,28 +19,35 @@ django.setup()
 from core.models import (AnonymizedPatient, EMRDataPoint, PatientOutcome, 
                         PatientCluster, ClusterMembership, ClusterInsight, 
                         DrugRecommendation, HCP)
+from core.observations import REFERENCE_RANGES, latest_values, parse_numeric
+from core.outcome_stats import group_outcome_stats
+
+# Lab and vital metrics used as clustering features, normalized against their reference ranges
+LAB_FEATURES = ['Hemoglobin A1c', 'Total Cholesterol', 'LDL Cholesterol', 'HDL Cholesterol', 'Creatinine']
+VITAL_FEATURES = ['Blood Pressure Systolic', 'Blood Pressure Diastolic', 'Heart Rate']
 
 class PatientClusteringEngine:
     """Advanced patient clustering engine using machine learning"""
     
     def __init__(self):
+        # scikit-learn is imported where it is used so importing this module stays cheap
+        from sklearn.preprocessing import StandardScaler
         self.scaler = StandardScaler()
         self.label_encoders = {}
         
     def prepare_patient_features(self, patients):
         """Prepare patient data for clustering"""
-        features = []
-        patient_ids = []
+        patients = list(patients)
+        patient_ids = [patient.id for patient in patients]
         
-        for patient in patients:
-            feature_vector = self._extract_patient_features(patient)
-            features.append(feature_vector)
-            patient_ids.append(patient.id)
+        # Latest typed observations for every patient in one query
+        observed = latest_values(patient_ids, LAB_FEATURES + VITAL_FEATURES)
+        features = [self._extract_patient_features(patient, observed[i]) for i, patient in enumerate(patients)]
         
         return np.array(features), patient_ids
     
-    def _extract_patient_features(self, patient):
-        """Extract numerical features from patient data"""
+    def _extract_patient_features(self, patient, observed):
+        """Extract numerical features from patient data and its latest observed lab/vital values"""
         features = []
         
         # Age group encoding
@@ -70,42 +72,17 @@ class PatientClusteringEngine:
         features.append(patient.emergency_visits_6m)
         features.append(patient.hospitalizations_6m)
         
-        # Lab values (extract numerical values)
-        lab_values = patient.last_lab_values or {}
-        for test_name, unit, min_val, max_val in [
-            ('Hemoglobin A1c', '%', 4.0, 6.5),
-            ('Total Cholesterol', 'mg/dL', 120, 200),
-            ('LDL Cholesterol', 'mg/dL', 70, 130),
-            ('HDL Cholesterol', 'mg/dL', 40, 60),
-            ('Creatinine', 'mg/dL', 0.6, 1.2)
-        ]:
-            if test_name in lab_values:
-                try:
-                    value = float(lab_values[test_name].split()[0])
-                    # Normalize to 0-1 scale
-                    normalized = (value - min_val) / (max_val - min_val)
-                    features.append(normalized)
-                except:
-                    features.append(0.5)  # Default middle value
-            else:
-                features.append(0.5)
-        
-        # Vital signs
-        vital_signs = patient.vital_signs or {}
-        for vital_name, unit, min_val, max_val in [
-            ('Blood Pressure Systolic', 'mmHg', 90, 140),
-            ('Blood Pressure Diastolic', 'mmHg', 60, 90),
-            ('Heart Rate', 'bpm', 60, 100)
-        ]:
-            if vital_name in vital_signs:
-                try:
-                    value = float(vital_signs[vital_name].split()[0])
-                    normalized = (value - min_val) / (max_val - min_val)
-                    features.append(normalized)
-                except:
-                    features.append(0.5)
-            else:
-                features.append(0.5)
+        # Lab values and vital signs; patients without data points fall back to their snapshot
+        snapshot = {**(patient.last_lab_values or {}), **(patient.vital_signs or {})}
+        for metric, value in zip(LAB_FEATURES + VITAL_FEATURES, observed):
+            if np.isnan(value):
+                value = parse_numeric(snapshot.get(metric))
+            if value is None:
+                features.append(0.5)  # Default middle value
+                continue
+            # Normalize to 0-1 over the reference range
+            min_val, max_val, _ = REFERENCE_RANGES[metric]
+            features.append((value - min_val) / (max_val - min_val))
         
         # Treatment response score (based on outcomes)
         outcomes = patient.outcomes.all()
@@ -121,6 +98,8 @@ class PatientClusteringEngine:
     
     def find_optimal_clusters(self, features, max_clusters=10):
         """Find optimal number of clusters using silhouette analysis"""
+        from sklearn.cluster import KMeans
+        from sklearn.metrics import silhouette_score
         if len(features) < 2:
             return 1
             
@@ -139,6 +118,7 @@ class PatientClusteringEngine:
     
     def cluster_patients(self, hcp, cluster_type='DIAGNOSIS'):
         """Cluster patients for a specific HCP"""
+        from sklearn.cluster import KMeans
         patients = AnonymizedPatient.objects.filter(hcp=hcp)
         
         if patients.count() < 3:
@@ -198,16 +178,9 @@ class PatientClusteringEngine:
             primary_diagnoses = [p.primary_diagnosis for p in cluster_patients]
             most_common_diagnosis = max(set(primary_diagnoses), key=primary_diagnoses.count)
             
-            # Calculate success rate
-            total_outcomes = 0
-            improved_outcomes = 0
-            for patient in cluster_patients:
-                for outcome in patient.outcomes.all():
-                    total_outcomes += 1
-                    if outcome.outcome == 'IMPROVED':
-                        improved_outcomes += 1
-            
-            success_rate = (improved_outcomes / total_outcomes * 100) if total_outcomes > 0 else 50.0
+            # Calculate success rate with one grouped outcome query
+            outcomes = group_outcome_stats([p.id for p in cluster_patients])
+            success_rate = outcomes['success_rate'] if outcomes['total'] > 0 else 50.0
             
             # Get common treatments
             all_treatments = []